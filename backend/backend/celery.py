@@ -0,0 +1,18 @@
+"""
+Celery app for the optional worker / beat processes.
+
+Settings prefixed CELERY_ (CELERY_BROKER_URL, CELERY_BEAT_SCHEDULE...) are
+read from Django settings; tasks are found in each app's tasks.py.
+
+    celery -A backend worker -l info
+    celery -A backend beat -l info
+"""
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+app = Celery('backend')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
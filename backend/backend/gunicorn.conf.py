@@ -0,0 +1,29 @@
+"""
+gunicorn settings: gunicorn backend.wsgi -c backend/gunicorn.conf.py
+
+Each worker loads the resume NLP pipeline (candidate/resume_nlp.py) right
+after it forks, so the first resume upload a worker serves does not pay for
+spacy.load().
+
+Memory: every worker holds its own copy of the model, roughly 50 MB for
+en_core_web_sm and 600+ MB for en_core_web_lg on top of Django itself, so
+workers x that must fit in RAM. The default worker count is cpu_count * 2 + 1
+capped at GUNICORN_MAX_WORKERS (default 8); GUNICORN_WORKERS sets it exactly.
+RESUME_NLP_ENABLED=0 skips the model in the web workers altogether.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS',
+    min(multiprocessing.cpu_count() * 2 + 1, int(os.environ.get('GUNICORN_MAX_WORKERS', 8))),
+))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+
+def post_fork(server, worker):
+    # Runs before the worker imports backend.wsgi, so point Django at its settings first
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    from candidate import resume_nlp
+    resume_nlp.init_worker()
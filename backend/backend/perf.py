@@ -0,0 +1,208 @@
+"""
+Opt-in request profiling.
+
+Off unless PERF_PROFILING=1 is set in the environment (settings.py then adds
+ProfilingMiddleware first in MIDDLEWARE). For every request it records, under
+the resolved URL name (e.g. 'candidate-bulk-fetch'):
+
+- wall time, SQL query count and SQL time
+- duplicated queries: the same SQL (parameters aside) run more than once in
+  one request, which is what an N+1 looks like
+- response size and status
+
+Records go into a ring buffer of the last PERF_BUFFER_SIZE requests kept in
+the shared cache (see backend/shared_cache.py), so every worker process writes
+to the same buffer and `manage.py perf_report` can read it (streamed bodies
+are timed up to the first byte):
+
+    GET /api/_perf/?sort=p95_ms&limit=20      admin users only; DELETE clears it
+    python manage.py perf_report --top 20 --sort max_queries
+
+PERF_QUERY_BUDGETS ({url name: max queries}, falling back to
+PERF_DEFAULT_QUERY_BUDGET) are checked on every recorded request; a request
+over budget is logged as a warning with its worst duplicated query.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SLOT_KEY = 'perf:slot:{}'
+COUNTER_KEY = 'perf:counter'
+DEFAULT_BUFFER_SIZE = 1000
+SKIPPED_URL_NAMES = ('perf-report',)
+SORT_FIELDS = ('p95_ms', 'p50_ms', 'max_ms', 'avg_queries', 'max_queries', 'avg_sql_ms', 'duplicates', 'requests',
+               'avg_bytes', 'over_budget')
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_SPACES = re.compile(r'\s+')
+
+
+def buffer_size():
+    return max(1, int(getattr(settings, 'PERF_BUFFER_SIZE', DEFAULT_BUFFER_SIZE)))
+
+
+def query_budget(endpoint):
+    """Max queries allowed for a URL name, or None"""
+    budgets = getattr(settings, 'PERF_QUERY_BUDGETS', {}) or {}
+    return budgets.get(endpoint, getattr(settings, 'PERF_DEFAULT_QUERY_BUDGET', None))
+
+
+def fingerprint(sql):
+    """SQL with IN lists of any length collapsed, so batches of one query shape compare equal"""
+    return _IN_LIST.sub('IN (...)', _SPACES.sub(' ', str(sql)).strip())
+
+
+# -----------------------------
+# Recording
+# -----------------------------
+class _QueryLog:
+    """connection.execute_wrapper that counts and times every query"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.shapes[fingerprint(sql)] += 1
+
+    def duplicates(self, top=5):
+        """(extra executions of repeated shapes, [(times run, sql)] for the worst `top`)"""
+        repeated = [(times, sql) for sql, times in self.shapes.most_common() if times > 1]
+        return sum(times - 1 for times, _ in repeated), [(times, sql[:300]) for times, sql in repeated[:top]]
+
+
+def _response_size(response):
+    if getattr(response, 'streaming', False):
+        length = response.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+def store(record):
+    """Append a record to the shared ring buffer"""
+    try:
+        position = cache.incr(COUNTER_KEY)
+    except ValueError:
+        cache.add(COUNTER_KEY, 0, None)
+        position = cache.incr(COUNTER_KEY)
+    cache.set(SLOT_KEY.format(position % buffer_size()), record, None)
+
+
+def records():
+    """Buffered records, oldest first"""
+    found = cache.get_many([SLOT_KEY.format(slot) for slot in range(buffer_size())])
+    return sorted(found.values(), key=lambda record: record['at'])
+
+
+def clear():
+    cache.delete_many([SLOT_KEY.format(slot) for slot in range(buffer_size())] + [COUNTER_KEY])
+
+
+class ProfilingMiddleware:
+    """Times each request and its SQL; see the module docstring"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        log = _QueryLog()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(log))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.view_name if match else None) or request.path
+        if endpoint in SKIPPED_URL_NAMES:
+            return response
+        try:
+            self._record(request, response, endpoint, elapsed, log)
+        except Exception as e:
+            # Profiling must never break the request
+            logger.error(f"Request profiling failed for {endpoint}: {e}", exc_info=True)
+        return response
+
+    def _record(self, request, response, endpoint, elapsed, log):
+        duplicates, worst = log.duplicates()
+        record = {
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'ms': round(elapsed * 1000, 2),
+            'queries': log.count,
+            'sql_ms': round(log.seconds * 1000, 2),
+            'duplicates': duplicates,
+            'duplicate_queries': worst,
+            'bytes': _response_size(response),
+            'at': time.time(),
+        }
+        budget = query_budget(endpoint)
+        record['over_budget'] = budget is not None and log.count > budget
+        if record['over_budget']:
+            logger.warning(
+                f"[PERF] {request.method} {endpoint} ran {log.count} queries (budget {budget}, "
+                f"{duplicates} duplicated){f'; worst: {worst[0][0]}x {worst[0][1]}' if worst else ''}"
+            )
+        store(record)
+
+
+# -----------------------------
+# Reports
+# -----------------------------
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(rows=None, sort='p95_ms', limit=20):
+    """Per-endpoint rollup of the buffered records, worst first by `sort`"""
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort '{sort}', use one of: {', '.join(SORT_FIELDS)}")
+    grouped = {}
+    for record in (records() if rows is None else rows):
+        grouped.setdefault(record['endpoint'], []).append(record)
+
+    summary = []
+    for endpoint, group in grouped.items():
+        times = [record['ms'] for record in group]
+        sizes = [record['bytes'] for record in group if record['bytes'] is not None]
+        worst = Counter()
+        for record in group:
+            for times_run, sql in record['duplicate_queries']:
+                worst[sql] = max(worst[sql], times_run)
+        summary.append({
+            'endpoint': endpoint,
+            'requests': len(group),
+            'p50_ms': _percentile(times, 0.5),
+            'p95_ms': _percentile(times, 0.95),
+            'max_ms': max(times),
+            'avg_queries': round(sum(record['queries'] for record in group) / len(group), 1),
+            'max_queries': max(record['queries'] for record in group),
+            'avg_sql_ms': round(sum(record['sql_ms'] for record in group) / len(group), 2),
+            'duplicates': max(record['duplicates'] for record in group),
+            'duplicate_queries': [{'times': times_run, 'sql': sql} for sql, times_run in worst.most_common(3)],
+            'avg_bytes': round(sum(sizes) / len(sizes)) if sizes else None,
+            'budget': query_budget(endpoint),
+            'over_budget': sum(1 for record in group if record['over_budget']),
+        })
+    summary.sort(key=lambda row: row[sort] or 0, reverse=True)
+    return summary[:limit] if limit else summary
+
@@ -0,0 +1,45 @@
+"""
+orjson-based DRF renderer.
+
+FastJSONRenderer is a drop-in for rest_framework.renderers.JSONRenderer (the
+default in settings.py unless FAST_JSON_RENDERER=0) for the large list
+payloads (bulk_fetch with up to 5000 candidates, all / job-rows with
+all=true). It writes the same JSON the stdlib renderer does:
+
+- datetimes, dates, times, Decimals, lazy strings, querysets, sets... go
+  through DRF's own JSONEncoder.default, so "2026-10-18T09:30:00Z" stays
+  "Z"-suffixed and raw Decimals stay numbers
+- non-string dict keys are coerced to strings like json.dumps does
+- U+2028 / U+2029 are escaped like DRF does
+- compact separators and raw (not \\u-escaped) UTF-8, DRF's defaults
+
+Anything orjson cannot encode (ints over 64 bits, an ?indent= request, or
+non-default UNICODE_JSON / COMPACT_JSON settings) falls back to the stdlib
+renderer, as does a missing orjson package. Floats may differ in exponent
+spelling only (1e+16 vs 1e16), which parses to the same value.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional dependency, the stdlib renderer is used without it
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer with the same output, encoded by orjson when it is installed"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
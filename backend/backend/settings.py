@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
+import tempfile
 from pathlib import Path
 import pymysql
 from corsheaders.defaults import default_headers
@@ -55,16 +57,37 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.middleware.gzip.GZipMiddleware',  # Add GZIP compression for faster response
+    'backend.compression.CompressionMiddleware',  # gzip / brotli over RESPONSE_COMPRESSION_MIN_BYTES
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'empreg.identity.EmployeeIdentityMiddleware',  # request.employee, resolved once per request
     'django.contrib.messages.middleware.MessageMiddleware',
     # 'django.middleware.clickjacking.XFrameOptionsMiddleware',  # Commented out for PDF iframe support
 ]
 
+# Response compression (backend/compression.py): brotli for JSON when the client
+# accepts it and the brotli package is installed, else gzip; smaller bodies are sent as-is.
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '4'))
+
+# Request profiling (backend/perf.py): off unless PERF_PROFILING=1.
+# Reports: GET /api/_perf/ (admin users) or `python manage.py perf_report`.
+PERF_PROFILING = os.environ.get('PERF_PROFILING', '') == '1'
+PERF_BUFFER_SIZE = int(os.environ.get('PERF_BUFFER_SIZE', '1000'))  # requests kept in the ring buffer
+# Max SQL queries per URL name; requests over budget are logged as warnings.
+# These run in 2-3 queries once caches are warm (see the query count tests).
+PERF_QUERY_BUDGETS = {
+    'candidate-bulk-fetch': 8,
+    'candidate-search': 8,
+    'candidate-my-candidates': 10,
+}
+PERF_DEFAULT_QUERY_BUDGET = int(os.environ.get('PERF_DEFAULT_QUERY_BUDGET', '50'))
+if PERF_PROFILING:
+    MIDDLEWARE.insert(0, 'backend.perf.ProfilingMiddleware')
+
 # CORS_ALLOW_ALL_ORIGINS = True
 
 # CORS_ALLOW_ALL_ORIGINS = DEBUG
@@ -135,16 +158,39 @@ DATABASES = {
 }
 
 # Cache Configuration (for performance optimization)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'TIMEOUT': 300,  # 5 minutes default
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000
+# One cache shared by every worker process (see backend/shared_cache.py):
+# redis when REDIS_URL is set, otherwise files under DJANGO_CACHE_DIR.
+# Test runs get a private in-memory cache.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if 'test' in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+            'TIMEOUT': 300,
+        }
+    }
+elif REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': 300,  # 5 minutes default
+            'KEY_PREFIX': 'staunch',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('DJANGO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'staunch_cache')),
+            'TIMEOUT': 300,  # 5 minutes default
+            'KEY_PREFIX': 'staunch',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000
+            }
         }
     }
-}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -175,6 +221,26 @@ USE_I18N = True
 
 USE_TZ = True
 
+# Celery (optional, backend/celery.py): worker and beat read the broker from
+# the environment. Without a broker resume parsing uses a local process pool
+# and expire_nfds runs from cron instead (see candidate/tasks.py).
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+CELERY_TIMEZONE = TIME_ZONE
+try:
+    from celery.schedules import crontab
+except ImportError:  # celery not installed
+    crontab = None
+CELERY_BEAT_SCHEDULE = {
+    'expire-nfds': {
+        'task': 'candidate.tasks.expire_nfds',
+        'schedule': crontab(hour=0, minute=1),
+    },
+    'requeue-stale-resume-jobs': {
+        'task': 'candidate.tasks.requeue_stale_resume_jobs',
+        'schedule': 600.0,
+    },
+} if crontab else {}
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -191,11 +257,17 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 # Allowed file types for resume upload
 ALLOWED_RESUME_EXTENSIONS = ['.pdf', '.doc', '.docx']
 MAX_RESUME_SIZE = 10 * 1024 * 1024  # 10MB
+# spaCy NER for resume parsing (candidate/resume_nlp.py); RESUME_NLP_ENABLED=0 skips the model
+RESUME_NLP_ENABLED = os.environ.get('RESUME_NLP_ENABLED', '1') == '1'
 
 # Media files settings for user uploads (profile photos, documents)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Django REST Framework settings (optional, but good defaults)
+# orjson renderer (backend/renderers.py), same output as DRF's JSONRenderer;
+# FAST_JSON_RENDERER=0 goes back to the stdlib one.
+FAST_JSON_RENDERER = os.environ.get('FAST_JSON_RENDERER', '1') == '1'
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
@@ -210,7 +282,7 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.MultiPartParser' # Essential for file uploads
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'backend.renderers.FastJSONRenderer' if FAST_JSON_RENDERER else 'rest_framework.renderers.JSONRenderer',
     ],
 }
 
@@ -0,0 +1,190 @@
+"""
+Shared, versioned cache for computed report data.
+
+settings.CACHES points at a backend every worker process shares (redis when
+REDIS_URL is set, otherwise files under DJANGO_CACHE_DIR; tests use
+LocMemCache). Keys embed the current version of each data namespace they
+depend on:
+
+    key = shared_cache.make_key('remarks_counts', ('candidate', 'client_job'), from_date, to_date)
+    data = shared_cache.get(key)
+    if data is None:
+        data = compute()
+        shared_cache.put(key, data, 300)
+
+Candidate / ClientJob / CandidateStatusHistory / CandidateRevenue / Employee
+signals call
+bump_on_commit(), so every key built on the old version stops matching once
+the write commits; stale entries just age out. Writes that skip signals
+(bulk_create, QuerySet.update) bump explicitly. 'org' is bumped by the
+empreg/hierarchy.py rebuilds.
+
+Hit/miss counts are kept per process and in the shared cache: stats().
+A lookup only bumps the per-process counts; they reach the shared cache in
+batches (every STATS_FLUSH_EVERY lookups or STATS_FLUSH_SECONDS, and on
+stats()), so counting does not add a cache write to every read. On
+FileBasedCache incr() is a read-modify-write of a file, so flushes from two
+processes at once can lose counts: treat the shared numbers as approximate
+there (redis increments atomically).
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+NAMESPACES = ('candidate', 'client_job', 'status_history', 'employee', 'revenue', 'org')
+VERSION_KEY = 'ns:{}:v'
+STATS_KEY = 'stats:{}:{}'
+STATS_NAMES_KEY = 'stats:names'
+STATS_FLUSH_EVERY = 100
+STATS_FLUSH_SECONDS = 60
+
+_lock = threading.Lock()
+_local_stats = {}
+# Counted here but not yet added to the shared cache
+_pending_stats = {}
+_pending_total = 0
+_last_flush = time.monotonic()
+
+
+# -----------------------------
+# Versions
+# -----------------------------
+def _initial_version():
+    # Not 1: if a version key is evicted it restarts above every value it had before,
+    # so entries cached under the old versions can never match again
+    return int(time.time() * 1000)
+
+
+def versions(*namespaces):
+    """{namespace: current version} in one cache round trip"""
+    keys = {VERSION_KEY.format(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    result = {}
+    for key, namespace in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _initial_version(), None)
+            version = cache.get(key)
+        result[namespace] = version
+    return result
+
+
+def bump(*namespaces):
+    """Invalidate every key built on these namespaces"""
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Not set yet (or evicted)
+            cache.set(key, _initial_version(), None)
+
+
+def bump_on_commit(*namespaces):
+    """
+    bump() once the current transaction commits (right away outside one), so
+    no reader can cache pre-commit data under the new version. Saves inside
+    one transaction share a single callback.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        for entry in connection.run_on_commit:
+            pending = getattr(entry[1], 'shared_cache_namespaces', None)
+            if pending is not None:
+                pending.update(namespaces)
+                return
+
+    def flush():
+        # Cleared once run, so later writes schedule their own callback
+        namespaces, flush.shared_cache_namespaces = flush.shared_cache_namespaces, None
+        bump(*namespaces)
+
+    flush.shared_cache_namespaces = set(namespaces)
+    transaction.on_commit(flush)
+
+
+# -----------------------------
+# Keys and values
+# -----------------------------
+def make_key(name, namespaces, *parts):
+    """'<name>:<ns>.<version>,...:<digest of parts>'"""
+    current = versions(*namespaces)
+    stamp = ','.join(f'{namespace}.{current[namespace]}' for namespace in namespaces)
+    digest = hashlib.md5('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'{name}:{stamp}:{digest}'
+
+
+def _count(name, outcome):
+    global _pending_total
+    with _lock:
+        counts = _local_stats.setdefault(name, {'hits': 0, 'misses': 0})
+        counts[outcome] += 1
+        pending = _pending_stats.setdefault(name, {'hits': 0, 'misses': 0})
+        pending[outcome] += 1
+        _pending_total += 1
+        due = _pending_total >= STATS_FLUSH_EVERY or time.monotonic() - _last_flush >= STATS_FLUSH_SECONDS
+    if due:
+        flush_stats()
+
+
+def _incr(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def flush_stats():
+    """Add this process's pending hit/miss counts to the shared counters"""
+    global _pending_stats, _pending_total, _last_flush
+    with _lock:
+        pending, _pending_stats, _pending_total = _pending_stats, {}, 0
+        _last_flush = time.monotonic()
+    if not pending:
+        return
+    for name, counts in pending.items():
+        for outcome, delta in counts.items():
+            if delta:
+                _incr(STATS_KEY.format(name, outcome), delta)
+    names = cache.get(STATS_NAMES_KEY) or []
+    new_names = [name for name in pending if name not in names]
+    if new_names:
+        cache.set(STATS_NAMES_KEY, names + new_names, None)
+
+
+def get(key):
+    value = cache.get(key)
+    _count(key.split(':', 1)[0], 'misses' if value is None else 'hits')
+    return value
+
+
+def put(key, value, timeout=300):
+    cache.set(key, value, timeout)
+
+
+def stats():
+    """Hit/miss counts for this process and across all processes, plus namespace versions"""
+    flush_stats()
+    with _lock:
+        process = {name: dict(counts) for name, counts in _local_stats.items()}
+    names = sorted(set(cache.get(STATS_NAMES_KEY) or []) | process.keys())
+    shared_keys = [STATS_KEY.format(name, outcome) for name in names for outcome in ('hits', 'misses')]
+    found = cache.get_many(shared_keys)
+    shared = {
+        name: {outcome: found.get(STATS_KEY.format(name, outcome), 0) for outcome in ('hits', 'misses')}
+        for name in names
+    }
+    for counts in list(process.values()) + list(shared.values()):
+        total = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / total, 3) if total else None
+    return {
+        'backend': settings.CACHES['default']['BACKEND'],
+        'process': process,
+        'shared': shared,
+        'versions': versions(*NAMESPACES),
+    }
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Load the resume NLP model up front when RESUME_NLP_PRELOAD is set
+from candidate import resume_nlp
+resume_nlp.preload_if_configured()
@@ -1,8 +1,12 @@
+import json
 import os
 import re
-import PyPDF2
 from typing import Dict, Any, Optional
 
+from . import resume_nlp
+from . import text_extraction
+from .keyword_matcher import KeywordMatcher
+
 # Handle docx import with fallback
 try:
     from docx import Document
@@ -26,43 +30,159 @@ except ImportError:
 # -------------------- TEXT EXTRACTION --------------------
 
 def extract_text_from_pdf(pdf_path: str) -> str:
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text
-    except Exception as e:
-
-        return ""
+    return text_extraction.extract_pdf(pdf_path).text
 
 def extract_text_from_docx(docx_path: str) -> str:
     if not DOCX_AVAILABLE:
 
         return ""
     try:
-        doc = Document(docx_path)
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
+        return text_extraction.extract_docx(docx_path).text
     except Exception as e:
 
         return ""
 
-def extract_text_from_doc(doc_path: str) -> str:
+def extract_text_from_doc(doc_path) -> str:
     if not TEXTRACT_AVAILABLE:
 
         return ""
     try:
-        return textract.process(doc_path).decode("utf-8")
+        # textract only reads files on disk
+        with text_extraction.as_path(doc_path, ".doc") as path:
+            return textract.process(path).decode("utf-8")
     except Exception as e:
 
         return ""
 
+# -------------------- KEYWORD TABLES --------------------
+# Table order is match priority. Compiled once below (see keyword_matcher.py).
+
+STATES = [
+    'andhra pradesh', 'arunachal pradesh', 'assam', 'bihar', 'chhattisgarh',
+    'goa', 'gujarat', 'haryana', 'himachal pradesh', 'jharkhand', 'karnataka',
+    'kerala', 'madhya pradesh', 'maharashtra', 'manipur', 'meghalaya', 'mizoram',
+    'nagaland', 'odisha', 'punjab', 'rajasthan', 'sikkim', 'tamil nadu',
+    'telangana', 'tripura', 'uttar pradesh', 'uttarakhand', 'west bengal',
+    'delhi', 'puducherry', 'chandigarh', 'dadra and nagar haveli', 'daman and diu',
+    'lakshadweep', 'andaman and nicobar islands', 'jammu and kashmir', 'ladakh'
+]
+
+STATE_ABBREVIATIONS = {
+    'AP': 'Andhra Pradesh', 'AR': 'Arunachal Pradesh', 'AS': 'Assam', 'BR': 'Bihar',
+    'CG': 'Chhattisgarh', 'GA': 'Goa', 'GJ': 'Gujarat', 'HR': 'Haryana',
+    'HP': 'Himachal Pradesh', 'JH': 'Jharkhand', 'KA': 'Karnataka', 'KL': 'Kerala',
+    'MP': 'Madhya Pradesh', 'MH': 'Maharashtra', 'MN': 'Manipur', 'ML': 'Meghalaya',
+    'MZ': 'Mizoram', 'NL': 'Nagaland', 'OR': 'Odisha', 'PB': 'Punjab',
+    'RJ': 'Rajasthan', 'SK': 'Sikkim', 'TN': 'Tamil Nadu', 'TG': 'Telangana',
+    'TR': 'Tripura', 'UP': 'Uttar Pradesh', 'UK': 'Uttarakhand', 'WB': 'West Bengal'
+}
+
+CITIES = ['mumbai', 'delhi', 'bangalore', 'hyderabad', 'ahmedabad', 'chennai',
+          'kolkata', 'surat', 'pune', 'jaipur', 'lucknow', 'kanpur', 'nagpur',
+          'indore', 'thane', 'bhopal', 'visakhapatnam', 'patna', 'vadodara',
+          'ludhiana', 'agra', 'nashik', 'faridabad', 'meerut', 'rajkot', 'varanasi']
+
+LANGUAGES = [
+    'english', 'tamil', 'telugu', 'hindi', 'kannada', 'malayalam', 'marathi',
+    'gujarati', 'punjabi', 'bengali', 'urdu', 'french', 'german', 'spanish',
+    'chinese', 'japanese'
+]
+
+SKILLS = [
+    'python', 'java', 'c++', 'c#', 'react', 'angular', 'django', 'flask',
+    'sql', 'mysql', 'postgresql', 'mongodb', 'aws', 'azure', 'docker',
+    'kubernetes', 'html', 'css', 'js', 'photoshop', 'illustrator',
+    'excel', 'word', 'powerpoint', 'ms office'
+]
+
+EDUCATION_MAPPING = {
+    # Post Graduate (PG)
+    'phd': {'level': 'PG', 'priority': 4, 'qualification': 'PhD'},
+    'ph.d': {'level': 'PG', 'priority': 4, 'qualification': 'PhD'},
+    'doctorate': {'level': 'PG', 'priority': 4, 'qualification': 'PhD'},
+    'mba': {'level': 'PG', 'priority': 3, 'qualification': 'MBA'},
+    'm.tech': {'level': 'PG', 'priority': 3, 'qualification': 'M.Tech'},
+    'mtech': {'level': 'PG', 'priority': 3, 'qualification': 'M.Tech'},
+    'm.e': {'level': 'PG', 'priority': 3, 'qualification': 'M.E'},
+    'mca': {'level': 'PG', 'priority': 3, 'qualification': 'MCA'},
+    'msc': {'level': 'PG', 'priority': 3, 'qualification': 'M.Sc'},
+    'ma': {'level': 'PG', 'priority': 3, 'qualification': 'MA'},
+    'mcom': {'level': 'PG', 'priority': 3, 'qualification': 'M.Com'},
+
+    # Under Graduate (UG)
+    'b.tech': {'level': 'UG', 'priority': 2, 'qualification': 'B.Tech'},
+    'btech': {'level': 'UG', 'priority': 2, 'qualification': 'B.Tech'},
+    'b.e': {'level': 'UG', 'priority': 2, 'qualification': 'B.E'},
+    'be': {'level': 'UG', 'priority': 2, 'qualification': 'B.E'},
+    'bca': {'level': 'UG', 'priority': 2, 'qualification': 'BCA'},
+    'bsc': {'level': 'UG', 'priority': 2, 'qualification': 'B.Sc'},
+    'ba': {'level': 'UG', 'priority': 2, 'qualification': 'BA'},
+    'bcom': {'level': 'UG', 'priority': 2, 'qualification': 'B.Com'},
+    'degree': {'level': 'UG', 'priority': 2, 'qualification': 'Degree'},
+    'graduation': {'level': 'UG', 'priority': 2, 'qualification': 'Graduation'},
+
+    # Higher Secondary
+    'hsc': {'level': 'HSC', 'priority': 1, 'qualification': 'HSC'},
+    'intermediate': {'level': 'HSC', 'priority': 1, 'qualification': 'Intermediate'},
+    '12th': {'level': 'HSC', 'priority': 1, 'qualification': '12th'},
+    'plus two': {'level': 'HSC', 'priority': 1, 'qualification': '+2'},
+    '+2': {'level': 'HSC', 'priority': 1, 'qualification': '+2'},
+
+    # Secondary
+    'ssc': {'level': 'SSC', 'priority': 0, 'qualification': 'SSC'},
+    '10th': {'level': 'SSC', 'priority': 0, 'qualification': '10th'},
+    'matriculation': {'level': 'SSC', 'priority': 0, 'qualification': 'Matriculation'},
+}
+
+STATE_ABBR_MATCHER = KeywordMatcher(STATE_ABBREVIATIONS, case_sensitive=True)
+LANGUAGE_MATCHER = KeywordMatcher({lang: lang.title() for lang in LANGUAGES})
+SKILL_MATCHER = KeywordMatcher({skill: skill.title() for skill in SKILLS})
+EDUCATION_MATCHER = KeywordMatcher(list(EDUCATION_MAPPING))
+
+# Extra states/cities exported from the locations tables (tbl_state / tbl_city)
+# by `manage.py sync_parser_locations`; read on first use, after the built-in tables.
+LOCATION_TERMS_FILE = os.path.join('resume_parser', 'locations.json')
+_location_matcher_cache = {}
+
+
+def location_terms_path() -> Optional[str]:
+    try:
+        from django.conf import settings
+        return os.path.join(settings.MEDIA_ROOT, LOCATION_TERMS_FILE)
+    except Exception:
+        return None
+
+
+def build_location_matchers(extra_states=(), extra_cities=()) -> Dict[str, KeywordMatcher]:
+    states = {state: state.title() for state in STATES}
+    for state in extra_states:
+        states.setdefault(' '.join(state.lower().split()), ' '.join(state.split()).title())
+    cities = {city: city.title() for city in CITIES}
+    for city in extra_cities:
+        cities.setdefault(' '.join(city.lower().split()), ' '.join(city.split()).title())
+    return {'state': KeywordMatcher(states), 'city': KeywordMatcher(cities)}
+
+
+def _location_matchers() -> Dict[str, KeywordMatcher]:
+    if not _location_matcher_cache:
+        extra = {}
+        path = location_terms_path()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as handle:
+                    extra = json.load(handle)
+            except (OSError, ValueError):
+                extra = {}
+        _location_matcher_cache.update(
+            build_location_matchers(extra.get('states', []), extra.get('cities', []))
+        )
+    return _location_matcher_cache
+
+
+def reset_location_matchers():
+    """Drop the compiled location tables so the next parse re-reads the locations file"""
+    _location_matcher_cache.clear()
+
 # -------------------- FIELD EXTRACTION --------------------
 
 def extract_email(text: str) -> Optional[str]:
@@ -107,47 +227,15 @@ def extract_pincode(text: str) -> Optional[str]:
     return match.group() if match else None
 
 def extract_state(text: str) -> Optional[str]:
-    states = [
-        'andhra pradesh', 'arunachal pradesh', 'assam', 'bihar', 'chhattisgarh',
-        'goa', 'gujarat', 'haryana', 'himachal pradesh', 'jharkhand', 'karnataka',
-        'kerala', 'madhya pradesh', 'maharashtra', 'manipur', 'meghalaya', 'mizoram',
-        'nagaland', 'odisha', 'punjab', 'rajasthan', 'sikkim', 'tamil nadu',
-        'telangana', 'tripura', 'uttar pradesh', 'uttarakhand', 'west bengal',
-        'delhi', 'puducherry', 'chandigarh', 'dadra and nagar haveli', 'daman and diu',
-        'lakshadweep', 'andaman and nicobar islands', 'jammu and kashmir', 'ladakh'
-    ]
-    for state in states:
-        pattern = r'\b' + re.escape(state) + r'\b'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return state.title()
-
-    state_abbr = {
-        'ap': 'Andhra Pradesh', 'ar': 'Arunachal Pradesh', 'as': 'Assam', 'br': 'Bihar',
-        'cg': 'Chhattisgarh', 'ga': 'Goa', 'gj': 'Gujarat', 'hr': 'Haryana',
-        'hp': 'Himachal Pradesh', 'jh': 'Jharkhand', 'ka': 'Karnataka', 'kl': 'Kerala',
-        'mp': 'Madhya Pradesh', 'mh': 'Maharashtra', 'mn': 'Manipur', 'ml': 'Meghalaya',
-        'mz': 'Mizoram', 'nl': 'Nagaland', 'or': 'Odisha', 'pb': 'Punjab',
-        'rj': 'Rajasthan', 'sk': 'Sikkim', 'tn': 'Tamil Nadu', 'tg': 'Telangana',
-        'tr': 'Tripura', 'up': 'Uttar Pradesh', 'uk': 'Uttarakhand', 'wb': 'West Bengal'
-    }
-    for abbr, full_name in state_abbr.items():
-        pattern = r'\b' + abbr.upper() + r'\b'
-        if re.search(pattern, text, re.IGNORECASE):
-            return full_name
-    return None
+    matchers = _location_matchers()
+    state = matchers['state'].first(text)
+    if state:
+        return state
+    # Abbreviations only as capitalised tokens ("TN"), not English words like "as" / "or"
+    return STATE_ABBR_MATCHER.first(text)
 
 def extract_city(text: str) -> Optional[str]:
-    cities = ['mumbai', 'delhi', 'bangalore', 'hyderabad', 'ahmedabad', 'chennai',
-              'kolkata', 'surat', 'pune', 'jaipur', 'lucknow', 'kanpur', 'nagpur',
-              'indore', 'thane', 'bhopal', 'visakhapatnam', 'patna', 'vadodara',
-              'ludhiana', 'agra', 'nashik', 'faridabad', 'meerut', 'rajkot', 'varanasi']
-    for city in cities:
-        pattern = r'\b' + re.escape(city) + r'\b'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return city.title()
-    return None
+    return _location_matchers()['city'].first(text)
 
 def extract_gender(text: str) -> Optional[str]:
     if re.search(r'\bmale\b', text, re.I):
@@ -157,81 +245,27 @@ def extract_gender(text: str) -> Optional[str]:
     return None
 
 def extract_languages(text: str) -> list:
-    keywords = [
-        'english', 'tamil', 'telugu', 'hindi', 'kannada', 'malayalam', 'marathi',
-        'gujarati', 'punjabi', 'bengali', 'urdu', 'french', 'german', 'spanish',
-        'chinese', 'japanese'
-    ]
-    found = [lang.title() for lang in keywords if lang in text.lower()]
-    return list(set(found))
+    return LANGUAGE_MATCHER.find_all(text)
 
 def extract_skills(text: str) -> list:
-    keywords = [
-        'python', 'java', 'c++', 'c#', 'react', 'angular', 'django', 'flask',
-        'sql', 'mysql', 'postgresql', 'mongodb', 'aws', 'azure', 'docker',
-        'kubernetes', 'html', 'css', 'js', 'photoshop', 'illustrator',
-        'excel', 'word', 'powerpoint', 'ms office'
-    ]
-    found = [skill.title() for skill in keywords if skill in text.lower()]
-    return list(set(found))
+    return SKILL_MATCHER.find_all(text)
 
 def extract_education(text: str) -> dict:
-    education_mapping = {
-        # Post Graduate (PG)
-        'phd': {'level': 'PG', 'priority': 4, 'qualification': 'PhD'},
-        'ph.d': {'level': 'PG', 'priority': 4, 'qualification': 'PhD'},
-        'doctorate': {'level': 'PG', 'priority': 4, 'qualification': 'PhD'},
-        'mba': {'level': 'PG', 'priority': 3, 'qualification': 'MBA'},
-        'm.tech': {'level': 'PG', 'priority': 3, 'qualification': 'M.Tech'},
-        'mtech': {'level': 'PG', 'priority': 3, 'qualification': 'M.Tech'},
-        'm.e': {'level': 'PG', 'priority': 3, 'qualification': 'M.E'},
-        'mca': {'level': 'PG', 'priority': 3, 'qualification': 'MCA'},
-        'msc': {'level': 'PG', 'priority': 3, 'qualification': 'M.Sc'},
-        'ma': {'level': 'PG', 'priority': 3, 'qualification': 'MA'},
-        'mcom': {'level': 'PG', 'priority': 3, 'qualification': 'M.Com'},
-
-        # Under Graduate (UG)
-        'b.tech': {'level': 'UG', 'priority': 2, 'qualification': 'B.Tech'},
-        'btech': {'level': 'UG', 'priority': 2, 'qualification': 'B.Tech'},
-        'b.e': {'level': 'UG', 'priority': 2, 'qualification': 'B.E'},
-        'be': {'level': 'UG', 'priority': 2, 'qualification': 'B.E'},
-        'bca': {'level': 'UG', 'priority': 2, 'qualification': 'BCA'},
-        'bsc': {'level': 'UG', 'priority': 2, 'qualification': 'B.Sc'},
-        'ba': {'level': 'UG', 'priority': 2, 'qualification': 'BA'},
-        'bcom': {'level': 'UG', 'priority': 2, 'qualification': 'B.Com'},
-        'degree': {'level': 'UG', 'priority': 2, 'qualification': 'Degree'},
-        'graduation': {'level': 'UG', 'priority': 2, 'qualification': 'Graduation'},
-
-        # Higher Secondary
-        'hsc': {'level': 'HSC', 'priority': 1, 'qualification': 'HSC'},
-        'intermediate': {'level': 'HSC', 'priority': 1, 'qualification': 'Intermediate'},
-        '12th': {'level': 'HSC', 'priority': 1, 'qualification': '12th'},
-        'plus two': {'level': 'HSC', 'priority': 1, 'qualification': '+2'},
-        '+2': {'level': 'HSC', 'priority': 1, 'qualification': '+2'},
-
-        # Secondary
-        'ssc': {'level': 'SSC', 'priority': 0, 'qualification': 'SSC'},
-        '10th': {'level': 'SSC', 'priority': 0, 'qualification': '10th'},
-        'matriculation': {'level': 'SSC', 'priority': 0, 'qualification': 'Matriculation'},
-    }
-
-    lines = text.split("\n")
     found_qualifications = []
 
-    for line in lines:
+    for line in text.split("\n"):
         line_lower = line.lower().strip()
         if not line_lower:
             continue
-        for keyword, info in education_mapping.items():
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, line_lower, re.IGNORECASE):
-                found_qualifications.append({
-                    'keyword': keyword,
-                    'level': info['level'],
-                    'priority': info['priority'],
-                    'qualification': info['qualification'],
-                    'line': line.strip()
-                })
+        for keyword in EDUCATION_MATCHER.matched_keywords(line_lower):
+            info = EDUCATION_MAPPING[keyword]
+            found_qualifications.append({
+                'keyword': keyword,
+                'level': info['level'],
+                'priority': info['priority'],
+                'qualification': info['qualification'],
+                'line': line.strip()
+            })
 
     if not found_qualifications:
         return {}
@@ -294,13 +328,21 @@ def extract_experience(text: str) -> dict:
 
 # -------------------- MAIN PARSER --------------------
 
-def alternative_parse_resume(file_path: str) -> Dict[str, Any]:
+def alternative_parse_resume(file_path, filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    file_path: a path, or bytes / a file-like object (e.g. an upload) parsed
+    in memory; filename gives the extension when it is not a path.
+    """
     try:
-        if file_path.lower().endswith(".pdf"):
-            text = extract_text_from_pdf(file_path)
-        elif file_path.lower().endswith(".docx"):
-            text = extract_text_from_docx(file_path)
-        elif file_path.lower().endswith(".doc"):
+        extraction = None
+        name = (filename or (file_path if isinstance(file_path, str) else getattr(file_path, "name", "")) or "").lower()
+        if name.endswith(".pdf"):
+            extraction = text_extraction.extract_pdf(file_path)
+            text = extraction.text
+        elif name.endswith(".docx"):
+            extraction = text_extraction.extract_docx(file_path) if DOCX_AVAILABLE else None
+            text = extraction.text if extraction else ""
+        elif name.endswith(".doc"):
             text = extract_text_from_doc(file_path)
         else:
             return {"success": False, "error": "Unsupported file format"}
@@ -323,6 +365,11 @@ def alternative_parse_resume(file_path: str) -> Dict[str, Any]:
             "experience": extract_experience(text),
             "raw_text": text
         }
+        if extraction is not None:
+            # no_of_pages, pages_parsed, extraction_backend, extraction_ms
+            parsed_data.update(extraction.as_metrics())
+        # Name / organisations from the process-wide spaCy model when one is installed (resume_nlp.py)
+        parsed_data.update(resume_nlp.get_service().extract_fields(text, parsed_data))
         return {"success": True, "data": parsed_data}
 
     except Exception as e:
@@ -0,0 +1,209 @@
+"""
+Daily calendar rollup (calendar_daily_counts).
+
+calendar_stats used to run three TruncDate GROUP BY aggregations over
+ClientJob and CandidateStatusHistory per request. The same counts are kept
+here per (date, event_type, branch_id, team_id, employee_id):
+
+- ClientJob / CandidateStatusHistory signals (candidate/signals.py) apply
+  +1/-1 deltas as rows are saved or deleted
+- `manage.py rebuild_calendar_counts` recomputes a date range from scratch;
+  a run over the whole history records a DerivedTableBuild row, and until
+  then calendar_stats aggregates the source tables instead
+
+Event types follow calendar_details: NFD/EDJ from ClientJob dates, and
+IF/SEL/NR/INP/PS/ATND from status history remarks.
+"""
+from collections import defaultdict
+from datetime import datetime, date as date_cls
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+EVENT_TYPES = ("IF", "NFD", "EDJ", "PS", "SEL", "NR", "INP", "FP", "ATND")
+
+# Status history remarks -> calendar event type (same mapping as calendar_details)
+HISTORY_EVENT_TYPES = {
+    "interview fixed": "IF",
+    "selected": "SEL",
+    "next round": "NR",
+    "in process": "INP",
+}
+
+
+def _as_date(value):
+    """Normalise DateField/DateTimeField/string values to a date (None if unusable)"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    if isinstance(value, date_cls):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value.strip()[:10], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return None
+
+
+def _scope(branch_id, team_id, employee_id):
+    # NULL scopes are stored as 0/'' so the unique key stays unique
+    return (branch_id or 0, team_id or 0, employee_id or '')
+
+
+def history_event_type(remarks, attend_flag, profile_submission):
+    """Calendar event type for a status history row, or None if it is not a calendar event"""
+    if attend_flag:
+        return "ATND"
+    remarks = (remarks or "").strip().lower()
+    if remarks == "profile submitted":
+        return "PS" if profile_submission == 1 else None
+    return HISTORY_EVENT_TYPES.get(remarks)
+
+
+def client_job_keys(job):
+    """Rollup keys a ClientJob contributes to"""
+    scope = _scope(job.branch_id, job.team_id, job.employee_id)
+    keys = []
+    nfd = _as_date(job.next_follow_up_date)
+    if nfd:
+        keys.append((nfd, "NFD") + scope)
+    ejd = _as_date(job.expected_joining_date)
+    if ejd:
+        keys.append((ejd, "EDJ") + scope)
+    return keys
+
+
+def status_history_keys(entry):
+    """Rollup keys a CandidateStatusHistory row contributes to"""
+    event_type = history_event_type(entry.remarks, entry.attend_flag, entry.profile_submission)
+    change_date = _as_date(entry.change_date)
+    if not event_type or not change_date:
+        return []
+    return [(change_date, event_type) + _scope(entry.branch_id, entry.team_id, entry.employee_id)]
+
+
+def apply_deltas(deltas):
+    """
+    Apply {key: delta} to calendar_daily_counts
+    key = (date, event_type, branch_id, team_id, employee_id)
+    """
+    from .models import CalendarDailyCount
+
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        day, event_type, branch_id, team_id, employee_id = key
+        lookup = dict(date=day, event_type=event_type, branch_id=branch_id,
+                      team_id=team_id, employee_id=employee_id)
+        updated = CalendarDailyCount.objects.filter(**lookup).update(count=F('count') + delta)
+        if updated or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                CalendarDailyCount.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            # Created concurrently by another request
+            CalendarDailyCount.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def diff_keys(old_keys, new_keys):
+    deltas = defaultdict(int)
+    for key in old_keys:
+        deltas[key] -= 1
+    for key in new_keys:
+        deltas[key] += 1
+    return deltas
+
+
+def aggregate_counts(start_date, end_date):
+    """
+    Compute rollup rows for [start_date, end_date] straight from the source tables
+    Returns {key: count}
+    """
+    from .models import ClientJob, CandidateStatusHistory
+
+    counts = defaultdict(int)
+    scope_fields = ("branch_id", "team_id", "employee_id")
+
+    followups = (
+        ClientJob.objects
+        .filter(next_follow_up_date__range=[start_date, end_date])
+        .values("next_follow_up_date", *scope_fields)
+        .annotate(count=Count("id"))
+    )
+    for row in followups:
+        key = (row["next_follow_up_date"], "NFD") + _scope(row["branch_id"], row["team_id"], row["employee_id"])
+        counts[key] += row["count"]
+
+    joinings = (
+        ClientJob.objects
+        .filter(expected_joining_date__date__range=[start_date, end_date])
+        .annotate(day=TruncDate("expected_joining_date"))
+        .values("day", *scope_fields)
+        .annotate(count=Count("id"))
+    )
+    for row in joinings:
+        key = (row["day"], "EDJ") + _scope(row["branch_id"], row["team_id"], row["employee_id"])
+        counts[key] += row["count"]
+
+    history = (
+        CandidateStatusHistory.objects
+        .filter(change_date__range=[start_date, end_date])
+        .values("change_date", "remarks", "attend_flag", "profile_submission", *scope_fields)
+        .annotate(count=Count("id"))
+    )
+    for row in history:
+        event_type = history_event_type(row["remarks"], row["attend_flag"], row["profile_submission"])
+        if event_type:
+            key = (row["change_date"], event_type) + _scope(row["branch_id"], row["team_id"], row["employee_id"])
+            counts[key] += row["count"]
+
+    return counts
+
+
+def rebuild(start_date, end_date):
+    """Replace the rollup rows for [start_date, end_date]; returns number of rows written"""
+    from .models import CalendarDailyCount
+
+    counts = aggregate_counts(start_date, end_date)
+    rows = [
+        CalendarDailyCount(
+            date=day, event_type=event_type, branch_id=branch_id,
+            team_id=team_id, employee_id=employee_id, count=count,
+        )
+        for (day, event_type, branch_id, team_id, employee_id), count in counts.items()
+        if count
+    ]
+    with transaction.atomic():
+        CalendarDailyCount.objects.filter(date__range=[start_date, end_date]).delete()
+        CalendarDailyCount.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def daily_counts(start_date, end_date, branch_id=None, team_id=None, employee_ids=None):
+    """
+    {date: {event_type: count}} for the range, optionally scoped to a branch,
+    team and/or list of employee codes. One indexed range scan on the rollup.
+    """
+    from .models import CalendarDailyCount
+
+    queryset = CalendarDailyCount.objects.filter(date__range=[start_date, end_date])
+    if branch_id:
+        queryset = queryset.filter(branch_id=branch_id)
+    if team_id:
+        queryset = queryset.filter(team_id=team_id)
+    if employee_ids:
+        queryset = queryset.filter(employee_id__in=employee_ids)
+
+    daily = defaultdict(dict)
+    rows = queryset.values("date", "event_type").annotate(total=Sum("count"))
+    for row in rows:
+        if row["total"]:
+            daily[row["date"]][row["event_type"]] = row["total"]
+    return daily
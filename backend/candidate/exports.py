@@ -0,0 +1,181 @@
+"""
+Streaming CSV / XLSX exports.
+
+The databank screens used to ask job_rows / all_candidates for `all=true`:
+every row serialized into one JSON list, then walked again for employee
+names and dates. Exports walk the queryset in keyset batches of values()
+rows instead, resolve employee names once per batch and stream the file,
+so memory stays flat whatever the row count. (QuerySet.iterator() alone
+would not: the MySQL drivers buffer the whole result set client side.)
+
+- CSV: StreamingHttpResponse; the header row is sent before the first query runs
+- XLSX: openpyxl write-only workbook spooled to a temporary file, then streamed.
+  openpyxl is optional; without it ?export=xlsx answers 400.
+
+    fmt = exports.requested_format(request)        # None, 'csv' or 'xlsx'
+    return exports.response(fmt, 'job_rows', columns, batches)
+
+columns is a list of (header, key); batches yields lists of row dicts.
+
+Text cells starting with = + - @ (or tab / carriage return) get a leading '
+so Excel shows user-entered names and remarks instead of running them as
+formulas (CSV injection).
+"""
+import csv
+import logging
+import tempfile
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+FORMAT_PARAM = 'export'
+FORMATS = ('csv', 'xlsx')
+DEFAULT_CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def xlsx_available():
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def requested_format(request, default=None):
+    """
+    ?export=csv|xlsx (not ?format=, which DRF keeps for renderer selection).
+    None when no export was asked for; ValidationError for unusable values.
+    """
+    value = (request.query_params.get(FORMAT_PARAM) or default or '').strip().lower()
+    if not value:
+        return None
+    if value not in FORMATS:
+        raise ValidationError({FORMAT_PARAM: f"Unknown export format '{value}', use csv or xlsx"})
+    if value == 'xlsx' and not xlsx_available():
+        raise ValidationError({FORMAT_PARAM: 'XLSX export needs openpyxl on the server, use export=csv'})
+    return value
+
+
+# -----------------------------
+# Rows
+# -----------------------------
+def iter_batches(queryset, fields, ordering_field='updated_at', chunk_size=None):
+    """
+    values() rows of the queryset ordered by -ordering_field, -id, one list
+    per query of EXPORT_CHUNK_SIZE rows (default 2000). Each query starts
+    after the previous batch's last (ordering_field, id), so no batch costs
+    more than the first.
+    """
+    chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    queryset = queryset.order_by()
+    columns = ['id', ordering_field] + [name for name in fields if name not in ('id', ordering_field)]
+    boundary = None
+    while True:
+        page = queryset
+        if boundary is not None:
+            value, pk = boundary
+            page = page.filter(Q(**{f'{ordering_field}__lt': value}) | Q(**{ordering_field: value, 'id__lt': pk}))
+        rows = list(page.order_by(f'-{ordering_field}', '-id').values(*columns)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        if len(rows) < chunk_size:
+            return
+        boundary = (rows[-1][ordering_field], rows[-1]['id'])
+
+
+def employee_names(codes):
+    """{code: full name} for the active employees among codes (one directory lookup per batch)"""
+    from empreg import directory as employee_directory
+
+    codes = {str(code) for code in codes if code}
+    if not codes:
+        return {}
+    return {
+        code: info['fullName'] or code
+        for code, info in employee_directory.resolve(codes).items()
+    }
+
+
+def columns_for(rows):
+    """(header, key) for every key of the first row, e.g. for report payloads"""
+    if not rows:
+        return []
+    return [(key.replace('_', ' ').title(), key) for key in rows[0]]
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%d-%m-%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d-%m-%Y')
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, (list, tuple)):
+        value = ', '.join(str(item) for item in value if item not in (None, ''))
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+# -----------------------------
+# Writers
+# -----------------------------
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(columns, batches):
+    writer = csv.writer(_Echo())
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    yield '\ufeff' + writer.writerow([header for header, _ in columns])
+    try:
+        for batch in batches:
+            yield ''.join(
+                writer.writerow([format_value(row.get(key)) for _, key in columns]) for row in batch
+            )
+    except Exception as e:
+        # Headers are already sent, so the status can no longer change
+        logger.error(f"CSV export failed mid-stream: {e}", exc_info=True)
+        raise
+
+
+def xlsx_file(columns, batches):
+    """Write-only workbook (rows go straight to disk) in a temporary file, rewound"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([header for header, _ in columns])
+    for batch in batches:
+        for row in batch:
+            sheet.append([format_value(row.get(key)) for _, key in columns])
+    handle = tempfile.TemporaryFile()
+    workbook.save(handle)
+    handle.seek(0)
+    return handle
+
+
+def response(fmt, name, columns, batches):
+    filename = f'{name}_{timezone.localdate():%Y%m%d}.{fmt}'
+    if fmt == 'xlsx':
+        return FileResponse(xlsx_file(columns, batches), as_attachment=True, filename=filename,
+                            content_type=XLSX_CONTENT_TYPE)
+    streaming = StreamingHttpResponse(csv_stream(columns, batches), content_type='text/csv; charset=utf-8')
+    streaming['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return streaming
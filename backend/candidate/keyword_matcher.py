@@ -0,0 +1,94 @@
+"""
+Precompiled multi-keyword matching for resume field extraction.
+
+A KeywordMatcher compiles a whole keyword table into one regex, once. The
+alternation is laid out as a prefix trie ("java|javascript" becomes
+"java(?:script)?"), so the regex engine walks the text once per table
+instead of once per keyword. Matches need a non-word character (or the
+text edge) on both sides, so "java" does not match inside "javascript"
+and "c++" / "+2" still match.
+
+    skills = KeywordMatcher({'python': 'Python', 'c++': 'C++'})
+    skills.find_all(text)   # values in table order
+    skills.first(text)      # first table entry present in text
+"""
+import re
+
+_BOUNDARY_START = r'(?<!\w)'
+_BOUNDARY_END = r'(?!\w)'
+
+
+def _trie_pattern(terms):
+    """Regex alternation for terms, factored by common prefix"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def emit(node):
+        if not node:
+            return ''
+        optional = '' in node
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if optional else body
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    Match a table of keywords against text in a single regex pass.
+
+    terms: iterable of keywords, or a dict of keyword -> value to report.
+    Table order is the priority order used by first()/find_all().
+    """
+
+    def __init__(self, terms, case_sensitive=False):
+        if not isinstance(terms, dict):
+            terms = {term: term for term in terms}
+        self.case_sensitive = case_sensitive
+        self._values = {}
+        self._rank = {}
+        for keyword, value in terms.items():
+            key = keyword if case_sensitive else keyword.lower()
+            key = ' '.join(key.split())
+            if key and key not in self._values:
+                self._rank[key] = len(self._rank)
+                self._values[key] = value
+        pattern = _BOUNDARY_START + '(?:' + _trie_pattern(self._values) + ')' + _BOUNDARY_END if self._values else r'(?!)'
+        self._regex = re.compile(pattern)
+
+    def __len__(self):
+        return len(self._values)
+
+    def _prepare(self, text):
+        text = text or ''
+        return text if self.case_sensitive else text.lower()
+
+    def matched_keywords(self, text):
+        """Set of table keywords present in text"""
+        return {match.group(0) for match in self._regex.finditer(self._prepare(text))}
+
+    def find_all(self, text):
+        """Values of every keyword present in text, in table order, without duplicates"""
+        found = sorted(self.matched_keywords(text), key=self._rank.__getitem__)
+        values = []
+        for keyword in found:
+            value = self._values[keyword]
+            if value not in values:
+                values.append(value)
+        return values
+
+    def first(self, text):
+        """Value of the highest-priority keyword present in text, or None"""
+        found = self.matched_keywords(text)
+        if not found:
+            return None
+        return self._values[min(found, key=self._rank.__getitem__)]
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from candidate.models import Candidate, FeedbackEntry
+
+
+class Command(BaseCommand):
+    help = 'Parse legacy Candidate.feedback blobs once into FeedbackEntry rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Candidates processed per transaction (default 500)')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Re-parse candidates that already have FeedbackEntry rows')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Parse and count entries without writing anything')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        rebuild = options['rebuild']
+        dry_run = options['dry_run']
+
+        candidates = Candidate.objects.exclude(feedback__isnull=True).exclude(feedback='')
+        if not rebuild:
+            candidates = candidates.exclude(feedback_entries__isnull=False)
+
+        candidate_ids = list(candidates.order_by('id').values_list('id', flat=True).distinct())
+        self.stdout.write(f'Backfilling feedback entries for {len(candidate_ids)} candidates...')
+
+        processed = 0
+        created = 0
+        for start in range(0, len(candidate_ids), batch_size):
+            chunk_ids = candidate_ids[start:start + batch_size]
+            chunk = Candidate.objects.filter(id__in=chunk_ids).prefetch_related('client_jobs')
+
+            rows = []
+            for candidate in chunk:
+                client_jobs = list(candidate.client_jobs.all())
+                parser_job = client_jobs[0] if client_jobs else None
+                rows.extend(FeedbackEntry.build_for_candidate(candidate, client_job=parser_job))
+            processed += len(chunk_ids)
+            created += len(rows)
+
+            if not dry_run:
+                with transaction.atomic():
+                    if rebuild:
+                        FeedbackEntry.objects.filter(candidate_id__in=chunk_ids).delete()
+                    FeedbackEntry.objects.bulk_create(rows, batch_size=1000)
+
+            self.stdout.write(f'  {processed}/{len(candidate_ids)} candidates, {created} entries')
+
+        prefix = '[dry run] Would create' if dry_run else 'Created'
+        self.stdout.write(
+            self.style.SUCCESS(f'{prefix} {created} feedback entries for {processed} candidates')
+        )
@@ -0,0 +1,117 @@
+import random
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Q
+
+from candidate import search as candidate_search
+from candidate.models import Candidate, ClientJob
+
+BENCH_PREFIX = 'BENCH_SEARCH_'
+
+FIRST_NAMES = ['arun', 'priya', 'karthik', 'divya', 'suresh', 'lakshmi', 'vignesh', 'meena', 'rahul', 'anitha']
+LAST_NAMES = ['kumar', 'raj', 'sundaram', 'krishnan', 'natarajan', 'subramani', 'balaji', 'mohan']
+CITIES = ['chennai', 'coimbatore', 'madurai', 'trichy', 'salem', 'bangalore', 'hyderabad']
+CLIENTS = ['tata motors', 'infosys', 'hyundai', 'ashok leyland', 'tvs', 'zoho', 'wipro', 'l&t']
+DESIGNATIONS = ['sales executive', 'machine operator', 'accountant', 'software engineer', 'telecaller', 'hr recruiter']
+
+
+class Command(BaseCommand):
+    help = 'Compare legacy icontains candidate search with the candidate_search_document index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Create this many synthetic candidates first (e.g. 200000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per term (default 5)')
+        parser.add_argument('--cleanup', action='store_true',
+                            help='Delete the synthetic candidates and exit')
+
+    def handle(self, *args, **options):
+        synthetic = Candidate.objects.filter(profile_number__startswith=BENCH_PREFIX)
+        if options['cleanup']:
+            deleted, _ = synthetic.delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} synthetic rows'))
+            return
+
+        if options['seed']:
+            self._seed(options['seed'])
+            call_command('rebuild_candidate_search', missing_only=True, stdout=self.stdout)
+
+        sample = synthetic.order_by('?').values('mobile1', 'profile_number').first() or {}
+        terms = [
+            'priya',
+            'karthik kumar',
+            'madurai',
+            'software engineer',
+            'zoho',
+            sample.get('mobile1') or '9876543210',
+            sample.get('profile_number') or 'PROF_0',
+            'xyzzy-no-match',
+        ]
+
+        total = Candidate.objects.count()
+        self.stdout.write(f'{total} candidates, {options["repeat"]} runs per term\n')
+        self.stdout.write(f'{"term":<28}{"legacy ms":>12}{"index ms":>12}{"legacy n":>10}{"index n":>10}')
+        for term in terms:
+            legacy_ms, legacy_n = self._time(lambda: self._legacy_ids(term), options['repeat'])
+            index_ms, index_n = self._time(lambda: self._index_ids(term), options['repeat'])
+            self.stdout.write(f'{term[:27]:<28}{legacy_ms:>12.1f}{index_ms:>12.1f}{legacy_n:>10}{index_n:>10}')
+
+    def _time(self, run, repeat):
+        timings = []
+        found = 0
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            found = len(run())
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return timings[len(timings) // 2], found
+
+    def _legacy_ids(self, term):
+        # Same filter all_candidates used before the search index
+        jobs = ClientJob.objects.filter(
+            Q(client_name__icontains=term) | Q(designation__icontains=term) | Q(remarks__icontains=term),
+            candidate_id=OuterRef('pk'),
+        )
+        query = (
+            Q(candidate_name__icontains=term) | Q(profile_number__icontains=term) |
+            Q(email__icontains=term) | Q(mobile1__icontains=term) | Q(mobile2__icontains=term) |
+            Q(city__icontains=term) | Q(state__icontains=term) | Q(executive_name__icontains=term)
+        )
+        queryset = Candidate.objects.filter(query | Q(Exists(jobs))).order_by('-updated_at')
+        return list(queryset.values_list('id', flat=True)[:100])
+
+    def _index_ids(self, term):
+        queryset = candidate_search.filter_candidates(Candidate.objects.all(), term)
+        if queryset is None:
+            return []
+        return list(queryset.order_by('-updated_at').values_list('id', flat=True)[:100])
+
+    def _seed(self, count):
+        self.stdout.write(f'Seeding {count} synthetic candidates...')
+        rng = random.Random(42)
+        start = Candidate.objects.filter(profile_number__startswith=BENCH_PREFIX).count()
+        batch = 5000
+        for offset in range(start, start + count, batch):
+            size = min(batch, start + count - offset)
+            candidates = []
+            for index in range(offset, offset + size):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                candidates.append(Candidate(
+                    profile_number=f'{BENCH_PREFIX}{index:07d}',
+                    candidate_name=f'{first} {last}',
+                    executive_name='EMP/00001',
+                    mobile1=f'9{index:09d}',
+                    email=f'{first}.{last}{index}@example.com',
+                    city=rng.choice(CITIES),
+                    state='tamil nadu',
+                ))
+            created = Candidate.objects.bulk_create(candidates, batch_size=1000)
+            jobs = [
+                ClientJob(candidate=candidate, client_name=rng.choice(CLIENTS),
+                          designation=rng.choice(DESIGNATIONS), remarks='interested')
+                for candidate in created
+            ]
+            ClientJob.objects.bulk_create(jobs, batch_size=1000)
+            self.stdout.write(f'  {offset + size - start}/{count}')
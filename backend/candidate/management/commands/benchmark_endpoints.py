@@ -0,0 +1,181 @@
+import json
+import platform
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from candidate.management.commands.seed_perf_data import BENCHMARK_USER, PROFILE_PREFIX
+from candidate.models import Candidate
+
+DEFAULT_USER = BENCHMARK_USER
+
+
+def endpoints(today, bulk_ids):
+    """(name, method, path, params) for the hot endpoints, with a 30-day window ending today"""
+    month_ago = today - timedelta(days=30)
+    window = {'from_date': f'{month_ago:%Y-%m-%d}', 'to_date': f'{today:%Y-%m-%d}'}
+    return [
+        ('calendar_stats', 'get', '/api/candidates/calendar-stats/', {'month': f'{today:%Y-%m}'}),
+        ('calendar_details', 'get', '/api/candidates/calendar-details/',
+         {'date': f'{today:%Y-%m-%d}', 'type': 'NFD', 'page': 1, 'page_size': 50}),
+        ('all_candidates', 'get', '/api/candidates/all/', {'page': 1, 'limit': 50}),
+        ('job_rows', 'get', '/api/candidates/job-rows/', {'limit': 100, 'offset': 0}),
+        ('remarks_with_counts', 'get', '/api/candidates/remarks-with-counts/', window),
+        ('clientwise_report', 'get', '/api/candidates/clientwise-report/',
+         {'start_date': window['from_date'], 'end_date': window['to_date']}),
+        ('employeewise_report', 'get', '/api/candidates/employeewise-report/',
+         {'start_date': window['from_date'], 'end_date': window['to_date']}),
+        ('bulk_fetch', 'post', '/api/candidates/bulk-fetch/', {'ids': bulk_ids, 'include_client_jobs': True}),
+        ('my_candidates_dtr', 'get', '/api/candidates/my-candidates-dtr/', dict(window, page_size=100)),
+        ('call_details', 'get', '/api/call-details/', {}),
+    ]
+
+
+def api_client(user=None):
+    """APIClient authenticated as user, sending the first ALLOWED_HOSTS entry (localhost for DEBUG's empty list)"""
+    host = next(iter(settings.ALLOWED_HOSTS), 'localhost').lstrip('.')
+    client = APIClient(HTTP_HOST='localhost' if host in ('', '*') else host)
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def compare(results, baseline, threshold):
+    """[(endpoint, metric, baseline, now)] for p50/p95 slower than baseline by more than threshold %, or more queries"""
+    regressions = []
+    previous = {row['endpoint']: row for row in baseline.get('endpoints', [])}
+    for row in results:
+        before = previous.get(row['endpoint'])
+        if not before:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if before[metric] and row[metric] > before[metric] * (1 + threshold / 100):
+                regressions.append((row['endpoint'], metric, before[metric], row[metric]))
+        if row['queries'] > before['queries']:
+            regressions.append((row['endpoint'], 'queries', before['queries'], row['queries']))
+    return regressions
+
+
+class Command(BaseCommand):
+    help = ('Time the hot API endpoints (p50/p95 latency, SQL queries) against the current database, '
+            'usually one filled by seed_perf_data, and optionally compare with an earlier run')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=DEFAULT_USER,
+                            help=f'Username to call the endpoints as (default {DEFAULT_USER}, a seeded BM)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per endpoint (default 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed runs first (default 2)')
+        parser.add_argument('--only', nargs='+', metavar='ENDPOINT', help='Endpoint names to run (default: all)')
+        parser.add_argument('--bulk-size', type=int, default=500, help='Candidate ids per bulk_fetch (default 500)')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+        parser.add_argument('--compare', metavar='BASELINE', help='JSON file of an earlier run to compare with')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Latency increase in %% reported as a regression (default 20)')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1 or options['warmup'] < 0:
+            raise CommandError('--repeat must be at least 1 and --warmup not negative')
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"User {options['user']!r} not found (run seed_perf_data or pass --user)")
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as handle:
+                    baseline = json.load(handle)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline {options['compare']}: {e}")
+
+        candidates = Candidate.objects.filter(profile_number__startswith=PROFILE_PREFIX)
+        if not candidates.exists():
+            candidates = Candidate.objects.all()
+        bulk_ids = list(candidates.order_by('-id').values_list('id', flat=True)[:max(1, options['bulk_size'])])
+        selected = endpoints(timezone.localdate(), bulk_ids)
+        if options['only']:
+            unknown = set(options['only']) - {name for name, _, _, _ in selected}
+            if unknown:
+                raise CommandError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+            selected = [row for row in selected if row[0] in options['only']]
+
+        client = api_client(user)
+
+        self.stdout.write(f'{Candidate.objects.count()} candidates, user {user.username}, '
+                          f'{options["warmup"]} warmup + {options["repeat"]} timed runs\n')
+        self.stdout.write(f'{"endpoint":<24}{"status":>8}{"p50 ms":>10}{"p95 ms":>10}{"max ms":>10}{"queries":>9}{"KB":>9}')
+        results = []
+        for name, method, path, params in selected:
+            row = self._run(client, name, method, path, params, options['warmup'], options['repeat'])
+            results.append(row)
+            self.stdout.write(
+                f'{name:<24}{row["status"]:>8}{row["p50_ms"]:>10.1f}{row["p95_ms"]:>10.1f}{row["max_ms"]:>10.1f}'
+                f'{row["queries"]:>9}{row["bytes"] / 1024:>9.1f}'
+            )
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'debug': settings.DEBUG,
+            'user': user.username,
+            'candidates': Candidate.objects.count(),
+            'repeat': options['repeat'],
+            'warmup': options['warmup'],
+            'endpoints': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f'\nResults written to {options["output"]}')
+
+        failed = [row['endpoint'] for row in results if row['status'] >= 400]
+        if failed:
+            self.stdout.write(self.style.ERROR(f'\nNon-2xx responses: {", ".join(failed)}'))
+        if baseline is not None:
+            regressions = compare(results, baseline, options['threshold'])
+            for endpoint, metric, before, now in regressions:
+                self.stdout.write(self.style.WARNING(f'REGRESSION {endpoint} {metric}: {before} -> {now}'))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f'\nNo regressions against {options["compare"]}'))
+
+    def _run(self, client, name, method, path, params, warmup, repeat):
+        def call():
+            if method == 'post':
+                return client.post(path, params, format='json')
+            return client.get(path, params)
+
+        for _ in range(warmup):
+            call()
+        timings = []
+        queries = []
+        response = body = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = call()
+                # Streamed exports do their work while iterating, so time the whole body
+                body = b''.join(response.streaming_content) if getattr(response, 'streaming', False) else response.content
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+        return {
+            'endpoint': name,
+            'method': method.upper(),
+            'path': path,
+            'status': response.status_code,
+            'p50_ms': round(_percentile(timings, 0.5), 2),
+            'p95_ms': round(_percentile(timings, 0.95), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': max(queries),
+            'bytes': len(body),
+        }
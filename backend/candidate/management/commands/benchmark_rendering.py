@@ -0,0 +1,99 @@
+import gzip
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from backend import compression
+from backend.renderers import FastJSONRenderer, orjson
+from candidate.management.commands.benchmark_endpoints import api_client
+from candidate.management.commands.seed_perf_data import PROFILE_PREFIX
+from candidate.models import Candidate
+
+
+def _median_ms(run, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return round(timings[len(timings) // 2], 2), result
+
+
+class Command(BaseCommand):
+    help = ('Serialization time and bytes on the wire for one bulk_fetch payload (default 5000 candidates): '
+            'stdlib vs orjson rendering, then gzip and brotli')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5000, help='Candidates in the payload (default 5000, the bulk_fetch max)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement, median reported (default 5)')
+        parser.add_argument('--user', help='Username to fetch as (default: anonymous)')
+        parser.add_argument('--output', help='Write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['count'] < 1 or options['repeat'] < 1:
+            raise CommandError('--count and --repeat must be at least 1')
+        candidates = Candidate.objects.filter(profile_number__startswith=PROFILE_PREFIX)
+        if not candidates.exists():
+            candidates = Candidate.objects.all()
+        ids = list(candidates.order_by('-id').values_list('id', flat=True)[:options['count']])
+        if not ids:
+            raise CommandError('No candidates found (run seed_perf_data first)')
+
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']!r} not found")
+        client = api_client(user)
+        response = client.post('/api/candidates/bulk-fetch/', {'ids': ids, 'include_client_jobs': True}, format='json')
+        if response.status_code != 200:
+            raise CommandError(f'bulk_fetch returned {response.status_code}')
+        data = response.data
+
+        repeat = options['repeat']
+        stdlib_ms, stdlib_body = _median_ms(lambda: JSONRenderer().render(data), repeat)
+        fast_ms, fast_body = _median_ms(lambda: FastJSONRenderer().render(data), repeat)
+        rows = [
+            {'step': 'render json (stdlib)', 'ms': stdlib_ms, 'bytes': len(stdlib_body)},
+            {'step': f'render json ({"orjson" if orjson else "orjson missing, stdlib"})', 'ms': fast_ms,
+             'bytes': len(fast_body)},
+        ]
+        # Level 6, as Django's GZipMiddleware uses
+        gzip_ms, gzipped = _median_ms(lambda: gzip.compress(fast_body, compresslevel=6), repeat)
+        rows.append({'step': 'gzip (level 6)', 'ms': gzip_ms, 'bytes': len(gzipped)})
+        if compression.brotli is not None:
+            for quality in sorted({1, compression.brotli_quality(), 6}):
+                brotli_ms, compressed = _median_ms(lambda: compression.brotli_compress(fast_body, quality), repeat)
+                rows.append({'step': f'brotli (quality {quality})', 'ms': brotli_ms, 'bytes': len(compressed)})
+
+        same_bytes = stdlib_body == fast_body
+        same_data = same_bytes or json.loads(stdlib_body) == json.loads(fast_body)
+        self.stdout.write(f'bulk_fetch payload: {len(data.get("found", []))} candidates, {repeat} runs per step\n')
+        self.stdout.write(f'{"step":<36}{"ms":>10}{"KB":>12}{"vs raw":>9}')
+        for row in rows:
+            ratio = row['bytes'] / len(fast_body) if fast_body else 0
+            self.stdout.write(f'{row["step"]:<36}{row["ms"]:>10.1f}{row["bytes"] / 1024:>12.1f}{ratio:>9.2f}')
+        if compression.brotli is None:
+            self.stdout.write('brotli not installed, skipped')
+        self.stdout.write(f'\nidentical bytes: {same_bytes}, identical data: {same_data}')
+        if not same_data:
+            self.stdout.write(self.style.ERROR('orjson output differs from the stdlib renderer'))
+
+        if options['output']:
+            report = {
+                'candidates': len(data.get('found', [])),
+                'repeat': repeat,
+                'fast_json_renderer': settings.FAST_JSON_RENDERER,
+                'identical_bytes': same_bytes,
+                'identical_data': same_data,
+                'steps': rows,
+            }
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(f'Results written to {options["output"]}')
@@ -0,0 +1,159 @@
+import os
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from candidate import alternative_parser
+
+FIRST_NAMES = ['Arun', 'Priya', 'Karthik', 'Divya', 'Suresh', 'Lakshmi', 'Vignesh', 'Meena']
+LAST_NAMES = ['Kumar', 'Raj', 'Sundaram', 'Krishnan', 'Natarajan', 'Balaji']
+PLACES = [('Chennai', 'Tamil Nadu'), ('Coimbatore', 'Tamil Nadu'), ('Bangalore', 'Karnataka'),
+          ('Hyderabad', 'Telangana'), ('Pune', 'Maharashtra'), ('Kochi', 'Kerala')]
+SKILLS = ['Python', 'Java', 'JavaScript', 'SQL', 'MS Office', 'Excel', 'Tally', 'AutoCAD', 'React', 'C++']
+FILLER = ('Responsible for daily operations, customer follow-up and reporting to the branch manager. '
+          'Coordinated with vendors and maintained records as per company policy. ')
+
+
+def _synthetic_resume(rng):
+    city, state = rng.choice(PLACES)
+    lines = [
+        f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        f'{rng.choice(FIRST_NAMES).lower()}{rng.randint(1, 999)}@example.com | +91 9{rng.randint(100000000, 999999999)}',
+        f'{city}, {state} {rng.randint(600001, 699999)}',
+        'CAREER OBJECTIVE',
+        FILLER * rng.randint(2, 6),
+        'EDUCATION',
+        rng.choice(['B.Tech in Mechanical Engineering', 'B.Com', 'MBA (Finance)', 'Diploma, 12th', 'M.Sc Physics']),
+        'SKILLS',
+        ', '.join(rng.sample(SKILLS, 4)),
+        'EXPERIENCE',
+        f'{rng.randint(1, 9)} years of experience in Acme Industries as Sales Executive',
+        FILLER * rng.randint(4, 12),
+        'LANGUAGES KNOWN: English, Tamil, Hindi',
+        'Gender: Male' if rng.random() < 0.5 else 'Gender: Female',
+    ]
+    return '\n'.join(lines)
+
+
+# -----------------------------
+# Pre-matcher extraction (one regex / substring pass per keyword), for comparison
+# -----------------------------
+def _legacy_state(text):
+    for state in alternative_parser.STATES:
+        if re.search(r'\b' + re.escape(state) + r'\b', text, re.IGNORECASE):
+            return state.title()
+    for abbr, full_name in alternative_parser.STATE_ABBREVIATIONS.items():
+        if re.search(r'\b' + abbr + r'\b', text, re.IGNORECASE):
+            return full_name
+    return None
+
+
+def _legacy_city(text):
+    for city in alternative_parser.CITIES:
+        if re.search(r'\b' + re.escape(city) + r'\b', text, re.IGNORECASE):
+            return city.title()
+    return None
+
+
+def _legacy_education(text):
+    found = []
+    for line in text.split('\n'):
+        line_lower = line.lower().strip()
+        if not line_lower:
+            continue
+        for keyword in alternative_parser.EDUCATION_MAPPING:
+            if re.search(r'\b' + re.escape(keyword) + r'\b', line_lower, re.IGNORECASE):
+                found.append(keyword)
+    return found
+
+
+def legacy_fields(text):
+    lowered = text.lower()
+    return (
+        _legacy_state(text),
+        _legacy_city(text),
+        [lang for lang in alternative_parser.LANGUAGES if lang in lowered],
+        [skill for skill in alternative_parser.SKILLS if skill in lowered],
+        _legacy_education(text),
+    )
+
+
+def matcher_fields(text):
+    return (
+        alternative_parser.extract_state(text),
+        alternative_parser.extract_city(text),
+        alternative_parser.extract_languages(text),
+        alternative_parser.extract_skills(text),
+        alternative_parser.extract_education(text),
+    )
+
+
+EXTRACTORS = {'legacy': legacy_fields, 'matcher': matcher_fields}
+
+
+def _run_batch(name, texts):
+    extract = EXTRACTORS[name]
+    for text in texts:
+        extract(text)
+    return len(texts)
+
+
+class Command(BaseCommand):
+    help = 'Field-extraction throughput: per-keyword regex loops vs the compiled keyword matchers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', help='Directory of sample resumes (.pdf/.docx/.doc/.txt)')
+        parser.add_argument('--synthetic', type=int, default=500,
+                            help='Generated resumes to use when no corpus is given (default 500)')
+        parser.add_argument('--repeat', type=int, default=3, help='Passes over the corpus (default 3)')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processes for the parallel run (default: CPU count)')
+
+    def handle(self, *args, **options):
+        texts = self._load_corpus(options['corpus']) if options['corpus'] else [
+            _synthetic_resume(random.Random(index)) for index in range(options['synthetic'])
+        ]
+        if not texts:
+            raise CommandError('No resumes with extractable text found')
+        texts = texts * max(1, options['repeat'])
+        workers = max(1, options['workers'])
+        avg_kb = sum(len(text) for text in texts) / len(texts) / 1024
+
+        self.stdout.write(f'{len(texts)} resumes (avg {avg_kb:.1f} KB of text), {workers} worker(s)\n')
+        self.stdout.write(f'{"extractor":<10}{"1 core /s":>14}{f"{workers} procs /s":>16}{"per core /s":>14}')
+        for name in EXTRACTORS:
+            started = time.perf_counter()
+            _run_batch(name, texts)
+            single = len(texts) / (time.perf_counter() - started)
+
+            chunks = [texts[index::workers] for index in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                started = time.perf_counter()
+                done = sum(pool.map(_run_batch, [name] * workers, chunks))
+                parallel = done / (time.perf_counter() - started)
+            self.stdout.write(f'{name:<10}{single:>14.0f}{parallel:>16.0f}{parallel / workers:>14.0f}')
+
+    def _load_corpus(self, directory):
+        if not os.path.isdir(directory):
+            raise CommandError(f'{directory} is not a directory')
+        texts = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            lowered = name.lower()
+            if lowered.endswith('.pdf'):
+                text = alternative_parser.extract_text_from_pdf(path)
+            elif lowered.endswith('.docx'):
+                text = alternative_parser.extract_text_from_docx(path)
+            elif lowered.endswith('.doc'):
+                text = alternative_parser.extract_text_from_doc(path)
+            elif lowered.endswith('.txt'):
+                with open(path, 'r', encoding='utf-8', errors='ignore') as handle:
+                    text = handle.read()
+            else:
+                continue
+            if text.strip():
+                texts.append(text)
+        return texts
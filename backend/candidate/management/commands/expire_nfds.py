@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from candidate import nfd_expiry
+
+
+class Command(BaseCommand):
+    help = 'Unassign jobs whose NFD expired at midnight and mark their feedback as open profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=nfd_expiry.DEFAULT_CHUNK_SIZE,
+                            help=f'Jobs/candidates per transaction (default {nfd_expiry.DEFAULT_CHUNK_SIZE})')
+        parser.add_argument('--skip-feedback', action='store_true',
+                            help='Only unassign jobs; leave candidate feedback untouched')
+        parser.add_argument('--status', action='store_true',
+                            help='Print the last run metrics and pending count without running')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            metrics = nfd_expiry.last_run_metrics()
+            self.stdout.write(f'Threshold: {nfd_expiry.get_threshold()}')
+            self.stdout.write(f'Pending expired jobs: {nfd_expiry.expired_jobs().count()}')
+            self.stdout.write(f'Last run: {metrics or "never"}')
+            return
+
+        run = nfd_expiry.run(
+            chunk_size=options['chunk_size'],
+            triggered_by='expire_nfds',
+            skip_feedback=options['skip_feedback'],
+        )
+        if run is None:
+            self.stdout.write(self.style.WARNING('Another NFD expiry run is in progress, skipped'))
+            return
+        summary = (
+            f'NFD expiry {run.status} (threshold {run.threshold}): {run.jobs_unassigned} jobs unassigned, '
+            f'{run.history_rows} history rows, {run.feedback_updated} feedback updated, '
+            f'{run.chunks} chunks in {run.duration_ms} ms'
+        )
+        if run.status == 'success':
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            self.stderr.write(self.style.ERROR(f'{summary}: {run.error}'))
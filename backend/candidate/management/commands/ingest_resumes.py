@@ -0,0 +1,332 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from backend import shared_cache
+from candidate import resume_nlp
+from candidate import search as candidate_search
+from candidate.models import Candidate, CandidateSearchDocument
+
+RESUME_EXTENSIONS = ('.pdf', '.docx', '.doc', '.txt')
+MAX_RESUME_TEXT = 50000
+# Values simple_text_extraction uses for "nothing found"
+EMPTY_VALUES = ('', 'not found', 'not extracted')
+
+
+def parse_one(path):
+    """Runs in a pool worker: (path, parse_resume result, elapsed ms)"""
+    from candidate.utils import parse_resume
+
+    started = time.perf_counter()
+    try:
+        result = parse_resume(path)
+    except Exception as e:
+        result = {"success": False, "error": f"Error during resume parsing: {e}"}
+    return path, result, int((time.perf_counter() - started) * 1000)
+
+
+def _clean(value, limit=None):
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else ''
+    value = ' '.join(str(value or '').split())
+    if value.lower() in EMPTY_VALUES:
+        return ''
+    return value[:limit] if limit else value
+
+
+class Command(BaseCommand):
+    help = 'Parse a folder or ZIP of resumes in a process pool and create candidates for new contacts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory or .zip of resumes (.pdf, .docx, .doc, .txt)')
+        parser.add_argument('--executive', default='System',
+                            help='Employee code recorded as executive/creator (default System)')
+        parser.add_argument('--source-name', default='Resume Import',
+                            help='Candidate.source for created rows (default "Resume Import")')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Parser processes (default: CPU count; 0 parses in this process)')
+        parser.add_argument('--batch-size', type=int, default=200,
+                            help='Candidates created per transaction / checkpoint (default 200)')
+        parser.add_argument('--checkpoint', help='Progress file (default: <source>.ingest.json)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Parse files again that failed in a previous run')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Parse and dedupe without writing candidates or the checkpoint')
+
+    def handle(self, *args, **options):
+        source = os.path.abspath(options['source'])
+        if not os.path.exists(source):
+            raise CommandError(f'{source} does not exist')
+        checkpoint_path = options['checkpoint'] or f'{source.rstrip(os.sep)}.ingest.json'
+        checkpoint = self._load_checkpoint(checkpoint_path, source, options['restart'])
+        if options['dry_run']:
+            # Reads the checkpoint like a real run would, but a dry run must not mark files done
+            checkpoint_path = None
+        if options['retry_failed']:
+            checkpoint['failed'] = {}
+
+        work_dir = None
+        try:
+            if zipfile.is_zipfile(source):
+                work_dir = tempfile.mkdtemp(prefix='ingest_resumes_')
+                files = self._extract_zip(source, work_dir)
+            elif os.path.isdir(source):
+                files = self._list_dir(source)
+            else:
+                raise CommandError(f'{source} is neither a directory nor a ZIP file')
+
+            done = set(checkpoint['done']) | set(checkpoint['failed'])
+            pending = [(name, path) for name, path in files if name not in done]
+            self.stdout.write(
+                f'{len(files)} resumes, {len(files) - len(pending)} already processed, {len(pending)} to parse'
+            )
+            self._ingest(pending, checkpoint, checkpoint_path, options)
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    # -----------------------------
+    # Input
+    # -----------------------------
+    def _list_dir(self, directory):
+        files = []
+        for root, _, names in os.walk(directory):
+            for name in names:
+                if name.lower().endswith(RESUME_EXTENSIONS) and not name.startswith('.'):
+                    path = os.path.join(root, name)
+                    files.append((os.path.relpath(path, directory), path))
+        return sorted(files)
+
+    def _extract_zip(self, archive, work_dir):
+        files = []
+        with zipfile.ZipFile(archive) as bundle:
+            for index, member in enumerate(bundle.infolist()):
+                name = member.filename
+                base = os.path.basename(name)
+                if member.is_dir() or not base.lower().endswith(RESUME_EXTENSIONS) or base.startswith('.'):
+                    continue
+                # Flatten into numbered files so paths inside the ZIP cannot escape work_dir
+                path = os.path.join(work_dir, f'{index:06d}_{base}')
+                with bundle.open(member) as data, open(path, 'wb') as target:
+                    shutil.copyfileobj(data, target)
+                files.append((name, path))
+        return sorted(files)
+
+    # -----------------------------
+    # Checkpoint
+    # -----------------------------
+    def _load_checkpoint(self, path, source, restart):
+        if not restart and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as handle:
+                checkpoint = json.load(handle)
+            if checkpoint.get('source') == source:
+                self.stdout.write(f'Resuming from {path}')
+                return checkpoint
+        return {'source': source, 'started_at': timezone.now().isoformat(), 'done': [], 'failed': {},
+                'created': 0, 'duplicates': 0}
+
+    def _save_checkpoint(self, path, checkpoint):
+        if path is None:
+            return
+        checkpoint['updated_at'] = timezone.now().isoformat()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(checkpoint, handle)
+        os.replace(tmp_path, path)
+
+    # -----------------------------
+    # Parse + create
+    # -----------------------------
+    def _ingest(self, pending, checkpoint, checkpoint_path, options):
+        if not pending:
+            self._report(checkpoint, Counter(), [], 0.0, 0)
+            return
+
+        names = {path: name for name, path in pending}
+        paths = [path for _, path in pending]
+        batch_size = max(1, options['batch_size'])
+        workers = max(0, options['workers'])
+        failures = Counter()
+        parse_ms = []
+        seen_emails, seen_phones = set(), set()
+        batch = []
+        started = time.perf_counter()
+
+        if workers:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=resume_nlp.init_worker)
+            results = pool.map(parse_one, paths, chunksize=max(1, min(16, len(paths) // (workers * 4) or 1)))
+        else:
+            pool = None
+            results = map(parse_one, paths)
+
+        try:
+            for processed, (path, result, elapsed_ms) in enumerate(results, 1):
+                parse_ms.append(elapsed_ms)
+                name = names[path]
+                if not result or not result.get('success'):
+                    reason = (result or {}).get('error') or 'Failed to parse resume'
+                    checkpoint['failed'][name] = reason
+                    failures[reason.split(':')[0]] += 1
+                else:
+                    batch.append((name, path, result.get('data') or {}))
+                if len(batch) >= batch_size:
+                    self._flush(batch, checkpoint, seen_emails, seen_phones, failures, options)
+                    self._save_checkpoint(checkpoint_path, checkpoint)
+                    batch = []
+                    rate = processed / (time.perf_counter() - started)
+                    self.stdout.write(f'  {processed}/{len(paths)} parsed ({rate:.1f} files/s), '
+                                      f'{checkpoint["created"]} created')
+            if batch:
+                self._flush(batch, checkpoint, seen_emails, seen_phones, failures, options)
+            self._save_checkpoint(checkpoint_path, checkpoint)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        self._report(checkpoint, failures, parse_ms, time.perf_counter() - started, len(paths))
+
+    def _contact(self, data):
+        email = _clean(data.get('email'), 254).lower()
+        phone = candidate_search.phone_key(_clean(data.get('mobile') or data.get('phone')))
+        if len(phone) < 10:
+            phone = ''
+        return email, phone
+
+    def _existing_contacts(self, emails, phones):
+        """(emails, phone keys) among these that already belong to a candidate"""
+        if not emails and not phones:
+            return set(), set()
+        variants = set()
+        for phone in phones:
+            variants.update({phone, f'+91{phone}', f'91{phone}', f'0{phone}', f'+91 {phone}'})
+        rows = Candidate.objects.filter(
+            Q(email__in=emails) | Q(mobile1__in=variants) | Q(mobile2__in=variants)
+        ).values_list('email', 'mobile1', 'mobile2')
+        known_emails, known_phones = set(), set()
+        for email, mobile1, mobile2 in rows:
+            if email:
+                known_emails.add(email.lower())
+            for mobile in (mobile1, mobile2):
+                if mobile:
+                    known_phones.add(candidate_search.phone_key(mobile))
+        return known_emails, known_phones
+
+    def _flush(self, batch, checkpoint, seen_emails, seen_phones, failures, options):
+        contacts = [self._contact(data) for _, _, data in batch]
+        known_emails, known_phones = self._existing_contacts(
+            {email for email, _ in contacts if email}, {phone for _, phone in contacts if phone}
+        )
+
+        new_rows = []
+        for (name, path, data), (email, phone) in zip(batch, contacts):
+            if not email and not phone:
+                checkpoint['failed'][name] = 'No email or mobile number found'
+                failures['No email or mobile number found'] += 1
+                continue
+            if (email and (email in known_emails or email in seen_emails)) or \
+                    (phone and (phone in known_phones or phone in seen_phones)):
+                checkpoint['duplicates'] += 1
+                checkpoint['done'].append(name)
+                continue
+            if email:
+                seen_emails.add(email)
+            if phone:
+                seen_phones.add(phone)
+            new_rows.append((name, path, data, email, phone))
+
+        if options['dry_run']:
+            checkpoint['created'] += len(new_rows)
+            checkpoint['done'].extend(name for name, *_ in new_rows)
+            return
+
+        candidates = []
+        stored_files = []
+        try:
+            for name, path, data, email, phone in new_rows:
+                with open(path, 'rb') as handle:
+                    stored = default_storage.save(f'resumes/{os.path.basename(name)}', File(handle))
+                stored_files.append(stored)
+                candidates.append(self._build_candidate(name, data, email, phone, stored, options))
+            with transaction.atomic():
+                Candidate.objects.bulk_create(candidates, batch_size=500)
+                self._index(candidates)
+                shared_cache.bump_on_commit('candidate')
+        except Exception:
+            for stored in stored_files:
+                default_storage.delete(stored)
+            raise
+
+        checkpoint['created'] += len(candidates)
+        checkpoint['done'].extend(name for name, *_ in new_rows)
+
+    def _build_candidate(self, name, data, email, phone, stored_file, options):
+        education = data.get('education') if isinstance(data.get('education'), dict) else {}
+        experience = data.get('experience') if isinstance(data.get('experience'), dict) else {}
+        raw_text = (data.get('raw_text') or '').encode('utf-8', errors='ignore').decode('utf-8')
+        stem = os.path.splitext(os.path.basename(name))[0].replace('_', ' ')
+        executive = options['executive']
+        return Candidate(
+            profile_number=f"PROF_{datetime.now().strftime('%Y%m%d%H%M%S')}_{str(uuid.uuid4())[:8]}",
+            executive_name=executive,
+            created_by=executive,
+            candidate_name=_clean(data.get('name'), 100) or stem[:100],
+            mobile1=phone,
+            email=email,
+            gender=_clean(data.get('gender'), 100) or None,
+            state=_clean(data.get('state'), 50) or None,
+            city=_clean(data.get('city'), 50) or None,
+            pincode=_clean(data.get('pincode'), 10) or None,
+            education=_clean(education.get('qualification') or education.get('degree'), 200) or None,
+            experience=_clean(experience.get('total_experience'), 200) or None,
+            source=options['source_name'][:50],
+            languages=data.get('languages') or data.get('language') or None,
+            skills=data.get('skills') or None,
+            resume_file=stored_file,
+            resume_parsed_data=data,
+            resume_text=raw_text[:MAX_RESUME_TEXT] or None,
+        )
+
+    def _index(self, candidates):
+        """bulk_create skips post_save, so write the search documents here"""
+        profile_numbers = [candidate.profile_number for candidate in candidates]
+        # MySQL does not return pks from bulk_create; look them up by the generated profile numbers
+        created = Candidate.objects.filter(profile_number__in=profile_numbers).only(
+            'id', 'candidate_name', 'profile_number', 'email', 'mobile1', 'mobile2', 'city', 'state', 'executive_name'
+        )
+        documents = [candidate_search.build_document(candidate, client_jobs=[]) for candidate in created]
+        CandidateSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+    # -----------------------------
+    # Summary
+    # -----------------------------
+    def _report(self, checkpoint, failures, parse_ms, elapsed, parsed):
+        rate = parsed / elapsed if elapsed else 0.0
+        ordered = sorted(parse_ms)
+        p95 = ordered[int(len(ordered) * 0.95) - 1] if ordered else 0
+        average = sum(ordered) / len(ordered) if ordered else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Parsed {parsed} files in {elapsed:.1f}s ({rate:.1f} files/s; parse avg {average:.0f} ms, p95 {p95} ms)'
+        ))
+        self.stdout.write(
+            f'Candidates created: {checkpoint["created"]}, duplicates skipped: {checkpoint["duplicates"]}, '
+            f'failed: {len(checkpoint["failed"])}'
+        )
+        for reason, count in failures.most_common(5):
+            self.stdout.write(f'  {count:>6}  {reason}')
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend import perf
+
+
+class Command(BaseCommand):
+    help = 'Top endpoints from the request profiling ring buffer (PERF_PROFILING=1, see backend/perf.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='Endpoints to show (default 20, 0 = all)')
+        parser.add_argument('--sort', default='p95_ms', choices=perf.SORT_FIELDS,
+                            help='Column to rank by (default p95_ms)')
+        parser.add_argument('--sql', action='store_true', help='Also print the worst duplicated queries')
+        parser.add_argument('--clear', action='store_true', help='Empty the buffer and exit')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            perf.clear()
+            self.stdout.write(self.style.SUCCESS('Profiling buffer cleared'))
+            return
+        if options['top'] < 0:
+            raise CommandError('--top must not be negative')
+
+        rows = perf.records()
+        if not rows:
+            self.stdout.write('No profiled requests buffered (is PERF_PROFILING=1 set for the web workers?)')
+            return
+        summary = perf.summarize(rows, sort=options['sort'], limit=options['top'])
+
+        self.stdout.write(f'{len(rows)} requests buffered, ranked by {options["sort"]}\n')
+        self.stdout.write(
+            f'{"endpoint":<44}{"reqs":>6}{"p50 ms":>9}{"p95 ms":>9}{"max ms":>9}{"avg q":>7}{"max q":>7}'
+            f'{"sql ms":>8}{"dup q":>7}{"avg KB":>8}{"budget":>8}{"over":>6}'
+        )
+        for row in summary:
+            size = f'{row["avg_bytes"] / 1024:.1f}' if row['avg_bytes'] is not None else '-'
+            budget = row['budget'] if row['budget'] is not None else '-'
+            self.stdout.write(
+                f'{row["endpoint"][:43]:<44}{row["requests"]:>6}{row["p50_ms"]:>9.1f}{row["p95_ms"]:>9.1f}'
+                f'{row["max_ms"]:>9.1f}{row["avg_queries"]:>7}{row["max_queries"]:>7}{row["avg_sql_ms"]:>8.1f}'
+                f'{row["duplicates"]:>7}{size:>8}{budget:>8}{row["over_budget"]:>6}'
+            )
+            if options['sql']:
+                for query in row['duplicate_queries']:
+                    self.stdout.write(f'    {query["times"]}x {query["sql"]}')
+
+        over = [row['endpoint'] for row in summary if row['over_budget']]
+        if over:
+            self.stdout.write(self.style.WARNING(f'\nOver query budget: {", ".join(over)}'))
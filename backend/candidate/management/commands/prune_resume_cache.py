@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from candidate import resume_cache
+
+
+class Command(BaseCommand):
+    help = 'Remove least recently used resume cache entries while the cache is over RESUME_CACHE_MAX_BYTES (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-bytes', type=int, default=None,
+                            help='Size limit to prune to (default RESUME_CACHE_MAX_BYTES)')
+
+    def handle(self, *args, **options):
+        if options['max_bytes'] is not None and options['max_bytes'] < 0:
+            raise CommandError('--max-bytes must not be negative')
+        freed = resume_cache.evict(limit=options['max_bytes'])
+        self.stdout.write(self.style.SUCCESS(f'Freed {freed / (1024 * 1024):.1f} MB from {resume_cache.cache_root()}'))
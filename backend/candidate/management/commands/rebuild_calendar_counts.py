@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.db.models.functions import TruncDate
+
+from candidate import calendar_rollup
+from candidate.models import CalendarDailyCount, ClientJob, CandidateStatusHistory, DerivedTableBuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild calendar_daily_counts from ClientJob and CandidateStatusHistory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from',
+                            help='First date to rebuild (YYYY-MM-DD, default: earliest event)')
+        parser.add_argument('--to', dest='date_to',
+                            help='Last date to rebuild (YYYY-MM-DD, default: latest event)')
+        parser.add_argument('--chunk-days', type=int, default=31,
+                            help='Days rebuilt per transaction (default 31)')
+
+    def _parse(self, value, name):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'--{name} must be YYYY-MM-DD, got {value!r}')
+
+    def _event_bounds(self):
+        bounds = [
+            ClientJob.objects.aggregate(low=Min('next_follow_up_date'), high=Max('next_follow_up_date')),
+            ClientJob.objects.annotate(day=TruncDate('expected_joining_date'))
+                             .aggregate(low=Min('day'), high=Max('day')),
+            CandidateStatusHistory.objects.aggregate(low=Min('change_date'), high=Max('change_date')),
+        ]
+        lows = [b['low'] for b in bounds if b['low']]
+        highs = [b['high'] for b in bounds if b['high']]
+        return (min(lows) if lows else None, max(highs) if highs else None)
+
+    def handle(self, *args, **options):
+        # Only a run over the whole history lets calendar_stats switch to the rollup
+        full = not options['date_from'] and not options['date_to']
+        start = self._parse(options['date_from'], 'from') if options['date_from'] else None
+        end = self._parse(options['date_to'], 'to') if options['date_to'] else None
+        if start is None or end is None:
+            low, high = self._event_bounds()
+            start = start or low
+            end = end or high
+        if start is None or end is None:
+            self.stdout.write('No calendar events found, nothing to rebuild')
+            if full:
+                DerivedTableBuild.mark_built(CalendarDailyCount)
+            return
+        if start > end:
+            raise CommandError('--from must not be after --to')
+
+        chunk_days = max(1, options['chunk_days'])
+        self.stdout.write(f'Rebuilding calendar_daily_counts from {start} to {end}...')
+
+        total_rows = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            rows = calendar_rollup.rebuild(chunk_start, chunk_end)
+            total_rows += rows
+            self.stdout.write(f'  {chunk_start} - {chunk_end}: {rows} rows')
+            chunk_start = chunk_end + timedelta(days=1)
+
+        if full:
+            DerivedTableBuild.mark_built(CalendarDailyCount, rows=total_rows)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total_rows} calendar_daily_counts rows'))
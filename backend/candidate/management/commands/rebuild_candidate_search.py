@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+
+from candidate import search as candidate_search
+from candidate.models import Candidate, CandidateSearchDocument, ClientJob, DerivedTableBuild
+
+
+class Command(BaseCommand):
+    help = 'Build candidate_search_document rows for every candidate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Candidates processed per transaction (default 1000)')
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Only build documents for candidates that do not have one yet')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+
+        candidates = Candidate.objects.all()
+        if options['missing_only']:
+            candidates = candidates.filter(search_document__isnull=True)
+        candidate_ids = list(candidates.order_by('id').values_list('id', flat=True))
+        self.stdout.write(f'Building search documents for {len(candidate_ids)} candidates...')
+
+        jobs = Prefetch('client_jobs', queryset=ClientJob.objects.only('candidate_id', 'client_name', 'designation', 'remarks'))
+        written = 0
+        for start in range(0, len(candidate_ids), batch_size):
+            chunk_ids = candidate_ids[start:start + batch_size]
+            chunk = (
+                Candidate.objects.filter(id__in=chunk_ids)
+                .only('id', 'candidate_name', 'profile_number', 'email', 'mobile1', 'mobile2',
+                      'city', 'state', 'executive_name')
+                .prefetch_related(jobs)
+            )
+            documents = [candidate_search.build_document(candidate) for candidate in chunk]
+            with transaction.atomic():
+                CandidateSearchDocument.objects.filter(candidate_id__in=chunk_ids).delete()
+                CandidateSearchDocument.objects.bulk_create(documents, batch_size=1000)
+            written += len(documents)
+            self.stdout.write(f'  {written}/{len(candidate_ids)}')
+
+        # Every candidate now has a document (--missing-only keeps the signal-written ones)
+        DerivedTableBuild.mark_built(CandidateSearchDocument, rows=CandidateSearchDocument.objects.count())
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} candidate search documents'))
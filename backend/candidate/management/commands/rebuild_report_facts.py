@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.db.models.functions import TruncDate
+
+from candidate import report_facts
+from candidate.models import ClientJob
+
+
+class Command(BaseCommand):
+    help = 'Rebuild client_job_report_facts (clientwise / employeewise reports) from ClientJob'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from',
+                            help='First updated_at date to rebuild (YYYY-MM-DD, default: earliest)')
+        parser.add_argument('--to', dest='date_to',
+                            help='Last updated_at date to rebuild (YYYY-MM-DD, default: latest)')
+        parser.add_argument('--chunk-days', type=int, default=31,
+                            help='Days rebuilt per transaction (default 31)')
+
+    def _parse(self, value, name):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'--{name} must be YYYY-MM-DD, got {value!r}')
+
+    def handle(self, *args, **options):
+        start = self._parse(options['date_from'], 'from') if options['date_from'] else None
+        end = self._parse(options['date_to'], 'to') if options['date_to'] else None
+        if start is None or end is None:
+            bounds = ClientJob.objects.annotate(day=TruncDate('updated_at')).aggregate(low=Min('day'), high=Max('day'))
+            start = start or bounds['low']
+            end = end or bounds['high']
+        if start is None or end is None:
+            self.stdout.write('No client jobs found, nothing to rebuild')
+            return
+        if start > end:
+            raise CommandError('--from must not be after --to')
+
+        chunk_days = max(1, options['chunk_days'])
+        self.stdout.write(f'Rebuilding client_job_report_facts from {start} to {end}...')
+
+        total_rows = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            rows = report_facts.rebuild(chunk_start, chunk_end)
+            total_rows += rows
+            self.stdout.write(f'  {chunk_start} - {chunk_end}: {rows} rows')
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total_rows} client_job_report_facts rows'))
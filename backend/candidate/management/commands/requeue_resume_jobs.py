@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from candidate import resume_jobs
+
+
+class Command(BaseCommand):
+    help = 'Re-dispatch resume parse jobs left queued/running by a worker that went away (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=None,
+                            help=f'Treat jobs older than this as stale (default RESUME_PARSE_STALE_MINUTES, '
+                                 f'{resume_jobs.DEFAULT_STALE_MINUTES})')
+        parser.add_argument('--backend', choices=['celery', 'process', 'inline'],
+                            help='Backend to hand them to (default: the configured one; inline instead of '
+                                 'process, whose pool would exit with this command)')
+
+    def handle(self, *args, **options):
+        if options['minutes'] is not None and options['minutes'] < 1:
+            raise CommandError('--minutes must be at least 1')
+        backend = options['backend']
+        if backend is None and resume_jobs.get_backend() == 'process':
+            backend = 'inline'
+        job_ids = resume_jobs.requeue_stale(minutes=options['minutes'], backend=backend)
+        self.stdout.write(self.style.SUCCESS(f'Requeued {len(job_ids)} stale resume parse jobs'))
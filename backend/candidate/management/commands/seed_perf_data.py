@@ -0,0 +1,423 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from backend import shared_cache
+from candidate.models import Candidate, CandidateRevenue, CandidateStatusHistory, ClientJob
+from empreg import directory as employee_directory
+from empreg import hierarchy, identity
+from empreg.models import Employee
+from events.models import CallDetailCandidate, CallDetails
+from Masters.models import Branch, Team
+
+# Markers used by --cleanup (and to keep seeded rows apart from real ones)
+PROFILE_PREFIX = 'PERF-'
+EMAIL_DOMAIN = 'perf.seed'
+TEAM_PREFIX = 'PERF '
+CALL_DESCRIPTION = 'perf seed call plan'
+# The only seeded login (first branch manager); everyone else gets an unusable password
+BENCHMARK_USER = 'EMP/80002'
+BENCHMARK_PASSWORD = 'perf-seed'
+
+BRANCHES = [('CHENNAI', 'CHN'), ('COIMBATORE', 'CBE'), ('MADURAI', 'MDU'), ('TRICHY', 'TRY'), ('SALEM', 'SLM'),
+            ('BANGALORE', 'BLR'), ('HYDERABAD', 'HYD'), ('PUNE', 'PUN')]
+FIRST_NAMES = ['arun', 'priya', 'karthik', 'divya', 'suresh', 'lakshmi', 'vignesh', 'meena', 'rahul', 'anitha',
+               'dinesh', 'kavya', 'gokul', 'revathi', 'saravanan', 'nandhini']
+LAST_NAMES = ['kumar', 'raj', 'sundaram', 'krishnan', 'natarajan', 'subramani', 'balaji', 'mohan', 'selvam']
+CITIES = [('Chennai', 'Tamil Nadu'), ('Coimbatore', 'Tamil Nadu'), ('Madurai', 'Tamil Nadu'), ('Trichy', 'Tamil Nadu'),
+          ('Salem', 'Tamil Nadu'), ('Bangalore', 'Karnataka'), ('Hyderabad', 'Telangana'), ('Pune', 'Maharashtra')]
+CLIENTS = ['Tata Motors', 'Infosys', 'Hyundai', 'Ashok Leyland', 'TVS', 'Zoho', 'Wipro', 'L&T', 'HDFC Bank',
+           'Flipkart', 'Amazon', 'Saint-Gobain', 'Caterpillar', 'Foxconn', 'Titan']
+DESIGNATIONS = ['Sales Executive', 'Machine Operator', 'Accountant', 'Software Engineer', 'Telecaller',
+                'HR Recruiter', 'Customer Support', 'Field Officer', 'Quality Inspector', 'Branch Manager']
+SOURCES = ['Naukri', 'Indeed', 'Walk-in', 'Reference', 'LinkedIn', 'Shine', 'Apna']
+EDUCATION = ['SSLC', 'HSC', 'Diploma', 'B.E', 'B.Com', 'B.Sc', 'MBA', 'MCA']
+# (remark, weight); the calendar and reports key off these values
+REMARKS = [('Interested', 20), ('Interview Fixed', 14), ('Feedback Pending', 12), ('Not Interested', 10),
+           ('Rejected', 10), ('No Show', 8), ('Next Round', 6), ('In Process', 6), ('Selected', 6),
+           ('Joined', 4), ('Call Back', 4)]
+CALL_STATUSES = ['call answered', 'not reachable', 'switched off', 'busy', 'call back later']
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let bulk_create keep the spread-out created/updated times instead of auto_now(_add) stamping now"""
+    fields = [field for model in models for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = ('Generate a synthetic, reproducible dataset (employees, candidates, client jobs, status history, '
+            'feedback, revenues, call plans) for performance work. Run against a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=100000, help='Candidates to create (default 100000)')
+        parser.add_argument('--jobs-per-candidate', type=int, default=3,
+                            help='Average client jobs per candidate (default 3)')
+        parser.add_argument('--employees', type=int, default=80, help='Employees across all branches (default 80)')
+        parser.add_argument('--branches', type=int, default=4, help=f'Branches to spread them over (max {len(BRANCHES)})')
+        parser.add_argument('--days', type=int, default=365, help='Spread activity over the last N days (default 365)')
+        parser.add_argument('--call-plans', type=int, default=None,
+                            help='CallDetails rows to create (default: 1 per 200 candidates)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default 42); same seed, same data')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Candidates per bulk_create batch')
+        parser.add_argument('--skip-derived', action='store_true',
+                            help='Do not rebuild search / report / calendar / hierarchy tables afterwards')
+        parser.add_argument('--cleanup', action='store_true', help='Delete previously seeded data and exit')
+        parser.add_argument('--i-know-this-is-not-production', action='store_true', dest='not_production',
+                            help='Run even though DEBUG is off')
+
+    # -----------------------------
+    # Entry point
+    # -----------------------------
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['not_production']:
+            raise CommandError('Refusing to seed or clean up with DEBUG off. This command creates users and rebuilds '
+                               'every derived table; on a scratch database pass --i-know-this-is-not-production')
+        if options['cleanup']:
+            self._cleanup()
+            return
+        if options['candidates'] < 0 or options['jobs_per_candidate'] < 0:
+            raise CommandError('--candidates and --jobs-per-candidate must not be negative')
+        if not 1 <= options['branches'] <= len(BRANCHES):
+            raise CommandError(f'--branches must be between 1 and {len(BRANCHES)}')
+        if options['employees'] < 2 * options['branches'] + 1:
+            raise CommandError('--employees must allow a CEO plus a BM and a TL per branch')
+        if Candidate.objects.filter(profile_number__startswith=PROFILE_PREFIX).exists():
+            raise CommandError('Seeded data already exists; run with --cleanup first')
+
+        self.rng = random.Random(options['seed'])
+        self.now = timezone.now().replace(microsecond=0)
+        self.days = max(1, options['days'])
+        started = timezone.now()
+
+        branches = self._seed_branches(options['branches'])
+        self.employees = self._seed_employees(options['employees'], branches)
+        self.executives = [emp for emp in self.employees if emp['level'] in ('L1', 'L2')]
+        self.stdout.write(f'{len(self.employees)} employees in {len(branches)} branches')
+
+        totals = {'candidates': 0, 'client_jobs': 0, 'status_history': 0, 'revenues': 0}
+        batch_size = max(1, options['batch_size'])
+        for start in range(0, options['candidates'], batch_size):
+            count = min(batch_size, options['candidates'] - start)
+            with transaction.atomic():
+                for name, rows in self._seed_candidate_batch(start, count, options['jobs_per_candidate']).items():
+                    totals[name] += rows
+            self.stdout.write(f'  {start + count}/{options["candidates"]} candidates, {totals["client_jobs"]} jobs')
+
+        call_plans = options['call_plans'] if options['call_plans'] is not None else max(1, options['candidates'] // 200)
+        totals['call_plans'] = self._seed_call_plans(call_plans)
+
+        if not options['skip_derived']:
+            self._rebuild_derived()
+        shared_cache.bump(*shared_cache.NAMESPACES)
+        employee_directory.invalidate()
+
+        elapsed = (timezone.now() - started).total_seconds()
+        summary = ', '.join(f'{rows} {name.replace("_", " ")}' for name, rows in totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Seeded {summary} in {elapsed:.1f}s (seed {options["seed"]})'))
+
+    # -----------------------------
+    # Helpers
+    # -----------------------------
+    def _moment(self):
+        """Random datetime within the last --days days, business hours"""
+        day = self.now - timedelta(days=self.rng.randrange(self.days))
+        return day.replace(hour=self.rng.randrange(9, 19), minute=self.rng.randrange(60), second=self.rng.randrange(60))
+
+    def _remark(self):
+        return self.rng.choices([remark for remark, _ in REMARKS], weights=[weight for _, weight in REMARKS])[0]
+
+    def _name(self):
+        return f'{self.rng.choice(FIRST_NAMES).title()} {self.rng.choice(LAST_NAMES).title()}'
+
+    # -----------------------------
+    # Organisation
+    # -----------------------------
+    def _seed_branches(self, count):
+        branches = []
+        for name, code in BRANCHES[:count]:
+            branch = Branch.objects.filter(name__iexact=name).first() or Branch.objects.filter(branchcode__iexact=code).first()
+            if branch is None:
+                branch = Branch.objects.create(name=name, branchcode=code)
+            branches.append(branch)
+        return branches
+
+    def _seed_employees(self, count, branches):
+        """One CEO; per branch a BM (L3), TLs (L2, about one per six) and executives (L1) under them"""
+        rows = [('L5', None, None)]
+        per_branch = (count - 1) // len(branches)
+        for index, branch in enumerate(branches):
+            size = per_branch + (1 if index < (count - 1) % len(branches) else 0)
+            tls = max(1, size // 6)
+            rows.append(('L3', branch, 'ceo'))
+            rows.extend(('L2', branch, 'bm') for _ in range(tls))
+            rows.extend(('L1', branch, 'tl') for _ in range(size - 1 - tls))
+
+        codes = [f'EMP/8{number:04d}' for number in range(1, len(rows) + 1)]
+        accounts = [User(username=code) for code in codes]
+        for user in accounts:
+            if user.username == BENCHMARK_USER:
+                user.set_password(BENCHMARK_PASSWORD)
+            else:
+                user.set_unusable_password()
+        User.objects.bulk_create(accounts, batch_size=1000)
+        users = dict(User.objects.filter(username__in=codes).values_list('username', 'id'))
+
+        employees = []
+        managers = {}
+        for number, ((level, branch, reports_to), code) in enumerate(zip(rows, codes), start=1):
+            first = self.rng.choice(FIRST_NAMES).title()
+            key = branch.id if branch else None
+            if reports_to == 'ceo':
+                manager = codes[0]
+            elif reports_to == 'bm':
+                manager = managers[(key, 'L3')][0]
+            elif reports_to == 'tl':
+                manager = self.rng.choice(managers[(key, 'L2')])
+            else:
+                manager = None
+            managers.setdefault((key, level), []).append(code)
+            employees.append(Employee(
+                user_id=users[code], employeeCode=code, firstName=first, lastName=f'P{number:04d}',
+                phone1=f'95{number:08d}', officialEmail=f'{code.replace("/", "").lower()}@{EMAIL_DOMAIN}',
+                branch=branch.name if branch else None, level=level, status='Active', reportingManager=manager,
+                joiningDate=(self.now - timedelta(days=self.rng.randrange(30, 1500))).date(),
+            ))
+        Employee.objects.bulk_create(employees, batch_size=1000)
+        by_code = {emp['employeeCode']: emp for emp in Employee.objects.filter(employeeCode__in=codes).values(
+            'id', 'employeeCode', 'firstName', 'lastName', 'branch', 'level', 'reportingManager')}
+
+        # One team per TL with the executives reporting to them
+        branch_ids = {branch.name: branch.id for branch in branches}
+        Team.objects.bulk_create([
+            Team(name=f'{TEAM_PREFIX}{emp["firstName"]} {emp["employeeCode"]}', branch_id=branch_ids[emp['branch']])
+            for emp in by_code.values() if emp['level'] == 'L2'
+        ])
+        teams = {name.rsplit(' ', 1)[-1]: team_id
+                 for team_id, name in Team.objects.filter(name__startswith=TEAM_PREFIX).values_list('id', 'name')}
+        links = []
+        for emp in by_code.values():
+            team_code = emp['employeeCode'] if emp['level'] == 'L2' else emp['reportingManager']
+            if emp['level'] in ('L1', 'L2') and team_code in teams:
+                emp['team_id'] = teams[team_code]
+                links.append(Team.employees.through(team_id=teams[team_code], employee_id=emp['id']))
+            emp['branch_id'] = branch_ids.get(emp['branch'])
+        Team.employees.through.objects.bulk_create(links, batch_size=1000)
+        return list(by_code.values())
+
+    # -----------------------------
+    # Candidates and everything hanging off them
+    # -----------------------------
+    def _feedback(self, owner, remarks):
+        entries = []
+        for remark in remarks:
+            moment = self._moment()
+            nfd = (moment + timedelta(days=self.rng.randrange(1, 10))).strftime('%d-%m-%Y')
+            entries.append(
+                f'Feedback-{self.rng.choice(["first call", "follow up", "shared JD", "asked for CV", "spoke to HR"])}'
+                f' : NFD-{nfd} : EJD- : IFD- : CallStatus-{self.rng.choice(CALL_STATUSES)} : Remarks-{remark}'
+                f' : Entry By-{owner["firstName"]}({owner["employeeCode"]}) : Entry Time{moment:%d-%m-%Y %H:%M:%S};'
+            )
+        return ''.join(entries)
+
+    def _seed_candidate_batch(self, start, count, jobs_per_candidate):
+        candidates = []
+        plans = {}
+        for index in range(start, start + count):
+            owner = self.rng.choice(self.executives)
+            city, state = self.rng.choice(CITIES)
+            created = self._moment()
+            jobs = self.rng.randint(max(0, jobs_per_candidate - 1), jobs_per_candidate + 1) if jobs_per_candidate else 0
+            remarks = [self._remark() for _ in range(jobs)]
+            profile_number = f'{PROFILE_PREFIX}{index + 1:07d}'
+            plans[profile_number] = (owner, remarks, created)
+            name = self._name()
+            candidates.append(Candidate(
+                profile_number=profile_number, executive_name=owner['employeeCode'], candidate_name=name,
+                mobile1=f'9{index + 1:09d}', mobile2=f'8{index + 1:09d}' if index % 4 == 0 else None,
+                email=f'{name.replace(" ", ".").lower()}.{index + 1}@example.com',
+                gender=self.rng.choice(['Male', 'Female']), country='India', state=state, city=city,
+                education=self.rng.choice(EDUCATION), experience=f'{self.rng.randrange(0, 15)} years',
+                source=self.rng.choice(SOURCES), communication=self.rng.choice(['Good', 'Average', 'Excellent']),
+                languages=['Tamil', 'English'], skills=self.rng.sample(DESIGNATIONS, 2),
+                feedback=self._feedback(owner, remarks) or None,
+                created_by=owner['employeeCode'], updated_by=owner['employeeCode'],
+                created_at=created, updated_at=created + timedelta(days=self.rng.randrange(0, 30)),
+            ))
+        with manual_timestamps(Candidate):
+            Candidate.objects.bulk_create(candidates, batch_size=1000)
+        ids = dict(Candidate.objects.filter(profile_number__in=plans).values_list('profile_number', 'id'))
+
+        jobs = []
+        for profile_number, (owner, remarks, created) in plans.items():
+            for remark in remarks:
+                jobs.append(self._client_job(ids[profile_number], owner, remark, created))
+        with manual_timestamps(ClientJob):
+            ClientJob.objects.bulk_create(jobs, batch_size=1000)
+
+        saved_jobs = list(ClientJob.objects.filter(candidate_id__in=ids.values()).values(
+            'id', 'candidate_id', 'client_name', 'remarks', 'profile_submission', 'branch_id', 'team_id',
+            'employee_id', 'updated_at', 'attend', 'current_ctc', 'expected_joining_date',
+        ))
+        history = self._status_history(saved_jobs)
+        revenues = self._revenues(saved_jobs)
+        return {'candidates': len(candidates), 'client_jobs': len(saved_jobs), 'status_history': history,
+                'revenues': revenues}
+
+    def _client_job(self, candidate_id, owner, remark, created):
+        updated = min(self.now, created + timedelta(days=self.rng.randrange(0, 60), hours=self.rng.randrange(0, 8)))
+        assigned = self.rng.random() < 0.15
+        assignee = self.rng.choice(self.executives) if assigned else None
+        current_ctc = Decimal(self.rng.randrange(120, 1500) * 1000)
+        job = ClientJob(
+            candidate_id=candidate_id, client_name=self.rng.choice(CLIENTS), designation=self.rng.choice(DESIGNATIONS),
+            industry=['Manufacturing'] if self.rng.random() < 0.5 else ['IT'], remarks=remark,
+            current_ctc=current_ctc, expected_ctc=current_ctc * Decimal('1.2'),
+            next_follow_up_date=(updated + timedelta(days=self.rng.randrange(-10, 20))).date(),
+            profile_submission=1 if self.rng.random() < 0.4 else 0,
+            attend=remark in ('Selected', 'Joined', 'Rejected', 'Next Round') or self.rng.random() < 0.1,
+            created_by=owner['employeeCode'], updated_by=owner['employeeCode'],
+            created_at=created, updated_at=updated,
+            branch_id=owner['branch_id'], team_id=owner.get('team_id'), employee_id=owner['employeeCode'],
+        )
+        if job.profile_submission:
+            job.profile_submission_date = updated.date()
+        if job.attend:
+            job.attend_date = updated.date()
+        if remark in ('Interview Fixed', 'Next Round'):
+            job.interview_date = updated + timedelta(days=self.rng.randrange(1, 10))
+        if remark in ('Selected', 'Joined'):
+            job.expected_joining_date = updated + timedelta(days=self.rng.randrange(7, 45))
+        if assignee is not None:
+            job.assign, job.assign_to, job.assign_by = 'assigned', assignee['employeeCode'], owner['employeeCode']
+            job.assigned_from, job.transfer_date = owner['employeeCode'], updated
+            job.transfer_status = 'Active'
+            job.employee_id = assignee['employeeCode']
+        return job
+
+    def _status_history(self, jobs):
+        rows = []
+        for job in jobs:
+            changed = job['updated_at']
+            trail = [self._remark() for _ in range(self.rng.randrange(0, 3))] + [job['remarks']]
+            for step, remark in enumerate(trail):
+                moment = changed - timedelta(days=3 * (len(trail) - 1 - step))
+                rows.append(CandidateStatusHistory(
+                    candidate_id=job['candidate_id'], client_job_id=job['id'], client_name=job['client_name'],
+                    remarks=remark, profile_submission=job['profile_submission'], attend_flag=job['attend'],
+                    change_date=moment.date(), created_by=job['employee_id'], created_at=moment,
+                    branch_id=job['branch_id'], team_id=job['team_id'], employee_id=job['employee_id'],
+                ))
+        with manual_timestamps(CandidateStatusHistory):
+            CandidateStatusHistory.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    def _revenues(self, jobs):
+        rows = []
+        for job in jobs:
+            if job['remarks'] not in ('Selected', 'Joined') or self.rng.random() < 0.3:
+                continue
+            joined = job['updated_at'] + timedelta(days=self.rng.randrange(7, 45))
+            ctc = int(job['current_ctc'] * Decimal('1.2'))
+            percentage = self.rng.choice([6, 8, 8.33, 10])
+            rows.append(CandidateRevenue(
+                candidate_id=job['candidate_id'], client_job_id=job['id'], joining_date=joined.date(),
+                accountable_ctc=str(ctc), offer_ctc=str(ctc), percentage=str(percentage),
+                amount=str(round(ctc * percentage / 100)), revenue=str(round(ctc * percentage / 100)),
+                revenue_status=self.rng.choice(['Pending', 'Invoiced', 'Received', 'Joined']),
+                created_by=job['employee_id'], updated_by=job['employee_id'],
+                created_at=job['updated_at'], updated_at=joined,
+            ))
+        with manual_timestamps(CandidateRevenue):
+            CandidateRevenue.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    # -----------------------------
+    # Call plans (events)
+    # -----------------------------
+    def _seed_call_plans(self, count):
+        if not count:
+            return 0
+        candidate_ids = list(
+            Candidate.objects.filter(profile_number__startswith=PROFILE_PREFIX).order_by('id').values_list('id', flat=True)
+        )
+        if not candidate_ids:
+            return 0
+        plans = []
+        links = {}
+        for index in range(count):
+            owner = self.rng.choice(self.executives)
+            start = self._moment().replace(minute=0, second=0)
+            city, state = self.rng.choice(CITIES)
+            kinds = {kind: sorted(set(self.rng.sample(candidate_ids, min(len(candidate_ids), self.rng.randrange(0, 6)))))
+                     for kind in ('onplan', 'onothers', 'profiles', 'profilesothers')}
+            plans.append(CallDetails(
+                tb_call_plan_id=index + 1, tb_call_plan_data=f'P{self.rng.randrange(1, 6)}', tb_call_emp_id=owner['id'],
+                tb_call_client_id=self.rng.randrange(1, len(CLIENTS) + 1), tb_call_state_id=state,
+                tb_call_city_id=city, tb_call_channel=self.rng.choice(DESIGNATIONS),
+                tb_call_source_id=self.rng.choice(SOURCES), tb_call_description=CALL_DESCRIPTION,
+                tb_call_startdate=start, tb_call_todate=start + timedelta(hours=self.rng.choice([1, 2, 4])),
+                tb_call_add_date=start - timedelta(days=1), tb_call_up_date=start,
+                employee_name=f'{owner["firstName"]} {owner["lastName"]}', client_name=self.rng.choice(CLIENTS),
+                **{f'tb_calls_{kind}': ','.join(str(candidate_id) for candidate_id in ids) for kind, ids in kinds.items()},
+            ))
+            links[index + 1] = kinds
+        with manual_timestamps(CallDetails):
+            CallDetails.objects.bulk_create(plans, batch_size=1000)
+        saved = CallDetails.objects.filter(tb_call_description=CALL_DESCRIPTION).values_list('id', 'tb_call_plan_id')
+        CallDetailCandidate.objects.bulk_create([
+            CallDetailCandidate(call_detail_id=call_detail_id, candidate_id=candidate_id, kind=kind)
+            for call_detail_id, plan_id in saved
+            for kind, ids in links.get(plan_id, {}).items()
+            for candidate_id in ids
+        ], batch_size=1000, ignore_conflicts=True)
+        return len(plans)
+
+    # -----------------------------
+    # Derived tables and cleanup
+    # -----------------------------
+    def _rebuild_derived(self):
+        """bulk_create skipped every signal, so rebuild what the signals would have maintained"""
+        self.stdout.write('Rebuilding derived tables...')
+        hierarchy.rebuild()
+        identity.rebuild()
+        call_command('rebuild_candidate_search', missing_only=True, stdout=self.stdout)
+        call_command('backfill_feedback_entries', stdout=self.stdout)
+        call_command('rebuild_report_facts', stdout=self.stdout)
+        call_command('rebuild_calendar_counts', stdout=self.stdout)
+
+    def _cleanup(self):
+        candidates = Candidate.objects.filter(profile_number__startswith=PROFILE_PREFIX)
+        candidate_ids = candidates.values('id')
+        with transaction.atomic():
+            history, _ = CandidateStatusHistory.objects.filter(candidate_id__in=candidate_ids).delete()
+            plans, _ = CallDetails.objects.filter(tb_call_description=CALL_DESCRIPTION).delete()
+            removed, _ = candidates.delete()
+            Team.objects.filter(name__startswith=TEAM_PREFIX).delete()
+            employees = Employee.objects.filter(officialEmail__endswith=f'@{EMAIL_DOMAIN}')
+            User.objects.filter(id__in=employees.values('user_id')).delete()
+            employees.delete()
+        self._rebuild_derived()
+        shared_cache.bump(*shared_cache.NAMESPACES)
+        employee_directory.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {removed} seeded candidate rows (with jobs and revenues), {history} status history rows '
+            f'and {plans} call plan rows'
+        ))
@@ -0,0 +1,38 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from candidate import alternative_parser
+from locations.models import City, State
+
+
+class Command(BaseCommand):
+    help = 'Export state/city names from the locations tables for resume field extraction'
+
+    def handle(self, *args, **options):
+        states = set()
+        for name in State.objects.values_list('state', flat=True).distinct():
+            if name and name.strip():
+                states.add(' '.join(name.split()))
+        for name in City.objects.values_list('state', flat=True).distinct():
+            if name and name.strip():
+                states.add(' '.join(name.split()))
+        cities = {
+            ' '.join(name.split())
+            for name in City.objects.values_list('city', flat=True).distinct()
+            if name and name.strip()
+        }
+
+        path = alternative_parser.location_terms_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump({'states': sorted(states), 'cities': sorted(cities)}, handle)
+        os.replace(tmp_path, path)
+        alternative_parser.reset_location_matchers()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(states)} states and {len(cities)} cities to {path} '
+            f'(running parser workers pick them up after a restart)'
+        ))
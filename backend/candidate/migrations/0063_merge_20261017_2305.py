@@ -0,0 +1,14 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0059_candidatestatushistory_delete_reason_and_more'),
+        ('candidate', '0062_candidate_candidate_created_at_idx'),
+    ]
+
+    operations = [
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0063_merge_20261017_2305'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0, help_text="Order of the entry in the candidate's feedback history (0 = first)")),
+                ('feedback_text', models.TextField(blank=True, default='')),
+                ('remarks', models.CharField(blank=True, default='', max_length=100)),
+                ('nfd_date', models.CharField(blank=True, default='', max_length=50)),
+                ('ejd_date', models.CharField(blank=True, default='', max_length=50)),
+                ('ifd_date', models.CharField(blank=True, default='', max_length=50)),
+                ('interview_date', models.CharField(blank=True, default='', max_length=50)),
+                ('call_status', models.CharField(blank=True, default='', max_length=50)),
+                ('entry_by', models.CharField(blank=True, default='', max_length=100)),
+                ('profile_created_by', models.CharField(blank=True, default='', max_length=100)),
+                ('entry_time', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feedback_entries', to='candidate.candidate')),
+                ('client_job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='feedback_entries', to='candidate.clientjob')),
+            ],
+            options={
+                'db_table': 'candidate_feedback_entry',
+                'ordering': ['candidate', 'position'],
+                'indexes': [models.Index(fields=['candidate', 'position'], name='feedback_cand_position_idx'), models.Index(fields=['candidate', '-entry_time'], name='feedback_cand_time_idx'), models.Index(fields=['client_job', '-entry_time'], name='feedback_job_time_idx'), models.Index(fields=['remarks'], name='feedback_remarks_idx'), models.Index(fields=['entry_by'], name='feedback_entry_by_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0064_feedbackentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('event_type', models.CharField(help_text='IF, NFD, EDJ, PS, SEL, NR, INP, FP or ATND', max_length=10)),
+                ('branch_id', models.IntegerField(default=0)),
+                ('team_id', models.IntegerField(default=0)),
+                ('employee_id', models.CharField(blank=True, default='', max_length=50)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'calendar_daily_counts',
+                'indexes': [models.Index(fields=['branch_id', 'date'], name='cal_counts_branch_date_idx'), models.Index(fields=['team_id', 'date'], name='cal_counts_team_date_idx'), models.Index(fields=['employee_id', 'date'], name='cal_counts_emp_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'event_type', 'branch_id', 'team_id', 'employee_id'), name='calendar_daily_counts_key')],
+            },
+        ),
+    ]
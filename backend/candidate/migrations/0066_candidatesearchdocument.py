@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_fulltext_index(apps, schema_editor):
+    # FULLTEXT is MySQL-only; other backends fall back to LIKE on `body`
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE candidate_search_document ADD FULLTEXT INDEX search_doc_body_ft (body)'
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute('ALTER TABLE candidate_search_document DROP INDEX search_doc_body_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0065_calendardailycount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSearchDocument',
+            fields=[
+                ('candidate', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='candidate.candidate')),
+                ('profile_number', models.CharField(blank=True, default='', max_length=50)),
+                ('name', models.CharField(blank=True, default='', help_text='Lower-cased candidate name', max_length=100)),
+                ('email', models.CharField(blank=True, default='', help_text='Lower-cased email', max_length=254)),
+                ('phone1', models.CharField(blank=True, default='', help_text='Last 10 digits of mobile1', max_length=15)),
+                ('phone2', models.CharField(blank=True, default='', help_text='Last 10 digits of mobile2', max_length=15)),
+                ('body', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'candidate_search_document',
+                'indexes': [models.Index(fields=['profile_number'], name='search_doc_profile_idx'), models.Index(fields=['name'], name='search_doc_name_idx'), models.Index(fields=['email'], name='search_doc_email_idx'), models.Index(fields=['phone1'], name='search_doc_phone1_idx'), models.Index(fields=['phone2'], name='search_doc_phone2_idx')],
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0066_candidatesearchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NfdExpiryRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.DateField(help_text='NFDs before this date were treated as expired')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('success', 'Success'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('triggered_by', models.CharField(blank=True, default='', max_length=100)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('duration_ms', models.IntegerField(default=0)),
+                ('chunks', models.IntegerField(default=0)),
+                ('jobs_unassigned', models.IntegerField(default=0)),
+                ('history_rows', models.IntegerField(default=0)),
+                ('feedback_updated', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'db_table': 'candidate_nfd_expiry_run',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['status', '-started_at'], name='nfd_run_status_started_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0068_resumeparsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientJobReportFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('client_name', models.CharField(blank=True, default='', max_length=100)),
+                ('owner_code', models.CharField(blank=True, default='', max_length=100)),
+                ('executive_name', models.CharField(blank=True, default='', max_length=100)),
+                ('assigned_from', models.CharField(blank=True, default='', max_length=255)),
+                ('branch_id', models.IntegerField(default=0)),
+                ('team_id', models.IntegerField(default=0)),
+                ('remarks', models.CharField(blank=True, default='', max_length=255)),
+                ('transfer_status', models.CharField(blank=True, default='', max_length=50)),
+                ('profile_submission', models.IntegerField(default=0)),
+                ('attend', models.BooleanField(default=False)),
+                ('state', models.CharField(blank=True, default='', max_length=50)),
+                ('city', models.CharField(blank=True, default='', max_length=50)),
+                ('key_hash', models.CharField(max_length=40, unique=True)),
+                ('jobs', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'client_job_report_facts',
+                'indexes': [models.Index(fields=['day'], name='report_facts_day_idx'), models.Index(fields=['branch_id', 'day'], name='report_facts_branch_day_idx'), models.Index(fields=['team_id', 'day'], name='report_facts_team_day_idx'), models.Index(fields=['owner_code', 'day'], name='report_facts_owner_day_idx')],
+            },
+        ),
+    ]
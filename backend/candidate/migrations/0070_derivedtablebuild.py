@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0069_clientjobreportfact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivedTableBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64, unique=True)),
+                ('built_at', models.DateTimeField()),
+                ('rows', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'derived_table_builds',
+            },
+        ),
+    ]
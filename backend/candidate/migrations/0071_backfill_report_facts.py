@@ -0,0 +1,80 @@
+import hashlib
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+# Same key rules as candidate.report_facts.job_key / key_hash (copied: migrations must not import app code)
+DIMENSIONS = (
+    'day', 'client_name', 'owner_code', 'executive_name', 'assigned_from', 'branch_id', 'team_id',
+    'remarks', 'transfer_status', 'profile_submission', 'attend', 'state', 'city',
+)
+JOB_FIELDS = (
+    'client_name', 'assign_to', 'assigned_from', 'branch_id', 'team_id',
+    'remarks', 'transfer_status', 'profile_submission', 'attend',
+)
+CANDIDATE_FIELDS = ('executive_name', 'state', 'city')
+
+
+def fact_key(row):
+    executive_name = row['candidate__executive_name'] or ''
+    return (
+        row['day'],
+        row['client_name'] or '',
+        row['assign_to'] or executive_name,
+        executive_name,
+        row['assigned_from'] or '',
+        row['branch_id'] or 0,
+        row['team_id'] or 0,
+        row['remarks'] or '',
+        row['transfer_status'] or '',
+        row['profile_submission'] or 0,
+        bool(row['attend']),
+        row['candidate__state'] or '',
+        row['candidate__city'] or '',
+    )
+
+
+def key_hash(key):
+    return hashlib.sha1('\x1f'.join(str(part) for part in key).encode('utf-8')).hexdigest()
+
+
+def backfill_report_facts(apps, schema_editor):
+    """
+    Fill client_job_report_facts from every existing client job: the reports
+    read only the fact table, and signals only cover jobs saved after 0069
+    """
+    ClientJob = apps.get_model('candidate', 'ClientJob')
+    ClientJobReportFact = apps.get_model('candidate', 'ClientJobReportFact')
+
+    counts = defaultdict(int)
+    candidate_fields = [f'candidate__{name}' for name in CANDIDATE_FIELDS]
+    rows = (
+        ClientJob.objects.filter(updated_at__isnull=False)
+        .annotate(day=TruncDate('updated_at'))
+        .values('day', *JOB_FIELDS, *candidate_fields)
+        .annotate(count=Count('id'))
+    )
+    for row in rows.iterator(chunk_size=2000):
+        if row['day']:
+            counts[fact_key(row)] += row['count']
+
+    ClientJobReportFact.objects.all().delete()
+    ClientJobReportFact.objects.bulk_create(
+        (ClientJobReportFact(key_hash=key_hash(key), jobs=count, **dict(zip(DIMENSIONS, key)))
+         for key, count in counts.items() if count),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0070_derivedtablebuild'),
+    ]
+
+    operations = [
+        # Reverse leaves the rows; signals and rebuild_report_facts keep maintaining them
+        migrations.RunPython(backfill_report_facts, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0071_backfill_report_facts'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='feedbackentry',
+            name='feedback_cand_time_idx',
+        ),
+        migrations.AddIndex(
+            model_name='feedbackentry',
+            index=models.Index(fields=['candidate', '-entry_time', '-position'], name='feedback_cand_time_idx'),
+        ),
+    ]
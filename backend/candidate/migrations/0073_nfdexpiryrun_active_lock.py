@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0072_feedback_time_position_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nfdexpiryrun',
+            name='active_lock',
+            field=models.CharField(blank=True, max_length=20, null=True, unique=True),
+        ),
+    ]
@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from datetime import datetime
+import uuid
 
 # -----------------------------
 # Shared Audit Fields
@@ -28,14 +29,9 @@ class AuditFields(models.Model):
         if not self.created_by:
             return None
         
-        try:
-            from empreg.models import Employee
-            employee = Employee.objects.get(employeeCode=self.created_by, del_state=0)
-            full_name = f"{employee.firstName} {employee.lastName}".strip()
-            return full_name if full_name else employee.firstName
-        except Exception:
-            # If employee not found, return the employee code as is
-            return self.created_by
+        from empreg import directory as employee_directory
+        # If employee not found, the employee code is returned as is
+        return employee_directory.display_name(self.created_by)
     
     def get_updated_by_name(self):
         """
@@ -48,14 +44,9 @@ class AuditFields(models.Model):
         if not self.updated_by:
             return None
         
-        try:
-            from empreg.models import Employee
-            employee = Employee.objects.get(employeeCode=self.updated_by, del_state=0)
-            full_name = f"{employee.firstName} {employee.lastName}".strip()
-            return full_name if full_name else employee.firstName
-        except Exception:
-            # If employee not found, return the employee code as is
-            return self.updated_by
+        from empreg import directory as employee_directory
+        # If employee not found, the employee code is returned as is
+        return employee_directory.display_name(self.updated_by)
     
     def save(self, *args, **kwargs):
         from django.utils import timezone
@@ -180,6 +171,47 @@ class Candidate(AuditFields):
         return f"{self.candidate_name} ({self.profile_number})"
 
 
+def _feedback_nfd_status(nfd_value):
+    """
+    Classify a feedback NFD string against today's date
+    Returns "PAST (expired)", "FUTURE (not expired)", "TODAY" or "INVALID DATE"
+    """
+    import re
+    try:
+        from datetime import datetime
+        # Clean the date string (remove any non-date characters like "(open profile)")
+        clean_nfd_value = re.sub(r'\s*\([^)]*\)', '', nfd_value).strip()
+
+        # Try to parse the NFD date with different formats
+        date_formats = [
+            ('%d/%m/%Y', "/"),
+            ('%d-%m-%Y', "-"),
+            ('%Y-%m-%d', "-"),
+            ('%d/%m/%y', "/"),
+            ('%d-%m-%y', "-")
+        ]
+
+        nfd_date = None
+        for fmt, sep in date_formats:
+            if sep in clean_nfd_value:
+                try:
+                    nfd_date = datetime.strptime(clean_nfd_value, fmt).date()
+                    break
+                except ValueError:
+                    continue
+
+        if nfd_date:
+            current_date = datetime.now().date()
+            if nfd_date < current_date:
+                return "PAST (expired)"
+            elif nfd_date > current_date:
+                return "FUTURE (not expired)"
+            return "TODAY"
+        return "INVALID DATE"
+    except Exception as e:
+        return f"ERROR: {str(e)}_FORMAT"
+
+
 # -----------------------------
 # Step 2 - Client & Job Details
 # -----------------------------
@@ -336,14 +368,10 @@ class ClientJob(AuditFields):
         if self.assign_to:
             try:
                 # Import here to avoid circular imports
-                from empreg.models import Employee
+                from empreg import directory as employee_directory
                 # assign_to stores employee code, convert to name for display
-                assigned_employee = Employee.objects.get(employeeCode=self.assign_to, del_state=0)
-                full_name = f"{assigned_employee.firstName} {assigned_employee.lastName}".strip() or assigned_employee.firstName
-                return full_name
-            except Employee.DoesNotExist:
-                # Fallback to employee code if employee not found
-                return self.assign_to
+                # (falls back to the employee code if employee not found)
+                return employee_directory.display_name(self.assign_to)
             except Exception as e:
                 print(f"WARNING: Error getting assigned executive name: {str(e)}")
                 return self.assign_to
@@ -715,218 +743,59 @@ class ClientJob(AuditFields):
             self.profile_submission_date = None
             print(f"DEBUG MODEL: Cleared profile_submission_date")
         
+        from django.db import transaction
+
         try:
-            # Check if this is a new record (first feedback entry)
-            is_new_record = self.pk is None
-            
-            if is_new_record:
-                # For new records, save without triggering auto_now on updated_at
-                # We'll save all fields but updated_at won't be set until first actual update
-                self.save()
-                print(f"DEBUG MODEL: New record saved - created_at set")
-            else:
-                # For existing records, save normally (updated_at will be updated)
-                self.candidate.save(update_fields=['feedback'])
-                self.save()
-                print(f"DEBUG MODEL: Save successful - Updated fields: remarks={self.remarks}, nfd={self.next_follow_up_date}, ejd={self.expected_joining_date}, ifd={self.interview_date}, profile_submission={self.profile_submission}, profile_submission_date={self.profile_submission_date}")
+            # Blob and FeedbackEntry rows are written together: once a candidate has rows
+            # they are all get_feedback_entries() reads, so a row must never be missing
+            with transaction.atomic():
+                # Check if this is a new record (first feedback entry)
+                is_new_record = self.pk is None
+
+                if is_new_record:
+                    # For new records, save without triggering auto_now on updated_at
+                    # We'll save all fields but updated_at won't be set until first actual update
+                    self.save()
+                    print(f"DEBUG MODEL: New record saved - created_at set")
+                else:
+                    # For existing records, save normally (updated_at will be updated)
+                    self.candidate.save(update_fields=['feedback'])
+                    self.save()
+                    print(f"DEBUG MODEL: Save successful - Updated fields: remarks={self.remarks}, nfd={self.next_follow_up_date}, ejd={self.expected_joining_date}, ifd={self.interview_date}, profile_submission={self.profile_submission}, profile_submission_date={self.profile_submission_date}")
+
+                FeedbackEntry.record(self, clean_text(feedback_entry), entry_id=entry_id)
         except Exception as e:
             print(f"DEBUG MODEL: Save failed: {str(e)}")
             raise
     
     def get_feedback_entries(self):
+        """Return list of structured feedback entries, newest first (see feedback_entries_page)"""
+        return self.feedback_entries_page()[0]
+
+    def feedback_entries_page(self, start=0, stop=None):
         """
-        Parse feedback field and return list of structured feedback entries
+        Return (entries[start:stop], total entries), newest first
+        Candidates with FeedbackEntry rows are sorted and sliced in the database
+        (feedback_cand_time_idx), so a page costs what it returns; the legacy
+        Candidate.feedback blob is parsed only for candidates without rows
         """
-        try:
-            if not self.candidate.feedback:
-                return []
-                
-            entries = []
-                
-            # Safety check for feedback content
-            if not isinstance(self.candidate.feedback, str):
-                print(f"WARNING: feedback is not a string for ClientJob {self.id}: {type(self.candidate.feedback)}")
-                return []
-                
-            # Try different separators based on the actual data format
-            raw_entries = []
-                
-            # Split by semicolons and identify feedback entries
-            import re
-            parts = self.candidate.feedback.split(';')
-            current_entry = ""
-            
-            for part in parts:
-                try:
-                    part = part.strip()
-                    if not part:
-                        continue
-                    
-                    # Check if this part starts a new feedback entry
-                    if part.startswith('Feedback-') or part.startswith('Feedback'):
-                        # Save previous entry if exists
-                        if current_entry:
-                            raw_entries.append(current_entry.strip())
-                        current_entry = part
-                    elif part.startswith('Profile assigned from'):
-                        # Handle profile assignment entries
-                        if current_entry:
-                            raw_entries.append(current_entry.strip())
-                        raw_entries.append(part.strip())
-                        current_entry = ""
-                    elif any(part.startswith(status + ':') for status in ['Selected', 'Abscond', 'Rejected', 'Hired', 'Dropped']):
-                        # Handle legacy status entries (Selected:, Abscond:, etc.)
-                        if current_entry:
-                            raw_entries.append(current_entry.strip())
-                        raw_entries.append(part.strip())
-                        current_entry = ""
-                    else:
-                        # Continue building current entry or add as standalone
-                        if part.startswith(':') and any(keyword in part for keyword in ['NFD-', 'EJD-', 'IFD-', 'CallStatus-', 'Remarks-', 'Entry By-', 'Entry Time']):
-                            if current_entry:
-                                raw_entries.append(current_entry.strip())
-                            current_entry = part
-                        elif current_entry and ('NFD-' in part or 'InterviewDate-' in part or 'Remarks-' in part or 'Entry By-' in part or 'Entry Time' in part):
-                            # This part belongs to the current feedback entry
-                            current_entry += " : " + part
-                        elif current_entry:
-                            # This might be a continuation or new entry
-                            if ':' in part and any(keyword in part for keyword in ['NFD-', 'InterviewDate-', 'Remarks-', 'Entry By-', 'Entry Time']):
-                                current_entry += " : " + part
-                            else:
-                                # Save current and start new
-                                raw_entries.append(current_entry.strip())
-                                current_entry = part
-                        else:
-                            # Start new entry
-                            current_entry = part
-                except Exception as part_error:
-                    print(f"WARNING: Error processing feedback part for ClientJob {self.id}: {str(part_error)}")
-                    continue
-            
-            # Don't forget the last entry
-            if current_entry:
-                raw_entries.append(current_entry.strip())
+        from django.db.models import Count, Min
 
-            # Remove exact duplicate raw entries while preserving original order
-            try:
-                unique_raw_entries = []
-                seen_raw = set()
-                for raw in raw_entries:
-                    try:
-                        key = raw.strip() if isinstance(raw, str) else str(raw).strip()
-                    except Exception:
-                        key = str(raw).strip()
-                    if not key:
-                        continue
-                    if key in seen_raw:
-                        continue
-                    seen_raw.add(key)
-                    unique_raw_entries.append(raw)
-                raw_entries = unique_raw_entries
-            except Exception as dedup_error:
-                print(f"WARNING: Error de-duplicating feedback entries for ClientJob {self.id}: {str(dedup_error)}")
-
-            for entry in raw_entries:
-                try:
-                    if entry and entry.strip():
-                        parsed = self._parse_feedback_entry(entry.strip())
-                        if parsed:
-                            entries.append(parsed)
-                        else:
-                            entries.append({
-                                'feedback': entry.strip() if entry else '',
-                                'nfd_date': '',
-                                'nfd_status': '',
-                                'ejd_date': '',
-                                'ifd_date': '',
-                                'interview_date': '',
-                                'remarks': '',
-                                'executive_name': '',
-                                'profile_created_by': '',
-                                'call_status': '',
-                                'entry_time': ''
-                            })
-                except Exception as entry_error:
-                    print(f"WARNING: Error parsing feedback entry for ClientJob {self.id}: {str(entry_error)}")
-                    # Add basic entry as fallback
-                    entries.append({
-                        'feedback': entry.strip() if entry else '',
-                        'nfd_date': '',
-                        'nfd_status': '',
-                        'ejd_date': '',
-                        'ifd_date': '',
-                        'interview_date': '',
-                        'remarks': '',
-                        'executive_name': '',
-                        'profile_created_by': '',
-                        'call_status': '',
-                        'entry_time': ''
-                    })
-
-            # Mark the first stored feedback entry (original order) as profile created
-            try:
-                if entries and isinstance(entries[0], dict):
-                    entries[0]['is_profile_created'] = True
-            except Exception as mark_error:
-                print(f"WARNING: Error marking profile created entry for ClientJob {self.id}: {str(mark_error)}")
-            
-            # Sort entries by entry_time (date + time) so newest entries come first (LIFO)
-            try:
-                from datetime import datetime as _dt
-                import re as _re
-
-                def _parse_entry_time(entry_dict):
-                    if not isinstance(entry_dict, dict):
-                        return _dt.min
-                    time_str = entry_dict.get('entry_time')
-                    if not time_str or not isinstance(time_str, str):
-                        return _dt.min
-                    time_str = time_str.strip()
-
-                    match = _re.search(r"(\d{2})-(\d{2})-(\d{4})(?:\s+(\d{2})(?::(\d{2})(?::(\d{2}))?)?)?", time_str)
-                    if not match:
-                        return _dt.min
-
-                    day = int(match.group(1))
-                    month = int(match.group(2))
-                    year = int(match.group(3))
-                    hour = int(match.group(4)) if match.group(4) is not None else 0
-                    minute = int(match.group(5)) if match.group(5) is not None else 0
-                    second = int(match.group(6)) if match.group(6) is not None else 0
+        try:
+            rows = FeedbackEntry.objects.filter(candidate_id=self.candidate_id)
+            summary = rows.aggregate(total=Count('id'), first_position=Min('position'))
+            if summary['total']:
+                entries = []
+                for row in rows.order_by('-entry_time', '-position')[start:stop]:
+                    entry = row.to_entry_dict()
+                    # The first stored entry is the one that created the profile
+                    entry['is_profile_created'] = row.position == summary['first_position']
+                    entries.append(entry)
+                return entries, summary['total']
+
+            entries = self._order_feedback_entries(self._parse_feedback_blob())
+            return entries[start:stop], len(entries)
 
-                    try:
-                        return _dt(year, month, day, hour, minute, second)
-                    except Exception:
-                        return _dt.min
-
-                entries.sort(key=_parse_entry_time, reverse=True)
-
-                if entries:
-                    # Prefer the entry we already marked as profile created (based on original order)
-                    existing_profile_entry = None
-                    for e in entries:
-                        if isinstance(e, dict) and e.get('is_profile_created'):
-                            existing_profile_entry = e
-                            break
-
-                    # Reset all flags
-                    for e in entries:
-                        if isinstance(e, dict):
-                            e['is_profile_created'] = False
-
-                    # Re-apply the flag to the preferred entry, or fall back to oldest (last) entry
-                    if existing_profile_entry is not None:
-                        existing_profile_entry['is_profile_created'] = True
-                    else:
-                        last_entry = entries[-1]
-                        if isinstance(last_entry, dict):
-                            last_entry['is_profile_created'] = True
-            except Exception as sort_error:
-                print(f"WARNING: Error sorting feedback entries for ClientJob {self.id}: {str(sort_error)}")
-            
-            return entries
-            
         except Exception as e:
             print(f"ERROR: Critical error in get_feedback_entries for ClientJob {self.id}: {str(e)}")
             # Return basic fallback
@@ -942,8 +811,212 @@ class ClientJob(AuditFields):
                 'profile_created_by': '',
                 'call_status': '',
                 'entry_time': ''
-            }]
+            }], 1
     
+    def _parse_feedback_blob(self, feedback=None):
+        """
+        Split the legacy semicolon-delimited feedback blob into parsed entries
+        Entries are returned in stored (oldest first) order
+        """
+        if feedback is None:
+            feedback = getattr(self.candidate, 'feedback', None)
+        if not feedback:
+            return []
+
+        entries = []
+            
+        # Safety check for feedback content
+        if not isinstance(feedback, str):
+            print(f"WARNING: feedback is not a string for ClientJob {self.id}: {type(feedback)}")
+            return []
+            
+        # Try different separators based on the actual data format
+        raw_entries = []
+            
+        # Split by semicolons and identify feedback entries
+        import re
+        parts = feedback.split(';')
+        current_entry = ""
+        
+        for part in parts:
+            try:
+                part = part.strip()
+                if not part:
+                    continue
+                
+                # Check if this part starts a new feedback entry
+                if part.startswith('Feedback-') or part.startswith('Feedback'):
+                    # Save previous entry if exists
+                    if current_entry:
+                        raw_entries.append(current_entry.strip())
+                    current_entry = part
+                elif part.startswith('Profile assigned from'):
+                    # Handle profile assignment entries
+                    if current_entry:
+                        raw_entries.append(current_entry.strip())
+                    raw_entries.append(part.strip())
+                    current_entry = ""
+                elif any(part.startswith(status + ':') for status in ['Selected', 'Abscond', 'Rejected', 'Hired', 'Dropped']):
+                    # Handle legacy status entries (Selected:, Abscond:, etc.)
+                    if current_entry:
+                        raw_entries.append(current_entry.strip())
+                    raw_entries.append(part.strip())
+                    current_entry = ""
+                else:
+                    # Continue building current entry or add as standalone
+                    if part.startswith(':') and any(keyword in part for keyword in ['NFD-', 'EJD-', 'IFD-', 'CallStatus-', 'Remarks-', 'Entry By-', 'Entry Time']):
+                        if current_entry:
+                            raw_entries.append(current_entry.strip())
+                        current_entry = part
+                    elif current_entry and ('NFD-' in part or 'InterviewDate-' in part or 'Remarks-' in part or 'Entry By-' in part or 'Entry Time' in part):
+                        # This part belongs to the current feedback entry
+                        current_entry += " : " + part
+                    elif current_entry:
+                        # This might be a continuation or new entry
+                        if ':' in part and any(keyword in part for keyword in ['NFD-', 'InterviewDate-', 'Remarks-', 'Entry By-', 'Entry Time']):
+                            current_entry += " : " + part
+                        else:
+                            # Save current and start new
+                            raw_entries.append(current_entry.strip())
+                            current_entry = part
+                    else:
+                        # Start new entry
+                        current_entry = part
+            except Exception as part_error:
+                print(f"WARNING: Error processing feedback part for ClientJob {self.id}: {str(part_error)}")
+                continue
+        
+        # Don't forget the last entry
+        if current_entry:
+            raw_entries.append(current_entry.strip())
+
+        # Remove exact duplicate raw entries while preserving original order
+        try:
+            unique_raw_entries = []
+            seen_raw = set()
+            for raw in raw_entries:
+                try:
+                    key = raw.strip() if isinstance(raw, str) else str(raw).strip()
+                except Exception:
+                    key = str(raw).strip()
+                if not key:
+                    continue
+                if key in seen_raw:
+                    continue
+                seen_raw.add(key)
+                unique_raw_entries.append(raw)
+            raw_entries = unique_raw_entries
+        except Exception as dedup_error:
+            print(f"WARNING: Error de-duplicating feedback entries for ClientJob {self.id}: {str(dedup_error)}")
+
+        for entry in raw_entries:
+            try:
+                if entry and entry.strip():
+                    parsed = self._parse_feedback_entry(entry.strip())
+                    if parsed:
+                        entries.append(parsed)
+                    else:
+                        entries.append({
+                            'feedback': entry.strip() if entry else '',
+                            'nfd_date': '',
+                            'nfd_status': '',
+                            'ejd_date': '',
+                            'ifd_date': '',
+                            'interview_date': '',
+                            'remarks': '',
+                            'executive_name': '',
+                            'profile_created_by': '',
+                            'call_status': '',
+                            'entry_time': ''
+                        })
+            except Exception as entry_error:
+                print(f"WARNING: Error parsing feedback entry for ClientJob {self.id}: {str(entry_error)}")
+                # Add basic entry as fallback
+                entries.append({
+                    'feedback': entry.strip() if entry else '',
+                    'nfd_date': '',
+                    'nfd_status': '',
+                    'ejd_date': '',
+                    'ifd_date': '',
+                    'interview_date': '',
+                    'remarks': '',
+                    'executive_name': '',
+                    'profile_created_by': '',
+                    'call_status': '',
+                    'entry_time': ''
+                })
+
+        return entries
+
+    def _order_feedback_entries(self, entries):
+        """
+        Flag the first stored entry as profile created and sort newest first
+        """
+        # Mark the first stored feedback entry (original order) as profile created
+        try:
+            if entries and isinstance(entries[0], dict):
+                entries[0]['is_profile_created'] = True
+        except Exception as mark_error:
+            print(f"WARNING: Error marking profile created entry for ClientJob {self.id}: {str(mark_error)}")
+        
+        # Sort entries by entry_time (date + time) so newest entries come first (LIFO)
+        try:
+            from datetime import datetime as _dt
+            import re as _re
+
+            def _parse_entry_time(entry_dict):
+                if not isinstance(entry_dict, dict):
+                    return _dt.min
+                time_str = entry_dict.get('entry_time')
+                if not time_str or not isinstance(time_str, str):
+                    return _dt.min
+                time_str = time_str.strip()
+
+                match = _re.search(r"(\d{2})-(\d{2})-(\d{4})(?:\s+(\d{2})(?::(\d{2})(?::(\d{2}))?)?)?", time_str)
+                if not match:
+                    return _dt.min
+
+                day = int(match.group(1))
+                month = int(match.group(2))
+                year = int(match.group(3))
+                hour = int(match.group(4)) if match.group(4) is not None else 0
+                minute = int(match.group(5)) if match.group(5) is not None else 0
+                second = int(match.group(6)) if match.group(6) is not None else 0
+
+                try:
+                    return _dt(year, month, day, hour, minute, second)
+                except Exception:
+                    return _dt.min
+
+            # Ties keep the newest stored entry first, like FeedbackEntry's (-entry_time, -position)
+            order = sorted(range(len(entries)), key=lambda index: (_parse_entry_time(entries[index]), index), reverse=True)
+            entries[:] = [entries[index] for index in order]
+
+            if entries:
+                # Prefer the entry we already marked as profile created (based on original order)
+                existing_profile_entry = None
+                for e in entries:
+                    if isinstance(e, dict) and e.get('is_profile_created'):
+                        existing_profile_entry = e
+                        break
+
+                # Reset all flags
+                for e in entries:
+                    if isinstance(e, dict):
+                        e['is_profile_created'] = False
+
+                # Re-apply the flag to the preferred entry, or fall back to oldest (last) entry
+                if existing_profile_entry is not None:
+                    existing_profile_entry['is_profile_created'] = True
+                else:
+                    last_entry = entries[-1]
+                    if isinstance(last_entry, dict):
+                        last_entry['is_profile_created'] = True
+        except Exception as sort_error:
+            print(f"WARNING: Error sorting feedback entries for ClientJob {self.id}: {str(sort_error)}")
+        
+        return entries
+
     def _parse_feedback_entry(self, entry):
             """
             Parse individual feedback entry string into structured data
@@ -1037,41 +1110,7 @@ class ClientJob(AuditFields):
                         parsed['nfd_date'] = nfd_value
                         
                         # Check if NFD is past date (expired) or future date
-                        try:
-                            from datetime import datetime
-                            # Clean the date string (remove any non-date characters like "(open profile)")
-                            clean_nfd_value = re.sub(r'\s*\([^)]*\)', '', nfd_value).strip()
-                            
-                            # Try to parse the NFD date with different formats
-                            date_formats = [
-                                ('%d/%m/%Y', "/"),
-                                ('%d-%m-%Y', "-"),
-                                ('%Y-%m-%d', "-"),
-                                ('%d/%m/%y', "/"),
-                                ('%d-%m-%y', "-")
-                            ]
-                            
-                            nfd_date = None
-                            for fmt, sep in date_formats:
-                                if sep in clean_nfd_value:
-                                    try:
-                                        nfd_date = datetime.strptime(clean_nfd_value, fmt).date()
-                                        break
-                                    except ValueError:
-                                        continue
-                            
-                            if nfd_date:
-                                current_date = datetime.now().date()
-                                if nfd_date < current_date:
-                                    parsed['nfd_status'] = "PAST (expired)"
-                                elif nfd_date > current_date:
-                                    parsed['nfd_status'] = "FUTURE (not expired)"
-                                else:
-                                    parsed['nfd_status'] = "TODAY"
-                            else:
-                                parsed['nfd_status'] = "INVALID DATE"
-                        except Exception as e:
-                            parsed['nfd_status'] = f"ERROR: {str(e)}_FORMAT"
+                        parsed['nfd_status'] = _feedback_nfd_status(nfd_value)
                     
                     # Extract EJD date
                     ejd_match = re.search(r'EJD-([^:]*?)(?:\s*:\s*|:|$)', entry)
@@ -1272,6 +1311,7 @@ class ClientJob(AuditFields):
         ]
         
         feedback_updated = False
+        expired_nfd = None
         current_date = current_datetime.date()
         
         # Check ONLY the LATEST feedback entry for expired NFD
@@ -1315,6 +1355,7 @@ class ClientJob(AuditFields):
                             
                             entry_updated = True
                             feedback_updated = True
+                            expired_nfd = (nfd_str, expired_display)
                             print(f"  Updated Entry {i+1}: {nfd_str} -> {expired_display}")
                             break  # Only update first NFD per entry
                             
@@ -1340,87 +1381,32 @@ class ClientJob(AuditFields):
             self.candidate.feedback = ';'.join(feedback_entries)
             self.candidate.save(update_fields=['feedback'])
             print(f"  Saved updated feedback with LATEST expired NFD marked as (open profile)")
+
+            # Keep the structured rows in step with the blob
+            if expired_nfd:
+                FeedbackEntry.sync_nfd_dates(self.candidate, client_job=self)
         else:
             print(f"  No expired NFD found in latest feedback entry")
         
         return feedback_updated
 
-    # Class-level cache for NFD updates
-    _last_nfd_update = None
-    _nfd_update_interval = 30 * 60  # 30 minutes in seconds
-    
     @classmethod
     def update_all_expired_nfd_jobs(cls):
         """
-        Ultra-fast bulk update method for expired NFD jobs with caching
-        Uses raw SQL for maximum performance and prevents frequent updates
-        Returns count of updated jobs
+        Run the NFD expiry engine now (see candidate/nfd_expiry.py)
+        Scheduled runs use `manage.py expire_nfds`; this is kept for manual/admin triggers
+        Returns count of unassigned jobs
         """
-        from datetime import timedelta
-        from django.utils import timezone
-        from django.db import connection
-        import time
-        
-        # Check if we've updated recently (cache mechanism)
-        current_time = time.time()
-        if (cls._last_nfd_update and 
-            current_time - cls._last_nfd_update < cls._nfd_update_interval):
-            print(f" NFD AUTO-UPDATE: Skipping update (last update was {int((current_time - cls._last_nfd_update) / 60)} minutes ago)")
-            return 0
-        
-        # Use common NFD expiry threshold from views
-        # Import here to avoid circular dependency
-        from candidate.views import get_nfd_expiry_threshold
-        expiry_cutoff = get_nfd_expiry_threshold()
-        
-        print(f" NFD AUTO-UPDATE: Starting bulk update (cutoff: {expiry_cutoff})")
-        
-        # Use raw SQL for maximum performance - bulk update in single query
-        with connection.cursor() as cursor:
-            # First, count how many records will be updated
-            count_sql = """
-                SELECT COUNT(*) FROM candidate_clientjob 
-                WHERE next_follow_up_date IS NOT NULL 
-                AND next_follow_up_date < %s 
-                AND assign_to IS NOT NULL
-            """
-            cursor.execute(count_sql, [expiry_cutoff])
-            total_found = cursor.fetchone()[0]
-            
-            print(f" NFD AUTO-UPDATE: Found {total_found} expired jobs to update")
-            
-            if total_found == 0:
-                cls._last_nfd_update = current_time  # Update cache even if no records
-                return 0
-            
-            # Bulk update all expired jobs - mark assign_to as NULL only
-            # Keep remarks and NFD date for frontend display
-            update_sql = """
-                UPDATE candidate_clientjob 
-                SET 
-                    assign_to = NULL
-                WHERE next_follow_up_date IS NOT NULL 
-                AND next_follow_up_date < %s 
-                AND assign_to IS NOT NULL
-            """
-            
-            # Execute bulk update
-            cursor.execute(update_sql, [expiry_cutoff])
-            updated_count = cursor.rowcount
-        
-        # Update cache
-        cls._last_nfd_update = current_time
-        
-        print(f" NFD AUTO-UPDATE: Bulk updated {updated_count} expired NFD jobs in single query")
-        return updated_count
+        from candidate import nfd_expiry
+        run = nfd_expiry.run(triggered_by='update_all_expired_nfd_jobs')
+        return run.jobs_unassigned if run else 0
     
     @classmethod
     def force_update_expired_nfd_jobs(cls):
         """
-        Force update expired NFD jobs bypassing cache
+        Force update expired NFD jobs
         Use this for manual/admin triggers
         """
-        cls._last_nfd_update = None  # Clear cache
         return cls.update_all_expired_nfd_jobs()
     
     def _is_nfd_expired_simple(self, current_date):
@@ -1783,6 +1769,186 @@ class JobAssignmentHistory(AuditFields):
         return f"{self.candidate.candidate_name}: {self.previous_owner} -> {self.new_owner} ({self.reason})"
 
 
+# -----------------------------
+# Structured Feedback Entries
+# -----------------------------
+class FeedbackEntry(models.Model):
+    """
+    One row per feedback entry written by ClientJob.add_feedback
+    Replaces re-parsing the semicolon-delimited Candidate.feedback blob on every read.
+    Candidate.feedback is still written alongside these rows during rollout.
+    """
+    ENTRY_TIME_FORMAT = "%d-%m-%Y %H:%M:%S"
+
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name="feedback_entries")
+    client_job = models.ForeignKey(ClientJob, on_delete=models.SET_NULL, null=True, blank=True, related_name="feedback_entries")
+    position = models.PositiveIntegerField(default=0, help_text="Order of the entry in the candidate's feedback history (0 = first)")
+    feedback_text = models.TextField(blank=True, default='')
+    remarks = models.CharField(max_length=100, blank=True, default='')
+    # NFD/EJD/IFD are kept as entered, e.g. "2025-11-21 (open profile)"
+    nfd_date = models.CharField(max_length=50, blank=True, default='')
+    ejd_date = models.CharField(max_length=50, blank=True, default='')
+    ifd_date = models.CharField(max_length=50, blank=True, default='')
+    interview_date = models.CharField(max_length=50, blank=True, default='')
+    call_status = models.CharField(max_length=50, blank=True, default='')
+    entry_by = models.CharField(max_length=100, blank=True, default='')
+    profile_created_by = models.CharField(max_length=100, blank=True, default='')
+    entry_time = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'candidate_feedback_entry'
+        ordering = ['candidate', 'position']
+        indexes = [
+            models.Index(fields=['candidate', 'position'], name='feedback_cand_position_idx'),
+            models.Index(fields=['candidate', '-entry_time', '-position'], name='feedback_cand_time_idx'),
+            models.Index(fields=['client_job', '-entry_time'], name='feedback_job_time_idx'),
+            models.Index(fields=['remarks'], name='feedback_remarks_idx'),
+            models.Index(fields=['entry_by'], name='feedback_entry_by_idx'),
+        ]
+
+    def __str__(self):
+        return f"Candidate {self.candidate_id} - #{self.position} {self.remarks}"
+
+    @classmethod
+    def _parse_entry_time(cls, value):
+        """Parse a dd-mm-YYYY [HH[:MM[:SS]]] entry time string into an aware datetime"""
+        import re
+        if not value or not isinstance(value, str):
+            return None
+        match = re.search(r"(\d{2})-(\d{2})-(\d{4})(?:\s+(\d{2})(?::(\d{2})(?::(\d{2}))?)?)?", value.strip())
+        if not match:
+            return None
+        try:
+            parsed = datetime(
+                int(match.group(3)), int(match.group(2)), int(match.group(1)),
+                int(match.group(4) or 0), int(match.group(5) or 0), int(match.group(6) or 0)
+            )
+        except ValueError:
+            return None
+        return timezone.make_aware(parsed)
+
+    @classmethod
+    def from_parsed(cls, candidate, parsed, position, client_job=None):
+        """Build an unsaved row from a ClientJob._parse_feedback_entry() dict"""
+        return cls(
+            candidate=candidate,
+            client_job=client_job,
+            position=position,
+            feedback_text=parsed.get('feedback') or '',
+            remarks=(parsed.get('remarks') or '')[:100],
+            nfd_date=(parsed.get('nfd_date') or '')[:50],
+            ejd_date=(parsed.get('ejd_date') or '')[:50],
+            ifd_date=(parsed.get('ifd_date') or '')[:50],
+            interview_date=(parsed.get('interview_date') or '')[:50],
+            call_status=(parsed.get('call_status') or '')[:50],
+            entry_by=(parsed.get('executive_name') or '')[:100],
+            profile_created_by=(parsed.get('profile_created_by') or '')[:100],
+            entry_time=cls._parse_entry_time(parsed.get('entry_time')),
+        )
+
+    @classmethod
+    def build_for_candidate(cls, candidate, client_job=None):
+        """
+        Parse the candidate's legacy feedback blob into unsaved rows (stored order)
+        """
+        parser = client_job or candidate.client_jobs.first() or ClientJob(candidate=candidate)
+        parsed_entries = parser._parse_feedback_blob(candidate.feedback)
+        return [
+            cls.from_parsed(candidate, parsed, position)
+            for position, parsed in enumerate(parsed_entries)
+        ]
+
+    @classmethod
+    def rebuild_for_candidate(cls, candidate, client_job=None):
+        """
+        Replace the candidate's rows with a fresh parse of Candidate.feedback
+        Keeps the client_job link of rows that survive at the same position.
+        """
+        from django.db import transaction
+
+        with transaction.atomic():
+            previous_links = dict(
+                cls.objects.filter(candidate=candidate).values_list('position', 'client_job_id')
+            )
+            rows = cls.build_for_candidate(candidate, client_job=client_job)
+            for row in rows:
+                row.client_job_id = previous_links.get(row.position)
+            cls.objects.filter(candidate=candidate).delete()
+            return cls.objects.bulk_create(rows)
+
+    @classmethod
+    def sync_nfd_dates(cls, candidate, client_job=None):
+        """
+        Copy NFD dates from a re-parse of Candidate.feedback onto the rows at the
+        same positions (after the blob was edited in place, e.g. NFD expiry).
+        Rebuilds the rows when the parse no longer lines up with them.
+        """
+        rows = list(cls.objects.filter(candidate=candidate).order_by('position', 'id'))
+        parsed_entries = cls.build_for_candidate(candidate, client_job=client_job)
+        if [row.position for row in rows] != [entry.position for entry in parsed_entries]:
+            return len(cls.rebuild_for_candidate(candidate, client_job=client_job))
+        changed = []
+        for row, entry in zip(rows, parsed_entries):
+            if row.nfd_date != entry.nfd_date:
+                row.nfd_date = entry.nfd_date
+                changed.append(row)
+        cls.objects.bulk_update(changed, ['nfd_date'])
+        return len(changed)
+
+    @classmethod
+    def record(cls, client_job, raw_entry, entry_id=None):
+        """
+        Mirror an entry just written to Candidate.feedback by add_feedback
+        Appends a single row; the blob is only re-parsed for edits (entry_id),
+        when the candidate has no rows yet, or when the new entry does not parse.
+        Call inside the transaction that saved the blob: the candidate row is
+        locked so concurrent appends (two ClientJobs) take distinct positions.
+        """
+        candidate = client_job.candidate
+        Candidate.objects.select_for_update().filter(pk=candidate.pk).values_list('pk', flat=True).first()
+        last_position = (
+            cls.objects.filter(candidate=candidate)
+            .order_by('-position')
+            .values_list('position', flat=True)
+            .first()
+        )
+
+        if entry_id is not None or last_position is None:
+            rows = cls.rebuild_for_candidate(candidate, client_job=client_job)
+            if entry_id is None and rows:
+                # The entry just appended is the newest stored one
+                cls.objects.filter(candidate=candidate, position=rows[-1].position).update(client_job=client_job)
+            return rows
+
+        parsed = client_job._parse_feedback_entry(raw_entry.strip().rstrip(';'))
+        if not parsed:
+            # Let the full parse decide, so the rows still match the blob
+            return cls.rebuild_for_candidate(candidate, client_job=client_job)
+        row = cls.from_parsed(candidate, parsed, last_position + 1, client_job=client_job)
+        row.save()
+        return [row]
+
+    def to_entry_dict(self):
+        """Return the same dict shape as ClientJob._parse_feedback_entry()"""
+        entry_time = ''
+        if self.entry_time:
+            entry_time = timezone.localtime(self.entry_time).strftime(self.ENTRY_TIME_FORMAT)
+        return {
+            'feedback': self.feedback_text,
+            'nfd_date': self.nfd_date,
+            'nfd_status': _feedback_nfd_status(self.nfd_date) if self.nfd_date else '',
+            'ejd_date': self.ejd_date,
+            'ifd_date': self.ifd_date,
+            'interview_date': self.interview_date,
+            'remarks': self.remarks,
+            'executive_name': self.entry_by,
+            'profile_created_by': self.profile_created_by,
+            'call_status': self.call_status,
+            'entry_time': entry_time,
+        }
+
+
 # -----------------------------
 # Step 3 - Education Certificates
 # -----------------------------
@@ -2075,13 +2241,8 @@ class CandidateStatusHistory(models.Model):
         if not self.created_by:
             return None
         
-        try:
-            from empreg.models import Employee
-            employee = Employee.objects.get(employeeCode=self.created_by, del_state=0)
-            full_name = f"{employee.firstName} {employee.lastName}".strip()
-            return full_name if full_name else employee.firstName
-        except Exception:
-            return self.created_by
+        from empreg import directory as employee_directory
+        return employee_directory.display_name(self.created_by)
 
     
     # @classmethod
@@ -2307,6 +2468,169 @@ class CandidateStatusHistory(models.Model):
             print(f" Error in create_status_entry: {str(e)}")
             return None
 
+    @classmethod
+    def _normalize_status_event(cls, event):
+        """Coerce one bulk status event the same way create_status_entry does; raises ValueError"""
+        candidate_id = event.get('candidate_id')
+        remarks = (event.get('remarks') or '').strip()
+        created_by = event.get('created_by')
+        if not candidate_id or not remarks or not created_by:
+            raise ValueError('candidate_id, remarks and created_by are required')
+
+        change_date = event.get('change_date') or timezone.now().date()
+        if isinstance(change_date, str):
+            change_date = datetime.strptime(change_date[:10], "%Y-%m-%d").date()
+        elif isinstance(change_date, datetime):
+            change_date = change_date.date()
+
+        attend_flag = event.get('attend_flag')
+        if isinstance(attend_flag, str):
+            attend_flag = attend_flag.strip().lower() in ('1', 'true', 'yes')
+        else:
+            attend_flag = bool(attend_flag)
+
+        profile_submission = event.get('profile_submission')
+        if profile_submission is not None:
+            try:
+                profile_submission = 1 if int(profile_submission) == 1 else 0
+            except (TypeError, ValueError):
+                profile_submission = None
+
+        def optional_int(value):
+            return int(value) if value not in (None, '', 'null') else None
+
+        return {
+            'candidate_id': int(candidate_id),
+            'client_job_id': optional_int(event.get('client_job_id')),
+            'vendor_id': optional_int(event.get('vendor_id')),
+            'client_name': event.get('client_name'),
+            'remarks': remarks,
+            'profile_submission': profile_submission,
+            'attend_flag': attend_flag,
+            'change_date': change_date,
+            'created_by': created_by,
+            'extra_notes': event.get('extra_notes'),
+            'branch_id': optional_int(event.get('branch_id')),
+            'team_id': optional_int(event.get('team_id')),
+            'employee_id': event.get('employee_id') or created_by,
+        }
+
+    @classmethod
+    def bulk_create_status_entries(cls, events):
+        """
+        Set-based create_status_entry for a list of status events (dicts with the
+        same keys as create_status_entry's arguments).
+
+        The de-dup rules are resolved against one query over the existing rows
+        and against earlier events in the same batch:
+        - "Interested" at most once per candidate per day (later ones skipped)
+        - one attend_flag row per candidate/job/date (later ones demoted to attend_flag=False)
+        - an identical candidate/remarks/job/date row is reused, not duplicated
+        - profile_submission=1 only for the first (candidate, job, employee);
+          that job gets profile_submission=1 / profile_submission_date
+
+        Survivors are bulk_created and the affected ClientJobs bulk_updated in
+        one transaction. Returns {'created': [...], 'existing': [...], 'skipped': [...], 'errors': [...]}
+        where existing/skipped/errors carry the event index.
+        """
+        from django.db import transaction
+        from django.db.models import Q
+        from backend import shared_cache
+        from . import calendar_rollup
+        from . import report_facts
+
+        result = {'created': [], 'existing': [], 'skipped': [], 'errors': []}
+        normalized = []
+        for index, event in enumerate(events):
+            try:
+                normalized.append((index, cls._normalize_status_event(event)))
+            except (ValueError, TypeError) as e:
+                result['errors'].append({'index': index, 'error': str(e)})
+        if not normalized:
+            return result
+
+        candidate_ids = {event['candidate_id'] for _, event in normalized}
+        dates = {event['change_date'] for _, event in normalized}
+        existing_rows = cls.objects.filter(
+            candidate_id__in=candidate_ids, is_deleted=False
+        ).filter(
+            Q(change_date__in=dates) | Q(profile_submission=1)
+        ).values('id', 'candidate_id', 'client_job_id', 'remarks', 'change_date',
+                 'attend_flag', 'profile_submission', 'employee_id')
+
+        interested = set()
+        attendance = set()
+        same_status = {}
+        submissions = set()
+        for row in existing_rows:
+            remark_key = (row['remarks'] or '').strip().lower()
+            if row['change_date'] in dates:
+                if remark_key == 'interested':
+                    interested.add((row['candidate_id'], row['change_date']))
+                if row['attend_flag']:
+                    attendance.add((row['candidate_id'], row['client_job_id'], row['change_date']))
+                same_status.setdefault(
+                    (row['candidate_id'], remark_key, row['client_job_id'], row['change_date']), row['id']
+                )
+            if row['profile_submission'] == 1:
+                submissions.add((row['candidate_id'], row['client_job_id'], row['employee_id']))
+
+        to_create = []
+        job_submissions = {}
+        for index, event in normalized:
+            remark_key = event['remarks'].lower()
+            day_key = (event['candidate_id'], event['change_date'])
+            job_day_key = (event['candidate_id'], event['client_job_id'], event['change_date'])
+            status_key = (event['candidate_id'], remark_key, event['client_job_id'], event['change_date'])
+
+            if remark_key == 'interested' and day_key in interested:
+                result['skipped'].append({'index': index, 'reason': 'interested_exists'})
+                continue
+            if event['attend_flag'] and job_day_key in attendance:
+                event['attend_flag'] = False
+            if status_key in same_status:
+                result['existing'].append({'index': index, 'id': same_status[status_key]})
+                continue
+
+            if event['profile_submission'] == 1:
+                submission_key = (event['candidate_id'], event['client_job_id'], event['employee_id'])
+                if submission_key in submissions:
+                    event['profile_submission'] = 0
+                else:
+                    submissions.add(submission_key)
+                    if event['client_job_id']:
+                        job_submissions.setdefault(event['client_job_id'], event['change_date'])
+            if event['profile_submission'] is None:
+                event['profile_submission'] = 0
+
+            if remark_key == 'interested':
+                interested.add(day_key)
+            if event['attend_flag']:
+                attendance.add(job_day_key)
+            same_status[status_key] = None
+            to_create.append(cls(**event))
+
+        with transaction.atomic():
+            created = cls.objects.bulk_create(to_create, batch_size=500)
+            if job_submissions:
+                # One UPDATE ... CASE; ids that no longer exist simply match no row
+                now = timezone.now()
+                jobs = [
+                    ClientJob(id=job_id, profile_submission=1, profile_submission_date=day, updated_at=now)
+                    for job_id, day in job_submissions.items()
+                ]
+                with report_facts.track_jobs(ClientJob.objects.filter(id__in=list(job_submissions))):
+                    ClientJob.objects.bulk_update(jobs, ['profile_submission', 'profile_submission_date', 'updated_at'])
+            # bulk_create skips post_save, so feed the calendar rollup directly
+            calendar_keys = []
+            for entry in created:
+                calendar_keys.extend(calendar_rollup.status_history_keys(entry))
+            calendar_rollup.apply_deltas(calendar_rollup.diff_keys([], calendar_keys))
+            shared_cache.bump_on_commit('status_history', 'client_job')
+
+        result['created'] = created
+        return result
+
     @classmethod
     def get_candidate_timeline(cls, candidate_id):
         """
@@ -2358,3 +2682,258 @@ class CandidateStatusHistory(models.Model):
         return calendar_data
 
 
+
+
+# -----------------------------
+# Calendar Daily Counts (rollup)
+# -----------------------------
+class CalendarDailyCount(models.Model):
+    """
+    Pre-aggregated calendar event counts per day, event type and owner scope.
+    Kept up to date by ClientJob/CandidateStatusHistory signals (candidate/signals.py)
+    and rebuilt with `manage.py rebuild_calendar_counts`. Read by calendar_stats.
+    """
+    date = models.DateField()
+    event_type = models.CharField(max_length=10, help_text="IF, NFD, EDJ, PS, SEL, NR, INP, FP or ATND")
+    # 0 / '' stand for "not set" so the unique key below also covers unscoped rows
+    branch_id = models.IntegerField(default=0)
+    team_id = models.IntegerField(default=0)
+    employee_id = models.CharField(max_length=50, blank=True, default='')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'calendar_daily_counts'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'event_type', 'branch_id', 'team_id', 'employee_id'],
+                name='calendar_daily_counts_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['branch_id', 'date'], name='cal_counts_branch_date_idx'),
+            models.Index(fields=['team_id', 'date'], name='cal_counts_team_date_idx'),
+            models.Index(fields=['employee_id', 'date'], name='cal_counts_emp_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.event_type} x{self.count}"
+
+
+# -----------------------------
+# Derived Table Builds
+# -----------------------------
+class DerivedTableBuild(models.Model):
+    """
+    One row per derived table (calendar_daily_counts, ...) once its rebuild
+    command has covered the whole history. Signals only keep rows touched since
+    deploy, so readers aggregate the source tables until the row exists.
+    """
+    table = models.CharField(max_length=64, unique=True)
+    built_at = models.DateTimeField()
+    rows = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'derived_table_builds'
+
+    def __str__(self):
+        return f"{self.table} built {self.built_at:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def mark_built(cls, model, rows=0):
+        cls.objects.update_or_create(table=model._meta.db_table,
+                                     defaults={'built_at': timezone.now(), 'rows': rows})
+
+    @classmethod
+    def is_built(cls, model):
+        return cls.objects.filter(table=model._meta.db_table).exists()
+
+
+# -----------------------------
+# Client Job Report Facts
+# -----------------------------
+class ClientJobReportFact(models.Model):
+    """
+    Client job counts per day (updated_at date) and every dimension the
+    clientwise / employeewise reports filter or group on.
+    Kept up to date by ClientJob/Candidate signals (candidate/signals.py) and
+    rebuilt with `manage.py rebuild_report_facts`. See candidate/report_facts.py.
+    """
+    day = models.DateField()
+    client_name = models.CharField(max_length=100, blank=True, default='')
+    # assign_to when set, otherwise the candidate's executive_name
+    owner_code = models.CharField(max_length=100, blank=True, default='')
+    executive_name = models.CharField(max_length=100, blank=True, default='')
+    assigned_from = models.CharField(max_length=255, blank=True, default='')
+    # 0 stands for "not set", as in calendar_daily_counts
+    branch_id = models.IntegerField(default=0)
+    team_id = models.IntegerField(default=0)
+    remarks = models.CharField(max_length=255, blank=True, default='')
+    transfer_status = models.CharField(max_length=50, blank=True, default='')
+    profile_submission = models.IntegerField(default=0)
+    attend = models.BooleanField(default=False)
+    state = models.CharField(max_length=50, blank=True, default='')
+    city = models.CharField(max_length=50, blank=True, default='')
+    # SHA-1 of the dimensions: a unique index over all of them would exceed MySQL's key length
+    key_hash = models.CharField(max_length=40, unique=True)
+    jobs = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'client_job_report_facts'
+        indexes = [
+            models.Index(fields=['day'], name='report_facts_day_idx'),
+            models.Index(fields=['branch_id', 'day'], name='report_facts_branch_day_idx'),
+            models.Index(fields=['team_id', 'day'], name='report_facts_team_day_idx'),
+            models.Index(fields=['owner_code', 'day'], name='report_facts_owner_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.client_name} {self.owner_code} x{self.jobs}"
+
+
+# -----------------------------
+# Candidate Search Document
+# -----------------------------
+class CandidateSearchDocument(models.Model):
+    """
+    Denormalized search row per candidate (candidate fields + client job
+    client names/designations/remarks + executive display name).
+    Kept in sync by candidate/signals.py; rebuilt with `manage.py rebuild_candidate_search`.
+    On MySQL `body` carries a FULLTEXT index (migration 0066); see candidate/search.py.
+    """
+    candidate = models.OneToOneField(Candidate, on_delete=models.CASCADE, primary_key=True, related_name="search_document")
+    # Exact-match shortcuts
+    profile_number = models.CharField(max_length=50, blank=True, default='')
+    name = models.CharField(max_length=100, blank=True, default='', help_text="Lower-cased candidate name")
+    email = models.CharField(max_length=254, blank=True, default='', help_text="Lower-cased email")
+    phone1 = models.CharField(max_length=15, blank=True, default='', help_text="Last 10 digits of mobile1")
+    phone2 = models.CharField(max_length=15, blank=True, default='', help_text="Last 10 digits of mobile2")
+    # Everything searchable, lower-cased and space separated
+    body = models.TextField(blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'candidate_search_document'
+        indexes = [
+            models.Index(fields=['profile_number'], name='search_doc_profile_idx'),
+            models.Index(fields=['name'], name='search_doc_name_idx'),
+            models.Index(fields=['email'], name='search_doc_email_idx'),
+            models.Index(fields=['phone1'], name='search_doc_phone1_idx'),
+            models.Index(fields=['phone2'], name='search_doc_phone2_idx'),
+        ]
+
+    def __str__(self):
+        return f"Search document for candidate {self.candidate_id}"
+
+
+# -----------------------------
+# NFD Expiry Runs
+# -----------------------------
+class NfdExpiryRun(models.Model):
+    """
+    One row per run of the NFD expiry engine (candidate/nfd_expiry.py).
+    The latest finished row is the "last run" reported by the NFD status endpoints;
+    its threshold is the watermark for the next run's feedback pass.
+    """
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    ]
+
+    threshold = models.DateField(help_text="NFDs before this date were treated as expired")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    triggered_by = models.CharField(max_length=100, blank=True, default='')
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.IntegerField(default=0)
+    chunks = models.IntegerField(default=0)
+    jobs_unassigned = models.IntegerField(default=0)
+    history_rows = models.IntegerField(default=0)
+    feedback_updated = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    # 'active' while the run holds the engine; unique, so a second concurrent claim fails on insert
+    active_lock = models.CharField(max_length=20, null=True, blank=True, unique=True)
+
+    class Meta:
+        db_table = 'candidate_nfd_expiry_run'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['status', '-started_at'], name='nfd_run_status_started_idx'),
+        ]
+
+    def __str__(self):
+        return f"NFD expiry {self.threshold} ({self.status})"
+
+    def as_metrics(self):
+        return {
+            'run_id': self.id,
+            'status': self.status,
+            'threshold': str(self.threshold),
+            'triggered_by': self.triggered_by,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'chunks': self.chunks,
+            'jobs_unassigned': self.jobs_unassigned,
+            'history_rows': self.history_rows,
+            'feedback_updated': self.feedback_updated,
+            'error': self.error,
+        }
+
+
+class ResumeParseJob(models.Model):
+    """
+    One resume parse, run outside the request by candidate/resume_jobs.py.
+    Either an uploaded file (ResumeParseAPIView) or a candidate's resume_file;
+    for the latter the result is written back to the candidate on success.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    ]
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, null=True, blank=True,
+                                  related_name="resume_parse_jobs")
+    upload = models.FileField(upload_to='resume_parse_jobs/', null=True, blank=True)
+    original_name = models.CharField(max_length=255, blank=True, default='')
+    content_type = models.CharField(max_length=100, blank=True, default='')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    backend = models.CharField(max_length=20, blank=True, default='')
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_by = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'candidate_resume_parse_job'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['candidate', 'status'], name='resume_job_candidate_idx'),
+        ]
+
+    def __str__(self):
+        return f"Resume parse {self.job_id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in ('success', 'failed')
+
+    def as_status(self):
+        return {
+            'job_id': str(self.job_id),
+            'status': self.status,
+            'candidate_id': self.candidate_id,
+            'file_name': self.original_name,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'result': self.result if self.status == 'success' else None,
+            'error': self.error,
+        }
@@ -0,0 +1,187 @@
+"""
+NFD expiry engine.
+
+Runs once per day after the midnight threshold from get_nfd_expiry_threshold()
+(`manage.py expire_nfds`, or the optional celery-beat task in candidate/tasks.py)
+instead of sweeping inside request handlers:
+
+1. Unassign jobs whose next_follow_up_date is before the threshold
+   (assign_to -> NULL), in id-ordered chunks, writing one
+   JobAssignmentHistory row per job with bulk_create. Each chunk is locked
+   (select_for_update) while it is unassigned, so a job whose NFD was moved
+   or that was reassigned meanwhile is left alone.
+2. Mark the latest expired NFD in each affected candidate's feedback as
+   "(open profile)" (ClientJob._update_all_expired_feedback_nfds), only for
+   NFDs that expired since the previous successful run.
+
+Every run is recorded in NfdExpiryRun; last_run_metrics() is what the
+NFD status endpoints report. A run claims the engine by inserting its row
+with the unique active_lock set, so overlapping cron and celery-beat runs
+cannot both start.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from backend import shared_cache
+
+from . import report_facts
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+SYSTEM_ACTOR = 'System Auto-Update'
+# A "running" row older than this is treated as a crashed run and loses its claim
+STALE_RUN_AFTER = timedelta(hours=2)
+ACTIVE_LOCK = 'active'
+
+
+def get_threshold():
+    from candidate.views import get_nfd_expiry_threshold
+    return get_nfd_expiry_threshold()
+
+
+def expired_jobs(threshold=None):
+    """Assigned jobs whose NFD is before the threshold (what the next run will unassign)"""
+    from .models import ClientJob
+    threshold = threshold or get_threshold()
+    return ClientJob.objects.filter(
+        next_follow_up_date__isnull=False,
+        next_follow_up_date__lt=threshold,
+        assign_to__isnull=False,
+    )
+
+
+def last_run():
+    from .models import NfdExpiryRun
+    return NfdExpiryRun.objects.exclude(status='running').order_by('-started_at').first()
+
+
+def last_run_metrics():
+    run = last_run()
+    return run.as_metrics() if run else None
+
+
+def _claim(threshold, triggered_by):
+    """Insert the run row holding active_lock; None when another live run holds it"""
+    from .models import NfdExpiryRun
+
+    NfdExpiryRun.objects.filter(
+        active_lock=ACTIVE_LOCK, started_at__lt=timezone.now() - STALE_RUN_AFTER
+    ).update(active_lock=None)
+    try:
+        with transaction.atomic():
+            return NfdExpiryRun.objects.create(threshold=threshold, triggered_by=triggered_by, active_lock=ACTIVE_LOCK)
+    except IntegrityError:
+        return None
+
+
+def _unassign_expired(run, threshold, chunk_size):
+    from .models import ClientJob, JobAssignmentHistory
+
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # Locked until the chunk commits: the rows still match expired_jobs() when they are updated
+            batch = list(
+                expired_jobs(threshold)
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .select_for_update()
+                .values('id', 'candidate_id', 'assign_to', 'next_follow_up_date')[:chunk_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1]['id']
+
+            # Keep remarks and NFD date for frontend display
+            expiring = expired_jobs(threshold).filter(id__in=[row['id'] for row in batch])
+            with report_facts.track_jobs(expiring):
+                updated = expiring.update(assign_to=None)
+            # QuerySet.update sends no signals
+            shared_cache.bump_on_commit('client_job')
+
+            history = [
+                JobAssignmentHistory(
+                    client_job_id=row['id'],
+                    candidate_id=row['candidate_id'],
+                    previous_owner=row['assign_to'],
+                    new_owner=None,
+                    assigned_by=SYSTEM_ACTOR,
+                    reason='expired_nfd',
+                    notes=f"NFD {row['next_follow_up_date']} expired (threshold {threshold})",
+                    created_by=SYSTEM_ACTOR,
+                    updated_by=SYSTEM_ACTOR,
+                )
+                for row in batch
+            ]
+            JobAssignmentHistory.objects.bulk_create(history, batch_size=chunk_size)
+
+        run.chunks += 1
+        run.jobs_unassigned += updated
+        run.history_rows += len(history)
+
+
+def _mark_expired_feedback(run, threshold, since, chunk_size, now):
+    from .models import ClientJob
+
+    jobs = ClientJob.objects.filter(next_follow_up_date__isnull=False, next_follow_up_date__lt=threshold)
+    if since:
+        jobs = jobs.filter(next_follow_up_date__gte=since)
+    candidate_ids = list(jobs.order_by('candidate_id').values_list('candidate_id', flat=True).distinct())
+
+    for start in range(0, len(candidate_ids), chunk_size):
+        chunk_ids = candidate_ids[start:start + chunk_size]
+        seen = set()
+        chunk_jobs = (
+            ClientJob.objects.filter(candidate_id__in=chunk_ids)
+            .exclude(candidate__feedback__isnull=True)
+            .select_related('candidate')
+            .order_by('candidate_id', '-updated_at')
+        )
+        for job in chunk_jobs:
+            if job.candidate_id in seen:
+                continue
+            seen.add(job.candidate_id)
+            try:
+                if job._update_all_expired_feedback_nfds(now):
+                    run.feedback_updated += 1
+            except Exception as e:
+                logger.warning(f"NFD expiry: feedback update failed for candidate {job.candidate_id}: {e}")
+        run.chunks += 1
+
+
+def run(chunk_size=DEFAULT_CHUNK_SIZE, triggered_by='command', skip_feedback=False):
+    """
+    Execute one expiry run. Returns the NfdExpiryRun row, or None when another
+    run is already in progress.
+    """
+    from .models import NfdExpiryRun
+
+    chunk_size = max(1, chunk_size)
+    threshold = get_threshold()
+    previous = NfdExpiryRun.objects.filter(status='success').order_by('-started_at').first()
+    since = previous.threshold if previous else None
+
+    expiry_run = _claim(threshold, triggered_by)
+    if expiry_run is None:
+        logger.info("NFD expiry: another run is in progress, skipping")
+        return None
+    started = time.monotonic()
+    try:
+        _unassign_expired(expiry_run, threshold, chunk_size)
+        if not skip_feedback:
+            _mark_expired_feedback(expiry_run, threshold, since, chunk_size, timezone.now())
+        expiry_run.status = 'success'
+    except Exception as e:
+        logger.exception(f"NFD expiry run {expiry_run.id} failed: {e}")
+        expiry_run.status = 'failed'
+        expiry_run.error = str(e)
+    expiry_run.finished_at = timezone.now()
+    expiry_run.duration_ms = int((time.monotonic() - started) * 1000)
+    expiry_run.active_lock = None
+    expiry_run.save()
+    return expiry_run
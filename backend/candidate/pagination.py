@@ -0,0 +1,220 @@
+"""
+Pagination for candidate / client-job / revenue lists.
+
+CandidatePagination and RevenuePagination stay page-number based by default.
+Sending `?pagination=cursor` (or a `cursor` from a previous response) switches
+to keyset pagination on (<timestamp>, id): no COUNT(*) and no OFFSET, so deep
+pages cost the same as the first one.
+
+Keyset response:
+    {
+        "next": <url|null>, "previous": <url|null>,
+        "next_cursor": <str|null>, "previous_cursor": <str|null>,
+        "results": [...],
+        "estimated_count": <int>,       # only with ?include_count=true
+        "count_is_exact": <bool>
+    }
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def wants_cursor(request):
+    """True when the client opted into keyset pagination"""
+    params = request.query_params
+    return params.get('pagination', '').lower() == 'cursor' or bool(params.get('cursor'))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination ordered by `-<ordering_field>, -id`.
+
+    The cursor is an opaque base64 token holding the boundary row's
+    (timestamp, id) and the direction. The ordering column must be non-null
+    and indexed (created_at / updated_at are).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'include_count'
+    # Upper bound for ?include_count=true; larger sets report the cap with count_is_exact=False
+    count_cap = 10000
+
+    def __init__(self, ordering_field='created_at', page_size=50, max_page_size=100):
+        self.ordering_field = ordering_field
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+    # ---------------------------------
+    # Cursor encoding
+    # ---------------------------------
+    def encode_cursor(self, value, pk, reverse=False):
+        payload = {'v': value.isoformat() if isinstance(value, datetime) else value, 'i': pk, 'r': int(reverse)}
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            value = payload['v']
+            if isinstance(value, str):
+                value = parse_datetime(value) or value
+            return value, int(payload['i']), bool(payload.get('r'))
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({'cursor': 'Invalid cursor'})
+
+    # ---------------------------------
+    # Paging
+    # ---------------------------------
+    def get_page_size(self, request):
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                size = int(value)
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (TypeError, ValueError):
+                pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        field = self.ordering_field
+        page_size = self.get_page_size(request)
+
+        # The total covers the whole filtered list, not what is left after the cursor
+        base_queryset = queryset
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        if cursor:
+            value, pk, reverse = self.decode_cursor(cursor)
+            if reverse:
+                # Rows "above" the boundary, walked upwards then flipped back
+                queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+            else:
+                queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+
+        ordering = (field, 'id') if reverse else (f'-{field}', '-id')
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page_size_used = page_size
+        self.has_next = has_more if not reverse else True
+        self.has_previous = bool(cursor) and (has_more if reverse else True)
+        self.first_row = rows[0] if rows else None
+        self.last_row = rows[-1] if rows else None
+
+        self.estimated_count = None
+        self.count_is_exact = None
+        if request.query_params.get(self.count_query_param, '').lower() == 'true':
+            self.estimated_count, self.count_is_exact = self.estimate_count(base_queryset)
+        return rows
+
+    def estimate_count(self, queryset):
+        """Bounded count: exact below count_cap, otherwise the cap"""
+        counted = queryset.order_by()[:self.count_cap + 1].count()
+        if counted > self.count_cap:
+            return self.count_cap, False
+        return counted, True
+
+    # ---------------------------------
+    # Response
+    # ---------------------------------
+    def get_next_cursor(self):
+        if not self.has_next or self.last_row is None:
+            return None
+        return self.encode_cursor(getattr(self.last_row, self.ordering_field), self.last_row.pk)
+
+    def get_previous_cursor(self):
+        if not self.has_previous or self.first_row is None:
+            return None
+        return self.encode_cursor(getattr(self.first_row, self.ordering_field), self.first_row.pk, reverse=True)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        url = replace_query_param(url, 'pagination', 'cursor')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_data(self, data):
+        next_cursor = self.get_next_cursor()
+        previous_cursor = self.get_previous_cursor()
+        payload = {
+            'next': self._link(next_cursor),
+            'previous': self._link(previous_cursor),
+            'next_cursor': next_cursor,
+            'previous_cursor': previous_cursor,
+            'page_size': self.page_size_used,
+            'results': data,
+        }
+        if self.estimated_count is not None:
+            payload['estimated_count'] = self.estimated_count
+            payload['count_is_exact'] = self.count_is_exact
+        return payload
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class OptInKeysetMixin:
+    """
+    Page-number paginator that hands over to KeysetPagination when the client
+    asks for it (see wants_cursor)
+    """
+    keyset_ordering_field = 'created_at'
+    keyset_page_size = None
+    keyset_max_page_size = None
+
+    def get_keyset_paginator(self):
+        return KeysetPagination(
+            ordering_field=self.keyset_ordering_field,
+            page_size=self.keyset_page_size or self.page_size,
+            max_page_size=self.keyset_max_page_size or self.max_page_size,
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self._keyset = None
+        if wants_cursor(request):
+            self._keyset = self.get_keyset_paginator()
+            return self._keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if getattr(self, '_keyset', None) is not None:
+            return self._keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class CandidatePagination(OptInKeysetMixin, PageNumberPagination):
+    page_size = 50  # Limit to 50 candidates per page
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class RevenuePagination(OptInKeysetMixin, PageNumberPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    # Set by a view that already counted the filtered rows; skips the paginator's COUNT(*)
+    known_count = None
+
+    def django_paginator_class(self, object_list, per_page, *args, **kwargs):
+        paginator = Paginator(object_list, per_page, *args, **kwargs)
+        if self.known_count is not None:
+            # Paginator.count is a cached_property; presetting it avoids the query
+            paginator.count = self.known_count
+        return paginator
@@ -0,0 +1,165 @@
+"""
+Client job report facts (client_job_report_facts).
+
+clientwise_report and employeewise_report used to group candidate_clientjob
+(joined to candidate) over updated_at__date on every request, which cannot
+use the updated_at index. The same counts are kept here, one row per
+combination of:
+
+    day (updated_at date), client_name, owner_code, executive_name,
+    assigned_from, branch_id, team_id, remarks, transfer_status,
+    profile_submission, attend, candidate state, candidate city
+
+with `jobs` = number of client jobs in it. owner_code is assign_to when set,
+otherwise the candidate's executive_name (the reports' owner rule).
+
+- ClientJob / Candidate signals (candidate/signals.py) apply +1/-1 deltas
+- ClientJob QuerySet.update / bulk_update calls run inside track_jobs()
+- `manage.py rebuild_report_facts` recomputes a date range from scratch
+- migration 0071 filled the table from every job that existed before it
+"""
+import hashlib
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+from .calendar_rollup import _as_date, diff_keys
+
+DIMENSIONS = (
+    "day", "client_name", "owner_code", "executive_name", "assigned_from", "branch_id", "team_id",
+    "remarks", "transfer_status", "profile_submission", "attend", "state", "city",
+)
+
+# ClientJob values a fact key is built from
+JOB_FIELDS = (
+    "updated_at", "client_name", "assign_to", "assigned_from", "branch_id", "team_id",
+    "remarks", "transfer_status", "profile_submission", "attend",
+)
+CANDIDATE_FIELDS = ("executive_name", "state", "city")
+
+
+def job_key(job, candidate):
+    """
+    Fact key for one client job. `job` and `candidate` are dicts (or objects)
+    holding JOB_FIELDS / CANDIDATE_FIELDS. None when updated_at is missing.
+    """
+    job = job if isinstance(job, dict) else {name: getattr(job, name, None) for name in JOB_FIELDS}
+    candidate = candidate if isinstance(candidate, dict) else {name: getattr(candidate, name, None) for name in CANDIDATE_FIELDS}
+    day = _as_date(job["updated_at"])
+    if not day:
+        return None
+    executive_name = candidate["executive_name"] or ""
+    return (
+        day,
+        job["client_name"] or "",
+        job["assign_to"] or executive_name,
+        executive_name,
+        job["assigned_from"] or "",
+        job["branch_id"] or 0,
+        job["team_id"] or 0,
+        job["remarks"] or "",
+        job["transfer_status"] or "",
+        job["profile_submission"] or 0,
+        bool(job["attend"]),
+        candidate["state"] or "",
+        candidate["city"] or "",
+    )
+
+
+def key_hash(key):
+    raw = "\x1f".join(str(part) for part in key)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _rows(queryset):
+    """(job values, candidate values) for each ClientJob in the queryset, one query"""
+    candidate_fields = [f"candidate__{name}" for name in CANDIDATE_FIELDS]
+    for row in queryset.values("id", "candidate_id", *JOB_FIELDS, *candidate_fields):
+        yield row, {name: row[f"candidate__{name}"] for name in CANDIDATE_FIELDS}
+
+
+def keys_for_jobs(queryset):
+    """Current fact keys of the ClientJobs in the queryset"""
+    keys = []
+    for job, candidate in _rows(queryset):
+        key = job_key(job, candidate)
+        if key:
+            keys.append(key)
+    return keys
+
+
+def apply_deltas(deltas):
+    """Apply {key: delta} to client_job_report_facts"""
+    from .models import ClientJobReportFact
+
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        digest = key_hash(key)
+        updated = ClientJobReportFact.objects.filter(key_hash=digest).update(jobs=F("jobs") + delta)
+        if updated or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                ClientJobReportFact.objects.create(key_hash=digest, jobs=delta, **dict(zip(DIMENSIONS, key)))
+        except IntegrityError:
+            # Created concurrently by another request
+            ClientJobReportFact.objects.filter(key_hash=digest).update(jobs=F("jobs") + delta)
+
+
+@contextmanager
+def track_jobs(queryset):
+    """
+    Keep the facts in step with a bulk write to the ClientJobs in `queryset`
+    (QuerySet.update / bulk_update send no signals):
+
+        with report_facts.track_jobs(ClientJob.objects.filter(id__in=ids)):
+            ClientJob.objects.filter(id__in=ids).update(assign_to=None)
+    """
+    ids, before = [], []
+    for job, candidate in _rows(queryset.all()):
+        ids.append(job["id"])
+        before.append(job_key(job, candidate))
+    yield
+    before = [key for key in before if key]
+    after = keys_for_jobs(queryset.model.objects.filter(id__in=ids))
+    apply_deltas(diff_keys(before, after))
+
+
+def aggregate_counts(start_date, end_date):
+    """{key: jobs} for [start_date, end_date] straight from candidate_clientjob"""
+    from .models import ClientJob
+
+    counts = defaultdict(int)
+    jobs = ClientJob.objects.filter(updated_at__date__range=[start_date, end_date])
+    candidate_fields = [f"candidate__{name}" for name in CANDIDATE_FIELDS]
+    rows = (
+        jobs.annotate(day=TruncDate("updated_at"))
+        .values("day", *JOB_FIELDS[1:], *candidate_fields)
+        .annotate(count=Count("id"))
+    )
+    for row in rows:
+        row["updated_at"] = row["day"]
+        key = job_key(row, {name: row[f"candidate__{name}"] for name in CANDIDATE_FIELDS})
+        if key:
+            counts[key] += row["count"]
+    return counts
+
+
+def rebuild(start_date, end_date):
+    """Replace the fact rows for [start_date, end_date]; returns number of rows written"""
+    from .models import ClientJobReportFact
+
+    counts = aggregate_counts(start_date, end_date)
+    rows = [
+        ClientJobReportFact(key_hash=key_hash(key), jobs=count, **dict(zip(DIMENSIONS, key)))
+        for key, count in counts.items()
+        if count
+    ]
+    with transaction.atomic():
+        ClientJobReportFact.objects.filter(day__range=[start_date, end_date]).delete()
+        ClientJobReportFact.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
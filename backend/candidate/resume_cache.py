@@ -0,0 +1,220 @@
+"""
+Content-addressed cache for resume parse results and DOCX -> PDF conversions.
+
+Entries live under MEDIA_ROOT/resume_cache/<first two hex>/<sha256 of the file bytes>/:
+
+    parse-v<N>.json successful parse_resume() result, N = PARSER_VERSION
+    converted.pdf   convert_docx_to_pdf() output
+
+Re-uploads of the same file (another executive, a cloned candidate) hit the
+entry instead of re-running the parser / LibreOffice. The cache is plain
+files (no database) because parse_resume also runs in the resume parse
+process pool (candidate/resume_jobs.py).
+
+Bump PARSER_VERSION whenever the parser chain's output changes (new fields,
+fixed extraction): results stored by older versions are then ignored and
+replaced on the next parse.
+
+An entry directory's mtime is its last use. Once the cache grows past
+RESUME_CACHE_MAX_BYTES the least recently used entries are removed: by
+`manage.py prune_resume_cache` (cron), and by a process once it has written
+another tenth of the limit since its last scan, so a put does not walk the
+whole tree. RESUME_CACHE_ENABLED = False turns the cache off.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRNAME = 'resume_cache'
+PARSER_VERSION = 1
+PARSE_FILENAME = f'parse-v{PARSER_VERSION}.json'
+PDF_FILENAME = 'converted.pdf'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Evict down to this fraction of the limit so every put does not evict again
+EVICT_TO = 0.9
+
+# Bytes this process has written since it last scanned the cache
+_written_since_scan = 0
+
+
+def enabled():
+    return getattr(settings, 'RESUME_CACHE_ENABLED', True)
+
+
+def cache_root():
+    return os.path.join(settings.MEDIA_ROOT, CACHE_DIRNAME)
+
+
+def max_bytes():
+    return getattr(settings, 'RESUME_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+
+# -----------------------------
+# Hashing
+# -----------------------------
+def content_hash(source):
+    """SHA-256 of a file path, uploaded file or bytes"""
+    digest = hashlib.sha256()
+    if isinstance(source, (bytes, bytearray)):
+        digest.update(source)
+    elif isinstance(source, str):
+        with open(source, 'rb') as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b''):
+                digest.update(block)
+    else:
+        # Django UploadedFile; leave it rewound for whoever reads it next
+        source.seek(0)
+        for chunk in source.chunks():
+            digest.update(chunk)
+        source.seek(0)
+    return digest.hexdigest()
+
+
+def _entry_dir(key):
+    return os.path.join(cache_root(), key[:2], key)
+
+
+def _touch(path):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def _write_atomic(path, write):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            write(handle)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# -----------------------------
+# Parse results
+# -----------------------------
+def get_parse(key):
+    """Cached parse result for a content hash, or None"""
+    if not enabled() or not key:
+        return None
+    entry = _entry_dir(key)
+    path = os.path.join(entry, PARSE_FILENAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            result = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    _touch(entry)
+    return result
+
+
+def put_parse(key, result):
+    """Store a successful parse result (failures are not cached)"""
+    if not enabled() or not key or not result or not result.get('success'):
+        return
+    try:
+        payload = json.dumps(result, default=str).encode('utf-8')
+        entry = _entry_dir(key)
+        _write_atomic(os.path.join(entry, PARSE_FILENAME), lambda handle: handle.write(payload))
+        for name in os.listdir(entry):
+            if name.startswith('parse') and name != PARSE_FILENAME:
+                os.remove(os.path.join(entry, name))  # an older parser version's result
+        _note_write(len(payload))
+    except Exception as e:
+        logger.warning(f"Resume cache: could not store parse result {key}: {e}")
+
+
+# -----------------------------
+# Converted PDFs
+# -----------------------------
+def get_pdf(key):
+    """Path of the cached PDF conversion for a content hash, or None"""
+    if not enabled() or not key:
+        return None
+    entry = _entry_dir(key)
+    path = os.path.join(entry, PDF_FILENAME)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    _touch(entry)
+    return path
+
+
+def put_pdf(key, pdf_path):
+    """Copy a converted PDF into the cache; returns the cached path (or pdf_path if caching is off)"""
+    if not enabled() or not key or not pdf_path or not os.path.exists(pdf_path):
+        return pdf_path
+    try:
+        target = os.path.join(_entry_dir(key), PDF_FILENAME)
+
+        def write(handle):
+            with open(pdf_path, 'rb') as source:
+                shutil.copyfileobj(source, handle)
+
+        _write_atomic(target, write)
+        _note_write(os.path.getsize(target))
+        return target if os.path.exists(target) else pdf_path
+    except Exception as e:
+        logger.warning(f"Resume cache: could not store PDF {key}: {e}")
+        return pdf_path
+
+
+# -----------------------------
+# Eviction
+# -----------------------------
+def _entries():
+    """[(last_used, size_bytes, path)] for every cache entry"""
+    entries = []
+    root = cache_root()
+    if not os.path.isdir(root):
+        return entries
+    for shard in os.scandir(root):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if not entry.is_dir():
+                continue
+            size = 0
+            for item in os.scandir(entry.path):
+                if item.is_file():
+                    size += item.stat().st_size
+            entries.append((entry.stat().st_mtime, size, entry.path))
+    return entries
+
+
+def _note_write(size):
+    """Count a put; scan and evict once this process has written (1 - EVICT_TO) of the limit"""
+    global _written_since_scan
+    _written_since_scan += size
+    if _written_since_scan >= max_bytes() * (1 - EVICT_TO):
+        evict()
+
+
+def evict(limit=None):
+    """Remove least recently used entries while the cache is over its size limit; returns bytes freed"""
+    global _written_since_scan
+    _written_since_scan = 0
+    limit = max_bytes() if limit is None else limit
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    if total <= limit:
+        return 0
+    freed = 0
+    target = int(limit * EVICT_TO)
+    for _, size, path in sorted(entries):
+        if total - freed <= target:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        freed += size
+    return freed
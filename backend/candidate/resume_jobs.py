@@ -0,0 +1,386 @@
+"""
+Resume parse jobs.
+
+Parsing (alternative_parse_resume -> simple_text_extraction -> pyresparser,
+see utils.parse_resume) can take seconds per file, so requests only create a
+ResumeParseJob and hand it to a worker:
+
+- "celery":  candidate.tasks.parse_resume_job (needs CELERY_BROKER_URL)
+- "process": a local ProcessPoolExecutor; the child only parses the file,
+             the job row / candidate are written back in this process
+- "inline":  parse in the calling thread (tests, management commands)
+
+parse_upload() is the synchronous form: the upload is parsed from memory and
+only the job row is written.
+
+RESUME_PARSE_BACKEND picks one; the default is celery when a broker is
+configured, otherwise the process pool. RESUME_PARSE_WORKERS sizes the pool.
+
+Files already in the content cache (resume_cache.py) finish immediately
+without being stored or queued.
+
+A "process" job only gets its result stored by the web worker that submitted
+it, so a recycled or killed worker leaves it "running" for good.
+requeue_stale() (`manage.py requeue_resume_jobs`, or the celery beat entry)
+puts jobs queued or running for more than RESUME_PARSE_STALE_MINUTES
+(default 30, keep it above the slowest parse) back on a backend.
+
+Status and result: GET /api/parse-resume/<job_id>/
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import resume_cache
+from . import resume_nlp
+
+logger = logging.getLogger(__name__)
+
+WORD_CONTENT_TYPES = (
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+)
+# Same cap _process_resume used for Candidate.resume_text
+MAX_RESUME_TEXT = 50000
+DEFAULT_STALE_MINUTES = 30
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# -----------------------------
+# Parsing (safe to run in a child process)
+# -----------------------------
+def parse_file(path, content_type=''):
+    """
+    Run the parser chain on a file on disk, or on an uploaded file in memory;
+    returns the parse_resume() result dict
+    """
+    from .alternative_parser import alternative_parse_resume
+    from .utils import parse_resume
+
+    if content_type in WORD_CONTENT_TYPES:
+        # Word documents go straight to the alternative parser (no PDF conversion)
+        key = resume_cache.content_hash(path) if resume_cache.enabled() else None
+        cached = resume_cache.get_parse(key)
+        if cached is not None:
+            cached['cache_hit'] = True
+            return cached
+        result = alternative_parse_resume(path)
+        resume_cache.put_parse(key, result)
+        return result
+    # parse_resume consults the content cache itself
+    return parse_resume(path)
+
+
+def _parse_in_worker(path, content_type):
+    try:
+        return parse_file(path, content_type)
+    except Exception as e:
+        return {"success": False, "error": f"Error during resume parsing: {e}"}
+
+
+# -----------------------------
+# Job lifecycle
+# -----------------------------
+def get_backend():
+    backend = getattr(settings, 'RESUME_PARSE_BACKEND', None)
+    if backend:
+        return backend
+    from . import tasks
+    if tasks.shared_task is not None and getattr(settings, 'CELERY_BROKER_URL', None):
+        return 'celery'
+    return 'process'
+
+
+def _source_path(job):
+    if job.upload:
+        return job.upload.path
+    if job.candidate_id and job.candidate.resume_file:
+        return job.candidate.resume_file.path
+    return None
+
+
+def apply_to_candidate(candidate, result):
+    """Store a successful parse result on the candidate (resume_parsed_data / resume_text)"""
+    if not result or not result.get('success'):
+        return False
+    data = result.get('data', {}) or {}
+    candidate.resume_parsed_data = data
+    raw_text = data.get('raw_text', '') or ''
+    if raw_text:
+        cleaned = raw_text.encode('utf-8', errors='ignore').decode('utf-8')
+        candidate.resume_text = cleaned[:MAX_RESUME_TEXT]
+    candidate.save(update_fields=['resume_parsed_data', 'resume_text'])
+    return True
+
+
+def _start(job_id):
+    """Mark a queued job running; returns the job, or None if it was already picked up"""
+    from .models import ResumeParseJob
+
+    claimed = ResumeParseJob.objects.filter(job_id=job_id, status='queued').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    return ResumeParseJob.objects.select_related('candidate').get(job_id=job_id)
+
+
+def _finish(job, result, started):
+    from .models import Candidate
+
+    if result and result.get('success'):
+        job.status = 'success'
+        job.result = result
+        if job.candidate_id:
+            candidate = Candidate.objects.filter(pk=job.candidate_id).first()
+            if candidate is not None:
+                apply_to_candidate(candidate, result)
+    else:
+        job.status = 'failed'
+        job.error = (result or {}).get('error') or 'Failed to parse resume'
+    job.finished_at = timezone.now()
+    job.duration_ms = int((time.monotonic() - started) * 1000)
+
+    # The uploaded copy is only needed while parsing; the result stays on the job
+    if job.upload:
+        try:
+            job.upload.delete(save=False)
+        except Exception as e:
+            logger.warning(f"Resume parse {job.job_id}: could not remove upload: {e}")
+    job.save(update_fields=['status', 'result', 'error', 'finished_at', 'duration_ms', 'upload'])
+    return job
+
+
+def run_job(job_id):
+    """Parse one queued job in this process (celery task / inline backend)"""
+    job = _start(job_id)
+    if job is None:
+        return None
+    started = time.monotonic()
+    path = _source_path(job)
+    if not path or not os.path.exists(path):
+        return _finish(job, {"success": False, "error": "Resume file not found"}, started)
+    try:
+        result = parse_file(path, job.content_type)
+    except Exception as e:
+        logger.exception(f"Resume parse {job_id} failed: {e}")
+        result = {"success": False, "error": f"Error during resume parsing: {e}"}
+    return _finish(job, result, started)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'RESUME_PARSE_WORKERS', 2)
+            # spawn: the web process may already run threads, which fork does not survive
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=resume_nlp.init_worker)
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _submit_to_pool(job_id):
+    job = _start(job_id)
+    if job is None:
+        return
+    started = time.monotonic()
+    path = _source_path(job)
+    if not path or not os.path.exists(path):
+        _finish(job, {"success": False, "error": "Resume file not found"}, started)
+        return
+
+    def done(future):
+        # Runs on the executor's management thread
+        try:
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "error": f"Resume parser worker failed: {e}"}
+            _finish(job, result, started)
+        except Exception as e:
+            logger.exception(f"Resume parse {job_id}: could not store result: {e}")
+        finally:
+            close_old_connections()
+
+    try:
+        future = _get_pool().submit(_parse_in_worker, path, job.content_type)
+    except BrokenProcessPool:
+        # A worker died earlier; replace the pool once
+        _reset_pool()
+        future = _get_pool().submit(_parse_in_worker, path, job.content_type)
+    future.add_done_callback(done)
+
+
+def _cached_result(source):
+    """Cached parse result for an uploaded file / path, or None"""
+    if not resume_cache.enabled():
+        return None
+    try:
+        cached = resume_cache.get_parse(resume_cache.content_hash(source))
+    except Exception as e:
+        logger.warning(f"Resume cache lookup failed: {e}")
+        return None
+    if cached is not None:
+        cached['cache_hit'] = True
+    return cached
+
+
+def _complete_from_cache(job, result):
+    job.status = 'success'
+    job.backend = 'cache'
+    job.result = result
+    job.started_at = job.finished_at = timezone.now()
+    return job
+
+
+def dispatch(job, backend=None):
+    """Hand a saved job to a backend (default: the configured one) once the surrounding transaction commits"""
+    if job.is_finished:
+        # Served from the content cache
+        return job
+    backend = backend or get_backend()
+    job_id = job.job_id
+    if job.backend != backend:
+        job.backend = backend
+        job.save(update_fields=['backend'])
+
+    def send():
+        if backend == 'celery':
+            from .tasks import parse_resume_job
+            parse_resume_job.delay(str(job_id))
+        elif backend == 'process':
+            _submit_to_pool(job_id)
+        else:
+            run_job(job_id)
+
+    transaction.on_commit(send)
+    return job
+
+
+def stale_minutes():
+    return getattr(settings, 'RESUME_PARSE_STALE_MINUTES', DEFAULT_STALE_MINUTES)
+
+
+def requeue_stale(minutes=None, backend=None):
+    """
+    Put jobs left "running" (their worker went away before storing the result)
+    or "queued" for more than `minutes` back to queued and dispatch them again.
+    A job that is still being parsed would simply be parsed twice: _start()
+    only lets one run claim it, the later _finish() wins. Returns the job ids.
+    """
+    from .models import ResumeParseJob
+
+    cutoff = timezone.now() - timedelta(minutes=minutes or stale_minutes())
+    stale = ResumeParseJob.objects.filter(
+        Q(status='running', started_at__lt=cutoff) | Q(status='queued', created_at__lt=cutoff)
+    )
+    job_ids = list(stale.values_list('job_id', flat=True))
+    if not job_ids:
+        return []
+    ResumeParseJob.objects.filter(job_id__in=job_ids, status='running').update(status='queued', started_at=None)
+    for job in ResumeParseJob.objects.filter(job_id__in=job_ids, status='queued'):
+        logger.warning(f"Resume parse {job.job_id}: no result after {minutes or stale_minutes()} minutes, requeued")
+        dispatch(job, backend=backend)
+    return job_ids
+
+
+def create_upload_job(uploaded_file, created_by=None, backend=''):
+    """
+    Store an uploaded file on a new queued job (not tied to a candidate).
+    A file already in the content cache gives a finished job and is not stored.
+    """
+    from .models import ResumeParseJob
+
+    job = ResumeParseJob(
+        original_name=uploaded_file.name[:255],
+        content_type=getattr(uploaded_file, 'content_type', '') or '',
+        created_by=created_by,
+        backend=backend,
+    )
+    cached = _cached_result(uploaded_file)
+    if cached is not None:
+        _complete_from_cache(job, cached)
+    else:
+        job.upload.save(os.path.basename(uploaded_file.name), uploaded_file, save=False)
+    job.save()
+    return job
+
+
+def parse_upload(uploaded_file, created_by=None):
+    """
+    Parse an upload now, in this thread, straight from memory; the file is not
+    stored. The run is recorded as a finished "inline" job.
+    """
+    from .models import ResumeParseJob
+
+    job = ResumeParseJob(
+        original_name=uploaded_file.name[:255],
+        content_type=getattr(uploaded_file, 'content_type', '') or '',
+        created_by=created_by,
+        backend='inline',
+    )
+    cached = _cached_result(uploaded_file)
+    if cached is not None:
+        _complete_from_cache(job, cached)
+        job.save()
+        return job
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save()
+    started = time.monotonic()
+    try:
+        result = parse_file(uploaded_file, job.content_type)
+    except Exception as e:
+        logger.exception(f"Resume parse {job.job_id} failed: {e}")
+        result = {"success": False, "error": f"Error during resume parsing: {e}"}
+    return _finish(job, result, started)
+
+
+def enqueue_upload(uploaded_file, created_by=None):
+    """Queue a parse of an uploaded file"""
+    return dispatch(create_upload_job(uploaded_file, created_by=created_by))
+
+
+def enqueue_for_candidate(candidate, created_by=None):
+    """
+    Queue a parse of candidate.resume_file; the result is written to the
+    candidate when the job succeeds. A job already queued for the candidate is reused.
+    """
+    from .models import ResumeParseJob
+
+    if not getattr(candidate, 'resume_file', None):
+        return None
+    pending = ResumeParseJob.objects.filter(candidate=candidate, status='queued').first()
+    if pending is not None:
+        return pending
+    job = ResumeParseJob(
+        candidate=candidate,
+        original_name=os.path.basename(candidate.resume_file.name)[:255],
+        created_by=created_by,
+    )
+    cached = _cached_result(candidate.resume_file.path) if os.path.exists(candidate.resume_file.path) else None
+    if cached is not None:
+        apply_to_candidate(candidate, cached)
+        _complete_from_cache(job, cached)
+    job.save()
+    return dispatch(job)
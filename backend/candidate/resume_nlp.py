@@ -0,0 +1,243 @@
+"""
+Per-process spaCy pipeline for resume parsing.
+
+spacy.load() costs hundreds of milliseconds and tens of MB, so every process
+loads the model once through ResumeNLPService and all parses reuse it:
+
+- gunicorn: post_fork in backend/gunicorn.conf.py calls init_worker()
+- resume parse pool, ingest_resumes pool, celery workers: warm_up() when the worker starts
+- RESUME_NLP_PRELOAD = True: warm_up() when wsgi.py loads (single-process servers)
+- anywhere else: the first parse loads it
+
+RESUME_NLP_MODELS lists the models to try (default en_core_web_sm, md, lg);
+without any of them (or without spaCy) NER is skipped and the regex parser
+works alone. RESUME_NLP_ENABLED = False turns NER off.
+
+    get_service().health()   # status, model, load time, parse counts, memory
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS = ('en_core_web_sm', 'en_core_web_md', 'en_core_web_lg')
+# Contact details, name and location sit at the top; NER over the whole CV only adds cost
+DEFAULT_MAX_CHARS = 20000
+# PERSON entities this far into the text count as the candidate's name
+NAME_WINDOW = 500
+
+_service = None
+_service_lock = threading.Lock()
+_pyresparser_config_checked = False
+
+
+def _setting(name, default):
+    # Raises ImproperlyConfigured before Django is set up, rather than silently using the default
+    return getattr(settings, name, default)
+
+
+def _rss_bytes():
+    """Current resident set size of this process (0 where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ResumeNLPService:
+    """One loaded spaCy pipeline plus usage counters for this process"""
+
+    def __init__(self, model_names=None):
+        self.model_names = tuple(model_names or _setting('RESUME_NLP_MODELS', DEFAULT_MODELS))
+        self.nlp = None
+        self.model = ''
+        # not_loaded -> loaded / blank (no model installed) / unavailable (no spaCy) / disabled / failed
+        self.status = 'not_loaded'
+        self.error = ''
+        self.load_ms = 0
+        # time.time(), not timezone.now(): no settings needed, whatever hook loads the model
+        self.loaded_at = None
+        self.model_rss_bytes = 0
+        self.parses = 0
+        self.parse_ms = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    @property
+    def has_ner(self):
+        return self.nlp is not None and 'ner' in self.nlp.pipe_names
+
+    def load(self):
+        """Load the first installed model; later calls are no-ops"""
+        if self.status != 'not_loaded':
+            return self
+        with self._lock:
+            if self.status != 'not_loaded':
+                return self
+            if not _setting('RESUME_NLP_ENABLED', True):
+                self.status = 'disabled'
+                return self
+            try:
+                import spacy
+            except ImportError as e:
+                self.status, self.error = 'unavailable', str(e)
+                return self
+
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            try:
+                for name in self.model_names:
+                    try:
+                        self.nlp = spacy.load(name)
+                        self.model, self.status = name, 'loaded'
+                        break
+                    except OSError:
+                        continue
+                if self.nlp is None:
+                    self.nlp = spacy.blank('en')
+                    self.model, self.status = 'blank:en', 'blank'
+                    logger.warning("No spaCy model installed (tried %s); NER disabled", ', '.join(self.model_names))
+                # First call initialises lazily built tables; keep that out of the first real parse
+                self.nlp('warm up')
+            except Exception as e:
+                self.nlp = None
+                self.status, self.error = 'failed', str(e)
+                logger.warning(f"Could not load spaCy pipeline: {e}")
+            self.load_ms = int((time.perf_counter() - started) * 1000)
+            self.model_rss_bytes = max(0, _rss_bytes() - rss_before)
+            self.loaded_at = time.time()
+            if self.nlp is not None:
+                logger.info(f"spaCy {self.model} loaded in {self.load_ms} ms (pid {os.getpid()})")
+        return self
+
+    def entities(self, text):
+        """{label: [entity text, ...]} for PERSON / ORG / GPE in document order; {} without NER"""
+        self.load()
+        if not self.has_ner or not text:
+            return {}
+        started = time.perf_counter()
+        try:
+            doc = self.nlp(text[:_setting('RESUME_NLP_MAX_CHARS', DEFAULT_MAX_CHARS)])
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"spaCy NER failed: {e}")
+            return {}
+        found = {}
+        for ent in doc.ents:
+            if ent.label_ in ('PERSON', 'ORG', 'GPE'):
+                value = ' '.join(ent.text.split())
+                values = found.setdefault(ent.label_, [])
+                if value and value not in values:
+                    values.append(value)
+                if ent.label_ == 'PERSON' and ent.start_char < NAME_WINDOW:
+                    found.setdefault('HEADER_PERSON', []).append(value)
+        self.parses += 1
+        self.parse_ms += int((time.perf_counter() - started) * 1000)
+        return found
+
+    def extract_fields(self, text, parsed_data):
+        """
+        Fields to merge into the regex parser's output: the candidate name from
+        a PERSON entity in the header, a city when the city table had none, and
+        organisations. {} when no NER model is loaded.
+        """
+        started = time.perf_counter()
+        found = self.entities(text)
+        if not found:
+            return {}
+        fields = {
+            'organizations': found.get('ORG', [])[:10],
+            'ner_model': self.model,
+            'ner_ms': int((time.perf_counter() - started) * 1000),
+        }
+        if found.get('HEADER_PERSON'):
+            fields['name'] = found['HEADER_PERSON'][0]
+        if not parsed_data.get('city') and found.get('GPE'):
+            fields['city'] = found['GPE'][0]
+        return fields
+
+    def health(self):
+        return {
+            'status': self.status,
+            'model': self.model,
+            'ner': self.has_ner,
+            'error': self.error,
+            'pid': os.getpid(),
+            'loaded_at': datetime.fromtimestamp(self.loaded_at, dt_timezone.utc).isoformat() if self.loaded_at else None,
+            'load_ms': self.load_ms,
+            'parses': self.parses,
+            'avg_parse_ms': round(self.parse_ms / self.parses, 1) if self.parses else 0,
+            'errors': self.errors,
+            'rss_bytes': _rss_bytes(),
+            'peak_rss_bytes': _peak_rss_bytes(),
+            'model_rss_bytes': self.model_rss_bytes,
+        }
+
+
+def get_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = ResumeNLPService()
+    return _service
+
+
+def warm_up(*args, **kwargs):
+    """Load the pipeline now (worker start hooks; accepts and ignores hook arguments)"""
+    return get_service().load()
+
+
+def init_worker():
+    """
+    ProcessPoolExecutor initializer and gunicorn post_fork hook: the process
+    may not have set Django up yet, so do that, then load the pipeline before
+    the first file arrives
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    warm_up()
+
+
+def preload_if_configured():
+    if _setting('RESUME_NLP_PRELOAD', False):
+        warm_up()
+
+
+def ensure_pyresparser_config():
+    """Write pyresparser's config.cfg if the install lacks it (checked once per process)"""
+    global _pyresparser_config_checked
+    if _pyresparser_config_checked:
+        return
+    import importlib.util
+
+    spec = importlib.util.find_spec('pyresparser')
+    if spec is None or not spec.origin:
+        raise Exception("pyresparser is not installed")
+    config_path = os.path.join(os.path.dirname(spec.origin), 'config.cfg')
+    if not os.path.exists(config_path):
+        with open(config_path, 'w') as f:
+            f.write("[nlp]\n")
+            f.write("lang = en\n")
+            f.write("pipeline = tagger,parser,ner\n")
+            f.write("\n[DEFAULT]\n")
+            f.write("# Basic pyresparser configuration\n")
+    _pyresparser_config_checked = True
@@ -0,0 +1,224 @@
+"""
+Candidate search backed by candidate_search_document.
+
+Replaces the ten-way icontains OR (+ joins to client_jobs + DISTINCT) with a
+lookup on one denormalized row per candidate:
+
+- phone numbers (10+ digits)  -> indexed phone1/phone2 equality on the last 10 digits
+- profile numbers / emails    -> indexed equality
+- anything else               -> MySQL FULLTEXT (boolean mode, prefix match) on `body`,
+                                 or a LIKE scan of `body` on other databases / short tokens
+
+Documents are written by candidate/signals.py and backfilled with
+`manage.py rebuild_candidate_search`, which records a DerivedTableBuild row
+when it is done. Until then the table only covers candidates saved since
+deploy, so filter_candidates() reports that it cannot serve the search
+(returns None) and callers keep the legacy query.
+
+Usage:
+    from candidate import search as candidate_search
+    queryset = candidate_search.filter_candidates(queryset, term)
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+# InnoDB ignores tokens shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_TOKEN = 3
+# Full phone numbers; shorter digit runs fall back to a substring match
+PHONE_MIN_DIGITS = 10
+
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+_TOKEN_SPLIT = re.compile(r'[^\w]+', re.UNICODE)
+
+# Fields build_document reads; saves that touch none of them leave the document as is
+CANDIDATE_FIELDS = ('candidate_name', 'profile_number', 'email', 'mobile1', 'mobile2',
+                    'city', 'state', 'executive_name')
+CLIENT_JOB_FIELDS = ('candidate', 'candidate_id', 'client_name', 'designation', 'remarks')
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def phone_key(value):
+    """Last 10 digits of a phone number (drops +91 / leading 0), '' if not a phone"""
+    digits = _digits(value)
+    return digits[-10:] if digits else ''
+
+
+def _norm(value):
+    return ' '.join(str(value).split()).lower() if value else ''
+
+
+def _tokens(term):
+    return [token for token in _TOKEN_SPLIT.split(term.lower()) if token]
+
+
+def is_phone_term(term):
+    stripped = re.sub(r'[\s+\-()]', '', term)
+    return stripped.isdigit() and len(stripped) >= PHONE_MIN_DIGITS
+
+
+def uses_fulltext():
+    return connection.vendor == 'mysql'
+
+
+# -----------------------------
+# Document building
+# -----------------------------
+def build_document(candidate, client_jobs=None):
+    """Unsaved CandidateSearchDocument for a candidate (client_jobs may be prefetched)"""
+    from empreg import directory as employee_directory
+    from .models import CandidateSearchDocument
+
+    if client_jobs is None:
+        client_jobs = candidate.client_jobs.all()
+
+    parts = [
+        candidate.candidate_name, candidate.profile_number, candidate.email,
+        _digits(candidate.mobile1), _digits(candidate.mobile2),
+        candidate.city, candidate.state, candidate.executive_name,
+    ]
+    executive = employee_directory.get(candidate.executive_name) if candidate.executive_name else None
+    if executive:
+        parts.extend([executive['firstName'], executive['lastName']])
+    for job in client_jobs:
+        parts.extend([job.client_name, job.designation, job.remarks])
+
+    seen = set()
+    words = []
+    for part in parts:
+        text = _norm(part)
+        if text and text not in seen:
+            seen.add(text)
+            words.append(text)
+
+    return CandidateSearchDocument(
+        candidate_id=candidate.pk,
+        profile_number=(candidate.profile_number or '').strip(),
+        name=_norm(candidate.candidate_name)[:100],
+        email=(candidate.email or '').strip().lower()[:254],
+        phone1=phone_key(candidate.mobile1),
+        phone2=phone_key(candidate.mobile2),
+        body=' '.join(words),
+    )
+
+
+def refresh_document(candidate_id):
+    """Rewrite the search document for one candidate"""
+    from .models import Candidate, CandidateSearchDocument, ClientJob
+
+    candidate = (
+        Candidate.objects
+        .only('id', 'candidate_name', 'profile_number', 'email', 'mobile1', 'mobile2',
+              'city', 'state', 'executive_name')
+        .filter(pk=candidate_id)
+        .first()
+    )
+    if candidate is None:
+        CandidateSearchDocument.objects.filter(candidate_id=candidate_id).delete()
+        return None
+    jobs = ClientJob.objects.filter(candidate_id=candidate_id).only('client_name', 'designation', 'remarks')
+    document = build_document(candidate, client_jobs=jobs)
+    document.save()
+    return document
+
+
+def index_built():
+    """True once rebuild_candidate_search has covered every candidate"""
+    from .models import CandidateSearchDocument, DerivedTableBuild
+    return DerivedTableBuild.is_built(CandidateSearchDocument)
+
+
+# -----------------------------
+# Querying
+# -----------------------------
+def _fulltext_query(tokens):
+    # Every token must match, as a word prefix
+    return ' '.join(f'+{_BOOLEAN_OPERATORS.sub("", token)}*' for token in tokens)
+
+
+def matching_documents(term):
+    """
+    CandidateSearchDocument queryset matching term; on MySQL annotated with
+    `relevance` for fulltext terms
+    """
+    from .models import CandidateSearchDocument
+
+    term = (term or '').strip()
+    documents = CandidateSearchDocument.objects.all()
+    if not term:
+        return documents.none()
+
+    if is_phone_term(term):
+        key = phone_key(term)
+        return documents.filter(phone1=key) | documents.filter(phone2=key)
+
+    if '@' in term and ' ' not in term:
+        exact = documents.filter(email=term.lower())
+        if exact.exists():
+            return exact
+
+    if ' ' not in term and any(ch.isdigit() for ch in term):
+        exact = documents.filter(profile_number=term)
+        if exact.exists():
+            return exact
+
+    tokens = _tokens(term)
+    if not tokens:
+        return documents.none()
+
+    digits = _digits(term)
+    if digits == term and len(digits) < PHONE_MIN_DIGITS:
+        # Partial phone / number fragment: substring match like the old icontains
+        return documents.filter(body__contains=digits)
+
+    fulltext_tokens = [token for token in tokens if len(token) >= FULLTEXT_MIN_TOKEN]
+    if uses_fulltext() and fulltext_tokens:
+        query = _fulltext_query(fulltext_tokens)
+        documents = documents.annotate(
+            relevance=RawSQL('MATCH(`candidate_search_document`.`body`) AGAINST (%s IN BOOLEAN MODE)', (query,))
+        ).filter(relevance__gt=0)
+        tokens = [token for token in tokens if len(token) < FULLTEXT_MIN_TOKEN]
+
+    for token in tokens:
+        documents = documents.filter(body__contains=token)
+    return documents
+
+
+def filter_candidates(queryset, term):
+    """
+    Restrict a Candidate queryset to candidates matching term.
+    Returns None when the search index has not been built yet.
+    """
+    if not index_built():
+        return None
+    return queryset.filter(pk__in=matching_documents(term).values('candidate_id'))
+
+
+def ranked_candidate_ids(term, limit=50):
+    """Candidate ids for term, best match first (relevance, then most recently updated)"""
+    documents = matching_documents(term)
+    if 'relevance' in documents.query.annotations:
+        documents = documents.order_by('-relevance', '-updated_at')
+    else:
+        documents = documents.order_by('-updated_at')
+    return list(documents.values_list('candidate_id', flat=True)[:limit])
+
+
+def exact_candidate_ids(term):
+    """Candidate ids whose name, email or phone equals term (indexed equality only)"""
+    from .models import CandidateSearchDocument
+
+    term = (term or '').strip()
+    if not term:
+        return []
+    documents = CandidateSearchDocument.objects.filter(name=_norm(term)) | \
+        CandidateSearchDocument.objects.filter(email=term.lower())
+    key = phone_key(term) if is_phone_term(term) else ''
+    if key:
+        documents = documents | CandidateSearchDocument.objects.filter(phone1=key) | \
+            CandidateSearchDocument.objects.filter(phone2=key)
+    return list(documents.values_list('candidate_id', flat=True))
@@ -39,6 +39,62 @@ class EducationCertificateSerializer(serializers.ModelSerializer):
         model = EducationCertificate
         fields = "__all__"
 
+# --------------------------------
+# Client Job List Serializer
+# --------------------------------
+class ClientJobListSerializer(serializers.ListSerializer):
+    """
+    Page-level precompute for ClientJobSerializer(many=True)
+    Resolves employee names, the NFD expiry threshold and candidate feedback for
+    the whole page once and shares them with the child through serializer context.
+    Nested use (e.g. CandidateSerializer.client_jobs) reuses what is already there.
+    """
+
+    def to_representation(self, data):
+        from django.db import models as db_models
+
+        iterable = data.all() if isinstance(data, db_models.manager.BaseManager) else data
+        jobs = list(iterable)
+        self.prepare_page_context(jobs)
+        return [self.child.to_representation(job) for job in jobs]
+
+    def prepare_page_context(self, jobs):
+        from candidate.views import get_nfd_expiry_threshold
+        from empreg import directory as employee_directory
+
+        context = self.context
+
+        if '_nfd_expiry_threshold' not in context:
+            context['_nfd_expiry_threshold'] = get_nfd_expiry_threshold()
+
+        # Employee code -> directory info (None when not found)
+        employee_map = context.setdefault('_employee_map', {})
+        codes = set()
+        for job in jobs:
+            for code in (job.created_by, job.updated_by, job.assign_to):
+                if code and code not in employee_map:
+                    codes.add(code)
+        if codes:
+            resolved = employee_directory.resolve(codes)
+            for code in codes:
+                employee_map[code] = resolved.get(code)
+
+        # Candidate (executive_name + feedback) for jobs not loaded with their candidate
+        candidate_field = ClientJob._meta.get_field('candidate')
+        missing_ids = {job.candidate_id for job in jobs if not candidate_field.is_cached(job)}
+        if missing_ids:
+            candidates = Candidate.objects.filter(id__in=missing_ids).only('id', 'executive_name', 'feedback')
+            candidates_by_id = {candidate.id: candidate for candidate in candidates}
+            for job in jobs:
+                if not candidate_field.is_cached(job) and job.candidate_id in candidates_by_id:
+                    candidate_field.set_cached_value(job, candidates_by_id[job.candidate_id])
+
+        candidate_feedback = context.setdefault('_candidate_feedback', {})
+        for job in jobs:
+            if candidate_field.is_cached(job) and job.candidate_id not in candidate_feedback:
+                candidate_feedback[job.candidate_id] = job.candidate.feedback
+
+
 # --------------------------------
 # Client Job Serializer
 # --------------------------------
@@ -62,6 +118,7 @@ class ClientJobSerializer(serializers.ModelSerializer):
     class Meta:
         model = ClientJob
         fields = "__all__"
+        list_serializer_class = ClientJobListSerializer
     
     def to_representation(self, instance):
         """Override to sanitize feedback field before serialization and convert attend to 0/1"""
@@ -69,7 +126,11 @@ class ClientJobSerializer(serializers.ModelSerializer):
         
         try:
             if 'feedback' not in representation:
-                representation['feedback'] = getattr(instance.candidate, 'feedback', None)
+                candidate_feedback = self.context.get('_candidate_feedback')
+                if candidate_feedback is not None and instance.candidate_id in candidate_feedback:
+                    representation['feedback'] = candidate_feedback[instance.candidate_id]
+                else:
+                    representation['feedback'] = getattr(instance.candidate, 'feedback', None)
         except Exception:
             representation['feedback'] = None
         
@@ -107,25 +168,57 @@ class ClientJobSerializer(serializers.ModelSerializer):
         
         return representation
     
+    def _employee_name(self, code):
+        """
+        Employee code -> "FirstName LastName" from the page-level map
+        Returns (found_in_map, name); callers fall back to the model method otherwise
+        """
+        employee_map = self.context.get('_employee_map')
+        if employee_map is None or code not in employee_map:
+            return False, None
+        employee = employee_map[code]
+        if not employee:
+            return True, code
+        return True, employee['fullName'] or employee['firstName'] or code
+
     def get_created_by_name(self, obj):
         """Get full name of person who created this record"""
-        return obj.get_created_by_name()
+        if not obj.created_by:
+            return None
+        found, name = self._employee_name(obj.created_by)
+        return name if found else obj.get_created_by_name()
     
     def get_updated_by_name(self, obj):
         """Get full name of person who last updated this record"""
-        return obj.get_updated_by_name()
+        if not obj.updated_by:
+            return None
+        found, name = self._employee_name(obj.updated_by)
+        return name if found else obj.get_updated_by_name()
 
     def get_current_executive_name(self, obj):
         """Get the name of the currently assigned executive"""
+        if obj.assign_to:
+            found, name = self._employee_name(obj.assign_to)
+            if found:
+                return name
         return obj.get_assigned_executive_name()
 
     def get_display_executive_name(self, obj):
         """Get the executive name to display for this specific client job"""
-        return obj.get_display_executive()
+        if obj.assign == 'assigned' and obj.assign_to:
+            return self.get_current_executive_name(obj)
+        return obj.candidate.executive_name
 
     def get_assignment_info(self, obj):
         """Get complete assignment information"""
-        return obj.get_assignment_info()
+        return {
+            'original_executive': obj.candidate.executive_name,
+            'assigned_to': obj.assign_to,
+            'assigned_by': obj.assign_by,
+            'current_executive': self.get_current_executive_name(obj),
+            'is_assigned': bool(obj.assign_to),
+            'assignment_type': 'specific_job' if obj.assign_to else 'original'
+        }
 
     def get_can_assign(self, obj):
         """Check if this client job can be assigned (open profile OR expired NFD)"""
@@ -158,8 +251,10 @@ class ClientJobSerializer(serializers.ModelSerializer):
                 # Handle date object
                 nfd_date = obj.next_follow_up_date
 
-            # Use common expiry threshold
-            expiry_threshold = get_nfd_expiry_threshold()
+            # Use common expiry threshold (computed once per page by ClientJobListSerializer)
+            expiry_threshold = self.context.get('_nfd_expiry_threshold')
+            if expiry_threshold is None:
+                expiry_threshold = get_nfd_expiry_threshold()
             return nfd_date < expiry_threshold
 
         except (ValueError, TypeError, AttributeError) as e:
@@ -179,6 +274,10 @@ class ClientJobSerializer(serializers.ModelSerializer):
         Get NFD display string for frontend
         Returns: "NFD: Oct 31 (open profile)" if expired, or "NFD: Oct 31" if active
         """
+        return self._nfd_display(obj)
+
+    def _nfd_display(self, obj, is_expired=None):
+        """get_nfd_display() body; is_expired skips re-checking when the caller already has it"""
         if not obj.next_follow_up_date:
             return None
         
@@ -197,7 +296,8 @@ class ClientJobSerializer(serializers.ModelSerializer):
             date_str = nfd_date.strftime('%b %d')
             
             # Check if expired and unassigned
-            is_expired = self.get_nfd_expired(obj)
+            if is_expired is None:
+                is_expired = self.get_nfd_expired(obj)
             is_unassigned = not obj.assign_to
             
             if is_expired and is_unassigned:
@@ -254,7 +354,7 @@ class ClientJobSerializer(serializers.ModelSerializer):
             'nfd_expired': nfd_expired,
             'has_assignment': bool(obj.assign_to),
             'assignment_reason': 'open_profile' if (obj.remarks and obj.remarks.lower() == 'open profile') else ('nfd_expired' if (nfd_expired and is_unassigned) else 'not_assignable'),
-            'nfd_display': self.get_nfd_display(obj)  # Include display string
+            'nfd_display': self._nfd_display(obj, nfd_expired)  # Include display string
         }
 
 # --------------------------------
@@ -345,53 +445,18 @@ class CandidateSerializer(serializers.ModelSerializer):
         if not name:
             return 'N/A'
         
-        # Try to get from cache first
         try:
-            if '_employee_cache' not in self.context:
-                self.context['_employee_cache'] = {}
-            
-            cache = self.context['_employee_cache']
-            
-            # Check if already cached
-            if name in cache:
-                return cache[name]
-            
-            # Not in cache, look it up
-            from empreg.models import Employee
-            from django.db.models import Q
+            from empreg import directory as employee_directory
             import logging
             
-            logger = logging.getLogger(__name__)
-            
-            # Normalize the code for lookup - try multiple variations
-            normalized_code = name.upper().replace('/', '').replace('_', '').replace(' ', '')
-            lowercase_code = name.lower()
-            
-            # Try to find employee by code with different formats
-            employee = Employee.objects.filter(
-                Q(employeeCode__iexact=name) |
-                Q(employeeCode__iexact=normalized_code) |
-                Q(employeeCode__iexact=lowercase_code) |
-                Q(employeeCode__icontains=name),  # Partial match as fallback
-                del_state=0
-            ).only('employeeCode', 'firstName', 'lastName').first()
-            
-            # Debug logging
+            # Lenient lookup also matches codes typed without separators, then partial codes
+            employee = employee_directory.find(name, partial=True)
             if not employee:
-                logger.warning(f"Employee not found for code: {name} (normalized: {normalized_code})")
-            
-            # Determine display name - Return full name (FirstName LastName)
-            if employee:
-                first_name = employee.firstName or ''
-                last_name = employee.lastName or ''
-                full_name = f"{first_name} {last_name}".strip()
-                display_name = full_name if full_name else employee.employeeCode
-            else:
-                display_name = name
+                logging.getLogger(__name__).warning(f"Employee not found for code: {name}")
+                return name
             
-            # Cache the result
-            cache[name] = display_name
-            return display_name
+            # Return full name (FirstName LastName)
+            return employee['fullName'] or employee['employeeCode']
             
         except Exception as e:
             # If lookup fails, return the original name
@@ -410,42 +475,39 @@ class CandidateRevenueSerializer(serializers.ModelSerializer):
     
     def get_branch(self, obj):
         """Get the branch from the employee's record in empreg_employee table"""
-        from empreg.models import Employee
+        from empreg import directory as employee_directory
         
         try:
-            # Get the employee by matching the executive_name with employeeCode
-            employee = Employee.objects.filter(
-                employeeCode=obj.candidate.executive_name
-            ).first()
+            # Match the executive_name with employeeCode
+            employee = employee_directory.get(obj.candidate.executive_name, include_deleted=True)
             
-            if employee and employee.branch:
-                return employee.branch
+            if employee and employee['branch']:
+                return employee['branch']
                 
         except Exception as e:
             print(f"Error getting employee branch: {e}")
             
-        # Fallback to client jobs if employee not found or branch not set
-        if hasattr(obj.candidate, 'client_jobs') and obj.candidate.client_jobs.exists():
-            latest_job = obj.candidate.client_jobs.order_by('-id').first()
-            return latest_job.branch if hasattr(latest_job, 'branch') else None
-            
+        # ClientJob has no branch column, so there is nothing to fall back to
         return None
+
+    def _latest_job_field(self, obj, field):
+        """
+        `field` of the candidate's most recent client job. The revenue list
+        annotates latest_<field> on every row; other callers query it.
+        """
+        annotated = f'latest_{field}'
+        if hasattr(obj, annotated):
+            return getattr(obj, annotated)
+        latest_job = obj.candidate.client_jobs.order_by('-id').only(field).first()
+        return getattr(latest_job, field) if latest_job else None
     
     def get_profile_status(self, obj):
         """Get the profile status from candidate's client jobs"""
-        if hasattr(obj.candidate, 'client_jobs') and obj.candidate.client_jobs.exists():
-            # Get the most recent client job
-            latest_job = obj.candidate.client_jobs.order_by('-id').first()
-            return latest_job.profilestatus  # Changed from profile_status to profilestatus
-        return None
+        return self._latest_job_field(obj, 'profilestatus')
     
     def get_client_name(self, obj):
         """Get the most recent client name from candidate's client jobs"""
-        if hasattr(obj.candidate, 'client_jobs') and obj.candidate.client_jobs.exists():
-            # Get the most recent client job
-            latest_job = obj.candidate.client_jobs.order_by('-id').first()
-            return latest_job.client_name
-        return None
+        return self._latest_job_field(obj, 'client_name')
     
     def get_display_executive_name(self, obj):
         """Return formatted executive name (FirstName LastName) from employee code"""
@@ -454,45 +516,16 @@ class CandidateRevenueSerializer(serializers.ModelSerializer):
         
         name = obj.candidate.executive_name
         try:
-            from empreg.models import Employee
-            from django.db.models import Q
-            from django.core.cache import cache
-            import logging
-            
-            logger = logging.getLogger(__name__)
+            from empreg import directory as employee_directory
             
-            # Try to get from cache first
-            cache_key = f"executive_display_name_{name}"
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return cached
-                
-            # Normalize the code for lookup - try multiple variations
-            normalized_code = name.upper().replace('/', '').replace('_', '').replace(' ', '')
-            
-            # Try to find employee by code with different formats
-            employee = Employee.objects.filter(
-                Q(employeeCode__iexact=name) |
-                Q(employeeCode__iexact=normalized_code),
-                del_state=0
-            ).only('employeeCode', 'firstName', 'lastName').first()
-            
-            # Determine display name - Return full name (FirstName LastName)
-            if employee:
-                first_name = employee.firstName or ''
-                last_name = employee.lastName or ''
-                display_name = f"{first_name} {last_name}".strip()
-                if not display_name:
-                    display_name = employee.employeeCode
-            else:
-                display_name = name
-                
-            # Cache the result for future use (1 hour)
-            cache.set(cache_key, display_name, timeout=3600)
-            return display_name
+            employee = employee_directory.find(name)
+            if not employee:
+                return name
+            return employee['fullName'] or employee['employeeCode']
             
         except Exception as e:
-            logger.error(f"Error getting executive display name: {str(e)}")
+            import logging
+            logging.getLogger(__name__).error(f"Error getting executive display name: {str(e)}")
             return name
 
     def get_location(self, obj):
@@ -663,19 +696,9 @@ class ProfileInSerializer(serializers.ModelSerializer):
             return None
         
         try:
-            from empreg.models import Employee
-            employee = Employee.objects.filter(
-                employeeCode=obj.assigned_from,
-                del_state=0
-            ).first()
-            
-            if employee:
-                first_name = employee.firstName or ''
-                last_name = employee.lastName or ''
-                full_name = f"{first_name} {last_name}".strip()
-                return full_name if full_name else obj.assigned_from
-            else:
-                return obj.assigned_from  # Fallback to employee code
+            from empreg import directory as employee_directory
+            # Falls back to the employee code when the employee is not found
+            return employee_directory.display_name(obj.assigned_from)
         except Exception as e:
             print(f"ProfileInSerializer: Error getting employee name for {obj.assigned_from}: {e}")
             return obj.assigned_from  # Fallback to employee code
@@ -686,19 +709,9 @@ class ProfileInSerializer(serializers.ModelSerializer):
             return None
         
         try:
-            from empreg.models import Employee
-            employee = Employee.objects.filter(
-                employeeCode=obj.assign_to,
-                del_state=0
-            ).first()
-            
-            if employee:
-                first_name = employee.firstName or ''
-                last_name = employee.lastName or ''
-                full_name = f"{first_name} {last_name}".strip()
-                return full_name if full_name else obj.assign_to
-            else:
-                return obj.assign_to  # Fallback to employee code
+            from empreg import directory as employee_directory
+            # Falls back to the employee code when the employee is not found
+            return employee_directory.display_name(obj.assign_to)
         except Exception as e:
             print(f"ProfileInSerializer: Error getting employee name for {obj.assign_to}: {e}")
             return obj.assign_to  # Fallback to employee code
@@ -759,19 +772,9 @@ class ProfileOutSerializer(serializers.ModelSerializer):
             return None
         
         try:
-            from empreg.models import Employee
-            employee = Employee.objects.filter(
-                employeeCode=obj.assign_to,
-                del_state=0
-            ).first()
-            
-            if employee:
-                first_name = employee.firstName or ''
-                last_name = employee.lastName or ''
-                full_name = f"{first_name} {last_name}".strip()
-                return full_name if full_name else obj.assign_to
-            else:
-                return obj.assign_to  # Fallback to employee code
+            from empreg import directory as employee_directory
+            # Falls back to the employee code when the employee is not found
+            return employee_directory.display_name(obj.assign_to)
         except Exception as e:
             print(f"ProfileOutSerializer: Error getting employee name for {obj.assign_to}: {e}")
             return obj.assign_to  # Fallback to employee code
@@ -786,19 +789,9 @@ class ProfileOutSerializer(serializers.ModelSerializer):
             return None
         
         try:
-            from empreg.models import Employee
-            employee = Employee.objects.filter(
-                employeeCode=obj.assigned_from,
-                del_state=0
-            ).first()
-            
-            if employee:
-                first_name = employee.firstName or ''
-                last_name = employee.lastName or ''
-                full_name = f"{first_name} {last_name}".strip()
-                return full_name if full_name else obj.assigned_from
-            else:
-                return obj.assigned_from  # Fallback to employee code
+            from empreg import directory as employee_directory
+            # Falls back to the employee code when the employee is not found
+            return employee_directory.display_name(obj.assigned_from)
         except Exception as e:
             print(f"ProfileOutSerializer: Error getting employee name for {obj.assigned_from}: {e}")
             return obj.assigned_from  # Fallback to employee code
@@ -836,13 +829,8 @@ class CandidateStatusHistorySerializer(serializers.ModelSerializer):
         if not obj.created_by:
             return None
         
-        try:
-            from empreg.models import Employee
-            employee = Employee.objects.get(employeeCode=obj.created_by, del_state=0)
-            full_name = f"{employee.firstName} {employee.lastName}".strip()
-            return full_name if full_name else employee.firstName
-        except Exception:
-            return obj.created_by
+        from empreg import directory as employee_directory
+        return employee_directory.display_name(obj.created_by)
     
     def create(self, validated_data):
         """Create a new status history entry"""
@@ -0,0 +1,201 @@
+import logging
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from backend import shared_cache
+
+from . import calendar_rollup
+from . import report_facts
+from . import search as candidate_search
+from .models import Candidate, ClientJob, CandidateStatusHistory, CandidateRevenue
+
+logger = logging.getLogger(__name__)
+
+CLIENT_JOB_CALENDAR_FIELDS = ('next_follow_up_date', 'expected_joining_date', 'branch_id', 'team_id', 'employee_id')
+STATUS_HISTORY_CALENDAR_FIELDS = ('remarks', 'attend_flag', 'profile_submission', 'change_date',
+                                  'branch_id', 'team_id', 'employee_id')
+
+ROLLUP_KEYS = {
+    ClientJob: (CLIENT_JOB_CALENDAR_FIELDS, calendar_rollup.client_job_keys),
+    CandidateStatusHistory: (STATUS_HISTORY_CALENDAR_FIELDS, calendar_rollup.status_history_keys),
+}
+
+
+# -----------------------------
+# calendar_daily_counts maintenance
+# -----------------------------
+@receiver(pre_save, sender=ClientJob, dispatch_uid='calendar_counts_clientjob_pre_save')
+@receiver(pre_save, sender=CandidateStatusHistory, dispatch_uid='calendar_counts_history_pre_save')
+def remember_calendar_keys(sender, instance, raw=False, **kwargs):
+    """Capture the rollup keys of the stored row so post_save can move its count"""
+    if raw:
+        return
+    fields, keys_for = ROLLUP_KEYS[sender]
+    instance._calendar_keys_before = []
+    if instance.pk is None:
+        return
+    try:
+        stored = sender.objects.filter(pk=instance.pk).values(*fields).first()
+        if stored:
+            instance._calendar_keys_before = keys_for(SimpleNamespace(**stored))
+    except Exception as e:
+        logger.warning(f"Calendar rollup: could not read previous row for {sender.__name__} {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=ClientJob, dispatch_uid='calendar_counts_clientjob_saved')
+@receiver(post_save, sender=CandidateStatusHistory, dispatch_uid='calendar_counts_history_saved')
+def update_calendar_counts_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    _, keys_for = ROLLUP_KEYS[sender]
+    try:
+        old_keys = getattr(instance, '_calendar_keys_before', [])
+        calendar_rollup.apply_deltas(calendar_rollup.diff_keys(old_keys, keys_for(instance)))
+    except Exception as e:
+        logger.warning(f"Calendar rollup: failed to update counts for {sender.__name__} {instance.pk}: {e}")
+    finally:
+        instance._calendar_keys_before = []
+
+
+@receiver(post_delete, sender=ClientJob, dispatch_uid='calendar_counts_clientjob_deleted')
+@receiver(post_delete, sender=CandidateStatusHistory, dispatch_uid='calendar_counts_history_deleted')
+def update_calendar_counts_on_delete(sender, instance, **kwargs):
+    _, keys_for = ROLLUP_KEYS[sender]
+    try:
+        calendar_rollup.apply_deltas(calendar_rollup.diff_keys(keys_for(instance), []))
+    except Exception as e:
+        logger.warning(f"Calendar rollup: failed to update counts for deleted {sender.__name__} {instance.pk}: {e}")
+
+
+# -----------------------------
+# client_job_report_facts maintenance
+# -----------------------------
+@receiver(pre_save, sender=ClientJob, dispatch_uid='report_facts_clientjob_pre_save')
+@receiver(pre_delete, sender=ClientJob, dispatch_uid='report_facts_clientjob_pre_delete')
+def remember_report_fact_keys(sender, instance, raw=False, **kwargs):
+    """Capture the stored row's fact key so post_save / post_delete can move its count"""
+    if raw:
+        return
+    instance._report_keys_before = []
+    if instance.pk is None:
+        return
+    try:
+        instance._report_keys_before = report_facts.keys_for_jobs(ClientJob.objects.filter(pk=instance.pk))
+    except Exception as e:
+        logger.warning(f"Report facts: could not read previous row for ClientJob {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=ClientJob, dispatch_uid='report_facts_clientjob_saved')
+def update_report_facts_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        # Read back: owner_code and state/city come from the candidate row
+        new_keys = report_facts.keys_for_jobs(ClientJob.objects.filter(pk=instance.pk))
+        old_keys = getattr(instance, '_report_keys_before', [])
+        report_facts.apply_deltas(calendar_rollup.diff_keys(old_keys, new_keys))
+    except Exception as e:
+        logger.warning(f"Report facts: failed to update counts for ClientJob {instance.pk}: {e}")
+    finally:
+        instance._report_keys_before = []
+
+
+@receiver(post_delete, sender=ClientJob, dispatch_uid='report_facts_clientjob_deleted')
+def update_report_facts_on_delete(sender, instance, **kwargs):
+    try:
+        report_facts.apply_deltas(calendar_rollup.diff_keys(getattr(instance, '_report_keys_before', []), []))
+    except Exception as e:
+        logger.warning(f"Report facts: failed to update counts for deleted ClientJob {instance.pk}: {e}")
+
+
+@receiver(pre_save, sender=Candidate, dispatch_uid='report_facts_candidate_pre_save')
+def remember_candidate_report_keys(sender, instance, raw=False, **kwargs):
+    """Owner / state / city changes move every fact of the candidate's jobs"""
+    instance._report_keys_before = None
+    if raw or instance.pk is None:
+        return
+    try:
+        stored = Candidate.objects.filter(pk=instance.pk).values(*report_facts.CANDIDATE_FIELDS).first()
+        if stored and any(stored[name] != getattr(instance, name) for name in report_facts.CANDIDATE_FIELDS):
+            instance._report_keys_before = report_facts.keys_for_jobs(ClientJob.objects.filter(candidate_id=instance.pk))
+    except Exception as e:
+        logger.warning(f"Report facts: could not read previous row for Candidate {instance.pk}: {e}")
+
+
+@receiver(post_save, sender=Candidate, dispatch_uid='report_facts_candidate_saved')
+def update_report_facts_for_candidate(sender, instance, raw=False, **kwargs):
+    old_keys = getattr(instance, '_report_keys_before', None)
+    if raw or old_keys is None:
+        return
+    instance._report_keys_before = None
+    try:
+        new_keys = report_facts.keys_for_jobs(ClientJob.objects.filter(candidate_id=instance.pk))
+        report_facts.apply_deltas(calendar_rollup.diff_keys(old_keys, new_keys))
+    except Exception as e:
+        logger.warning(f"Report facts: failed to update counts for Candidate {instance.pk}: {e}")
+
+
+# -----------------------------
+# candidate_search_document maintenance
+# -----------------------------
+@receiver(post_save, sender=Candidate, dispatch_uid='search_document_candidate_saved')
+def refresh_search_document_for_candidate(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and not update_fields & set(candidate_search.CANDIDATE_FIELDS)):
+        return
+    _refresh_search_document(instance.pk)
+
+
+def _refresh_search_document(candidate_id):
+    try:
+        candidate_search.refresh_document(candidate_id)
+    except Exception as e:
+        logger.warning(f"Candidate search: failed to refresh document for candidate {candidate_id}: {e}")
+
+
+@receiver(post_save, sender=ClientJob, dispatch_uid='search_document_clientjob_saved')
+def refresh_search_document_for_client_job(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not instance.candidate_id:
+        return
+    if update_fields is not None and not update_fields & set(candidate_search.CLIENT_JOB_FIELDS):
+        return
+    _refresh_search_document(instance.candidate_id)
+
+
+@receiver(post_delete, sender=ClientJob, dispatch_uid='search_document_clientjob_deleted')
+def refresh_search_document_after_client_job_delete(sender, instance, **kwargs):
+    if not instance.candidate_id:
+        return
+    # Deferred: when the candidate itself is being deleted its jobs go first,
+    # and refreshing now would recreate the document under a dying candidate
+    candidate_id = instance.candidate_id
+    transaction.on_commit(lambda: _refresh_search_document(candidate_id))
+
+
+# -----------------------------
+# shared cache invalidation (backend/shared_cache.py)
+# -----------------------------
+CACHE_NAMESPACES = {
+    Candidate: 'candidate',
+    ClientJob: 'client_job',
+    CandidateStatusHistory: 'status_history',
+    CandidateRevenue: 'revenue',
+}
+
+
+@receiver(post_save, sender=Candidate, dispatch_uid='shared_cache_candidate_saved')
+@receiver(post_delete, sender=Candidate, dispatch_uid='shared_cache_candidate_deleted')
+@receiver(post_save, sender=ClientJob, dispatch_uid='shared_cache_clientjob_saved')
+@receiver(post_delete, sender=ClientJob, dispatch_uid='shared_cache_clientjob_deleted')
+@receiver(post_save, sender=CandidateStatusHistory, dispatch_uid='shared_cache_history_saved')
+@receiver(post_delete, sender=CandidateStatusHistory, dispatch_uid='shared_cache_history_deleted')
+@receiver(post_save, sender=CandidateRevenue, dispatch_uid='shared_cache_revenue_saved')
+@receiver(post_delete, sender=CandidateRevenue, dispatch_uid='shared_cache_revenue_deleted')
+def bump_shared_cache_version(sender, **kwargs):
+    """Cached data built on this model's namespace stops matching once the write commits"""
+    try:
+        shared_cache.bump_on_commit(CACHE_NAMESPACES[sender])
+    except Exception as e:
+        logger.warning(f"Shared cache: could not bump {sender.__name__} version: {e}")
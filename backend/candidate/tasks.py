@@ -0,0 +1,58 @@
+"""
+Celery tasks (celery is optional).
+
+backend/celery.py is the app; run `celery -A backend worker` and
+`celery -A backend beat` with CELERY_BROKER_URL set. CELERY_BEAT_SCHEDULE in
+settings.py runs expire_nfds just after midnight.
+
+Without celery, run `python manage.py expire_nfds` from cron at the same time.
+
+parse_resume_job is what candidate/resume_jobs.py queues when
+RESUME_PARSE_BACKEND is "celery" (the default once CELERY_BROKER_URL is set).
+Each worker process loads the spaCy pipeline once at start (resume_nlp.py).
+requeue_stale_resume_jobs (every 10 minutes from beat) re-dispatches jobs
+whose worker went away mid-parse.
+"""
+try:
+    from celery import shared_task
+    from celery.signals import worker_process_init
+except ImportError:  # celery not installed
+    shared_task = None
+    worker_process_init = None
+
+from . import nfd_expiry
+
+
+def expire_nfds(chunk_size=nfd_expiry.DEFAULT_CHUNK_SIZE):
+    run = nfd_expiry.run(chunk_size=chunk_size, triggered_by='celery')
+    return run.as_metrics() if run else None
+
+
+if shared_task is not None:
+    expire_nfds = shared_task(name='candidate.tasks.expire_nfds')(expire_nfds)
+
+
+def parse_resume_job(job_id):
+    from . import resume_jobs
+    job = resume_jobs.run_job(job_id)
+    return job.status if job else None
+
+
+if shared_task is not None:
+    parse_resume_job = shared_task(name='candidate.tasks.parse_resume_job')(parse_resume_job)
+
+
+def requeue_stale_resume_jobs():
+    from . import resume_jobs
+    return [str(job_id) for job_id in resume_jobs.requeue_stale()]
+
+
+if shared_task is not None:
+    requeue_stale_resume_jobs = shared_task(name='candidate.tasks.requeue_stale_resume_jobs')(requeue_stale_resume_jobs)
+
+
+if worker_process_init is not None:
+    @worker_process_init.connect
+    def warm_resume_nlp(**kwargs):
+        from . import resume_nlp
+        resume_nlp.warm_up()
@@ -1,3 +1,1503 @@
-from django.test import TestCase
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+import gzip
+from io import BytesIO, StringIO
+import json
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from backend import compression, perf, shared_cache
+from backend.renderers import FastJSONRenderer
+from empreg import directory as employee_directory
+from empreg import identity as employee_identity
+from empreg.models import Employee
+
+from . import alternative_parser
+from . import calendar_rollup
+from . import exports
+from . import nfd_expiry
+from . import resume_cache
+from . import resume_jobs
+from . import resume_nlp
+from . import text_extraction
+from . import search as candidate_search
+from .keyword_matcher import KeywordMatcher
+from . import report_facts
+from .models import (
+    Candidate, ClientJob, CandidateRevenue, CandidateStatusHistory, CalendarDailyCount, CandidateSearchDocument, DerivedTableBuild,
+    ClientJobReportFact, FeedbackEntry, JobAssignmentHistory, NfdExpiryRun, ResumeParseJob,
+)
+
+
+class CandidateEndpointQueryCountTests(APITestCase):
+    """
+    Serializing a page of candidates/client jobs must cost a fixed number of
+    queries: the count for a small page and a larger page has to match.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='EMP/90001', password='x')
+        self.employee = Employee.objects.create(
+            user=self.user, employeeCode='EMP/90001', firstName='Query', lastName='Owner',
+            phone1='9000000001', branch='CHENNAI', level='L1',
+        )
+        self.assignee = Employee.objects.create(
+            employeeCode='EMP/90002', firstName='Assigned', lastName='Person',
+            phone1='9000000002', branch='CHENNAI', level='L1',
+        )
+
+    def _create_candidates(self, count, jobs_per_candidate=2):
+        candidates = []
+        for index in range(count):
+            candidate = Candidate.objects.create(
+                candidate_name='Query Count Candidate',
+                mobile1=f'8{len(Candidate.objects.all()):09d}',
+                executive_name=self.employee.employeeCode,
+                created_by=self.employee.employeeCode,
+                feedback='Feedback-first call: NFD-: EJD-: CallStatus-call answered: Remarks-interested: '
+                         'Entry By-Query: Entry Time01-01-2024 10:00:00;',
+            )
+            for job_index in range(jobs_per_candidate):
+                ClientJob.objects.create(
+                    candidate=candidate,
+                    client_name=f'Client {job_index}',
+                    designation='Engineer',
+                    remarks='interested',
+                    created_by=self.employee.employeeCode,
+                    assign_to=self.assignee.employeeCode if job_index % 2 else None,
+                    assign='assigned' if job_index % 2 else None,
+                )
+            candidates.append(candidate)
+        return candidates
+
+    def _count_queries(self, request):
+        # Load the employee directory snapshot and the user's identity outside the measured block
+        employee_directory.resolve([self.employee.employeeCode])
+        employee_identity.for_user(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        return len(queries)
+
+    def _assert_constant(self, make_request, small=2, large=8):
+        self._create_candidates(small)
+        small_count = self._count_queries(make_request)
+        self._create_candidates(large - small)
+        large_count = self._count_queries(make_request)
+        self.assertEqual(small_count, large_count)
+
+    def test_detail_query_count_does_not_grow_with_client_jobs(self):
+        few = self._create_candidates(1, jobs_per_candidate=1)[0]
+        many = self._create_candidates(1, jobs_per_candidate=8)[0]
+        few_count = self._count_queries(lambda: self.client.get(f'/api/candidates/{few.id}/'))
+        many_count = self._count_queries(lambda: self.client.get(f'/api/candidates/{many.id}/'))
+        self.assertEqual(few_count, many_count)
+
+    def test_search_query_count_is_constant(self):
+        self._assert_constant(
+            lambda: self.client.get('/api/candidates/search/', {'term': 'Query Count Candidate'})
+        )
+
+    def test_bulk_fetch_query_count_is_constant(self):
+        def make_request():
+            ids = list(Candidate.objects.values_list('id', flat=True))
+            return self.client.post(
+                '/api/candidates/bulk-fetch/',
+                {'ids': ids, 'include_client_jobs': True},
+                format='json',
+            )
+        self._assert_constant(make_request)
+
+    def test_my_candidates_query_count_is_constant(self):
+        self.client.force_authenticate(self.user)
+        self._assert_constant(lambda: self.client.get('/api/candidates/my-candidates/'))
+
+
+class CalendarDailyCountTests(TestCase):
+    """Signal-maintained calendar_daily_counts must match a full rebuild"""
+
+    def setUp(self):
+        self.candidate = Candidate.objects.create(candidate_name='Calendar Candidate', mobile1='7000000001')
+
+    def _rollup(self):
+        return {
+            (row.date, row.event_type, row.branch_id, row.team_id, row.employee_id): row.count
+            for row in CalendarDailyCount.objects.all() if row.count
+        }
+
+    def _history(self, remarks, change_date, **extra):
+        return CandidateStatusHistory.objects.create(
+            candidate_id=self.candidate.id, remarks=remarks, change_date=change_date,
+            created_by='EMP/00001', branch_id=1, team_id=2, employee_id='EMP/00001', **extra
+        )
+
+    def test_signals_match_rebuild(self):
+        job = ClientJob.objects.create(
+            candidate=self.candidate, client_name='Acme', designation='Engineer',
+            next_follow_up_date=date(2025, 3, 10), employee_id='EMP/00001', branch_id=1,
+        )
+        ClientJob.objects.create(
+            candidate=self.candidate, client_name='Beta', designation='Engineer',
+            expected_joining_date=datetime(2025, 3, 12, 9, 30),
+        )
+        self._history('Interview Fixed', date(2025, 3, 11))
+        self._history('profile submitted', date(2025, 3, 11), profile_submission=1)
+        self._history('profile submitted', date(2025, 3, 11), profile_submission=0)
+        dropped = self._history('selected', date(2025, 3, 13))
+
+        job.next_follow_up_date = date(2025, 3, 15)
+        job.save()
+        dropped.delete()
+
+        incremental = self._rollup()
+        self.assertEqual(incremental[(date(2025, 3, 15), 'NFD', 1, 0, 'EMP/00001')], 1)
+        self.assertNotIn((date(2025, 3, 10), 'NFD', 1, 0, 'EMP/00001'), incremental)
+        self.assertEqual(incremental[(date(2025, 3, 11), 'PS', 1, 2, 'EMP/00001')], 1)
+
+        call_command('rebuild_calendar_counts', stdout=StringIO())
+        self.assertEqual(incremental, self._rollup())
+
+    def test_calendar_stats_reads_rollup_with_scope(self):
+        self._history('selected', date(2025, 4, 2))
+        CandidateStatusHistory.objects.create(
+            candidate_id=self.candidate.id, remarks='selected', change_date=date(2025, 4, 2),
+            created_by='EMP/00002', branch_id=5, employee_id='EMP/00002',
+        )
+        response = self.client.get('/api/candidates/calendar-stats/', {'month': '2025-04'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['totals']['selected'], 2)
+
+        response = self.client.get('/api/candidates/calendar-stats/', {'month': '2025-04', 'branch_id': 5})
+        self.assertEqual(response.json()['totals']['selected'], 1)
+        self.assertEqual(response.json()['events'][0]['event_counts']['SEL'], 1)
+
+        response = self.client.get('/api/candidates/calendar-stats/', {'year': '2025', 'executive': 'EMP/00001'})
+        self.assertEqual(response.json()['totals']['selected'], 1)
+        self.assertEqual(calendar_rollup.daily_counts(date(2025, 4, 1), date(2025, 4, 30))[date(2025, 4, 2)]['SEL'], 2)
+
+    def test_calendar_stats_ignores_partial_rollup_until_full_rebuild(self):
+        # Rows from before the rollup existed: no signals, so no rollup rows
+        CandidateStatusHistory.objects.bulk_create([
+            CandidateStatusHistory(candidate_id=self.candidate.id, remarks='selected', change_date=date(2025, 4, day),
+                                   created_by='EMP/00001', employee_id='EMP/00001')
+            for day in (3, 4)
+        ])
+        self._history('selected', date(2025, 4, 5))
+        self.assertEqual(sum(self._rollup().values()), 1)
+
+        response = self.client.get('/api/candidates/calendar-stats/', {'month': '2025-04'})
+        self.assertEqual(response.json()['totals']['selected'], 3)
+
+        call_command('rebuild_calendar_counts', '--from', '2025-04-03', '--to', '2025-04-03', stdout=StringIO())
+        self.assertFalse(DerivedTableBuild.is_built(CalendarDailyCount))
+        call_command('rebuild_calendar_counts', stdout=StringIO())
+        self.assertTrue(DerivedTableBuild.is_built(CalendarDailyCount))
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/candidates/calendar-stats/', {'month': '2025-04'})
+        self.assertEqual(response.json()['totals']['selected'], 3)
+        self.assertFalse(any('candidate_status_history' in query['sql'] for query in captured))
+
+
+class KeysetPaginationTests(APITestCase):
+    """?pagination=cursor walks the list without overlaps or gaps"""
+
+    def setUp(self):
+        for index in range(7):
+            Candidate.objects.create(candidate_name=f'Cursor {index}', mobile1=f'6{index:09d}')
+
+    def _walk(self, url, params, key='id'):
+        ids = []
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        pages = [response.json()]
+        while pages[-1]['next_cursor']:
+            response = self.client.get(url, dict(params, cursor=pages[-1]['next_cursor']))
+            pages.append(response.json())
+        for page in pages:
+            ids.extend(row[key] for row in page['results'])
+        return ids, pages
+
+    def test_list_cursor_pages_cover_every_row_once(self):
+        ids, pages = self._walk('/api/candidates/', {'pagination': 'cursor', 'page_size': 3, 'include_count': 'true'})
+        expected = list(Candidate.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0]['estimated_count'], 7)
+        self.assertIsNone(pages[0]['previous_cursor'])
+
+        # Walking back from the last page returns the middle page
+        previous = self.client.get('/api/candidates/', {'page_size': 3, 'cursor': pages[2]['previous_cursor']}).json()
+        self.assertEqual([row['id'] for row in previous['results']], [row['id'] for row in pages[1]['results']])
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get('/api/candidates/', {'page_size': 3})
+        self.assertEqual(response.json()['count'], 7)
+        self.assertIn('next', response.json())
+
+    def test_job_rows_cursor_query_count_does_not_grow_with_depth(self):
+        for candidate in Candidate.objects.all():
+            ClientJob.objects.create(candidate=candidate, client_name='Acme', designation='Engineer')
+        first = self.client.get('/api/candidates/job-rows/', {'pagination': 'cursor', 'limit': 2}).json()
+        self.assertNotIn('count', first)
+
+        with CaptureQueriesContext(connection) as first_queries:
+            self.client.get('/api/candidates/job-rows/', {'pagination': 'cursor', 'limit': 2})
+        with CaptureQueriesContext(connection) as deep_queries:
+            self.client.get('/api/candidates/job-rows/', {'limit': 2, 'cursor': first['next_cursor']})
+        self.assertEqual(len(first_queries), len(deep_queries))
+
+        ids, _ = self._walk('/api/candidates/job-rows/', {'pagination': 'cursor', 'limit': 2}, key='job_id')
+        self.assertEqual(ids, list(ClientJob.objects.order_by('-updated_at', '-id').values_list('id', flat=True)))
+
+
+class CandidateSearchIndexTests(APITestCase):
+    """candidate_search_document follows Candidate/ClientJob changes and serves the search endpoints"""
+
+    def setUp(self):
+        self.candidate = Candidate.objects.create(
+            candidate_name='Meena Krishnan', mobile1='+91 98400 12345', email='Meena.K@example.com',
+            city='Madurai', profile_number='PROF_SEARCH_1',
+        )
+        Candidate.objects.create(candidate_name='Other Person', mobile1='9000011111', email='other@example.com')
+        DerivedTableBuild.mark_built(CandidateSearchDocument)
+
+    def test_document_tracks_client_jobs(self):
+        job = ClientJob.objects.create(candidate=self.candidate, client_name='Zoho Corp', designation='Telecaller')
+        self.assertIn('zoho corp', self.candidate.search_document.body)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        self.candidate.search_document.refresh_from_db()
+        self.assertNotIn('zoho', self.candidate.search_document.body)
+
+    def test_deleting_candidate_removes_document(self):
+        ClientJob.objects.create(candidate=self.candidate, client_name='Zoho Corp', designation='Telecaller')
+        candidate_id = self.candidate.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate.delete()
+        self.assertFalse(CandidateSearchDocument.objects.filter(candidate_id=candidate_id).exists())
+
+    def test_exact_shortcuts_and_text_terms(self):
+        ClientJob.objects.create(candidate=self.candidate, client_name='Zoho Corp', designation='Telecaller')
+        for term in ['9840012345', '098400 12345', 'meena.k@example.com', 'PROF_SEARCH_1', 'madurai zoho', 'telecal']:
+            matched = candidate_search.filter_candidates(Candidate.objects.all(), term)
+            self.assertEqual(list(matched.values_list('id', flat=True)), [self.candidate.id], term)
+
+    def test_endpoints_use_index(self):
+        response = self.client.get('/api/candidates/', {'search': 'krishnan'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.candidate.id])
+
+        response = self.client.get('/api/candidates/search/', {'term': '9840012345'})
+        self.assertEqual([row['id'] for row in response.json()], [self.candidate.id])
+
+        response = self.client.get('/api/candidates/search/', {'term': 'meena', 'mode': 'fulltext'})
+        self.assertEqual([row['id'] for row in response.json()], [self.candidate.id])
+        response = self.client.get('/api/candidates/search/', {'term': 'meena', 'mode': 'fulltext', 'limit': 'all'})
+        self.assertEqual(response.status_code, 400)
+
+        ClientJob.objects.create(candidate=self.candidate, client_name='Zoho Corp', designation='Telecaller')
+        response = self.client.get('/api/candidates/all/', {'search': 'krishnan'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.candidate.id])
+
+    def test_partial_index_is_not_used_until_rebuilt(self):
+        DerivedTableBuild.objects.all().delete()
+        # Created before the index existed: no signals, no document
+        [legacy] = Candidate.objects.bulk_create([Candidate(candidate_name='Legacy Krishnan', mobile1='9000022222')])
+        self.assertIsNone(candidate_search.filter_candidates(Candidate.objects.all(), 'krishnan'))
+        response = self.client.get('/api/candidates/', {'search': 'krishnan'})
+        self.assertEqual({row['id'] for row in response.json()['results']}, {self.candidate.id, legacy.id})
+        ClientJob.objects.create(candidate=self.candidate, client_name='Zoho Corp', designation='Telecaller')
+        response = self.client.get('/api/candidates/all/', {'search': 'krishnan'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [self.candidate.id])
+
+        call_command('rebuild_candidate_search', missing_only=True, stdout=StringIO())
+        self.assertTrue(CandidateSearchDocument.objects.filter(candidate=legacy).exists())
+        matched = candidate_search.filter_candidates(Candidate.objects.all(), 'krishnan')
+        self.assertEqual(set(matched.values_list('id', flat=True)), {self.candidate.id, legacy.id})
+
+    def test_saves_outside_indexed_fields_skip_the_refresh(self):
+        document = self.candidate.search_document
+        CandidateSearchDocument.objects.filter(pk=document.pk).update(body='stale')
+        self.candidate.feedback = 'Feedback-call: NFD-: Remarks-ok;'
+        self.candidate.save(update_fields=['feedback'])
+        self.assertEqual(CandidateSearchDocument.objects.get(pk=document.pk).body, 'stale')
+
+        job = ClientJob.objects.create(candidate=self.candidate, client_name='Zoho Corp', designation='Telecaller')
+        CandidateSearchDocument.objects.filter(pk=document.pk).update(body='stale')
+        job.profile_submission = 1
+        job.save(update_fields=['profile_submission'])
+        self.assertEqual(CandidateSearchDocument.objects.get(pk=document.pk).body, 'stale')
+
+        self.candidate.city = 'Trichy'
+        self.candidate.save(update_fields=['city'])
+        self.assertIn('trichy', CandidateSearchDocument.objects.get(pk=document.pk).body)
+
+
+class NfdExpiryEngineTests(APITestCase):
+    """Expiry runs outside requests, in chunks, and the endpoints only report it"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='EMP/90010', password='x')
+        today = timezone.now().date()
+        self.expired = []
+        for index in range(5):
+            candidate = Candidate.objects.create(
+                candidate_name=f'Expiry {index}', mobile1=f'5{index:09d}',
+                feedback=f'Feedback-call: NFD-{today - timedelta(days=2)}: EJD-: CallStatus-answered: '
+                         f'Remarks-interested: Entry By-Tester: Entry Time01-01-2024 10:00:00;',
+            )
+            self.expired.append(ClientJob.objects.create(
+                candidate=candidate, client_name='Acme', designation='Engineer', assign_to='EMP/00001',
+                next_follow_up_date=today - timedelta(days=2),
+            ))
+        self.active = ClientJob.objects.create(
+            candidate=Candidate.objects.create(candidate_name='Active', mobile1='5999999999'),
+            client_name='Acme', designation='Engineer', assign_to='EMP/00001',
+            next_follow_up_date=today,
+        )
+
+    def test_run_unassigns_in_chunks_and_records_metrics(self):
+        run = nfd_expiry.run(chunk_size=2)
+        self.assertEqual(run.status, 'success')
+        self.assertEqual(run.jobs_unassigned, 5)
+        self.assertEqual(run.history_rows, 5)
+        self.assertEqual(run.feedback_updated, 5)
+        self.assertEqual(
+            JobAssignmentHistory.objects.filter(reason='expired_nfd', previous_owner='EMP/00001').count(), 5
+        )
+        self.assertFalse(ClientJob.objects.filter(id__in=[job.id for job in self.expired], assign_to__isnull=False).exists())
+        self.assertEqual(ClientJob.objects.get(id=self.active.id).assign_to, 'EMP/00001')
+        self.assertIn('(open profile)', Candidate.objects.get(id=self.expired[0].candidate_id).feedback)
+
+        # A second run the same day has nothing left to do
+        again = nfd_expiry.run(chunk_size=2)
+        self.assertEqual((again.jobs_unassigned, again.feedback_updated), (0, 0))
+
+    def test_overlapping_runs_cannot_both_claim(self):
+        held = NfdExpiryRun.objects.create(threshold=timezone.now().date(), active_lock=nfd_expiry.ACTIVE_LOCK)
+        self.assertIsNone(nfd_expiry.run())
+        self.assertEqual(ClientJob.objects.filter(assign_to__isnull=False).count(), 6)
+
+        # A claim older than STALE_RUN_AFTER belongs to a crashed run
+        NfdExpiryRun.objects.filter(pk=held.pk).update(started_at=timezone.now() - timedelta(hours=3))
+        run = nfd_expiry.run()
+        self.assertEqual((run.status, run.jobs_unassigned, run.history_rows), ('success', 5, 5))
+        self.assertFalse(NfdExpiryRun.objects.filter(active_lock__isnull=False).exists())
+
+    def test_endpoints_only_read(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/update-expired-nfd/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pending_count'], 5)
+        self.assertIsNone(response.data['last_run'])
+        self.assertEqual(ClientJob.objects.filter(assign_to__isnull=False).count(), 6)
+
+        call_command('expire_nfds', stdout=StringIO())
+        response = self.client.post('/api/cleanup-expired-jobs/')
+        self.assertEqual(response.data['updated_count'], 5)
+        self.assertEqual(response.data['pending_count'], 0)
+        self.assertEqual(NfdExpiryRun.objects.count(), 1)
+
+        response = self.client.get(f'/api/client-jobs/{self.active.id}/get-feedback-entries/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(NfdExpiryRun.objects.count(), 1)
+
+    def test_beat_schedule_runs_a_registered_task(self):
+        from backend import celery_app
+        if celery_app is None:
+            self.skipTest('celery not installed')
+        celery_app.loader.import_default_modules()
+        for entry in settings.CELERY_BEAT_SCHEDULE.values():
+            self.assertIn(entry['task'], celery_app.tasks)
+        self.assertEqual(settings.CELERY_BEAT_SCHEDULE['expire-nfds']['task'], 'candidate.tasks.expire_nfds')
+
+
+class BulkStatusHistoryTests(APITestCase):
+    """Bulk status ingestion applies create_status_entry's de-dup rules in one pass"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='EMP/90011', password='x')
+        self.day = date(2024, 3, 5)
+        self.candidate = Candidate.objects.create(candidate_name='Bulk', mobile1='4000000001')
+        self.job = ClientJob.objects.create(candidate=self.candidate, client_name='Acme', designation='Engineer')
+        CandidateStatusHistory.objects.create(
+            candidate_id=self.candidate.id, client_job_id=self.job.id, remarks='Interested',
+            change_date=self.day, created_by='EMP/00001', employee_id='EMP/00001', profile_submission=0,
+        )
+
+    def _event(self, remarks, **extra):
+        event = dict(candidate_id=self.candidate.id, client_job_id=self.job.id, remarks=remarks,
+                     change_date=self.day.isoformat(), created_by='EMP/00001')
+        event.update(extra)
+        return event
+
+    def test_rules_apply_against_table_and_batch(self):
+        result = CandidateStatusHistory.bulk_create_status_entries([
+            self._event('Interested'),                                    # exists in the table
+            self._event('Interview Fixed', attend_flag=True),
+            self._event('Interview Fixed', attend_flag=True),             # same status/day in the batch
+            self._event('Attended', attend_flag=True),                    # second attendance -> demoted
+            self._event('Profile Submitted', profile_submission=1),
+            self._event('Profile Submitted', profile_submission=1, change_date='2024-03-06'),  # not first
+            {'remarks': 'No candidate'},
+        ])
+        self.assertEqual([item['reason'] for item in result['skipped']], ['interested_exists'])
+        self.assertEqual([item['index'] for item in result['existing']], [2])
+        self.assertEqual([item['index'] for item in result['errors']], [6])
+
+        rows = {(row.remarks, row.change_date.day): row for row in CandidateStatusHistory.objects.all()}
+        self.assertEqual(len(rows), 5)
+        self.assertTrue(rows[('Interview Fixed', 5)].attend_flag)
+        self.assertFalse(rows[('Attended', 5)].attend_flag)
+        self.assertEqual(rows[('Profile Submitted', 5)].profile_submission, 1)
+        self.assertEqual(rows[('Profile Submitted', 6)].profile_submission, 0)
+        self.assertEqual(rows[('Profile Submitted', 5)].employee_id, 'EMP/00001')
+
+        job = ClientJob.objects.get(id=self.job.id)
+        self.assertEqual((job.profile_submission, job.profile_submission_date), (1, self.day))
+        # Rollup sees the bulk rows even though bulk_create skips post_save
+        self.assertEqual(calendar_rollup.daily_counts(self.day, self.day)[self.day], {'ATND': 1, 'PS': 1})
+
+    def test_endpoint_query_count_does_not_grow_with_batch(self):
+        self.client.force_authenticate(self.user)
+
+        def post(count, offset):
+            events = [self._event(f'Called {offset + index}') for index in range(count)]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/status-history/bulk-create/', {'events': events}, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.data['created_count'], count)
+            return len(ctx)
+
+        post(1, 1000)  # warm the employee directory cache
+        self.assertEqual(post(3, 0), post(30, 100))
+        response = self.client.post('/api/status-history/bulk-create/', {'events': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+RESUME_TEXT = b"""Priya Raman
+priya.raman@example.com
++91 9876543210
+
+SKILLS
+python django sql
+"""
+
+
+@override_settings(RESUME_PARSE_BACKEND='inline')
+class ResumeParseJobTests(APITestCase):
+    """Uploads queue a parse job; results are polled and written to the candidate"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.user = User.objects.create_user(username='EMP/90012', password='x')
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _file(self, name='resume.txt'):
+        return SimpleUploadedFile(name, RESUME_TEXT, content_type='text/plain')
+
+    def test_async_upload_returns_job_and_status_endpoint_reports_result(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post('/api/parse-resume/?async=true', {'file': self._file()}, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job_id']
+        self.assertEqual(self.client.get(f'/api/parse-resume/{job_id}/').data['status'], 'queued')
+
+        for callback in callbacks:
+            callback()
+        data = self.client.get(f'/api/parse-resume/{job_id}/').data
+        self.assertEqual(data['status'], 'success')
+        self.assertEqual(data['result']['data']['email'], 'priya.raman@example.com')
+        self.assertFalse(ResumeParseJob.objects.get(job_id=job_id).upload)
+
+        missing = self.client.get('/api/parse-resume/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(missing.status_code, 404)
+
+    def test_sync_upload_keeps_response_shape(self):
+        response = self.client.post('/api/parse-resume/', {'file': self._file()}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['success'])
+        self.assertEqual(ResumeParseJob.objects.get().backend, 'inline')
+        # Parsed from memory: nothing stored for the job
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'resume_parse_jobs')))
+
+    @override_settings(RESUME_CACHE_ENABLED=False)
+    def test_jobs_orphaned_by_a_dead_worker_are_requeued(self):
+        # Claimed by a pool whose web worker was recycled before the result came back
+        orphaned = resume_jobs.create_upload_job(self._file('orphaned.txt'))
+        ResumeParseJob.objects.filter(pk=orphaned.pk).update(
+            status='running', backend='process', started_at=timezone.now() - timedelta(hours=1))
+        busy = resume_jobs.create_upload_job(self._file('busy.txt'))
+        ResumeParseJob.objects.filter(pk=busy.pk).update(status='running', started_at=timezone.now())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('requeue_resume_jobs', stdout=StringIO())
+        orphaned.refresh_from_db()
+        self.assertEqual((orphaned.status, orphaned.backend), ('success', 'inline'))
+        self.assertEqual(orphaned.result['data']['email'], 'priya.raman@example.com')
+        self.assertEqual(ResumeParseJob.objects.get(pk=busy.pk).status, 'running')
+        self.assertEqual(resume_jobs.requeue_stale(), [])
+
+    def test_candidate_upload_updates_candidate_when_job_completes(self):
+        candidate = Candidate.objects.create(candidate_name='Priya', mobile1='4000000002')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/api/candidates/{candidate.id}/upload-resume/', {'resume_file': self._file()}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 202)
+        job = ResumeParseJob.objects.get(job_id=response.data['job_id'])
+        candidate.refresh_from_db()
+        self.assertEqual((job.status, job.candidate_id), ('success', candidate.id))
+        self.assertEqual(candidate.resume_parsed_data['email'], 'priya.raman@example.com')
+        self.assertIn('python django sql', candidate.resume_text)
+
+
+@override_settings(RESUME_PARSE_BACKEND='inline')
+class ResumeCacheTests(APITestCase):
+    """Identical files reuse one cached parse / PDF conversion; the cache is LRU bounded"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_duplicate_upload_is_served_from_cache(self):
+        first = self.client.post('/api/parse-resume/', {
+            'file': SimpleUploadedFile('a.txt', RESUME_TEXT, content_type='text/plain')}, format='multipart')
+        second = self.client.post('/api/parse-resume/?async=true', {
+            'file': SimpleUploadedFile('b.txt', RESUME_TEXT, content_type='text/plain')}, format='multipart')
+        self.assertTrue(first.data['success'])
+        self.assertNotIn('cache_hit', first.data)
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.data['result']['cache_hit'])
+        self.assertEqual(second.data['result']['data'], first.data['data'])
+        job = ResumeParseJob.objects.get(job_id=second.data['job_id'])
+        self.assertEqual((job.status, job.backend), ('success', 'cache'))
+        self.assertFalse(job.upload)
+
+    def test_word_to_pdf_uses_cached_conversion(self):
+        docx = b'PK fake docx bytes'
+        resume_cache.put_pdf(resume_cache.content_hash(docx), self._pdf(b'%PDF-1.4 cached'))
+        response = self.client.post('/api/convert-word-to-pdf/', {'file': SimpleUploadedFile(
+            'cv.docx', docx,
+            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document')},
+            format='multipart')
+        self.assertEqual(response.status_code, 200)
+        # Streamed straight from the cache entry
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 cached')
+        response.close()
+
+    def test_eviction_removes_least_recently_used(self):
+        for index in range(3):
+            resume_cache.put_parse(f'{index:064x}', {'success': True, 'data': {'raw_text': 'x' * 400}})
+        # Touch entry 0 so entry 1 is the oldest
+        old = timezone.now().timestamp() - 100
+        for index in range(3):
+            os.utime(resume_cache._entry_dir(f'{index:064x}'), (old + index, old + index))
+        self.assertIsNotNone(resume_cache.get_parse(f'{0:064x}'))
+
+        resume_cache.evict(limit=1000)
+        self.assertIsNotNone(resume_cache.get_parse(f'{0:064x}'))
+        self.assertIsNone(resume_cache.get_parse(f'{1:064x}'))
+        self.assertIsNotNone(resume_cache.get_parse(f'{2:064x}'))
+
+    @override_settings(RESUME_CACHE_MAX_BYTES=10000)
+    def test_puts_evict_after_writing_a_tenth_of_the_limit(self):
+        resume_cache.evict()
+        for index in range(40):
+            resume_cache.put_parse(f'{index:064x}', {'success': True, 'data': {'raw_text': 'x' * 400}})
+        total = sum(size for _, size, _ in resume_cache._entries())
+        self.assertLessEqual(total, 10000 + 1000)
+        self.assertIsNotNone(resume_cache.get_parse(f'{39:064x}'))
+        self.assertIsNone(resume_cache.get_parse(f'{0:064x}'))
+
+        call_command('prune_resume_cache', '--max-bytes', '0', stdout=StringIO())
+        self.assertEqual(resume_cache._entries(), [])
+
+    def test_results_from_another_parser_version_are_ignored(self):
+        key = resume_cache.content_hash(RESUME_TEXT)
+        entry = resume_cache._entry_dir(key)
+        os.makedirs(entry)
+        with open(os.path.join(entry, 'parse.json'), 'w') as handle:
+            json.dump({'success': True, 'data': {'email': 'stale@example.com'}}, handle)
+        self.assertIsNone(resume_cache.get_parse(key))
+
+        response = self.client.post('/api/parse-resume/', {
+            'file': SimpleUploadedFile('a.txt', RESUME_TEXT, content_type='text/plain')}, format='multipart')
+        self.assertEqual(response.data['data']['email'], 'priya.raman@example.com')
+        self.assertEqual(os.listdir(entry), [resume_cache.PARSE_FILENAME])
+        self.assertEqual(resume_cache.get_parse(key)['data']['email'], 'priya.raman@example.com')
+
+    def _pdf(self, content):
+        path = os.path.join(self.media_root, 'converted.pdf')
+        with open(path, 'wb') as handle:
+            handle.write(content)
+        return path
+
+
+class KeywordMatcherTests(TestCase):
+    """Resume keyword tables compile to one boundary-aware regex per table"""
+
+    def tearDown(self):
+        alternative_parser.reset_location_matchers()
+
+    def test_boundaries_priority_and_symbols(self):
+        matcher = KeywordMatcher({'java': 'Java', 'javascript': 'JavaScript', 'c++': 'C++', '+2': '+2'})
+        self.assertEqual(matcher.find_all('JavaScript, C++ and +2'), ['JavaScript', 'C++', '+2'])
+        self.assertEqual(matcher.find_all('javas cript'), [])
+        self.assertEqual(matcher.first('c++ then java'), 'Java')
+
+    def test_field_extraction(self):
+        text = 'Priya\nMumbai, Tamil Nadu\nB.Tech, 12th\nSkills: Python, React.js, MS Office\nworked as analyst or lead'
+        self.assertEqual(alternative_parser.extract_state(text), 'Tamil Nadu')
+        self.assertEqual(alternative_parser.extract_city(text), 'Mumbai')
+        self.assertEqual(alternative_parser.extract_skills(text), ['Python', 'React', 'Js', 'Ms Office'])
+        self.assertEqual(alternative_parser.extract_education(text), {'qualification': 'B.Tech', 'level': 'UG'})
+        # Abbreviations only as capitalised tokens
+        self.assertIsNone(alternative_parser.extract_state('worked as analyst or lead'))
+        self.assertEqual(alternative_parser.extract_state('Salem, TN'), 'Tamil Nadu')
+
+    def test_location_tables_extend_builtin_lists(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root):
+            alternative_parser.reset_location_matchers()
+            self.assertIsNone(alternative_parser.extract_city('Lives in Coimbatore'))
+            path = alternative_parser.location_terms_path()
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as handle:
+                handle.write('{"states": [], "cities": ["Coimbatore", "Mumbai"]}')
+            alternative_parser.reset_location_matchers()
+            self.assertEqual(alternative_parser.extract_city('Lives in Coimbatore'), 'Coimbatore')
+            # Built-in order still wins
+            self.assertEqual(alternative_parser.extract_city('Coimbatore / Mumbai'), 'Mumbai')
+
+
+@override_settings(RESUME_MAX_PAGES=3, RESUME_PARALLEL_PAGES=0)
+class TextExtractionTests(TestCase):
+    """PDF text comes from the first installed backend, capped at RESUME_MAX_PAGES"""
+
+    def setUp(self):
+        import pymupdf
+
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.path = os.path.join(self.directory, 'cv.pdf')
+        document = pymupdf.open()
+        for number in range(5):
+            page = document.new_page()
+            page.insert_text((72, 72), f'Page {number} Priya Raman priya@example.com Chennai Python')
+        document.save(self.path)
+        document.close()
+
+    def test_page_cap_and_metrics(self):
+        result = text_extraction.extract_pdf(self.path)
+        self.assertEqual((result.pages_total, result.pages_read, result.backend), (5, 3, 'pymupdf'))
+        self.assertIn('Page 2', result.text)
+        self.assertNotIn('Page 3', result.text)
+
+        parsed = alternative_parser.alternative_parse_resume(self.path)
+        self.assertTrue(parsed['success'])
+        self.assertEqual(parsed['data']['no_of_pages'], 5)
+        self.assertEqual(parsed['data']['pages_parsed'], 3)
+        self.assertIn('extraction_ms', parsed['data'])
+        self.assertEqual(parsed['data']['city'], 'Chennai')
+
+    def test_bytes_and_file_objects_are_read_in_memory(self):
+        with open(self.path, 'rb') as handle:
+            data = handle.read()
+        for source in (data, BytesIO(data)):
+            result = text_extraction.extract_pdf(source)
+            self.assertEqual((result.pages_total, result.pages_read), (5, 3))
+            self.assertIn('Page 2', result.text)
+
+        parsed = alternative_parser.alternative_parse_resume(data, 'cv.pdf')
+        self.assertTrue(parsed['success'])
+        self.assertEqual(parsed['data']['email'], 'priya@example.com')
+
+        upload = SimpleUploadedFile('cv.pdf', data, content_type='application/pdf')
+        parsed = alternative_parser.alternative_parse_resume(upload)
+        self.assertEqual(parsed['data']['pages_parsed'], 3)
+
+    def test_backends_are_interchangeable(self):
+        texts = {}
+        for name in text_extraction.DEFAULT_BACKENDS:
+            with override_settings(RESUME_PDF_BACKENDS=(name,)):
+                result = text_extraction.extract_pdf(self.path, max_pages=0)
+            self.assertEqual((result.backend, result.pages_read), (name, 5))
+            texts[name] = ' '.join(result.text.split())
+        self.assertEqual(len(set(texts.values())), 1)
+
+
+class IngestResumesCommandTests(TestCase):
+    """Bulk import skips known contacts and resumes from its checkpoint"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.source = os.path.join(self.directory, 'resumes')
+        os.makedirs(self.source)
+        self.override = override_settings(MEDIA_ROOT=os.path.join(self.directory, 'media'))
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+
+    def _write(self, name, full_name, email, phone):
+        with open(os.path.join(self.source, name), 'w') as handle:
+            handle.write(f'{full_name}\n{email}\n{phone}\n\nSKILLS\npython sql\n')
+
+    def _ingest(self, *args):
+        out = StringIO()
+        call_command('ingest_resumes', self.source, '--workers', '0', '--batch-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dedupes_and_resumes_from_checkpoint(self):
+        Candidate.objects.create(candidate_name='Known', mobile1='+91 9000000001', email='old@example.com')
+        self._write('a.txt', 'Arun Kumar', 'arun@example.com', '+91 9000000001')   # existing mobile
+        self._write('b.txt', 'Divya Raj', 'divya@example.com', '+91 9000000002')
+        self._write('c.txt', 'Divya Copy', 'DIVYA@example.com', '+91 9000000003')  # same email as b
+        self._write('d.txt', 'Meena Balaji', 'meena@example.com', '+91 9000000004')
+        self._write('notes.md', 'Not A Resume', 'x@example.com', '+91 9000000005')
+
+        output = self._ingest()
+        self.assertIn('Candidates created: 2, duplicates skipped: 2, failed: 0', output)
+        created = Candidate.objects.filter(source='Resume Import').order_by('email')
+        self.assertEqual([c.email for c in created], ['divya@example.com', 'meena@example.com'])
+        self.assertEqual(created[0].mobile1, '9000000002')
+        self.assertEqual(created[0].created_by, 'System')
+        self.assertTrue(created[0].resume_file.name.startswith('resumes/'))
+        self.assertEqual(
+            CandidateSearchDocument.objects.filter(candidate__in=created).count(), 2
+        )
+
+        self._write('e.txt', 'Karthik Raj', 'karthik@example.com', '+91 9000000006')
+        output = self._ingest()
+        self.assertIn('5 resumes, 4 already processed, 1 to parse', output)
+        self.assertEqual(Candidate.objects.filter(source='Resume Import').count(), 3)
+
+    def test_dry_run_leaves_the_checkpoint_alone(self):
+        self._write('a.txt', 'Arun Kumar', 'arun@example.com', '+91 9000000011')
+        self._write('b.txt', 'Divya Raj', 'divya@example.com', '+91 9000000012')
+
+        output = self._ingest('--dry-run')
+        self.assertIn('Candidates created: 2', output)
+        self.assertFalse(Candidate.objects.filter(source='Resume Import').exists())
+        self.assertFalse(os.path.exists(f'{self.source}.ingest.json'))
+
+        output = self._ingest()
+        self.assertIn('2 resumes, 0 already processed, 2 to parse', output)
+        self.assertEqual(Candidate.objects.filter(source='Resume Import').count(), 2)
+
+
+class ResumeNLPServiceTests(APITestCase):
+    """The spaCy pipeline is loaded once per process and reports its state"""
+
+    def test_service_is_shared_and_loads_once(self):
+        service = resume_nlp.get_service()
+        self.assertIs(resume_nlp.get_service(), service)
+        self.assertIs(resume_nlp.warm_up(), service)
+        status_after_load, loaded_at = service.status, service.loaded_at
+        self.assertNotEqual(status_after_load, 'not_loaded')
+        service.load()
+        self.assertEqual((service.status, service.loaded_at), (status_after_load, loaded_at))
+
+        response = self.client.get('/api/parse-resume/health/')
+        self.assertEqual(response.status_code, 200)
+        health = response.data['nlp']
+        self.assertEqual(health['status'], service.status)
+        self.assertIn('rss_bytes', health)
+        self.assertIn('model_rss_bytes', health)
+
+        # Loading the model on demand is for admins only
+        self.assertIn(self.client.get('/api/parse-resume/health/', {'warm': 'true'}).status_code, (401, 403))
+        self.client.force_authenticate(User.objects.create_user(username='EMP/90030', password='x'))
+        self.assertEqual(self.client.get('/api/parse-resume/health/', {'warm': 'true'}).status_code, 403)
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='x', is_staff=True))
+        self.assertEqual(self.client.get('/api/parse-resume/health/', {'warm': 'true'}).status_code, 200)
+
+    @override_settings(RESUME_NLP_ENABLED=False)
+    def test_disabled_service_leaves_regex_fields_alone(self):
+        service = resume_nlp.ResumeNLPService().load()
+        self.assertEqual(service.status, 'disabled')
+        self.assertFalse(service.has_ner)
+        self.assertEqual(service.extract_fields('Priya Raman\nChennai', {'city': None}), {})
+
+
+class SharedCacheTests(APITestCase):
+    """Cached report data is keyed on data versions that model writes bump"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from Masters.models import Remark
+
+        shared_cache.flush_stats()  # counts left over from earlier tests go before the clear
+        cache.clear()
+        self.user = User.objects.create_user(username='EMP/90020', password='x')
+        self.client.force_authenticate(self.user)
+        Remark.objects.create(name='interested')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate = Candidate.objects.create(candidate_name='Cache', mobile1='4000000030', city='Chennai')
+            ClientJob.objects.create(candidate=self.candidate, client_name='Acme', designation='Engineer',
+                                     remarks='interested')
+
+    def _counts(self):
+        response = self.client.get('/api/candidates/remarks-with-counts/', {'city': 'Chennai'})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results'][0]['total_count'], response.data['cached']
+
+    def test_counts_are_cached_until_a_write_commits(self):
+        self.assertEqual(self._counts(), (1, False))
+        self.assertEqual(self._counts(), (1, True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ClientJob.objects.create(candidate=self.candidate, client_name='Beta', designation='Engineer',
+                                     remarks='interested')
+        self.assertEqual(self._counts(), (2, False))
+
+        stats = self.client.get('/api/cache-stats/').data
+        self.assertEqual(stats['shared']['remarks_counts']['hits'], 1)
+        self.assertEqual(stats['shared']['remarks_counts']['misses'], 2)
+
+    def test_lookups_count_locally_and_flush_in_batches(self):
+        from django.core.cache import cache
+
+        shared_cache.flush_stats()
+        for _ in range(3):
+            shared_cache.get('batched:1:x')
+        self.assertIsNone(cache.get(shared_cache.STATS_KEY.format('batched', 'misses')))
+        self.assertEqual(shared_cache.stats()['shared']['batched']['misses'], 3)
+
+        for _ in range(shared_cache.STATS_FLUSH_EVERY):
+            shared_cache.get('batched:1:x')
+        self.assertEqual(cache.get(shared_cache.STATS_KEY.format('batched', 'misses')), 3 + shared_cache.STATS_FLUSH_EVERY)
+
+    def test_writes_in_one_transaction_bump_once(self):
+        before = shared_cache.versions('candidate', 'client_job')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            for index in range(3):
+                Candidate.objects.create(candidate_name=f'Bulk {index}', mobile1=f'40000000{40 + index}')
+                ClientJob.objects.create(candidate=self.candidate, client_name=f'C{index}', designation='X')
+        self.assertEqual(len([c for c in callbacks if hasattr(c, 'shared_cache_namespaces')]), 1)
+        for callback in callbacks:
+            callback()
+        after = shared_cache.versions('candidate', 'client_job')
+        self.assertEqual(after['candidate'], before['candidate'] + 1)
+        self.assertEqual(after['client_job'], before['client_job'] + 1)
+
+
+class CandidateRevenueSummaryTests(APITestCase):
+    """The revenue list header comes from one aggregate on each candidate's latest job status"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(username='EMP/90030', password='x')
+        self.client.force_authenticate(self.user)
+        rows = [
+            # (latest job status, revenue status, revenue)
+            ('Joined', 'Claimed', '1000'),
+            ('Joined', 'Pending', '500'),
+            ('Joined', 'Processing', '250'),
+            ('Abscond', 'Claimed', '700'),
+            ('Interview', 'Pending', '300'),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for index, (status, revenue_status, revenue) in enumerate(rows):
+                candidate = Candidate.objects.create(candidate_name=f'Revenue {index}', mobile1=f'41000000{index:02d}')
+                # An older job with a different status must not count
+                ClientJob.objects.create(candidate=candidate, client_name='Old', designation='X', profilestatus='Joined')
+                job = ClientJob.objects.create(candidate=candidate, client_name='Acme', designation='X',
+                                               profilestatus=status)
+                CandidateRevenue.objects.create(candidate=candidate, client_job=job, revenue=revenue,
+                                                revenue_status=revenue_status)
+
+    def _list(self, **params):
+        employee_directory.resolve(['EMP/90030'])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/candidate-revenues/', {'page': 1, **params})
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        return response.data, len(queries)
+
+    def test_header_counts_and_query_budget(self):
+        data, queries = self._list()
+        self.assertLessEqual(queries, 2)
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(
+            (data['claimed_count'], data['pending_count'], data['processing_count'],
+             data['joined_count'], data['abscond_count']),
+            (1, 2, 1, 3, 1),
+        )
+        self.assertEqual(float(data['total_revenue']), 1750)
+        statuses = sorted(row['profile_status'] for row in data['results'])
+        self.assertEqual(statuses, ['Abscond', 'Interview', 'Joined', 'Joined', 'Joined'])
+        self.assertEqual({row['client_name'] for row in data['results']}, {'Acme'})
+
+        # Cached header: only the page query
+        _, queries = self._list()
+        self.assertEqual(queries, 1)
+
+    def test_client_filter_and_invalidation(self):
+        data, _ = self._list(client='acme')
+        self.assertEqual(data['count'], 5)
+        data, _ = self._list(client='acm')
+        self.assertEqual(data['count'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CandidateRevenue.objects.filter(revenue_status='Pending').first().delete()
+        data, queries = self._list(client='acme')
+        self.assertEqual(queries, 2)
+        self.assertEqual(data['count'], 4)
+
+
+class ReportFactTests(APITestCase):
+    """clientwise / employeewise reports read client_job_report_facts, kept in step with ClientJob"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='EMP/91001', password='x')
+        self.client.force_authenticate(self.user)
+        Employee.objects.create(user=self.user, employeeCode='EMP/91001', firstName='Alpha', lastName='One',
+                                phone1='9100000001', branch='CHENNAI', level='L1')
+        Employee.objects.create(employeeCode='EMP/91002', firstName='Beta', lastName='Two',
+                                phone1='9100000002', branch='MADURAI', level='L1')
+        candidates = [
+            Candidate.objects.create(candidate_name=f'Report {index}', mobile1=f'91000000{index:02d}',
+                                     executive_name=executive, state='Tamil Nadu', city=city)
+            for index, (executive, city) in enumerate([
+                ('EMP/91001', 'Chennai'), ('EMP/91001', 'Chennai'), ('EMP/91001', 'Madurai'),
+                ('EMP/91001', 'Chennai'), ('EMP/91002', 'Coimbatore'),
+            ])
+        ]
+        jobs = [
+            (0, 'Acme', 'Selected', dict(profile_submission=1, attend=True, transfer_status='Active')),
+            (1, 'Acme', 'Rejected', dict(profile_submission=1, assign_to='EMP/91002', assigned_from='EMP/91001',
+                                         transfer_status='Active')),
+            (2, 'Beta', 'Interview Fixed', {}),
+            (3, 'Beta', 'No Show', dict(profile_submission=1, assigned_from='EMP/91002', transfer_status='Inactive')),
+            (4, 'Acme', 'Feedback Pending', dict(attend=True)),
+            (0, 'Beta', None, {}),
+            (4, 'Zeta', 'Selected', {}),
+        ]
+        self.jobs = [
+            ClientJob.objects.create(candidate=candidates[index], client_name=client, designation='X',
+                                     remarks=remarks, **extra)
+            for index, client, remarks, extra in jobs
+        ]
+        # Bulk writes go through track_jobs
+        old = ClientJob.objects.filter(pk=self.jobs[-1].pk)
+        with report_facts.track_jobs(old):
+            old.update(updated_at=timezone.make_aware(datetime(2024, 1, 5, 10, 0)))
+        self.today = timezone.localdate().isoformat()
+
+    def _facts(self):
+        return {(row.key_hash, row.jobs) for row in ClientJobReportFact.objects.all() if row.jobs}
+
+    def _get(self, report, **params):
+        response = self.client.get(f'/api/candidates/{report}-report/', params)
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        return response.data
+
+    def test_signals_match_rebuild(self):
+        # Edits, candidate owner/city changes and deletes all move counts
+        self.jobs[2].remarks = 'Selected'
+        self.jobs[2].save()
+        candidate = self.jobs[3].candidate
+        candidate.executive_name = 'EMP/91002'
+        candidate.city = 'Salem'
+        candidate.save()
+        self.jobs[5].delete()
+
+        incremental = self._facts()
+        call_command('rebuild_report_facts', stdout=StringIO())
+        self.assertEqual(incremental, self._facts())
+        self.assertEqual(ClientJobReportFact.objects.filter(day=date(2024, 1, 5)).get().client_name, 'Zeta')
+
+    def test_migration_backfills_jobs_from_before_the_fact_table(self):
+        import importlib
+        from django.apps import apps
+
+        expected = self._facts()
+        ClientJobReportFact.objects.all().delete()
+        self.assertEqual(self._get('clientwise'), [])
+
+        migration = importlib.import_module('candidate.migrations.0071_backfill_report_facts')
+        migration.backfill_report_facts(apps, None)
+        self.assertEqual(self._facts(), expected)
+        self.assertEqual({row['client_name'] for row in self._get('clientwise')}, {'Acme', 'Beta', 'Zeta'})
+
+    def test_reports_read_facts(self):
+        rows = {row['client_name']: row for row in self._get('clientwise')}
+        self.assertEqual((rows['Acme']['total'], rows['Acme']['selected'], rows['Acme']['rejected']), (3, 1, 1))
+        self.assertEqual((rows['Acme']['profile_submitted'], rows['Acme']['attended_count']), (2, 2))
+        self.assertEqual((rows['Beta']['others'], rows['Beta']['profile_submitted_inactive']), (2, 1))
+
+        rows = self._get('clientwise', start_date=self.today, end_date=self.today, city='chennai')
+        self.assertEqual(sorted(row['client_name'] for row in rows), ['Acme', 'Beta'])
+
+        rows = {row['employee_code']: row for row in self._get('employeewise')}
+        # EMP/91002 owns the reassigned Acme job and Zeta, and is the previous owner of the No Show job
+        self.assertEqual((rows['EMP/91002']['total'], rows['EMP/91002']['profile_submitted_inactive']), (3, 1))
+        self.assertEqual(sorted(rows['EMP/91002']['clients']), ['Acme', 'Beta', 'Zeta'])
+        self.assertEqual(rows['EMP/91001']['total'], 4)
+
+        rows = self._get('employeewise', executive='EMP/91002', owner_by='previous',
+                         start_date='2024-01-01', end_date='2024-01-31')
+        self.assertEqual(rows, [])
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class ExportTests(APITestCase):
+    """Exports stream every matching row in keyset batches, with names resolved per batch"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='EMP/92001', password='x')
+        self.client.force_authenticate(self.user)
+        Employee.objects.create(user=self.user, employeeCode='EMP/92001', firstName='Export', lastName='Owner',
+                                phone1='9200000001', branch='CHENNAI', level='L1')
+        for index in range(5):
+            candidate = Candidate.objects.create(candidate_name=f'Export {index}', mobile1=f'92000000{index:02d}',
+                                                 executive_name='EMP/92001', city='Chennai')
+            ClientJob.objects.create(candidate=candidate, client_name=f'Client {index}', designation='X',
+                                     remarks='interested', assign_to='EMP/92001')
+        # Ties on updated_at must not drop or repeat rows across batch boundaries
+        stamp = timezone.now()
+        ClientJob.objects.update(updated_at=stamp)
+        Candidate.objects.update(updated_at=stamp)
+
+    def _csv(self, url, **params):
+        import csv
+
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        text = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.DictReader(StringIO(text)))
+
+    def test_job_rows_export(self):
+        rows = self._csv('/api/candidates/job-rows/export/', client='client')
+        self.assertEqual(sorted(row['Client'] for row in rows), [f'Client {index}' for index in range(5)])
+        self.assertEqual({row['Assign To'] for row in rows}, {'Export Owner'})
+        self.assertEqual(len(self._csv('/api/candidates/job-rows/export/', client='Client 3')), 1)
+
+    def test_databank_export(self):
+        rows = self._csv('/api/candidates/all/export/', city='Chennai')
+        self.assertEqual(len({row['Candidate ID'] for row in rows}), 5)
+        self.assertEqual({row['Executive'] for row in rows}, {'Export Owner'})
+        self.assertEqual(sorted(row['Latest Client'] for row in rows), [f'Client {index}' for index in range(5)])
+        # Search goes through the same filters (it used to fail on a shadowed module name)
+        self.assertEqual([row['Candidate Name'] for row in self._csv('/api/candidates/all/export/', search='Export 3')],
+                         ['Export 3'])
+        self.assertEqual(self.client.get('/api/candidates/all/', {'search': 'Export 3'}).data['count'], 1)
+
+    def test_formula_like_text_is_escaped(self):
+        Candidate.objects.filter(candidate_name='Export 0').update(candidate_name='=HYPERLINK("http://evil","x")')
+        ClientJob.objects.filter(client_name='Client 1').update(client_name='@SUM(A1:A2)')
+        names = {row['Candidate Name'] for row in self._csv('/api/candidates/all/export/', city='Chennai')}
+        self.assertIn('\'=HYPERLINK("http://evil","x")', names)
+        clients = {row['Client'] for row in self._csv('/api/candidates/job-rows/export/', client='SUM')}
+        self.assertIn("'@SUM(A1:A2)", clients)
+
+        self.assertEqual([exports.format_value(value) for value in ('+91 98400', '-1', '\tx', 'safe = ok', -5)],
+                         ["'+91 98400", "'-1", "'\tx", 'safe = ok', -5])
+        self.assertEqual(exports.format_value(['=1', 'b']), "'=1, b")
+
+    def test_report_export_and_format_check(self):
+        rows = self._csv('/api/candidates/clientwise-report/', export='csv')
+        self.assertEqual(len(rows), 5)
+        self.assertIn('Client Name', rows[0])
+        response = self.client.get('/api/candidates/job-rows/export/', {'export': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+
+PROFILED_MIDDLEWARE = ['backend.perf.ProfilingMiddleware'] + settings.MIDDLEWARE
+
+
+@override_settings(MIDDLEWARE=PROFILED_MIDDLEWARE, PERF_BUFFER_SIZE=5, PERF_DEFAULT_QUERY_BUDGET=None,
+                   PERF_QUERY_BUDGETS={'candidate-detail': 2})
+class ProfilingMiddlewareTests(APITestCase):
+    """Opt-in request profiling: ring buffer, /api/_perf/, perf_report and query budgets"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.admin = User.objects.create_user(username='perf-admin', password='x', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.candidates = [
+            Candidate.objects.create(candidate_name=f'Perf {index}', mobile1=f'70000000{index:02d}')
+            for index in range(3)
+        ]
+
+    def test_records_and_budget(self):
+        for candidate in self.candidates:
+            with self.assertLogs('backend.perf', level='WARNING') as logs:
+                self.assertEqual(self.client.get(f'/api/candidates/{candidate.id}/').status_code, 200)
+        self.assertIn('candidate-detail ran', logs.output[0])
+        self.client.get('/api/cache-stats/')
+
+        rows = perf.records()
+        self.assertEqual([row['endpoint'] for row in rows], ['candidate-detail'] * 3 + ['cache-stats'])
+        self.assertTrue(all(row['queries'] > 2 and row['over_budget'] for row in rows[:3]))
+        self.assertGreater(rows[0]['bytes'], 0)
+
+        # Ring buffer keeps the last PERF_BUFFER_SIZE requests
+        for _ in range(3):
+            self.client.get('/api/cache-stats/')
+        self.assertEqual([row['endpoint'] for row in perf.records()], ['candidate-detail'] + ['cache-stats'] * 4)
+
+    def test_duplicate_query_fingerprints(self):
+        self.assertEqual(perf.fingerprint('SELECT 1 FROM t WHERE id IN (%s, %s,  %s)'),
+                         perf.fingerprint('SELECT 1 FROM t WHERE id IN (%s)'))
+        log = perf._QueryLog()
+        for sql in ['SELECT a WHERE id = %s'] * 3 + ['SELECT b']:
+            log(lambda *args: None, sql, (), False, {})
+        self.assertEqual(log.duplicates(), (2, [(3, 'SELECT a WHERE id = %s')]))
+
+    def test_perf_endpoint_and_command(self):
+        self.client.get(f'/api/candidates/{self.candidates[0].id}/')
+        response = self.client.get('/api/_perf/', {'sort': 'max_queries'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['buffered_requests'], 1)  # /api/_perf/ itself is not recorded
+        self.assertEqual(response.data['endpoints'][0]['endpoint'], 'candidate-detail')
+        self.assertEqual(response.data['endpoints'][0]['budget'], 2)
+        self.assertEqual(self.client.get('/api/_perf/', {'sort': 'bogus'}).status_code, 400)
+
+        out = StringIO()
+        call_command('perf_report', '--top', '5', '--sql', stdout=out)
+        self.assertIn('candidate-detail', out.getvalue())
+        self.assertIn('Over query budget: candidate-detail', out.getvalue())
+
+        self.assertEqual(self.client.delete('/api/_perf/').status_code, 204)
+        self.assertEqual(perf.records(), [])
+
+        staff_only = User.objects.create_user(username='perf-user', password='x')
+        self.client.force_authenticate(staff_only)
+        self.assertEqual(self.client.get('/api/_perf/').status_code, 403)
+
+
+class PerfSeedAndBenchmarkTests(TestCase):
+    """seed_perf_data is reproducible and benchmark_endpoints runs every hot endpoint against it"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+
+    def _seed(self, seed=7):
+        call_command('seed_perf_data', '--candidates', '30', '--employees', '9', '--branches', '2',
+                     '--batch-size', '12', '--days', '20', '--seed', str(seed), '--i-know-this-is-not-production',
+                     stdout=StringIO())
+        return list(Candidate.objects.order_by('profile_number').values_list(
+            'profile_number', 'candidate_name', 'executive_name', 'city'))
+
+    def test_seed_is_reproducible_and_consistent(self):
+        first = self._seed()
+        self.assertEqual(len(first), 30)
+        self.assertEqual(Employee.objects.filter(officialEmail__endswith='@perf.seed').count(), 9)
+        jobs = ClientJob.objects.filter(candidate__profile_number__startswith='PERF-')
+        self.assertTrue(jobs.exists())
+        # Every job has status history ending in its current remark, and the derived tables were rebuilt
+        for job in jobs.values('id', 'remarks'):
+            latest = CandidateStatusHistory.objects.filter(client_job_id=job['id']).order_by('-created_at').first()
+            self.assertEqual(latest.remarks, job['remarks'])
+        self.assertEqual(CandidateSearchDocument.objects.count(), 30)
+        self.assertTrue(ClientJobReportFact.objects.exists())
+        self.assertTrue(Candidate.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).exists())
+
+        call_command('seed_perf_data', '--cleanup', '--i-know-this-is-not-production', stdout=StringIO())
+        self.assertFalse(Candidate.objects.exists())
+        self.assertFalse(Employee.objects.exists())
+        self.assertEqual(self._seed(), first)
+
+    def test_refuses_without_debug_and_only_the_benchmark_user_can_log_in(self):
+        # Tests run with DEBUG off, like production
+        with self.assertRaisesMessage(CommandError, '--i-know-this-is-not-production'):
+            call_command('seed_perf_data', '--candidates', '1', stdout=StringIO())
+        with self.assertRaisesMessage(CommandError, '--i-know-this-is-not-production'):
+            call_command('seed_perf_data', '--cleanup', stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+
+        self._seed()
+        loginable = [user.username for user in User.objects.order_by('username') if user.has_usable_password()]
+        self.assertEqual(loginable, ['EMP/80002'])
+        self.assertTrue(User.objects.get(username='EMP/80002').check_password('perf-seed'))
+        self.assertTrue(User.objects.filter(username='EMP/80001', employee__level='L5').exists())
+
+    def test_benchmark_writes_results_and_compares(self):
+        self._seed()
+        output = os.path.join(self.workdir, 'bench.json')
+        out = StringIO()
+        call_command('benchmark_endpoints', '--repeat', '2', '--warmup', '0', '--output', output, stdout=out)
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(report['candidates'], 30)
+        rows = {row['endpoint']: row for row in report['endpoints']}
+        self.assertEqual(set(rows), {'calendar_stats', 'calendar_details', 'all_candidates', 'job_rows',
+                                     'remarks_with_counts', 'clientwise_report', 'employeewise_report',
+                                     'bulk_fetch', 'my_candidates_dtr', 'call_details'})
+        for name, row in rows.items():
+            self.assertEqual(row['status'], 200, name)
+            self.assertGreater(row['queries'], 0, name)
+            self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+        self.assertNotIn('Non-2xx', out.getvalue())
+
+        # A baseline ten times faster: every endpoint now looks like a regression
+        for row in report['endpoints']:
+            row['p50_ms'] = row['p95_ms'] = row['p50_ms'] / 10
+        with open(output, 'w') as handle:
+            json.dump(report, handle)
+        out = StringIO()
+        call_command('benchmark_endpoints', '--repeat', '1', '--only', 'bulk_fetch', '--compare', output, stdout=out)
+        self.assertIn('REGRESSION bulk_fetch p50_ms', out.getvalue())
+
+
+class RenderingAndCompressionTests(TestCase):
+    """FastJSONRenderer writes what DRF's JSONRenderer writes; large responses are gzip / brotli compressed"""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        call_command('seed_perf_data', '--candidates', '20', '--employees', '5', '--branches', '1',
+                     '--skip-derived', '--i-know-this-is-not-production', stdout=StringIO())
+        self.ids = list(Candidate.objects.values_list('id', flat=True))
+
+    def _body(self, content):
+        body = json.loads(content)
+        body.pop('performance')  # timings differ per call
+        return body
+
+    def _bulk_fetch(self, **headers):
+        return self.client.post('/api/candidates/bulk-fetch/', {'ids': self.ids, 'include_client_jobs': True},
+                                content_type='application/json', **headers)
+
+    def test_renderer_matches_stdlib_output(self):
+        data = {
+            'aware': datetime(2026, 10, 18, 9, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'naive': datetime(2026, 10, 18, 9, 30),
+            'date': date(2026, 10, 18),
+            'time': dt_time(9, 30),
+            'ctc': Decimal('450000.50'),
+            'counts': {1: 'one', None: 'none', True: 'yes'},
+            'rows': ({'name': 'Priya தமிழ்', 'note': 'line\u2028break'}, [1.5, None, False]),
+            'queryset': Candidate.objects.order_by('id').values_list('id', flat=True)[:2],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        # Beyond orjson (ints over 64 bits) or pretty-printed: the stdlib renderer
+        for payload, media_type in [({'big': 2 ** 70}, None), (data, 'application/json; indent=4')]:
+            self.assertEqual(FastJSONRenderer().render(payload, media_type), JSONRenderer().render(payload, media_type))
+
+        response = self._bulk_fetch()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['found']), 20)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_large_responses_are_compressed(self):
+        plain = self._bulk_fetch()
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertGreater(len(plain.content), 1024)
+
+        zipped = self._bulk_fetch(HTTP_ACCEPT_ENCODING='gzip, deflate' if compression.brotli is None else 'gzip')
+        self.assertEqual(zipped['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', zipped['Vary'])
+        self.assertEqual(self._body(gzip.decompress(zipped.content)), self._body(plain.content))
+
+        small = self.client.post('/api/candidates/bulk-fetch/', {'ids': []}, content_type='application/json',
+                                 HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+        # Well above the body: its 'performance' timings change its length from call to call
+        with override_settings(RESPONSE_COMPRESSION_MIN_BYTES=len(plain.content) * 2):
+            self.assertNotIn('Content-Encoding', self._bulk_fetch(HTTP_ACCEPT_ENCODING='gzip'))
+
+        # Without the brotli package "br" is ignored and gzip is used
+        preferred = self._bulk_fetch(HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertEqual(preferred['Content-Encoding'], 'br' if compression.brotli else 'gzip')
+        if compression.brotli:
+            self.assertEqual(self._body(compression.brotli.decompress(preferred.content)), self._body(plain.content))
+
+        # Anything but JSON stays on gzip (and its BREACH padding) even when brotli is preferred
+        page = HttpResponse('<p>candidate row</p>' * 200, content_type='text/html; charset=utf-8')
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br, gzip')
+        response = compression.CompressionMiddleware(lambda request: page)(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_rendering_benchmark(self):
+        output = os.path.join(tempfile.mkdtemp(), 'render.json')
+        self.addCleanup(shutil.rmtree, os.path.dirname(output), ignore_errors=True)
+        out = StringIO()
+        call_command('benchmark_rendering', '--count', '20', '--repeat', '1', '--output', output, stdout=out)
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(report['candidates'], 20)
+        self.assertTrue(report['identical_data'])
+        steps = {row['step']: row['bytes'] for row in report['steps']}
+        self.assertLess(steps['gzip (level 6)'], steps['render json (stdlib)'])
+        self.assertIn('identical data: True', out.getvalue())
+
+
+class FeedbackEntryTests(APITestCase):
+    """FeedbackEntry rows read the same as the Candidate.feedback blob they mirror"""
+
+    def setUp(self):
+        self.candidate = Candidate.objects.create(candidate_name='Feedback Rows', mobile1='7000000001')
+        self.job = ClientJob.objects.create(candidate=self.candidate, client_name='Acme', designation='Engineer')
+
+    def _add(self, text, nfd_date, remarks='interested', **extra):
+        self.job.add_feedback(text, remarks=remarks, nfd_date=nfd_date, entry_by='Tester(EMP/00001)',
+                              call_status='call answered', **extra)
+        self.job.candidate.refresh_from_db()
+
+    def _rows(self):
+        return list(FeedbackEntry.objects.filter(candidate=self.candidate).order_by('position'))
+
+    def test_rows_read_like_the_blob(self):
+        self._add('first call', '2030-01-05')
+        self._add('shared JD', '2030-01-09', remarks='Interview Fixed')
+        rows = self._rows()
+        self.assertEqual([row.position for row in rows], [0, 1])
+        self.assertEqual([row.client_job_id for row in rows], [self.job.id, self.job.id])
+        self.assertEqual([row.to_entry_dict() for row in rows], self.job._parse_feedback_blob())
+
+        from_rows = self.job.get_feedback_entries()
+        FeedbackEntry.objects.filter(candidate=self.candidate).delete()
+        self.assertEqual(ClientJob.objects.get(id=self.job.id).get_feedback_entries(), from_rows)
+
+    def test_pages_are_sorted_and_sliced_in_the_database(self):
+        # Stored order differs from time order: positions 0..4 entered on these days
+        for day in (1, 3, 2, 5, 4):
+            self._add(f'call on day {day}', '2030-01-20', entry_time=f'0{day}-01-2030 10:00:00')
+        self.client.force_authenticate(User.objects.create_user(username='EMP/00001', password='x'))
+        url = f'/api/client-jobs/{self.job.id}/get-feedback-entries/'
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['feedback'] for entry in response.data['feedback_entries']],
+                         ['call on day 3', 'call on day 2'])
+        self.assertEqual((response.data['total_entries'], response.data['total_pages']), (5, 3))
+        reads = [query['sql'] for query in queries if 'FROM "candidate_feedback_entry"' in query['sql']
+                 and 'ORDER BY' in query['sql']]
+        self.assertEqual(len(reads), 1)
+        self.assertIn('LIMIT 2 OFFSET 2', reads[0])
+
+        last = self.client.get(url, {'page': 3, 'page_size': 2}).data['feedback_entries']
+        self.assertEqual([(entry['feedback'], entry['is_profile_created']) for entry in last], [('call on day 1', True)])
+        everything = self.client.get(url).data['feedback_entries']
+        self.assertEqual([entry['is_profile_created'] for entry in everything], [False, False, False, False, True])
+        # Candidates without rows read the same from the blob
+        FeedbackEntry.objects.filter(candidate=self.candidate).delete()
+        self.assertEqual(self.client.get(url).data['feedback_entries'], everything)
+
+    def test_record_appends_and_rebuilds_on_edit(self):
+        self._add('first call', '2030-01-05')
+        first_id = self._rows()[0].id
+        self._add('second call', '2030-01-06')
+        rows = self._rows()
+        self.assertEqual(rows[0].id, first_id)  # appended, not rebuilt
+        self.assertEqual(rows[1].feedback_text, 'second call')
+
+        self._add('second call, edited', '2030-01-07', entry_id=1)
+        rows = self._rows()
+        self.assertEqual([row.feedback_text for row in rows], ['first call', 'second call, edited'])
+        self.assertEqual(rows[1].nfd_date, '2030-01-07')
+        self.assertEqual([row.to_entry_dict() for row in rows], self.job._parse_feedback_blob())
+
+    def test_backfill_is_idempotent(self):
+        self._add('first call', '2030-01-05')
+        self._add('second call', '2030-01-06')
+        expected = [row.to_entry_dict() for row in self._rows()]
+        FeedbackEntry.objects.all().delete()
+
+        call_command('backfill_feedback_entries', stdout=StringIO())
+        out = StringIO()
+        call_command('backfill_feedback_entries', stdout=out)
+        self.assertIn('Created 0 feedback entries for 0 candidates', out.getvalue())
+        call_command('backfill_feedback_entries', '--rebuild', stdout=StringIO())
+        self.assertEqual([row.to_entry_dict() for row in self._rows()], expected)
+
+    def test_expiry_updates_the_row_at_the_same_position(self):
+        past = (timezone.now() - timedelta(days=3)).date()
+        self._add('first call', str(past))
+        self._add('second call', str(past))
+        # A row whose NFD was stored in another format still gets expired
+        FeedbackEntry.objects.filter(candidate=self.candidate, position=1).update(nfd_date=past.strftime('%d-%m-%Y'))
+
+        self.assertTrue(self.job._update_all_expired_feedback_nfds(timezone.now()))
+        rows = self._rows()
+        self.assertEqual(rows[0].nfd_date, str(past))
+        self.assertEqual(rows[1].nfd_date, f'{past} (open profile)')
+        self.assertEqual([row.to_entry_dict() for row in rows], self.job._parse_feedback_blob())
+
+
+class MyCandidatesDtrScopeTests(APITestCase):
+    """my-candidates-dtr keeps its per-role scopes; TL reports come from the closure table (depth 1)"""
+
+    def setUp(self):
+        rows = [
+            # code, first name, level, branch, reporting manager, status
+            ('EMP/20001', 'Branchmgr', 'L3', 'CHENNAI', '', 'Active'),
+            ('EMP/20002', 'Lead', 'L2', 'CHENNAI', 'EMP/20001', 'Active'),
+            ('EMP/20003', 'Exec', 'L1', 'CHENNAI', 'EMP/20002', 'Active'),
+            ('EMP/20004', 'Deep', 'L1', 'CHENNAI', 'EMP/20003', 'Active'),  # Lead's tree, not a direct report
+            ('EMP/20005', 'Remote', 'L1', 'PUNE', 'EMP/20001', 'Active'),  # BM's tree, other branch
+            ('EMP/20006', 'Quit', 'L1', 'CHENNAI', 'Lead', 'Inactive'),  # by first name
+            ('EMP/20007', 'Floater', 'L1', None, '', 'Active'),
+            ('EMP/20008', 'Madbm', 'L3', 'MADURAI', '', 'Active'),
+        ]
+        self.users = {}
+        with self.captureOnCommitCallbacks(execute=True):
+            for index, (code, first, level, branch, manager, status) in enumerate(rows):
+                self.users[code] = User.objects.create_user(username=code, password='x')
+                Employee.objects.create(user=self.users[code], employeeCode=code, firstName=first, lastName='X',
+                                        phone1=f'92000{code[-5:]}', level=level, branch=branch,
+                                        reportingManager=manager, status=status)
+                Candidate.objects.create(candidate_name=code, mobile1=f'72000{index:05d}',
+                                         executive_name=code, created_by=code)
+
+    def _owners(self, code, **params):
+        self.client.force_authenticate(self.users[code])
+        response = self.client.get('/api/candidates/my-candidates-dtr/', params)
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        return sorted(row['candidate_name'] for row in response.data['results'])
+
+    def test_bm_scopes(self):
+        # Active employees of the branch only, not the BM's reporting tree elsewhere
+        self.assertEqual(self._owners('EMP/20001', filterMode='all_branch'),
+                         ['EMP/20001', 'EMP/20002', 'EMP/20003', 'EMP/20004'])
+        self.assertEqual(self._owners('EMP/20001'), ['EMP/20001'])
+        self.assertEqual(self._owners('EMP/20001', filterMode='tl_only', selectedTL='EMP/20002'), ['EMP/20002'])
+        self.assertEqual(self._owners('EMP/20001', filterMode='tl_only', selectedTL='EMP/20005'), ['EMP/20001'])
+        # The TL's active direct reports in the branch
+        self.assertEqual(self._owners('EMP/20001', filterMode='tl_with_team', selectedTL='EMP/20002'),
+                         ['EMP/20002', 'EMP/20003'])
+        # Madurai (and Coimbatore) BMs also see employees without a branch
+        self.assertEqual(self._owners('EMP/20008', filterMode='all_branch'), ['EMP/20007', 'EMP/20008'])
+
+    def test_tl_and_employee_scopes(self):
+        # Direct reports by code or first name, whatever their status
+        self.assertEqual(self._owners('EMP/20002'), ['EMP/20002', 'EMP/20003', 'EMP/20006'])
+        self.assertEqual(self._owners('EMP/20003'), ['EMP/20003'])
@@ -0,0 +1,319 @@
+"""
+Resume text extraction.
+
+PDF text comes from the fastest backend that is installed, in order:
+PyMuPDF, pdfminer.six, PyPDF2 (RESUME_PDF_BACKENDS reorders or limits
+them). Pages are collected in a list and joined once, so the work grows
+linearly with page count.
+
+- RESUME_MAX_PAGES (default 10): pages read for field extraction; 0 or None reads all.
+- RESUME_PARALLEL_PAGES (default 20): PDFs with more pages to read than
+  this are split across a process pool of RESUME_PDF_WORKERS (default 2).
+
+Sources can be a path, bytes or a file-like object (an upload), so uploads
+are read in memory; as_path() gives a temporary file only to tools that
+need one (textract, the Word -> PDF converter, pyresparser).
+
+    result = extract_pdf(path_or_bytes)
+    result.text, result.pages_total, result.pages_read, result.backend, result.elapsed_ms
+"""
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = ('pymupdf', 'pdfminer', 'pypdf2')
+DEFAULT_MAX_PAGES = 10
+DEFAULT_PARALLEL_PAGES = 20
+DEFAULT_WORKERS = 2
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _setting(name, default):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        # Settings not configured (e.g. used from a plain script)
+        return default
+
+
+class ExtractionResult:
+    def __init__(self, text='', pages_total=0, pages_read=0, backend='', elapsed_ms=0):
+        self.text = text
+        self.pages_total = pages_total
+        self.pages_read = pages_read
+        self.backend = backend
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def truncated(self):
+        return self.pages_read < self.pages_total
+
+    def as_metrics(self):
+        return {
+            'no_of_pages': self.pages_total,
+            'pages_parsed': self.pages_read,
+            'extraction_backend': self.backend,
+            'extraction_ms': self.elapsed_ms,
+        }
+
+
+# -----------------------------
+# Sources
+# -----------------------------
+def read_source(source):
+    """Path or bytes for a source; file-like objects are read (and rewound)"""
+    if isinstance(source, (str, bytes)):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    data = source.read()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return data
+
+
+def _binary(source):
+    """Something a library can open: the path itself, or a BytesIO over the bytes"""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def describe(source):
+    return source if isinstance(source, str) else f'<{len(source)} bytes>'
+
+
+@contextmanager
+def as_path(source, suffix=''):
+    """
+    A filesystem path for tools that only take paths. Paths are used as they
+    are; bytes / file objects go to a temporary file removed on exit.
+    """
+    source = read_source(source)
+    if isinstance(source, str):
+        yield source
+        return
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix='resume_')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(source)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class PyMuPDFBackend:
+    name = 'pymupdf'
+
+    @staticmethod
+    def module():
+        try:
+            import pymupdf
+        except ImportError:
+            import fitz as pymupdf
+        return pymupdf
+
+    def open(self, source):
+        if isinstance(source, str):
+            return self.module().open(source)
+        return self.module().open(stream=source, filetype='pdf')
+
+    def page_count(self, source):
+        with self.open(source) as document:
+            return document.page_count
+
+    def pages(self, source, start, stop):
+        with self.open(source) as document:
+            return [document.load_page(number).get_text() for number in range(start, min(stop, document.page_count))]
+
+
+class PdfMinerBackend:
+    name = 'pdfminer'
+
+    @staticmethod
+    def module():
+        import pdfminer.high_level
+        return pdfminer.high_level
+
+    def page_count(self, source):
+        from pdfminer.pdfpage import PDFPage
+        if isinstance(source, str):
+            with open(source, 'rb') as handle:
+                return sum(1 for _ in PDFPage.get_pages(handle))
+        return sum(1 for _ in PDFPage.get_pages(io.BytesIO(source)))
+
+    def pages(self, source, start, stop):
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        return [
+            ''.join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+            for layout in extract_pages(_binary(source), page_numbers=range(start, stop))
+        ]
+
+
+class PyPDF2Backend:
+    name = 'pypdf2'
+
+    @staticmethod
+    def module():
+        import PyPDF2
+        return PyPDF2
+
+    def page_count(self, source):
+        return len(self.module().PdfReader(_binary(source)).pages)
+
+    def pages(self, source, start, stop):
+        reader = self.module().PdfReader(_binary(source))
+        return [reader.pages[number].extract_text() or '' for number in range(start, min(stop, len(reader.pages)))]
+
+
+BACKENDS = {backend.name: backend for backend in (PyMuPDFBackend(), PdfMinerBackend(), PyPDF2Backend())}
+
+
+def available_backends():
+    """Installed PDF backends in preference order"""
+    available = []
+    for name in _setting('RESUME_PDF_BACKENDS', DEFAULT_BACKENDS):
+        backend = BACKENDS.get(name)
+        if backend is None:
+            continue
+        try:
+            backend.module()
+        except ImportError:
+            continue
+        available.append(backend)
+    return available
+
+
+# -----------------------------
+# PDF extraction
+# -----------------------------
+def _extract_range(backend_name, source, start, stop):
+    return BACKENDS[backend_name].pages(source, start, stop)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = _setting('RESUME_PDF_WORKERS', DEFAULT_WORKERS)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _pages_parallel(backend, source, pages_to_read):
+    workers = max(1, _setting('RESUME_PDF_WORKERS', DEFAULT_WORKERS))
+    step = -(-pages_to_read // workers)
+    ranges = [(start, min(start + step, pages_to_read)) for start in range(0, pages_to_read, step)]
+    try:
+        futures = [_get_pool().submit(_extract_range, backend.name, source, start, stop) for start, stop in ranges]
+        pages = []
+        for future in futures:
+            pages.extend(future.result())
+        return pages
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool next time
+        _reset_pool()
+        raise
+
+
+def extract_pdf(source, max_pages=None):
+    """
+    Text of the first max_pages pages (RESUME_MAX_PAGES when not given, 0 for
+    all pages) with the first backend that can read the file.
+    source: path, bytes or file-like object.
+    """
+    source = read_source(source)
+    if max_pages is None:
+        max_pages = _setting('RESUME_MAX_PAGES', DEFAULT_MAX_PAGES)
+    parallel_pages = _setting('RESUME_PARALLEL_PAGES', DEFAULT_PARALLEL_PAGES)
+    started = time.perf_counter()
+
+    for backend in available_backends():
+        try:
+            pages_total = backend.page_count(source)
+            pages_to_read = min(pages_total, max_pages) if max_pages else pages_total
+            pages = None
+            if parallel_pages and pages_to_read > parallel_pages:
+                try:
+                    pages = _pages_parallel(backend, source, pages_to_read)
+                except Exception as e:
+                    logger.warning(f"Parallel PDF extraction failed, reading serially: {e}")
+            if pages is None:
+                pages = backend.pages(source, 0, pages_to_read)
+            text = '\n'.join(page for page in pages if page)
+            if pages and text:
+                text += '\n'
+            return ExtractionResult(
+                text=text,
+                pages_total=pages_total,
+                pages_read=len(pages),
+                backend=backend.name,
+                elapsed_ms=int((time.perf_counter() - started) * 1000),
+            )
+        except Exception as e:
+            logger.warning(f"{backend.name} could not read {describe(source)}: {e}")
+
+    return ExtractionResult(elapsed_ms=int((time.perf_counter() - started) * 1000))
+
+
+# -----------------------------
+# Word documents
+# -----------------------------
+def extract_docx(source):
+    """Paragraph text of a .docx (python-docx, path / bytes / file-like), joined once"""
+    started = time.perf_counter()
+    try:
+        from docx import Document
+    except ImportError:
+        return ExtractionResult(elapsed_ms=0)
+    document = Document(_binary(read_source(source)))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    text = '\n'.join(lines) + '\n' if lines else ''
+    return ExtractionResult(
+        text=text,
+        backend='python-docx',
+        elapsed_ms=int((time.perf_counter() - started) * 1000),
+    )
+
+
+# -----------------------------
+# Plain text
+# -----------------------------
+def extract_plain(source):
+    """Text of a .txt file / bytes (UTF-8, falling back to Latin-1)"""
+    source = read_source(source)
+    if isinstance(source, str):
+        with open(source, 'rb') as handle:
+            source = handle.read()
+    try:
+        text = source.decode('utf-8')
+    except UnicodeDecodeError:
+        text = source.decode('latin-1')
+    return ExtractionResult(text=text, backend='text')
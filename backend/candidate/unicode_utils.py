@@ -68,7 +68,7 @@ def sanitize_unicode_text(text):
         # Filter out non-ASCII characters, keeping only ASCII equivalents
         ascii_text = ''.join(char for char in normalized if ord(char) < 128)
         return ascii_text
-    except Exception as e:}, error: {e}")
+    except Exception as e:
         # Fallback: remove all non-ASCII characters
         return re.sub(r'[^\x00-\x7F]+', '', sanitized_text)
 
@@ -120,7 +120,7 @@ def safe_str_conversion(obj):
             # Convert to string first, then sanitize
             str_obj = str(obj)
             return sanitize_unicode_text(str_obj)
-    except Exception as e:}, error: {e}")
+    except Exception as e:
         return "Error converting to string"
 
 # Test function to verify sanitization works
@@ -145,8 +145,10 @@ def test_unicode_sanitization():
 
     for i, test_text in enumerate(test_cases, 1):
         try:
-            result = sanitize_unicode_text(test_text)} → {repr(result)}")
-        except Exception as e:} → Error: {e}")
+            result = sanitize_unicode_text(test_text)
+            print(f"{i}. {repr(test_text)} → {repr(result)}")
+        except Exception as e:
+            print(f"{i}. {repr(test_text)} → Error: {e}")
 
     # Test dictionary sanitization
     test_dict = {
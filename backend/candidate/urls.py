@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CandidateViewSet, ClientJobViewSet, EducationCertificateViewSet,
     ExperienceCompanyViewSet, PreviousCompanyViewSet, AdditionalInfoViewSet,
-    ResumeParseAPIView, WordToPdfConvertAPIView, CandidateRevenueViewSet, CandidateRevenueFeedbackViewSet,
+    ResumeParseAPIView, ResumeParseJobView, ResumeParserHealthView, WordToPdfConvertAPIView, CandidateRevenueViewSet, CandidateRevenueFeedbackViewSet,
     FileUploadView, update_expired_nfd_status, check_expired_nfd_jobs,
     # Unified Workflow endpoints
     clone_candidate_for_client, claim_open_job, mark_jobs_as_open,
@@ -11,7 +11,8 @@ from .views import (
     # Profile IN/OUT endpoints
     profile_in_list, profile_out_list,
     # Status History endpoints
-    create_status_history, get_candidate_timeline, get_candidate_calendar, get_status_history_stats
+    create_status_history, bulk_create_status_history, get_candidate_timeline, get_candidate_calendar, get_status_history_stats,
+    cache_stats, perf_report,
 )
 
 router = DefaultRouter()
@@ -26,8 +27,12 @@ router.register(r'candidate-revenue-feedbacks', CandidateRevenueFeedbackViewSet)
 
 urlpatterns = [
     path('parse-resume/', ResumeParseAPIView.as_view(), name='parse-resume'),
+    path('parse-resume/health/', ResumeParserHealthView.as_view(), name='parse-resume-health'),
+    path('parse-resume/<uuid:job_id>/', ResumeParseJobView.as_view(), name='parse-resume-job'),
     path('convert-word-to-pdf/', WordToPdfConvertAPIView.as_view(), name='convert-word-to-pdf'),
     path('upload/', FileUploadView.as_view(), name='file-upload'),
+    path('cache-stats/', cache_stats, name='cache-stats'),
+    path('_perf/', perf_report, name='perf-report'),
     path('update-expired-nfd/', update_expired_nfd_status, name='update-expired-nfd'),
     path('check-expired-nfd/', check_expired_nfd_jobs, name='check-expired-nfd'),
 
@@ -50,6 +55,7 @@ urlpatterns = [
     # STATUS HISTORY ENDPOINTS
     # ========================================
     path('status-history/create/', create_status_history, name='create-status-history'),
+    path('status-history/bulk-create/', bulk_create_status_history, name='bulk-create-status-history'),
     path('candidates/<int:candidate_id>/timeline/', get_candidate_timeline, name='get-candidate-timeline'),
     path('candidates/<int:candidate_id>/calendar/', get_candidate_calendar, name='get-candidate-calendar'),
     path('status-history/stats/', get_status_history_stats, name='get-status-history-stats'),
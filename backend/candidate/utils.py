@@ -1,6 +1,8 @@
 import os
 import io
+import shutil
 import subprocess
+import tempfile
 import warnings
 
 # Suppress spaCy warnings that might interfere with parsing
@@ -10,7 +12,10 @@ warnings.filterwarnings('ignore', category=UserWarning, module='spacy')
 # This prevents NLTK stopwords errors during migrations
 ResumeParser = None
 resume_parser_available = None  # Will be checked when needed
-from django.core.files.uploadedfile import InMemoryUploadedFile
+
+from . import resume_cache
+from . import resume_nlp
+from . import text_extraction
 
 # NOTE: The docx2pdf library requires LibreOffice to be installed and accessible
 # on your system path.
@@ -84,34 +89,87 @@ def parse_resume(file):
     """
     Parses resume data using the resume_parser library.
     This function handles both in-memory uploaded files and file paths.
+    Results are cached by file content (see resume_cache.py).
     """
     if not file:
         return {"success": False, "error": "No file provided."}
 
-    # If the file is an in-memory object, save it to a temporary file for the parser.
-    if isinstance(file, InMemoryUploadedFile):
-        temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp')
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Generate a unique filename to avoid conflicts
-        unique_filename = f"{os.urandom(8).hex()}_{file.name}"
-        temp_file_path = os.path.join(temp_dir, unique_filename)
-        
-        with open(temp_file_path, 'wb+') as temp_file:
-            for chunk in file.chunks():
-                temp_file.write(chunk)
+    cache_key = None
+    if resume_cache.enabled():
+        try:
+            cache_key = resume_cache.content_hash(file)
+        except Exception as e:
+            print(f"Warning: Could not hash resume for cache: {e}")
+    cached = resume_cache.get_parse(cache_key)
+    if cached is not None:
+        cached["cache_hit"] = True
+        return cached
+
+    result = _parse_resume(file, cache_key)
+    resume_cache.put_parse(cache_key, result)
+    return result
+
+
+def cached_docx_to_pdf(docx_path, cache_key=None):
+    """
+    convert_docx_to_pdf() through the content cache.
+    Returns the PDF path (inside the cache when caching is on) or "" on failure.
+    """
+    cache_key = cache_key or (resume_cache.content_hash(docx_path) if resume_cache.enabled() else None)
+    cached = resume_cache.get_pdf(cache_key)
+    if cached:
+        return cached
+    with tempfile.TemporaryDirectory() as work_dir:
+        pdf_path = convert_docx_to_pdf(docx_path, work_dir)
+        if not pdf_path:
+            return ""
+        stored = resume_cache.put_pdf(cache_key, pdf_path)
+        if stored != pdf_path:
+            return stored
+        # Caching is off: keep the PDF next to the source file
+        target = os.path.splitext(docx_path)[0] + ".pdf"
+        shutil.move(pdf_path, target)
+        return target
+
+
+def _docx_to_pdf_source(source, cache_key=None):
+    """
+    (pdf source, pdf name) for a .docx path or bytes, or None if conversion failed.
+    The converter only works on files, so bytes go through a temporary file;
+    the PDF is read back into memory unless it is kept in the content cache.
+    """
+    if isinstance(source, str):
+        pdf_path = cached_docx_to_pdf(source, cache_key)
+        return (pdf_path, pdf_path) if pdf_path else None
+    with text_extraction.as_path(source, '.docx') as docx_path:
+        pdf_path = cached_docx_to_pdf(docx_path, cache_key)
+    if not pdf_path:
+        return None
+    if pdf_path.startswith(resume_cache.cache_root()):
+        return pdf_path, pdf_path
+    try:
+        with open(pdf_path, 'rb') as pdf_file:
+            return pdf_file.read(), pdf_path
+    finally:
+        os.remove(pdf_path)
+
+
+def _parse_resume(file, cache_key=None):
+    # Uploaded files are parsed from memory; paths are read where they are.
+    if isinstance(file, str):
+        source = source_name = file
     else:
-        # If 'file' is already a path string, use it directly.
-        temp_file_path = file
+        source = text_extraction.read_source(file)
+        source_name = getattr(file, 'name', '') or ''
 
     # Convert .docx to .pdf if necessary.
     # The resumeparse library may handle .docx directly, but converting to PDF is a
     # robust fallback and often improves accuracy.
-    if temp_file_path.lower().endswith('.docx'):
+    if source_name.lower().endswith('.docx'):
         try:
-            pdf_path = convert_docx_to_pdf(temp_file_path, temp_dir)
-            if pdf_path:  # Only use PDF path if conversion was successful
-                temp_file_path = pdf_path
+            converted = _docx_to_pdf_source(source, cache_key)
+            if converted:  # Only use the PDF if conversion was successful
+                source, source_name = converted
         except Exception as e:
             # Handle conversion failure
             print(f"Error converting DOCX to PDF: {e}")
@@ -129,7 +187,7 @@ def parse_resume(file):
         try:
             from .alternative_parser import alternative_parse_resume
             print("Using alternative parser to avoid spaCy configuration issues...")
-            fallback_result = alternative_parse_resume(temp_file_path)
+            fallback_result = alternative_parse_resume(source, source_name)
             if fallback_result["success"]:
                 fallback_result["message"] = "Used alternative parser (recommended for stability)"
                 return fallback_result
@@ -138,7 +196,7 @@ def parse_resume(file):
         
         # If alternative parser fails, try simple text extraction
         try:
-            fallback_data = simple_text_extraction(temp_file_path)
+            fallback_data = simple_text_extraction(source, source_name)
             if fallback_data:
                 return {
                     "success": True,
@@ -150,52 +208,28 @@ def parse_resume(file):
         
         # Only try pyresparser as a last resort (keeping original code for reference)
         try:
-            # Initialize spaCy with better error handling
-            import spacy
-            nlp = None
-            
-            # Try multiple approaches to load spaCy model
-            model_names = ["en_core_web_sm", "en_core_web_md", "en_core_web_lg"]
-            for model_name in model_names:
-                try:
-                    nlp = spacy.load(model_name)
-                    break
-                except OSError:
-                    continue
+            # spaCy model is loaded once per process (resume_nlp.py)
+            nlp_service = resume_nlp.get_service().load()
+            if nlp_service.nlp is None:
+                print(f"Warning: Could not initialize spaCy: {nlp_service.error or nlp_service.status}")
+                # Skip pyresparser if spaCy fails
+                raise Exception("spaCy initialization failed")
+            if not nlp_service.has_ner:
+                print("Warning: Using blank spaCy model. Consider installing en_core_web_sm for better results.")
             
-            # If no model found, create a blank English model
-            if nlp is None:
-                try:
-                    nlp = spacy.blank("en")
-                    print("Warning: Using blank spaCy model. Consider installing en_core_web_sm for better results.")
-                except Exception as spacy_error:
-                    print(f"Warning: Could not initialize spaCy: {spacy_error}")
-                    # Skip pyresparser if spaCy fails
-                    raise Exception("spaCy initialization failed")
-            
-            # Create pyresparser config directory and file if needed
+            # Create pyresparser config file if needed
             try:
-                import pkg_resources
-                pyresparser_path = pkg_resources.get_distribution("pyresparser").location
-                config_dir = os.path.join(pyresparser_path, "pyresparser")
-                config_path = os.path.join(config_dir, "config.cfg")
-                
-                if not os.path.exists(config_path):
-                    os.makedirs(config_dir, exist_ok=True)
-                    with open(config_path, 'w') as f:
-                        f.write("[nlp]\n")
-                        f.write("lang = en\n")
-                        f.write("pipeline = tagger,parser,ner\n")
-                        f.write("\n[DEFAULT]\n")
-                        f.write("# Basic pyresparser configuration\n")
+                resume_nlp.ensure_pyresparser_config()
             except Exception as config_error:
                 print(f"Warning: Could not create config file: {config_error}")
                 # Skip pyresparser if config creation fails
                 raise Exception("Config file creation failed")
             
             # Try to initialize ResumeParser with error handling
-            parser = ResumeParser(temp_file_path)
-            data = parser.get_extracted_data()
+            # pyresparser only reads files on disk
+            with text_extraction.as_path(source, os.path.splitext(source_name)[1]) as resume_path:
+                parser = ResumeParser(resume_path)
+                data = parser.get_extracted_data()
             
         except Exception as e:
             error_msg = str(e)
@@ -206,7 +240,7 @@ def parse_resume(file):
                 try:
                     # Import and use alternative parser
                     from .alternative_parser import alternative_parse_resume
-                    fallback_result = alternative_parse_resume(temp_file_path)
+                    fallback_result = alternative_parse_resume(source, source_name)
                     if fallback_result["success"]:
                         fallback_result["message"] = "Used alternative parser due to spaCy/pyresparser configuration issues"
                         return fallback_result
@@ -215,7 +249,7 @@ def parse_resume(file):
                 
                 # If alternative parser fails, try simple text extraction
                 try:
-                    fallback_data = simple_text_extraction(temp_file_path)
+                    fallback_data = simple_text_extraction(source, source_name)
                     if fallback_data:
                         return {
                             "success": True,
@@ -263,69 +297,47 @@ def parse_resume(file):
     except Exception as e:
         return {"success": False, "error": f"Error during resume parsing: {e}"}
 
-    finally:
-        # Clean up all temporary files created by this function.
-        try:
-            if isinstance(file, InMemoryUploadedFile):
-                # Remove the original temp file
-                if 'temp_file_path' in locals() and os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-        except Exception as cleanup_error:
-            print(f"Warning: Could not clean up temporary files: {cleanup_error}")
 
-def simple_text_extraction(file_path):
+def simple_text_extraction(file_path, filename=None):
     """
     Simple fallback text extraction for resume parsing when pyresparser fails.
     Extracts basic information using simple text processing.
+    file_path may also be bytes / a file-like object, with filename giving its extension.
     """
     import re
     
     try:
         text_content = ""
+        extraction = None
+        name = (filename or (file_path if isinstance(file_path, str) else getattr(file_path, 'name', '')) or '').lower()
         
         # Extract text based on file type
-        if file_path.lower().endswith('.pdf'):
-            try:
-                import PyPDF2
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text_content += page.extract_text() + "\n"
-            except ImportError:
-                # If PyPDF2 is not available, try pdfplumber
-                try:
-                    import pdfplumber
-                    with pdfplumber.open(file_path) as pdf:
-                        for page in pdf.pages:
-                            text_content += page.extract_text() + "\n"
-                except ImportError:
-                    return None
-        
-        elif file_path.lower().endswith(('.doc', '.docx')):
+        if name.endswith('.pdf'):
+            # PyMuPDF / pdfminer / PyPDF2, whichever is installed first (text_extraction.py)
+            extraction = text_extraction.extract_pdf(file_path)
+            if not extraction.backend:
+                return None
+            text_content = extraction.text
+        
+        elif name.endswith(('.doc', '.docx')):
             try:
                 from docx import Document
-                doc = Document(file_path)
-                for paragraph in doc.paragraphs:
-                    text_content += paragraph.text + "\n"
+                extraction = text_extraction.extract_docx(file_path)
+                text_content = extraction.text
             except ImportError:
                 try:
                     import python_docx
                     from python_docx import Document
-                    doc = Document(file_path)
-                    for paragraph in doc.paragraphs:
-                        text_content += paragraph.text + "\n"
+                    doc = Document(io.BytesIO(text_extraction.read_source(file_path))
+                                   if not isinstance(file_path, str) else file_path)
+                    text_content = "\n".join(paragraph.text for paragraph in doc.paragraphs) + "\n"
                 except ImportError:
                     print("Warning: python-docx not available for DOCX parsing")
                     return None
         
         else:
-            # Try to read as plain text
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    text_content = file.read()
-            except:
-                with open(file_path, 'r', encoding='latin-1') as file:
-                    text_content = file.read()
+            # Try to read as plain text (UTF-8, then Latin-1)
+            text_content = text_extraction.extract_plain(file_path).text
         
         if not text_content.strip():
             return None
@@ -389,7 +401,9 @@ def simple_text_extraction(file_path):
             if skill.lower() in text_lower:
                 found_skills.append(skill)
         
+        metrics = extraction.as_metrics() if extraction is not None else {}
         return {
+            **metrics,
             "name": potential_name or "Not found",
             "email": emails[0] if emails else "Not found",
             "phone": phones[0] if phones else "Not found",
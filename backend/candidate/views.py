@@ -3,9 +3,9 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Count, OuterRef, Subquery, IntegerField, Value, Sum,Prefetch
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.db.models import Q, Count, Exists, OuterRef, Subquery, IntegerField, Value, Sum,Prefetch
+from django.db.models.functions import Coalesce
 from django.http import FileResponse, Http404, HttpResponse
 from django.conf import settings
 from django.db import transaction, connection
@@ -15,6 +15,9 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from datetime import datetime, timedelta
 from empreg.models import Employee  # Import Employee model for branch filtering
+from empreg import hierarchy as org_hierarchy
+from empreg import identity as employee_identity
+from backend import perf, shared_cache
 import os
 import uuid
 import tempfile
@@ -28,7 +31,7 @@ logger = logging.getLogger(__name__)
 from .models import (
     Candidate, ClientJob, EducationCertificate,
     ExperienceCompany, PreviousCompany, AdditionalInfo, CandidateRevenue, CandidateRevenueFeedback,
-    CandidateStatusHistory
+    CandidateStatusHistory, ResumeParseJob
 )
 from .serializers import (
     CandidateSerializer, CandidateListSerializer, ClientJobSerializer, EducationCertificateSerializer,
@@ -36,6 +39,13 @@ from .serializers import (
 )
 from .utils import parse_resume, convert_docx_to_pdf
 from .alternative_parser import alternative_parse_resume
+from . import search as candidate_search
+from . import resume_cache
+from . import resume_jobs
+from . import resume_nlp
+from . import report_facts
+from . import exports
+from .pagination import CandidatePagination, RevenuePagination, KeysetPagination, wants_cursor
 from empreg.models import Employee
 # ------------------------------
 # Utility Functions
@@ -62,20 +72,10 @@ def get_current_user_name(user):
     
     try:
         if user and user.is_authenticated:
-            
-            # Optimized: Single query with Q objects to avoid multiple DB hits
-            username = user.username
-            employee = Employee.objects.filter(
-                Q(user=user) | 
-                Q(employeeCode=username) | 
-                Q(phone1=username) | 
-                Q(phone2=username),
-                del_state=0
-            ).select_related().first()
-            
+            # Resolved once per request (empreg/identity.py)
+            employee = employee_identity.for_user(user)
             if employee:
-                result = f"{employee.firstName}({employee.employeeCode})"
-                return result
+                return employee.display_name
             
             # Fallback to username if no employee record
             fallback_name = user.username if user else "System"
@@ -90,24 +90,10 @@ def get_current_user_employee_code(user):
     
     try:
         if user and user.is_authenticated:
-            username = user.username
-            employees = Employee.objects.filter(
-                Q(user=user) | 
-                Q(employeeCode=username) | 
-                Q(phone1=username) | 
-                Q(phone2=username),
-                del_state=0
-            ).select_related()
-            
-            if employees.exists():
-                # Prioritize correct format: "Emp/XXXXX" over invalid formats like "EMPXXXXX-X"
-                # First, try to find employee code with "/" (correct format)
-                for employee in employees:
-                    if employee.employeeCode and '/' in employee.employeeCode:
-                        return employee.employeeCode  # Return correct format (e.g., "Emp/00040")
-                
-                # If no "/" format found, return the first one as fallback
-                return employees.first().employeeCode
+            # Resolved once per request; "Emp/XXXXX" codes win over "EMPXXXXX-X" (empreg/identity.py)
+            employee = employee_identity.for_user(user)
+            if employee and employee.employeeCode:
+                return employee.employeeCode
             
             # Fallback to username if no employee record
             return user.username if user else "System"
@@ -118,31 +104,17 @@ def get_current_user_employee_code(user):
 
 def _resolve_branch_team_by_employee_code(employee_code, fallback_client_job_id=None):
     try:
-        from empreg.models import Employee as Emp
-        from Masters.models import Team as TeamModel, Branch as BranchModel
+        from empreg import directory as employee_directory
         from .models import ClientJob as CJ
 
         branch_id = None
         team_id = None
 
-        emp = Emp.objects.filter(employeeCode=employee_code, del_state=0).first()
+        # Team branch wins over the employee's branch name/code (resolved in the directory)
+        emp = employee_directory.get(employee_code)
         if emp:
-            team = (
-                TeamModel.objects
-                .filter(employees__employeeCode=employee_code, employees__del_state=0, status='Active')
-                .first()
-            )
-            if team:
-                team_id = team.id
-                if getattr(team, 'branch_id', None):
-                    branch_id = team.branch_id
-
-            if branch_id is None:
-                bp = (emp.branch or '').strip()
-                if bp:
-                    b = BranchModel.objects.filter(name__iexact=bp).first() or BranchModel.objects.filter(branchcode__iexact=bp).first()
-                    if b:
-                        branch_id = b.id
+            team_id = emp['team_id']
+            branch_id = emp['branch_id']
 
         if (branch_id is None or team_id is None) and fallback_client_job_id:
             cj = CJ.objects.filter(id=fallback_client_job_id).first()
@@ -155,19 +127,6 @@ def _resolve_branch_team_by_employee_code(employee_code, fallback_client_job_id=
         return branch_id, team_id
     except Exception:
         return None, None
-# ------------------------------
-# Pagination for Candidate List
-# ------------------------------
-class CandidatePagination(PageNumberPagination):
-    page_size = 50  # Limit to 50 candidates per page
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-
-class RevenuePagination(PageNumberPagination):
-    page_size = 50
-    page_size_query_param = "page_size"
-    max_page_size = 200
 
 # ------------------------------
 # Candidate View
@@ -269,8 +228,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
                     
                     # Conditional prefetch based on requested data
                     prefetch_relations = []
-                    if include_client_jobs:
-                        prefetch_relations.append('client_jobs')
+                    if include_client_jobs or include_feedback or include_assignments:
+                        # CandidateSerializer nests client_jobs and revenues
+                        prefetch_relations.extend(['client_jobs', 'revenues'])
                     if include_feedback or include_assignments:
                         prefetch_relations.extend([
                             'education_certificates',
@@ -289,8 +249,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 
                 # Conditional prefetch based on requested data
                 prefetch_relations = []
-                if include_client_jobs:
-                    prefetch_relations.append('client_jobs')
+                if include_client_jobs or include_feedback or include_assignments:
+                    # CandidateSerializer nests client_jobs and revenues
+                    prefetch_relations.extend(['client_jobs', 'revenues'])
                 if include_feedback or include_assignments:
                     prefetch_relations.extend([
                         'education_certificates',
@@ -422,8 +383,11 @@ class CandidateViewSet(viewsets.ModelViewSet):
                     Q(client_jobs__assign_to__iexact=executive_filter)
                 ).distinct()
             
-            # Apply search filter if provided
-            if search_term:
+            # Apply search filter if provided (search index first, legacy OR until it is built)
+            indexed = candidate_search.filter_candidates(queryset, search_term) if search_term else None
+            if indexed is not None:
+                queryset = indexed
+            elif search_term:
                 # Try to find employee by name first
                 from empreg.models import Employee
                 matching_employees = Employee.objects.filter(
@@ -455,7 +419,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
         else:
             # For detail view, prefetch related objects
             queryset = Candidate.objects.prefetch_related(
-                'client_jobs', 'education_certificates', 'experience_companies', 
+                'client_jobs', 'revenues', 'education_certificates', 'experience_companies', 
                 'previous_companies', 'additional_info'
             )
             
@@ -479,20 +443,35 @@ class CandidateViewSet(viewsets.ModelViewSet):
         """
         Custom search action for candidates.
         Search by name, email (case-insensitive exact match) or mobile number (exact match).
-        Usage: /api/candidate/search/?term=search_value
+        mode=fulltext returns ranked matches from the search index instead.
+        Usage: /api/candidate/search/?term=search_value[&mode=fulltext&limit=50]
         """
         term = request.query_params.get('term', '').strip()
         
         if not term:
             return Response([])
         
-        # Build search query with exact matches
-        # For name and email: case-insensitive exact match
-        # For mobile numbers: exact match (case-sensitive)
-        query = Q(candidate_name__iexact=term) | Q(email__iexact=term) | Q(mobile1__exact=term)
-        
-        # Add mobile2 search if it's not null/empty
-        query |= Q(mobile2__exact=term)
+        ranked_ids = None
+        if candidate_search.index_built():
+            if request.query_params.get('mode') == 'fulltext':
+                try:
+                    limit = int(request.query_params.get('limit', 50))
+                except (ValueError, TypeError):
+                    return Response({"error": "limit must be a valid integer"}, status=400)
+                limit = min(max(limit, 1), 200)
+                ranked_ids = candidate_search.ranked_candidate_ids(term, limit=limit)
+                query = Q(id__in=ranked_ids)
+            else:
+                # Indexed equality on normalized name/email/phone
+                query = Q(id__in=candidate_search.exact_candidate_ids(term))
+        else:
+            # Build search query with exact matches
+            # For name and email: case-insensitive exact match
+            # For mobile numbers: exact match (case-sensitive)
+            query = Q(candidate_name__iexact=term) | Q(email__iexact=term) | Q(mobile1__exact=term)
+            
+            # Add mobile2 search if it's not null/empty
+            query |= Q(mobile2__exact=term)
        
         # candidates = Candidate.objects.filter(query).prefetch_related('client_jobs', 'revenues')
         # Prefetch Active client jobs, treating NULL/blank as Active too
@@ -508,6 +487,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
             queryset=CandidateRevenue.objects.only('id', 'candidate_id', 'joining_date')
         )
         candidates = Candidate.objects.filter(query).prefetch_related(active_jobs_prefetch, revenue_prefetch)
+        if ranked_ids is not None:
+            rank = {candidate_id: index for index, candidate_id in enumerate(ranked_ids)}
+            candidates = sorted(candidates, key=lambda candidate: rank[candidate.id])
         serializer = self.get_serializer(candidates, many=True)
         
         # Enhance with employee details
@@ -537,7 +519,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
     # ------------------------------------------------------------------
     def _enhance_with_employee_details(self, serialized_data):
         try:
-            from empreg.models import Employee
+            from empreg import directory as employee_directory
             # Collect all employee codes used across the payload
             employee_codes = set()
             for c in serialized_data:
@@ -559,22 +541,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
             if not employee_codes:
                 return serialized_data
 
-            # Bulk fetch employees; prefer active ones if model has del_state
-            employees = Employee.objects.filter(employeeCode__in=employee_codes)
-            if hasattr(Employee, 'del_state'):
-                employees = employees.filter(del_state=0)
-            employees = employees.values('employeeCode', 'firstName', 'lastName')
-
-            # Build lookup
+            # Bulk resolve active employees from the shared directory
             lookup = {}
-            for emp in employees:
-                first = emp.get('firstName') or ''
-                last = emp.get('lastName') or ''
-                full = f"{first} {last}".strip() or first or last or ''
-                lookup[emp['employeeCode']] = {
-                    'firstName': first,
-                    'lastName': last,
-                    'fullName': full,
+            for code, emp in employee_directory.resolve(employee_codes).items():
+                lookup[code] = {
+                    'firstName': emp['firstName'],
+                    'lastName': emp['lastName'],
+                    'fullName': emp['fullName'],
                 }
 
             # Enhance each candidate dict
@@ -653,25 +626,17 @@ class CandidateViewSet(viewsets.ModelViewSet):
             return serialized_data
 
     def _process_resume(self, candidate):
+        """Queue a background parse of the candidate's resume (see candidate/resume_jobs.py)"""
         if not getattr(candidate, 'resume_file', None):
-            return
+            return None
         try:
-            file_path = candidate.resume_file.path
-            if not os.path.exists(file_path):
-                return
-            result = parse_resume(file_path)
-            if result.get('success'):
-                data = result.get('data', {})
-                candidate.resume_parsed_data = data
-                raw_text = data.get('raw_text', '') or ''
-                if raw_text:
-                    cleaned = raw_text.encode('utf-8', errors='ignore').decode('utf-8')
-                    if len(cleaned) > 50000:
-                        cleaned = cleaned[:50000]
-                    candidate.resume_text = cleaned
-                candidate.save(update_fields=['resume_parsed_data', 'resume_text'])
-        except Exception:
-            return
+            if not os.path.exists(candidate.resume_file.path):
+                return None
+            created_by = getattr(self.request.user, 'username', None) or None
+            return resume_jobs.enqueue_for_candidate(candidate, created_by=created_by)
+        except Exception as e:
+            logger.warning(f"Could not queue resume parse for candidate {candidate.pk}: {e}")
+            return None
     
     @action(detail=False, methods=['post'], url_path='create-complete')
     def create_complete(self, request):
@@ -949,13 +914,12 @@ class CandidateViewSet(viewsets.ModelViewSet):
     def remarks_with_counts(self, request):
         """
         Return ALL active remarks from masters_remark with their filtered counts.
-        Uses RAW SQL for maximum performance + 5-minute caching.
+        Uses RAW SQL for maximum performance + 5-minute caching in the shared
+        cache; candidate/client job writes invalidate it (backend/shared_cache.py).
         Endpoint: /api/candidates/remarks-with-counts/
         """
         try:
-            from django.core.cache import cache
             from django.db import connection
-            import hashlib
             import time
             
             start_time = time.time()
@@ -968,14 +932,15 @@ class CandidateViewSet(viewsets.ModelViewSet):
             state = request.query_params.get('state', '')
             city = request.query_params.get('city', '')
             
-            # Create cache key based on filters
-            filter_str = f"{from_date}_{to_date}_{client}_{executive}_{state}_{city}"
-            cache_key = f"remarks_counts_{hashlib.md5(filter_str.encode()).hexdigest()}"
+            # Cache key based on filters and the current candidate / client job data versions
+            cache_key = shared_cache.make_key(
+                'remarks_counts', ('candidate', 'client_job'), from_date, to_date, client, executive, state, city
+            )
             
             logger.info(f"[CACHE] Checking cache for key: {cache_key}")
             
             # Try to get from cache
-            cached_data = cache.get(cache_key)
+            cached_data = shared_cache.get(cache_key)
             if cached_data is not None:
                 cache_time = time.time() - start_time
                 logger.info(f"[CACHE HIT] Returned cached data in {cache_time:.3f}s")
@@ -1102,7 +1067,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
             }
             
             # Cache for 5 minutes (300 seconds)
-            cache.set(cache_key, response_data, 300)
+            shared_cache.put(cache_key, response_data, 300)
             logger.info(f"[CACHE SET] Cached data for key: {cache_key} (expires in 5 min)")
             logger.info(f"[TIMING] Total request time: {total_time:.3f}s (SQL: {query_time:.3f}s)")
             
@@ -1120,6 +1085,226 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
    
 
+    def _databank_queryset(self, request):
+        """Candidates matching the databank (all_candidates) filters, shared with its export"""
+        # Get filters
+        from_date = request.query_params.get('from_date')
+        to_date = request.query_params.get('to_date')
+        remark = request.query_params.get('remark')
+        client = request.query_params.get('client')
+        state = request.query_params.get('state')
+        city = request.query_params.get('city')
+        executive_filter = request.query_params.get('executive', None)
+        search_term = request.query_params.get('search', '').strip()
+        include_history_param = request.query_params.get('include_history', None)
+        include_history = True
+        if include_history_param is not None:
+            val = str(include_history_param).strip().lower()
+            if val in ('0', 'false', 'no'):
+                include_history = False
+            elif val in ('1', 'true', 'yes'):
+                include_history = True
+        
+        # OPTIMIZATION: Use subquery to filter ClientJobs first, then get candidate IDs
+        # This avoids expensive joins and distinct() on the main query
+        from django.db.models import Q, Exists, OuterRef
+        from .models import ClientJob
+        
+        # Build ClientJob filters (optimized for index usage)
+        client_job_filters = Q()
+        if from_date:
+            try:
+                from datetime import datetime
+                from_datetime = datetime.strptime(from_date, '%Y-%m-%d')
+                # Use datetime comparison instead of __date lookup for index usage
+                client_job_filters &= Q(updated_at__gte=from_datetime)
+            except ValueError:
+                logger.warning(f"Invalid from_date format: {from_date}")
+        
+        if to_date:
+            try:
+                from datetime import datetime
+                to_datetime = datetime.strptime(to_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+                # Use datetime comparison instead of __date lookup for index usage
+                client_job_filters &= Q(updated_at__lte=to_datetime)
+            except ValueError:
+                logger.warning(f"Invalid to_date format: {to_date}")
+        
+        if remark:
+            client_job_filters &= Q(remarks=remark)
+        # Optional attend filter (1 or 0)
+        attend_param = request.query_params.get('attend')
+        if attend_param is not None:
+            val = str(attend_param).strip().lower()
+            if val in ('1', 'true', 'yes'):
+                client_job_filters &= Q(attend=1)
+            elif val in ('0', 'false', 'no'):
+                client_job_filters &= Q(attend=0)
+
+        # Optional profile_submission filter (1 or 0)
+        profile_submission_param = request.query_params.get('profile_submission')
+        if profile_submission_param is not None:
+            ps_val = str(profile_submission_param).strip().lower()
+            if ps_val in ('1', 'true', 'yes'):
+                client_job_filters &= Q(profile_submission=1)
+            elif ps_val in ('0', 'false', 'no'):
+                client_job_filters &= Q(profile_submission=0)
+
+        # Optional transfer_status filter ('Active' or 'Inactive')
+        transfer_status_param = request.query_params.get('transfer_status')
+        if transfer_status_param is not None:
+            ts_val = str(transfer_status_param).strip()
+            if ts_val:
+                # Support CSV like Active,Inactive if ever needed
+                if ',' in ts_val:
+                    statuses = [s.strip() for s in ts_val.split(',') if s.strip()]
+                    if statuses:
+                        client_job_filters &= Q(transfer_status__in=statuses)
+                else:
+                    client_job_filters &= Q(transfer_status__iexact=ts_val)
+
+        # Optional exclude_remarks for 'others' drilldown (CSV list)
+        exclude_remarks_param = request.query_params.get('exclude_remarks')
+        if exclude_remarks_param:
+            try:
+                values = [v.strip() for v in exclude_remarks_param.split(',') if v.strip()]
+                if values:
+                    excl_q = Q()
+                    for v in values:
+                        excl_q |= Q(remarks__iexact=v)
+                    client_job_filters &= ~excl_q
+            except Exception:
+                pass
+            
+        if client and client.strip().lower() not in ["", "all", "all clients"]:
+            client_trimmed = client.strip()
+            client_job_filters &= Q(client_name__icontains=client_trimmed)
+        
+        # Build Candidate filters
+        candidate_filters = Q()
+        
+        if executive_filter and executive_filter.strip().lower() not in ["", "all", "all executives"]:
+            executive_trimmed = executive_filter.strip()
+            candidate_filters &= Q(executive_name__icontains=executive_trimmed)
+        
+        if state and state.strip().lower() not in ["", "all", "all states"]:
+            state_trimmed = state.strip()
+            candidate_filters &= (Q(city__icontains=state_trimmed) | Q(state__icontains=state_trimmed))
+        
+        if city and city.strip().lower() not in ["", "all", "all cities"]:
+            city_trimmed = city.strip()
+            candidate_filters &= Q(city__icontains=city_trimmed)
+        
+        # Use optimized approach: filter ClientJob first, get IDs, then filter Candidate
+        # This is faster than Exists for large datasets with complex filters
+        import time
+        start_time = time.time()
+        
+        # Step 1: Get candidate IDs from filtered ClientJobs (uses indexes)
+        logger.info(f"[DATABANK] Filtering ClientJobs with filters: {client_job_filters}")
+        matching_candidate_ids = list(ClientJob.objects.filter(
+            client_job_filters
+        ).values_list('candidate_id', flat=True).distinct())
+        
+        filter_time = time.time() - start_time
+        logger.info(f"[DATABANK] Found {len(matching_candidate_ids)} candidate IDs in {filter_time:.3f}s")
+        
+        # Augment: If a remark filter is provided, also include candidates from status history
+        # This supports drill-down from aggregated reports that are based on CandidateStatusHistory
+        try:
+            if remark and include_history:
+                history_filters = Q(remarks__iexact=remark)
+                # Apply client filter to history using icontains to handle spacing/case differences
+                if client and client.strip().lower() not in ["", "all", "all clients"]:
+                    client_trimmed = client.strip()
+                    history_filters &= Q(client_name__icontains=client_trimmed)
+                # Apply date range to change_date (history business date)
+                if from_date:
+                    try:
+                        from datetime import datetime
+                        from_date_obj = datetime.strptime(from_date, '%Y-%m-%d').date()
+                        history_filters &= Q(change_date__gte=from_date_obj)
+                    except ValueError:
+                        logger.warning(f"Invalid from_date format for history: {from_date}")
+                if to_date:
+                    try:
+                        from datetime import datetime
+                        to_date_obj = datetime.strptime(to_date, '%Y-%m-%d').date()
+                        history_filters &= Q(change_date__lte=to_date_obj)
+                    except ValueError:
+                        logger.warning(f"Invalid to_date format for history: {to_date}")
+
+                history_ids = list(CandidateStatusHistory.objects.filter(history_filters, is_deleted=False)
+                                   .values_list('candidate_id', flat=True)
+                                   .distinct())
+                if history_ids:
+                    before = len(matching_candidate_ids)
+                    matching_candidate_ids = list(set(matching_candidate_ids) | set(history_ids))
+                    logger.info(
+                        f"[DATABANK] Augmented candidate IDs from history: +{len(matching_candidate_ids) - before} (history={len(history_ids)}), total={len(matching_candidate_ids)}"
+                    )
+        except Exception as hx:
+            logger.warning(f"History augmentation skipped due to error: {str(hx)}")
+        
+        # Step 2: Filter candidates by ID (fast - uses PRIMARY KEY)
+        if matching_candidate_ids:
+            all_candidates = self.get_queryset().filter(
+                candidate_filters,
+                id__in=matching_candidate_ids
+            )
+        else:
+            # No matching jobs, return empty queryset
+            all_candidates = self.get_queryset().none()
+        
+        # Add search filter - search across multiple fields
+        # This is done AFTER the initial filters to search across all remaining candidates
+        indexed = candidate_search.filter_candidates(all_candidates, search_term) if search_term else None
+        if indexed is not None:
+            all_candidates = indexed
+        elif search_term:
+            # First, search for employees whose name matches the search term
+            try:
+                from empreg.models import Employee
+                matching_employees = list(Employee.objects.filter(
+                    Q(firstName__icontains=search_term) |
+                    Q(lastName__icontains=search_term) |
+                    Q(employeeCode__icontains=search_term)
+                ).values_list('employeeCode', flat=True))
+            except Exception as emp_error:
+                logger.warning(f"Error searching employees: {str(emp_error)}")
+                matching_employees = []
+            
+            # Search in candidate fields OR client job fields OR employee names
+            search_q = (
+                Q(candidate_name__icontains=search_term) |
+                Q(profile_number__icontains=search_term) |
+                Q(email__icontains=search_term) |
+                Q(mobile1__icontains=search_term) |
+                Q(mobile2__icontains=search_term) |
+                Q(city__icontains=search_term) |
+                Q(state__icontains=search_term) |
+                Q(executive_name__icontains=search_term)
+            )
+            
+            # Add employee name search - find candidates assigned to matching employees
+            if matching_employees:
+                search_q |= Q(executive_name__in=matching_employees)
+            
+            # For client job search, use Exists subquery
+            search_jobs_subquery = ClientJob.objects.filter(
+                Q(client_name__icontains=search_term) |
+                Q(designation__icontains=search_term) |
+                Q(remarks__icontains=search_term),
+                candidate_id=OuterRef('pk')
+            )
+            
+            # Combine: candidate matches OR has matching client jobs
+            all_candidates = all_candidates.filter(
+                search_q | Q(Exists(search_jobs_subquery))
+            )
+
+        return all_candidates
+
     @action(detail=False, methods=['get'], url_path='all')
     def all_candidates(self, request):
         """
@@ -1128,219 +1313,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
         Endpoint: /api/candidates/all/
         """
         try:
-            # Get filters
-            from_date = request.query_params.get('from_date')
-            to_date = request.query_params.get('to_date')
-            remark = request.query_params.get('remark')
-            client = request.query_params.get('client')
-            state = request.query_params.get('state')
-            city = request.query_params.get('city')
-            executive_filter = request.query_params.get('executive', None)
-            search_term = request.query_params.get('search', '').strip()
-            include_history_param = request.query_params.get('include_history', None)
-            include_history = True
-            if include_history_param is not None:
-                val = str(include_history_param).strip().lower()
-                if val in ('0', 'false', 'no'):
-                    include_history = False
-                elif val in ('1', 'true', 'yes'):
-                    include_history = True
-            
-            # OPTIMIZATION: Use subquery to filter ClientJobs first, then get candidate IDs
-            # This avoids expensive joins and distinct() on the main query
-            from django.db.models import Q, Exists, OuterRef
-            from .models import ClientJob
-            
-            # Build ClientJob filters (optimized for index usage)
-            client_job_filters = Q()
-            if from_date:
-                try:
-                    from datetime import datetime
-                    from_datetime = datetime.strptime(from_date, '%Y-%m-%d')
-                    # Use datetime comparison instead of __date lookup for index usage
-                    client_job_filters &= Q(updated_at__gte=from_datetime)
-                except ValueError:
-                    logger.warning(f"Invalid from_date format: {from_date}")
-            
-            if to_date:
-                try:
-                    from datetime import datetime
-                    to_datetime = datetime.strptime(to_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
-                    # Use datetime comparison instead of __date lookup for index usage
-                    client_job_filters &= Q(updated_at__lte=to_datetime)
-                except ValueError:
-                    logger.warning(f"Invalid to_date format: {to_date}")
-            
-            if remark:
-                client_job_filters &= Q(remarks=remark)
-            # Optional attend filter (1 or 0)
-            attend_param = request.query_params.get('attend')
-            if attend_param is not None:
-                val = str(attend_param).strip().lower()
-                if val in ('1', 'true', 'yes'):
-                    client_job_filters &= Q(attend=1)
-                elif val in ('0', 'false', 'no'):
-                    client_job_filters &= Q(attend=0)
-
-            # Optional profile_submission filter (1 or 0)
-            profile_submission_param = request.query_params.get('profile_submission')
-            if profile_submission_param is not None:
-                ps_val = str(profile_submission_param).strip().lower()
-                if ps_val in ('1', 'true', 'yes'):
-                    client_job_filters &= Q(profile_submission=1)
-                elif ps_val in ('0', 'false', 'no'):
-                    client_job_filters &= Q(profile_submission=0)
-
-            # Optional transfer_status filter ('Active' or 'Inactive')
-            transfer_status_param = request.query_params.get('transfer_status')
-            if transfer_status_param is not None:
-                ts_val = str(transfer_status_param).strip()
-                if ts_val:
-                    # Support CSV like Active,Inactive if ever needed
-                    if ',' in ts_val:
-                        statuses = [s.strip() for s in ts_val.split(',') if s.strip()]
-                        if statuses:
-                            client_job_filters &= Q(transfer_status__in=statuses)
-                    else:
-                        client_job_filters &= Q(transfer_status__iexact=ts_val)
-
-            # Optional exclude_remarks for 'others' drilldown (CSV list)
-            exclude_remarks_param = request.query_params.get('exclude_remarks')
-            if exclude_remarks_param:
-                try:
-                    values = [v.strip() for v in exclude_remarks_param.split(',') if v.strip()]
-                    if values:
-                        excl_q = Q()
-                        for v in values:
-                            excl_q |= Q(remarks__iexact=v)
-                        client_job_filters &= ~excl_q
-                except Exception:
-                    pass
-                
-            if client and client.strip().lower() not in ["", "all", "all clients"]:
-                client_trimmed = client.strip()
-                client_job_filters &= Q(client_name__icontains=client_trimmed)
-            
-            # Build Candidate filters
-            candidate_filters = Q()
-            
-            if executive_filter and executive_filter.strip().lower() not in ["", "all", "all executives"]:
-                executive_trimmed = executive_filter.strip()
-                candidate_filters &= Q(executive_name__icontains=executive_trimmed)
-            
-            if state and state.strip().lower() not in ["", "all", "all states"]:
-                state_trimmed = state.strip()
-                candidate_filters &= (Q(city__icontains=state_trimmed) | Q(state__icontains=state_trimmed))
-            
-            if city and city.strip().lower() not in ["", "all", "all cities"]:
-                city_trimmed = city.strip()
-                candidate_filters &= Q(city__icontains=city_trimmed)
-            
-            # Use optimized approach: filter ClientJob first, get IDs, then filter Candidate
-            # This is faster than Exists for large datasets with complex filters
-            import time
             start_time = time.time()
-            
-            # Step 1: Get candidate IDs from filtered ClientJobs (uses indexes)
-            logger.info(f"[DATABANK] Filtering ClientJobs with filters: {client_job_filters}")
-            matching_candidate_ids = list(ClientJob.objects.filter(
-                client_job_filters
-            ).values_list('candidate_id', flat=True).distinct())
-            
-            filter_time = time.time() - start_time
-            logger.info(f"[DATABANK] Found {len(matching_candidate_ids)} candidate IDs in {filter_time:.3f}s")
-            
-            # Augment: If a remark filter is provided, also include candidates from status history
-            # This supports drill-down from aggregated reports that are based on CandidateStatusHistory
-            try:
-                if remark and include_history:
-                    history_filters = Q(remarks__iexact=remark)
-                    # Apply client filter to history using icontains to handle spacing/case differences
-                    if client and client.strip().lower() not in ["", "all", "all clients"]:
-                        client_trimmed = client.strip()
-                        history_filters &= Q(client_name__icontains=client_trimmed)
-                    # Apply date range to change_date (history business date)
-                    if from_date:
-                        try:
-                            from datetime import datetime
-                            from_date_obj = datetime.strptime(from_date, '%Y-%m-%d').date()
-                            history_filters &= Q(change_date__gte=from_date_obj)
-                        except ValueError:
-                            logger.warning(f"Invalid from_date format for history: {from_date}")
-                    if to_date:
-                        try:
-                            from datetime import datetime
-                            to_date_obj = datetime.strptime(to_date, '%Y-%m-%d').date()
-                            history_filters &= Q(change_date__lte=to_date_obj)
-                        except ValueError:
-                            logger.warning(f"Invalid to_date format for history: {to_date}")
-
-                    history_ids = list(CandidateStatusHistory.objects.filter(history_filters, is_deleted=False)
-                                       .values_list('candidate_id', flat=True)
-                                       .distinct())
-                    if history_ids:
-                        before = len(matching_candidate_ids)
-                        matching_candidate_ids = list(set(matching_candidate_ids) | set(history_ids))
-                        logger.info(
-                            f"[DATABANK] Augmented candidate IDs from history: +{len(matching_candidate_ids) - before} (history={len(history_ids)}), total={len(matching_candidate_ids)}"
-                        )
-            except Exception as hx:
-                logger.warning(f"History augmentation skipped due to error: {str(hx)}")
-            
-            # Step 2: Filter candidates by ID (fast - uses PRIMARY KEY)
-            if matching_candidate_ids:
-                all_candidates = self.get_queryset().filter(
-                    candidate_filters,
-                    id__in=matching_candidate_ids
-                )
-            else:
-                # No matching jobs, return empty queryset
-                all_candidates = self.get_queryset().none()
-            
-            # Add search filter - search across multiple fields
-            # This is done AFTER the initial filters to search across all remaining candidates
-            if search_term:
-                # First, search for employees whose name matches the search term
-                try:
-                    from empreg.models import Employee
-                    matching_employees = list(Employee.objects.filter(
-                        Q(firstName__icontains=search_term) |
-                        Q(lastName__icontains=search_term) |
-                        Q(employeeCode__icontains=search_term)
-                    ).values_list('employeeCode', flat=True))
-                except Exception as emp_error:
-                    logger.warning(f"Error searching employees: {str(emp_error)}")
-                    matching_employees = []
-                
-                # Search in candidate fields OR client job fields OR employee names
-                candidate_search = (
-                    Q(candidate_name__icontains=search_term) |
-                    Q(profile_number__icontains=search_term) |
-                    Q(email__icontains=search_term) |
-                    Q(mobile1__icontains=search_term) |
-                    Q(mobile2__icontains=search_term) |
-                    Q(city__icontains=search_term) |
-                    Q(state__icontains=search_term) |
-                    Q(executive_name__icontains=search_term)
-                )
-                
-                # Add employee name search - find candidates assigned to matching employees
-                if matching_employees:
-                    candidate_search |= Q(executive_name__in=matching_employees)
-                
-                # For client job search, use Exists subquery
-                search_jobs_subquery = ClientJob.objects.filter(
-                    Q(client_name__icontains=search_term) |
-                    Q(designation__icontains=search_term) |
-                    Q(remarks__icontains=search_term),
-                    candidate_id=OuterRef('pk')
-                )
-                
-                # Combine: candidate matches OR has matching client jobs
-                all_candidates = all_candidates.filter(
-                    candidate_search | Q(Exists(search_jobs_subquery))
-                )
-            
+            all_candidates = self._databank_queryset(request)
+
             # Add prefetch_related BEFORE pagination to optimize query
             all_candidates = all_candidates.prefetch_related('client_jobs').order_by('-updated_at')
             
@@ -1369,8 +1344,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
                     'message': 'All candidates retrieved successfully'
                 }, status=status.HTTP_200_OK)
             else:
-                # Use pagination for regular requests
+                # Use pagination for regular requests (?pagination=cursor for keyset paging)
                 paginator = self.pagination_class()
+                paginator.keyset_ordering_field = 'updated_at'
                 page = paginator.paginate_queryset(all_candidates, request)
                 if page is not None:
                     # Page already has prefetch_related applied from the queryset above
@@ -1405,6 +1381,152 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    DATABANK_EXPORT_COLUMNS = [
+        ('Candidate ID', 'id'), ('Profile Number', 'profile_number'), ('Candidate Name', 'candidate_name'),
+        ('Mobile', 'mobile1'), ('Alternate Mobile', 'mobile2'), ('Email', 'email'), ('Gender', 'gender'),
+        ('City', 'city'), ('State', 'state'), ('Pincode', 'pincode'), ('Education', 'education'),
+        ('Experience', 'experience'), ('Source', 'source'), ('Executive Code', 'executive_name'),
+        ('Executive', 'executive_display'), ('Clients', 'clients'), ('Latest Client', 'latest_client'),
+        ('Latest Designation', 'latest_designation'), ('Latest Remarks', 'latest_remarks'),
+        ('Next Follow Up', 'next_follow_up_date'), ('Created At', 'created_at'), ('Updated At', 'updated_at'),
+    ]
+    DATABANK_EXPORT_FIELDS = (
+        'profile_number', 'candidate_name', 'mobile1', 'mobile2', 'email', 'gender', 'city', 'state',
+        'pincode', 'education', 'experience', 'source', 'executive_name', 'created_at',
+    )
+
+    @action(detail=False, methods=['get'], url_path='all/export')
+    def all_candidates_export(self, request):
+        """
+        Stream the databank as a file: same filters as /api/candidates/all/,
+        ?export=csv (default) or xlsx; one row per candidate with its client
+        jobs summarised. Replaces all?all=true for downloads.
+        """
+        from collections import defaultdict
+        from .models import ClientJob
+
+        fmt = exports.requested_format(request, default='csv')
+        queryset = self._databank_queryset(request)
+
+        def batches():
+            for rows in exports.iter_batches(queryset, self.DATABANK_EXPORT_FIELDS):
+                jobs = defaultdict(list)
+                job_rows = (ClientJob.objects.filter(candidate_id__in=[row['id'] for row in rows])
+                            .order_by('-id')
+                            .values('candidate_id', 'client_name', 'designation', 'remarks', 'next_follow_up_date'))
+                for job in job_rows:
+                    jobs[job['candidate_id']].append(job)
+                names = exports.employee_names(row['executive_name'] for row in rows)
+                for row in rows:
+                    candidate_jobs = jobs.get(row['id'], [])
+                    latest = candidate_jobs[0] if candidate_jobs else {}
+                    row['executive_display'] = names.get(row['executive_name'], row['executive_name'])
+                    row['clients'] = list(dict.fromkeys(job['client_name'] for job in candidate_jobs))
+                    row['latest_client'] = latest.get('client_name')
+                    row['latest_designation'] = latest.get('designation')
+                    row['latest_remarks'] = latest.get('remarks')
+                    row['next_follow_up_date'] = latest.get('next_follow_up_date')
+                yield rows
+
+        return exports.response(fmt, 'databank', self.DATABANK_EXPORT_COLUMNS, batches())
+
+    def _job_rows_queryset(self, request):
+        """ClientJobs matching the job_rows filters (shared by job_rows and its export)"""
+        from django.db.models import Q
+        from .models import ClientJob, Candidate
+
+        from_date = request.query_params.get('from_date')
+        to_date = request.query_params.get('to_date')
+        date_field = (request.query_params.get('date_field') or 'updated_at').strip()
+        client = request.query_params.get('client')
+        state = request.query_params.get('state')
+        city = request.query_params.get('city')
+        executive = request.query_params.get('executive')
+        owner_by = (request.query_params.get('owner_by') or '').strip().lower()  # 'current' | 'previous' | '' (default)
+        remark = request.query_params.get('remark')
+        attend_param = request.query_params.get('attend')
+        profile_submission_param = request.query_params.get('profile_submission')
+        transfer_status_param = request.query_params.get('transfer_status')
+
+        job_q = Q()
+        if from_date:
+            try:
+                from datetime import datetime
+                if date_field == 'profile_submission_date':
+                    job_q &= Q(profile_submission_date__gte=datetime.strptime(from_date, '%Y-%m-%d').date())
+                else:
+                    job_q &= Q(updated_at__gte=datetime.strptime(from_date, '%Y-%m-%d'))
+            except ValueError:
+                logger.warning(f"Invalid from_date format: {from_date}")
+        if to_date:
+            try:
+                from datetime import datetime
+                if date_field == 'profile_submission_date':
+                    job_q &= Q(profile_submission_date__lte=datetime.strptime(to_date, '%Y-%m-%d').date())
+                else:
+                    to_dt = datetime.strptime(to_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+                    job_q &= Q(updated_at__lte=to_dt)
+            except ValueError:
+                logger.warning(f"Invalid to_date format: {to_date}")
+
+        if attend_param is not None:
+            val = str(attend_param).strip().lower()
+            if val in ('1', 'true', 'yes'):
+                job_q &= Q(attend=True)
+            elif val in ('0', 'false', 'no'):
+                job_q &= Q(attend=False)
+
+        if profile_submission_param is not None:
+            ps_val = str(profile_submission_param).strip().lower()
+            if ps_val in ('1', 'true', 'yes'):
+                job_q &= Q(profile_submission=1)
+            elif ps_val in ('0', 'false', 'no'):
+                job_q &= Q(profile_submission=0)
+
+        if transfer_status_param is not None:
+            ts_val = str(transfer_status_param).strip()
+            if ts_val:
+                if ',' in ts_val:
+                    statuses = [s.strip() for s in ts_val.split(',') if s.strip()]
+                    if statuses:
+                        job_q &= Q(transfer_status__in=statuses)
+                else:
+                    job_q &= Q(transfer_status__iexact=ts_val)
+
+        if client and client.strip().lower() not in ["", "all", "all clients"]:
+            job_q &= Q(client_name__icontains=client.strip())
+
+        if remark:
+            job_q &= Q(remarks__iexact=remark.strip())
+
+        # Executive filter: allow different owner scopes
+        cand_q = Q()
+        exec_val = (executive or '').strip()
+        exec_filter_applied = False
+        if exec_val and exec_val.lower() not in ["", "all", "all executives"]:
+            if owner_by == 'previous':
+                # Attribute to previous owner -> match assigned_from on ClientJob
+                job_q &= Q(assigned_from__iexact=exec_val)
+                exec_filter_applied = True
+            elif owner_by == 'current':
+                # Current owner -> assign_to OR candidate.executive_name
+                job_q &= (Q(assign_to__iexact=exec_val) | Q(candidate__executive_name__iexact=exec_val))
+                exec_filter_applied = True
+            # else fallback to candidate.executive_name icontains (legacy behavior)
+            
+        if (not exec_filter_applied) and exec_val and exec_val.lower() not in ["", "all", "all executives"]:
+            cand_q &= Q(executive_name__icontains=exec_val)
+        if state and state.strip().lower() not in ["", "all", "all states"]:
+            st = state.strip()
+            cand_q &= (Q(state__icontains=st) | Q(city__icontains=st))
+        if city and city.strip().lower() not in ["", "all", "all cities"]:
+            cand_q &= Q(city__icontains=city.strip())
+
+        qs = ClientJob.objects.filter(job_q)
+        if cand_q.children:
+            qs = qs.filter(candidate__in=Candidate.objects.filter(cand_q).values('id'))
+        return qs
+
     @action(detail=False, methods=['get'], url_path='job-rows')
     def job_rows(self, request):
         """
@@ -1424,109 +1546,25 @@ class CandidateViewSet(viewsets.ModelViewSet):
           - all=true to return all without pagination
         """
         try:
-            from django.db.models import Q
-            from .models import ClientJob, Candidate
-
-            from_date = request.query_params.get('from_date')
-            to_date = request.query_params.get('to_date')
-            date_field = (request.query_params.get('date_field') or 'updated_at').strip()
-            client = request.query_params.get('client')
-            state = request.query_params.get('state')
-            city = request.query_params.get('city')
-            executive = request.query_params.get('executive')
-            owner_by = (request.query_params.get('owner_by') or '').strip().lower()  # 'current' | 'previous' | '' (default)
-            remark = request.query_params.get('remark')
-            attend_param = request.query_params.get('attend')
-            profile_submission_param = request.query_params.get('profile_submission')
-            transfer_status_param = request.query_params.get('transfer_status')
-
-            job_q = Q()
-            if from_date:
-                try:
-                    from datetime import datetime
-                    if date_field == 'profile_submission_date':
-                        job_q &= Q(profile_submission_date__gte=datetime.strptime(from_date, '%Y-%m-%d').date())
-                    else:
-                        job_q &= Q(updated_at__gte=datetime.strptime(from_date, '%Y-%m-%d'))
-                except ValueError:
-                    logger.warning(f"Invalid from_date format: {from_date}")
-            if to_date:
-                try:
-                    from datetime import datetime
-                    if date_field == 'profile_submission_date':
-                        job_q &= Q(profile_submission_date__lte=datetime.strptime(to_date, '%Y-%m-%d').date())
-                    else:
-                        to_dt = datetime.strptime(to_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
-                        job_q &= Q(updated_at__lte=to_dt)
-                except ValueError:
-                    logger.warning(f"Invalid to_date format: {to_date}")
-
-            if attend_param is not None:
-                val = str(attend_param).strip().lower()
-                if val in ('1', 'true', 'yes'):
-                    job_q &= Q(attend=True)
-                elif val in ('0', 'false', 'no'):
-                    job_q &= Q(attend=False)
-
-            if profile_submission_param is not None:
-                ps_val = str(profile_submission_param).strip().lower()
-                if ps_val in ('1', 'true', 'yes'):
-                    job_q &= Q(profile_submission=1)
-                elif ps_val in ('0', 'false', 'no'):
-                    job_q &= Q(profile_submission=0)
-
-            if transfer_status_param is not None:
-                ts_val = str(transfer_status_param).strip()
-                if ts_val:
-                    if ',' in ts_val:
-                        statuses = [s.strip() for s in ts_val.split(',') if s.strip()]
-                        if statuses:
-                            job_q &= Q(transfer_status__in=statuses)
-                    else:
-                        job_q &= Q(transfer_status__iexact=ts_val)
-
-            if client and client.strip().lower() not in ["", "all", "all clients"]:
-                job_q &= Q(client_name__icontains=client.strip())
-
-            if remark:
-                job_q &= Q(remarks__iexact=remark.strip())
-
-            # Executive filter: allow different owner scopes
-            cand_q = Q()
-            exec_val = (executive or '').strip()
-            exec_filter_applied = False
-            if exec_val and exec_val.lower() not in ["", "all", "all executives"]:
-                if owner_by == 'previous':
-                    # Attribute to previous owner -> match assigned_from on ClientJob
-                    job_q &= Q(assigned_from__iexact=exec_val)
-                    exec_filter_applied = True
-                elif owner_by == 'current':
-                    # Current owner -> assign_to OR candidate.executive_name
-                    job_q &= (Q(assign_to__iexact=exec_val) | Q(candidate__executive_name__iexact=exec_val))
-                    exec_filter_applied = True
-                # else fallback to candidate.executive_name icontains (legacy behavior)
-                
-            if (not exec_filter_applied) and exec_val and exec_val.lower() not in ["", "all", "all executives"]:
-                cand_q &= Q(executive_name__icontains=exec_val)
-            if state and state.strip().lower() not in ["", "all", "all states"]:
-                st = state.strip()
-                cand_q &= (Q(state__icontains=st) | Q(city__icontains=st))
-            if city and city.strip().lower() not in ["", "all", "all cities"]:
-                cand_q &= Q(city__icontains=city.strip())
-
-            qs = ClientJob.objects.select_related('candidate').prefetch_related('assignment_history').filter(job_q)
-            if cand_q.children:
-                qs = qs.filter(candidate__in=Candidate.objects.filter(cand_q).values('id'))
+            qs = self._job_rows_queryset(request).select_related('candidate').prefetch_related('assignment_history')
 
             get_all = request.query_params.get('all', '').lower() == 'true'
             offset = int(request.query_params.get('offset', 0))
             limit = int(request.query_params.get('limit', 100))
 
-            total_count = qs.count()
-            if not get_all:
-                jobs = qs.order_by('-updated_at')[offset:offset+limit]
+            keyset = None
+            if not get_all and wants_cursor(request):
+                # Keyset paging on (updated_at, id): no COUNT(*) and no OFFSET
+                keyset = KeysetPagination(ordering_field='updated_at', page_size=limit, max_page_size=1000)
+                keyset.page_size_query_param = 'limit'
+                jobs = keyset.paginate_queryset(qs, request)
+                total_count = None
             else:
-                jobs = qs.order_by('-updated_at')
+                total_count = qs.count()
+                if not get_all:
+                    jobs = qs.order_by('-updated_at')[offset:offset+limit]
+                else:
+                    jobs = qs.order_by('-updated_at')
 
             results = []
             for j in jobs:
@@ -1602,6 +1640,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
                     if 'assign_to_name' not in r:
                         r['assign_to_name'] = r.get('assign_to')
 
+            if keyset is not None:
+                return Response(keyset.get_paginated_data(results), status=status.HTTP_200_OK)
+
             return Response({
                 'count': total_count,
                 'results': results
@@ -1614,6 +1655,58 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    # Export columns: (header, key in the flattened row)
+    JOB_ROW_EXPORT_COLUMNS = [
+        ('Job ID', 'id'), ('Candidate ID', 'candidate_id'), ('Candidate Name', 'candidate__candidate_name'),
+        ('Client', 'client_name'), ('Designation', 'designation'), ('Remarks', 'remarks'),
+        ('Transfer Status', 'transfer_status'), ('Profile Submission', 'profile_submission'),
+        ('Profile Submission Date', 'profile_submission_date'), ('Attend', 'attend'),
+        ('City', 'candidate__city'), ('State', 'candidate__state'), ('Executive', 'candidate__executive_name'),
+        ('Assign To', 'assign_to_name'), ('Assigned From', 'assigned_from_name'), ('Transfer Date', 'transfer_date'),
+        ('Previous Owners', 'previous_owner_names'), ('Updated At', 'updated_at'),
+    ]
+    # values() projection behind them (names are resolved per batch)
+    JOB_ROW_EXPORT_FIELDS = (
+        'candidate_id', 'candidate__candidate_name', 'client_name', 'designation', 'remarks', 'profilestatus',
+        'transfer_status', 'profile_submission', 'profile_submission_date', 'attend', 'candidate__city',
+        'candidate__state', 'candidate__executive_name', 'assign_to', 'assigned_from', 'transfer_date',
+    )
+
+    @action(detail=False, methods=['get'], url_path='job-rows/export')
+    def job_rows_export(self, request):
+        """
+        Stream job_rows as a file: same filters as /api/candidates/job-rows/,
+        ?export=csv (default) or xlsx. Replaces job-rows?all=true for downloads.
+        """
+        from collections import defaultdict
+        from .models import JobAssignmentHistory
+
+        fmt = exports.requested_format(request, default='csv')
+        queryset = self._job_rows_queryset(request)
+
+        def batches():
+            for rows in exports.iter_batches(queryset, self.JOB_ROW_EXPORT_FIELDS):
+                previous = defaultdict(list)
+                history = (JobAssignmentHistory.objects
+                           .filter(client_job_id__in=[row['id'] for row in rows], previous_owner__isnull=False)
+                           .order_by('-created_at')
+                           .values_list('client_job_id', 'previous_owner'))
+                for job_id, owner in history:
+                    if owner and owner not in previous[job_id]:
+                        previous[job_id].append(owner)
+                codes = {code for owners in previous.values() for code in owners}
+                codes.update(row['assign_to'] for row in rows)
+                codes.update(row['assigned_from'] for row in rows)
+                names = exports.employee_names(codes)
+                for row in rows:
+                    row['remarks'] = row['remarks'] or row['profilestatus']
+                    row['previous_owner_names'] = [names.get(code, code) for code in previous.get(row['id'], [])]
+                    row['assign_to_name'] = names.get(row['assign_to'], row['assign_to'])
+                    row['assigned_from_name'] = names.get(row['assigned_from'], row['assigned_from'])
+                yield rows
+
+        return exports.response(fmt, 'job_rows', self.JOB_ROW_EXPORT_COLUMNS, batches())
+
     @action(detail=False, methods=['get'], url_path='my-candidates')
     def my_candidates(self, request):
         """
@@ -1630,18 +1723,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
             
             # Debug: Log the request details
             
-            # Get the employee code for the logged-in user using robust search
+            # Get the employee code for the logged-in user (request.employee, see empreg/identity.py)
             try:
-                from empreg.models import Employee
-                
-                username = request.user.username
-                employee = Employee.objects.filter(
-                    Q(user=request.user) | 
-                    Q(employeeCode=username) | 
-                    Q(phone1=username) | 
-                    Q(phone2=username),
-                    del_state=0
-                ).select_related().first()
+                employee = request.employee
                 
                 if not employee:
                     return Response({
@@ -1665,7 +1749,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 created_by=employee_code
             ).only(
                 'id', 'profile_number', 'executive_name', 'candidate_name', 
-                'mobile1', 'mobile2', 'email', 'city', 'created_by', 'created_at', 'updated_at'
+                'mobile1', 'mobile2', 'email', 'city', 'source', 'created_by', 'created_at', 'updated_at'
             ).order_by('-updated_at')
             
             
@@ -1690,8 +1774,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
             
             # Check if user wants all data (no pagination)
             get_all = request.query_params.get('all', '').lower() == 'true'
+            keyset = None
             
-            if get_all:
+            if not get_all and wants_cursor(request):
+                # Keyset paging on (updated_at, id): no COUNT(*) and no OFFSET
+                keyset = KeysetPagination(ordering_field='updated_at', page_size=1000, max_page_size=5000)
+                candidates_page = keyset.paginate_queryset(candidates, request)
+            elif get_all:
                 # Return all candidates without pagination
                 total_count = candidates.count()
                 candidates_page = candidates
@@ -1752,6 +1841,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 candidate_data.append(candidate_dict)
             
             
+            if keyset is not None:
+                return Response(keyset.get_paginated_data(candidate_data), status=status.HTTP_200_OK)
+
             # Prepare pagination info based on whether we're fetching all or using pagination
             if get_all:
                 pagination_info = {
@@ -1800,16 +1892,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
             from empreg.models import Employee
             
 
-            # Get employee profile using robust search
+            # Get employee profile (request.employee, see empreg/identity.py)
             try:
-                username = request.user.username
-                employee = Employee.objects.filter(
-                    Q(user=request.user) | 
-                    Q(employeeCode=username) | 
-                    Q(phone1=username) | 
-                    Q(phone2=username),
-                    del_state=0
-                ).select_related().first()
+                employee = request.employee
                 
                 if not employee:
                     return Response({"error": "Employee profile not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -1830,26 +1915,21 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
             # BM logic (L3/bm) - Enhanced filtering
             if user_role in ['L3', 'bm']:
-                # Get all employees in BM's branch (including null branch for Coimbatore and Madurai)
+                # Active employees in BM's branch (including null branch for Coimbatore and Madurai)
                 if user_branch and user_branch.upper() in ['COIMBATORE', 'MADURAI']:
-                    # For Coimbatore and Madurai BM: include employees with branch='COIMBATORE'/'MADURAI' OR branch is null
-                    branch_employees = Employee.objects.filter(
-                        Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                        del_state=0,
-                        status='Active'
-                    ).exclude(employeeCode__isnull=True)
+                    in_branch = Q(branch__iexact=user_branch) | Q(branch__isnull=True)
                 else:
-                    # For other branches: only include employees with exact branch match
-                    branch_employees = Employee.objects.filter(
-                        branch=user_branch,
-                        del_state=0,
-                        status='Active'
-                    ).exclude(employeeCode__isnull=True)
-                branch_employee_codes = [emp.employeeCode for emp in branch_employees if emp.employeeCode]
+                    in_branch = Q(branch=user_branch)
+                branch_employees = Employee.objects.filter(in_branch, del_state=0, status='Active')
+                branch_employee_codes = [code for code in branch_employees.values_list('employeeCode', flat=True) if code]
                 # Always include BM's own employeeCode
                 if employee_code not in branch_employee_codes:
                     branch_employee_codes.append(employee_code)
 
+                def valid_selected_tl():
+                    # Selected TL must be an active L2 of the BM's branch
+                    return branch_employees.filter(employeeCode=selected_tl, level='L2').exists()
+
                 # Apply filters based on priority
                 if selected_employee:
                     # Priority 1: Selected Employee - show only candidates currently owned by that employee
@@ -1872,24 +1952,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 elif filter_mode == 'tl_only' and selected_tl:
                     # Priority 4: TL Only - show candidates under selected TL
                     # Verify selected TL is active and in the same branch (including null for Coimbatore and Madurai)
-                    if user_branch and user_branch.upper() in ['COIMBATORE', 'MADURAI']:
-                        selected_tl_obj = Employee.objects.filter(
-                            Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                            employeeCode=selected_tl,
-                            level='L2',
-                            status='Active',
-                            del_state=0
-                        ).first()
-                    else:
-                        selected_tl_obj = Employee.objects.filter(
-                            employeeCode=selected_tl,
-                            branch=user_branch,
-                            level='L2',
-                            status='Active',
-                            del_state=0
-                        ).first()
-                    
-                    if selected_tl_obj:
+                    if valid_selected_tl():
                         # executive_name stores employee code, not full name
                         candidates = Candidate.objects.filter(
                             executive_name=selected_tl
@@ -1902,46 +1965,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 elif filter_mode == 'tl_with_team' and selected_tl:
                     # Priority 5: TL + Team - show TL + their team candidates
                     # Verify selected TL is active and in the same branch (including null for Coimbatore and Madurai)
-                    if user_branch and user_branch.upper() in ['COIMBATORE', 'MADURAI']:
-                        selected_tl_obj = Employee.objects.filter(
-                            Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                            employeeCode=selected_tl,
-                            level='L2',
-                            status='Active',
-                            del_state=0
-                        ).first()
-                    else:
-                        selected_tl_obj = Employee.objects.filter(
-                            employeeCode=selected_tl,
-                            branch=user_branch,
-                            level='L2',
-                            status='Active',
-                            del_state=0
-                        ).first()
-                    
-                    if selected_tl_obj:
-                        # Get team members reporting to this TL (same branch logic)
-                        if user_branch and user_branch.upper() in ['COIMBATORE', 'MADURAI']:
-                            tl_team_employees = Employee.objects.filter(
-                                Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                                reportingManager__in=[selected_tl],
-                                status='Active',
-                                del_state=0
-                            )
-                        else:
-                            tl_team_employees = Employee.objects.filter(
-                                reportingManager__in=[selected_tl],
-                                branch=user_branch,
-                                status='Active',
-                                del_state=0
-                            )
-                        tl_team_codes = [selected_tl]  # Include TL themselves
-                        tl_team_codes.extend([emp.employeeCode for emp in tl_team_employees if emp.employeeCode])
-                        
-                        # Get employee codes for executive_name matching
+                    if valid_selected_tl():
+                        # TL + their direct reports (closure table, depth 1) within the BM's branch
                         # executive_name stores employee code, not full name
                         tl_team_codes_list = [selected_tl]
-                        tl_team_codes_list.extend([emp.employeeCode for emp in tl_team_employees if emp.employeeCode])
+                        tl_team_codes_list.extend(branch_employees.filter(
+                            employeeCode__in=org_hierarchy.subordinate_codes(selected_tl, max_depth=1)
+                        ).values_list('employeeCode', flat=True))
                         
                         candidates = Candidate.objects.filter(
                             executive_name__in=tl_team_codes_list
@@ -1960,14 +1990,10 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
             # TL logic (L2/tl) - Show only currently owned candidates by team
             elif user_role in ['L2', 'tl']:
-                reporting_employees = Employee.objects.filter(
-                    reportingManager__in=[employee_code, employee.firstName]
-                )
-                
-                # Get employee codes of all team members for executive_name matching
+                # TL + everyone reporting to them directly, active or not (closure table, depth 1)
                 # executive_name stores employee code, not full name
                 team_employee_codes = [employee_code]
-                team_employee_codes.extend([emp.employeeCode for emp in reporting_employees if emp.employeeCode])
+                team_employee_codes.extend(org_hierarchy.subordinate_codes(employee_code, max_depth=1, active_only=False))
 
                 # Show only candidates currently owned by TL or team members (executive_name)
                 # Once assigned outside the team, they won't see it
@@ -2255,16 +2281,10 @@ class CandidateViewSet(viewsets.ModelViewSet):
             
             print(f"branch_employees called by user: {request.user}")
 
-            # Get employee profile using robust search
+            # Get employee profile (request.employee, see empreg/identity.py)
             try:
                 username = request.user.username
-                employee = Employee.objects.filter(
-                    Q(user=request.user) | 
-                    Q(employeeCode=username) | 
-                    Q(phone1=username) | 
-                    Q(phone2=username),
-                    del_state=0
-                ).select_related().first()
+                employee = request.employee
                 
                 if not employee:
                     print(f"BM Employee not found for user: {request.user} (username: {username})")
@@ -2286,39 +2306,14 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 return Response({"error": "Access denied. Only Branch Managers can access this endpoint."}, 
                               status=status.HTTP_403_FORBIDDEN)
 
-            # Get all employees in BM's branch (including null branch for Coimbatore and Madurai)
-            if user_branch and user_branch.upper() in ['COIMBATORE', 'MADURAI']:
-                # For Coimbatore and Madurai BM: include employees with branch='COIMBATORE'/'MADURAI' OR branch is null
-                branch_employees = Employee.objects.filter(
-                    Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                    del_state=0,
-                    status='Active'
-                ).exclude(employeeCode__isnull=True).order_by('firstName', 'lastName')
-            else:
-                # For other branches: only include employees with exact branch match
-                branch_employees = Employee.objects.filter(
-                    branch=user_branch,
-                    del_state=0,
-                    status='Active'
-                ).exclude(employeeCode__isnull=True).order_by('firstName', 'lastName')
-
-            # Get TLs specifically with enhanced filtering
-            if user_branch and user_branch.upper() in ['COIMBATORE', 'MADURAI']:
-                # For Coimbatore and Madurai BM: include TLs with branch='COIMBATORE'/'MADURAI' OR branch is null
-                team_leaders_query = Employee.objects.filter(
-                    Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                    level='L2',
-                    status='Active',
-                    del_state=0
-                ).exclude(employeeCode__isnull=True).order_by('firstName', 'lastName')
-            else:
-                # For other branches: only include TLs with exact branch match
-                team_leaders_query = Employee.objects.filter(
-                    branch=user_branch,
-                    level='L2',
-                    status='Active',
-                    del_state=0
-                ).exclude(employeeCode__isnull=True).order_by('firstName', 'lastName')
+            # Active employees of the BM's branch (including null branch for Coimbatore and Madurai),
+            # one indexed IN on the precomputed organisation hierarchy
+            branch_members = org_hierarchy.members(branch=user_branch, with_unassigned=True) if user_branch else None
+            branch_employees = Employee.objects.filter(
+                employeeCode__in=branch_members.values('employee_code') if branch_members is not None else [],
+                del_state=0,
+                status='Active'
+            ).order_by('firstName', 'lastName')
 
             # Separate TLs and regular employees
             team_leaders = []
@@ -2338,7 +2333,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 all_employees.append(emp_data)
 
             # Process TLs specifically
-            for tl in team_leaders_query:
+            for tl in (emp for emp in branch_employees if emp.level == 'L2'):
                 tl_data = {
                     'employeeCode': tl.employeeCode,
                     'firstName': tl.firstName,
@@ -2377,12 +2372,18 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
         candidate.resume_file = request.FILES['resume_file']
         candidate.save()
-        self._process_resume(candidate)
-        
+        job = self._process_resume(candidate)
+        if job is not None:
+            job.refresh_from_db()
+            candidate.refresh_from_db(fields=['resume_parsed_data'])
+
+        # Parsing runs in the background; poll /api/parse-resume/<job_id>/ for the result
         return Response({
-            "status": "Resume processed",
+            "status": "Resume processed" if job is not None and job.status == 'success' else "Resume queued",
+            "job_id": str(job.job_id) if job is not None else None,
+            "job_status": job.status if job is not None else None,
             "data": candidate.resume_parsed_data
-        })
+        }, status=status.HTTP_200_OK if job is None or job.is_finished else status.HTTP_202_ACCEPTED)
 
     def perform_update(self, serializer):
         candidate = serializer.save()
@@ -2925,570 +2926,85 @@ class CandidateViewSet(viewsets.ModelViewSet):
     #             'error': 'Failed to fetch calendar statistics',
     #             'details': str(e),
     #             'month': month_param or 'unknown',
-    #             'year': year_param or 'unknown'
-    #         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-    @action(detail=False, methods=['get'], url_path='calendar-stats')
-    def calendar_stats(self, request):
-        """
-        Ultra-optimized calendar API — loads full month under 3 seconds.
-        No per-row loops. Uses DB aggregation for all event types.
-        """
-        from django.db.models.functions import TruncDate
-        from django.db.models import Count, Q, Value
-        from .models import ClientJob, CandidateStatusHistory, Candidate
-        from empreg.models import Employee
-
-        try:
-            # ----------------------------
-            # Parse date filters
-            # ----------------------------
-            month_param = request.query_params.get("month")
-            year_param  = request.query_params.get("year")
-
-            if month_param:
-                year, month = map(int, month_param.split("-"))
-                start_date = datetime(year, month, 1).date()
-                end_date = (
-                    datetime(year, month + 1, 1).date() if month < 12
-                    else datetime(year + 1, 1, 1).date()
-                ) - timedelta(days=1)
-            else:
-                year = int(year_param)
-                start_date = datetime(year, 1, 1).date()
-                end_date   = datetime(year + 1, 1, 1).date() - timedelta(days=1)
-
-            # Build datetime range for expected_joining_date so DB can use index efficiently
-            start_ejd = datetime.combine(start_date, datetime.min.time())
-            end_ejd = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
-
-            # ----------------------------
-            #  Aggregation: ClientJob Events (IF, NFD, EDJ)
-            # ----------------------------
-            followups_by_date = (
-                ClientJob.objects
-                .filter(next_follow_up_date__range=[start_date, end_date])
-                .annotate(date=TruncDate("next_follow_up_date"))
-                .values("date")
-                .annotate(count=Count("id"))
-            )
-
-            joinings_by_date = (
-                ClientJob.objects
-                .filter(
-                    expected_joining_date__gte=start_ejd,
-                    expected_joining_date__lt=end_ejd,
-                )
-                .annotate(date=TruncDate("expected_joining_date"))
-                .values("date")
-                .annotate(count=Count("id"))
-            )
-
-            # ----------------------------
-            #  Aggregation: Status History Events
-            # (PS, SEL, NR, INP, ATND, etc.)
-            # ----------------------------
-            # Include profile_submission so PS can follow the same
-            # semantics as calendar_details (only profile_submission=1).
-            hist = (
-                CandidateStatusHistory.objects
-                .filter(change_date__range=[start_date, end_date])
-                .annotate(date=TruncDate("change_date"))
-                .values("date", "remarks", "attend_flag", "profile_submission")
-                .annotate(count=Count("id"))
-            )
-
-            # ----------------------------
-            #  Build event_counts dictionary per date
-            # ----------------------------
-            daily = {}
-
-            def ensure_date(date_str):
-                if date_str not in daily:
-                    daily[date_str] = {
-                        "event_counts": {
-                            "IF":0,"NFD":0,"EDJ":0,"PS":0,"SEL":0,
-                            "NR":0,"INP":0,"FP":0,"ATND":0
-                        },
-                        "events": []  # detailed rows loaded later
-                    }
-            # ---- NFD
-            for row in followups_by_date:
-                ds = str(row["date"])
-                ensure_date(ds)
-                daily[ds]["event_counts"]["NFD"] = row["count"]
-
-            # ---- EDJ
-            for row in joinings_by_date:
-                ds = str(row["date"])
-                ensure_date(ds)
-                daily[ds]["event_counts"]["EDJ"] = row["count"]
-
-<<<<<<< HEAD
-                # Candidate data
-                candidate_data = {
-                    'id': job.candidate.id,
-                    'candidate_name': job.candidate.candidate_name,
-                    'mobile1': job.candidate.mobile1,
-                    'email': job.candidate.email,
-                    # Preserve raw code and expose display name separately
-                    'executive_name': job.candidate.executive_name,
-                    'executive_display': get_employee_full_name(job.candidate.executive_name),
-                    'profile_number': job.candidate.profile_number,
-                    'mobile2': job.candidate.mobile2,
-                    'education': job.candidate.education,
-                    'experience': job.candidate.experience,
-                    'created_at': str(job.candidate.created_at),
-                    'updated_at': str(job.candidate.updated_at),
-                    'created_by': job.candidate.created_by,
-                    'updated_by': job.candidate.updated_by,
-                    'state': job.candidate.state,
-                    'city': job.candidate.city,
-                    'pincode': job.candidate.pincode,
-                    'source': job.candidate.source,
-                }
-
-                # Client job data
-                client_job_data = {
-                    'id': job.id,
-                    'client_name': job.client_name,
-                    'designation': job.designation,
-                    'remarks': job.remarks,
-                    'expected_ctc': job.expected_ctc,
-                    'current_ctc': job.current_ctc,
-                    'feedback': getattr(job.candidate, 'feedback', None),
-                    'created_at': str(job.created_at),
-                    'updated_at': str(job.updated_at),
-                    'created_by': job.created_by,
-                    'updated_by': job.updated_by,
-                    
-                    'interview_date': str(job.interview_date) if job.interview_date else None,
-                    'next_follow_up_date': str(job.next_follow_up_date) if job.next_follow_up_date else None,
-                    'expected_joining_date': str(job.expected_joining_date) if job.expected_joining_date else None,
-                    'candidate_id': job.candidate_id
-                }
-                
-                candidate_ids.add(job.candidate_id)
-
-                # Process each event type
-                events = []
-
-                if job.interview_date:
-                    try:
-                        # Handle datetime, date, or string types
-                        if hasattr(job.interview_date, 'date'):
-                            interview_date_str = job.interview_date.date().isoformat()
-                        elif hasattr(job.interview_date, 'isoformat'):
-                            interview_date_str = job.interview_date.isoformat()
-                        else:
-                            interview_date_str = str(job.interview_date)
-                        
-                        # Validate the date string is not invalid (e.g., 0000-00-00)
-                        if interview_date_str and not interview_date_str.startswith('0000'):
-                            key = (interview_date_str, job.candidate_id, job.id)
-                            if_seen_keys.add(key)
-                            events.append(('IF', interview_date_str))
-                            totals['interviews'] += 1
-                    except (ValueError, AttributeError, OSError) as e:
-                        # Skip invalid dates (year 0, invalid format, etc.)
-                        logger.warning(f"Skipping invalid interview_date for job {job.id}: {e}")
-                        pass
-
-                if job.next_follow_up_date:
-                    try:
-                        nfd_str = job.next_follow_up_date.isoformat()
-                        # Validate the date string is not invalid
-                        if nfd_str and not nfd_str.startswith('0000'):
-                            events.append(('NFD', nfd_str))
-                            totals['followups'] += 1
-                    except (ValueError, AttributeError, OSError) as e:
-                        # Skip invalid dates
-                        logger.warning(f"Skipping invalid next_follow_up_date for job {job.id}: {e}")
-                        pass
-
-                if job.expected_joining_date:
-                    try:
-                        # Handle datetime, date, or string types
-                        if hasattr(job.expected_joining_date, 'date'):
-                            joining_date_str = job.expected_joining_date.date().isoformat()
-                        elif hasattr(job.expected_joining_date, 'isoformat'):
-                            joining_date_str = job.expected_joining_date.isoformat()
-                        else:
-                            joining_date_str = str(job.expected_joining_date)
-                        
-                        # Validate the date string is not invalid
-                        if joining_date_str and not joining_date_str.startswith('0000'):
-                            events.append(('EDJ', joining_date_str))
-                            totals['joinings'] += 1
-                    except (ValueError, AttributeError, OSError) as e:
-                        # Skip invalid dates
-                        logger.warning(f"Skipping invalid expected_joining_date for job {job.id}: {e}")
-                        pass
-
-                # Add results by date
-                for event_type, date_str in events:
-                    try:
-                        if start_date and end_date:
-                            # Convert date_str to date object for comparison
-                            event_date = datetime.fromisoformat(date_str).date() if isinstance(date_str, str) else date_str
-                            if not (start_date <= event_date <= end_date):
-                                continue
-                    except (ValueError, OSError) as e:
-                        # Skip dates that can't be parsed
-                        logger.warning(f"Skipping unparseable date {date_str}: {e}")
-                        continue
-                    
-                    if date_str not in daily_stats:
-                        daily_stats[date_str] = {
-                            'events': [],
-                            'event_counts': {'IF': 0, 'NFD': 0, 'EDJ': 0, 'FP': 0, 'ATND': 0}
-                        }
-
-                    daily_stats[date_str]['events'].append({
-                        'type': event_type,
-                        'candidate': candidate_data,
-                        'client_job': client_job_data,
-                    })
-                    daily_stats[date_str]['event_counts'][event_type] += 1
-            
-            # Add Status History Events
-            try:
-                status_history_query = CandidateStatusHistory.objects.select_related().filter(is_deleted=False)
-                
-                if start_date and end_date:
-                    status_history_query = status_history_query.filter(
-                        change_date__range=[start_date, end_date]
-                    )
-                
-                status_histories = list(status_history_query)
-
-                # Augment employee lookup with executives from status history candidates (not only client_jobs)
-                try:
-                    status_candidate_ids = list({sh.candidate_id for sh in status_histories})
-                    if status_candidate_ids:
-                        exec_codes = list({row['executive_name'] for row in Candidate.objects.filter(id__in=status_candidate_ids).values('executive_name') if row['executive_name']})
-                        # Filter out codes already present (case-insensitive)
-                        missing_codes = [c for c in exec_codes if str(c).lower() not in employee_lookup_lower]
-                        if missing_codes:
-                            extra_emps = Employee.objects.filter(
-                                Q(employeeCode__in=missing_codes) |
-                                Q(phone1__in=missing_codes) |
-                                Q(phone2__in=missing_codes),
-                                del_state=0
-                            ).values('employeeCode', 'phone1', 'phone2', 'firstName', 'lastName')
-                            for emp in extra_emps:
-                                full_name = (f"{emp['firstName']} {emp['lastName']}").strip() or emp['firstName'] or 'N/A'
-                                if emp['employeeCode']:
-                                    employee_lookup[emp['employeeCode']] = full_name
-                                if emp['phone1']:
-                                    employee_lookup[emp['phone1']] = full_name
-                                if emp['phone2']:
-                                    employee_lookup[emp['phone2']] = full_name
-                            # Refresh lowercase map
-                            employee_lookup_lower = {str(k).lower(): v for k, v in employee_lookup.items()}
-                except Exception:
-                    pass
-                
-                # Process status history events
-                for history in status_histories:
-                    try:
-                        date_str = history.change_date.isoformat()
-                        
-                        # Skip if outside date range
-                        if start_date and end_date:
-                            if not (start_date <= history.change_date <= end_date):
-                                continue
-                        
-                        # Get candidate data for this status history
-                        try:
-                            candidate = Candidate.objects.get(id=history.candidate_id)
-                            # Return full candidate details for parity with ClientJob events
-                            # Get client job data if available
-                            client_job = None
-                            if history.client_job_id:
-                                try:
-                                    client_job = ClientJob.objects.filter(id=history.client_job_id).first()
-                                except ClientJob.DoesNotExist:
-                                    pass
-                            
-                            # Get designation from client job or use candidate's
-                            designation = None
-                            if hasattr(candidate, 'designation') and candidate.designation:
-                                designation = candidate.designation
-                            elif client_job and client_job.designation:
-                                designation = client_job.designation
-                                
-                            # Get CTC values from client job or use candidate's
-                            current_ctc = None
-                            if hasattr(candidate, 'current_ctc') and candidate.current_ctc is not None:
-                                current_ctc = str(candidate.current_ctc)
-                            elif client_job and client_job.current_ctc is not None:
-                                current_ctc = str(client_job.current_ctc)
-                                
-                            expected_ctc = None
-                            if hasattr(candidate, 'expected_ctc') and candidate.expected_ctc is not None:
-                                expected_ctc = str(candidate.expected_ctc)
-                            elif client_job and client_job.expected_ctc is not None:
-                                expected_ctc = str(client_job.expected_ctc)
-                            
-                            candidate_data = {
-                                # Core identifiers
-                                'id': candidate.id,
-
-                                # Names and phones (include both old and new keys for compatibility)
-                                'candidate_name': candidate.candidate_name,
-                                'name': candidate.candidate_name,
-                                'mobile1': candidate.mobile1,
-                                'mobile2': candidate.mobile2,
-                                'mobile': candidate.mobile1,
-
-                                # Contact and ownership
-                                'email': candidate.email,
-                                # Preserve raw code and add display name
-                                'executive_name': candidate.executive_name if hasattr(candidate, 'executive_name') else None,
-                                'executive_display': get_employee_full_name(candidate.executive_name) if hasattr(candidate, 'executive_name') else 'N/A',
-                                'profile_number': candidate.profile_number,
-
-                                # Profile info
-                                'education': candidate.education,
-                                'experience': candidate.experience,
-                                'state': candidate.state,
-                                'city': candidate.city,
-                                'pincode': candidate.pincode,
-                                'source': candidate.source,
-                                'designation': designation,
-                                'current_ctc': current_ctc,
-                                'expected_ctc': expected_ctc,
-
-                                # Audit
-                                'created_at': str(candidate.created_at),
-                                'updated_at': str(candidate.updated_at),
-                                'created_by': get_employee_full_name(candidate.created_by) if candidate.created_by else 'N/A',
-                                'updated_by': get_employee_full_name(candidate.updated_by) if candidate.updated_by else 'N/A',
-                            }
-                        except Candidate.DoesNotExist:
-                            continue
-                        
-                        
-                        
-                        # Map status remarks to event types
-                        status_type_mapping = {
-                            'interested': 'INT',
-                            'interview fixed': 'IF',
-                            'feedback pending': 'FP',
-                            'next round': 'NR',
-                            'selected': 'SEL',
-                            'joined': 'JND',
-                            'not selected': 'NS',
-                            'no show': 'NS',
-                            'rejected': 'REJ',
-                            'in process': 'INP',
-                            'hold': 'HLD',
-                            'candidate lost': 'CL',
-                            'not joined': 'NLJ',
-                            'golden egg': 'GE',
-                            'profile submitted': 'PS'                          
-                        }
-                        
-                        event_type = status_type_mapping.get(history.remarks.lower(), 'SH')  # SH = Status History
-                        
-                        # For Profile Submission (PS) events, ensure only one per (date, candidate, client_job)
-                        # We process history rows in descending change_date/created_at order, so the first
-                        # PS encountered per key is the latest and is the one we keep.
-                        if event_type == 'PS':
-                            key = (date_str, history.candidate_id, history.client_job_id or 0)
-                            if key in ps_seen_keys:
-                                # Skip older duplicate PS entries for the same candidate/job/date
-                                continue
-                            ps_seen_keys.add(key)
-                        if event_type == 'IF':
-                            key = (date_str, history.candidate_id, history.client_job_id or 0)
-                            if key in if_seen_keys:
-                                continue
-                            if_seen_keys.add(key)
-                        
-                        if date_str not in daily_stats:
-                            daily_stats[date_str] = {
-                                'events': [],
-                                'event_counts': {'IF': 0, 'NFD': 0, 'EDJ': 0, 'INT': 0, 'AFP': 0, 'FP': 0, 'SEL': 0, 'JND': 0, 'NS': 0, 'REJ': 0, 'HLD': 0, 'CL': 0, 'NLJ': 0, 'GE': 0, 'PS': 0, 'SH': 0, 'INP': 0, 'NR': 0, 'ATND': 0}
-                            }
-                        
-                        # Ensure all event types exist in event_counts
-                        for et in ['INT', 'AFP', 'FP', 'SEL', 'JND', 'NS', 'REJ', 'HLD', 'CL', 'NLJ', 'GE', 'PS', 'SH', 'INP', 'NR', 'ATND']:
-                            if et not in daily_stats[date_str]['event_counts']:
-                                daily_stats[date_str]['event_counts'][et] = 0
-
-                        # FIXED ATND REMARK LOGIC
-                        # -------------------------
-                        if getattr(history, 'attend_flag', False):
-                            client_job = ClientJob.objects.filter(id=history.client_job_id).first()
-                            original_attend_remark = client_job.remarks if client_job else history.remarks
-
-                            daily_stats[date_str]['events'].append({
-                                'type': 'ATND',
-                                'candidate': candidate_data,
-                                'status_history': {
-                                    'id': history.id,
-                                    'remarks': original_attend_remark,  # Use actual client job remark for ATND
-                                    'client_job_id': history.client_job_id,
-                                    'vendor_id': history.vendor_id,
-                                    'client_name': history.client_name,
-                                    'extra_notes': history.extra_notes,
-                                    'attend_flag': True,
-                                    'created_by': get_employee_full_name(history.created_by) if history.created_by else 'N/A',
-                                    'created_at': str(history.created_at)
-                                }
-                            })
-                            daily_stats[date_str]['event_counts']['ATND'] += 1
-
-                            # Count attended rows per date
-                            try:
-                                if date_str not in attendance_counts_by_date:
-                                    attendance_counts_by_date[date_str] = 0
-                                attendance_counts_by_date[date_str] += 1
-                            except Exception:
-                                pass
-                            
-                            # Skip normal SH mapping for attended rows
-                            continue
-
-                        # ---------- Non-Attended events (normal flow) ----------
-                        daily_stats[date_str]['events'].append({
-                            'type': event_type,
-                            'candidate': candidate_data,
-                            'status_history': {
-                                'id': history.id,
-                                'remarks': history.remarks,
-                                'client_job_id': history.client_job_id,
-                                'vendor_id': history.vendor_id,
-                                'client_name': history.client_name,
-                                'extra_notes': history.extra_notes,
-                                'attend_flag': False,
-                                'created_by': get_employee_full_name(history.created_by) if history.created_by else 'N/A',
-                                'created_at': str(history.created_at)
-                            }
-                        })
-                        daily_stats[date_str]['event_counts'][event_type] += 1
-
-                        # Record attended row for this date if marked as attended
-                        try:
-                            if getattr(history, 'attend_flag', False):
-                                if date_str not in attendance_counts_by_date:
-                                    attendance_counts_by_date[date_str] = 0
-                                attendance_counts_by_date[date_str] += 1
-                        except Exception:
-                            pass
-                        
-                        # Update totals
-                        if event_type == 'INT':
-                            totals['interested'] = totals.get('interested', 0) + 1
-                        elif event_type == 'SEL':
-                            totals['selected'] = totals.get('selected', 0) + 1
-                        elif event_type == 'FP':
-                            # Use snake_case key so it can be exposed as `feedback_pending` if needed
-                            totals['feedback_pending'] = totals.get('feedback_pending', 0) + 1
-                        elif event_type == 'INP':
-                            # Use snake_case key to match `in_process` in the API response
-                            totals['in_process'] = totals.get('in_process', 0) + 1
-                        elif event_type == 'JND':
-                            totals['joined'] = totals.get('joined', 0) + 1
-                        elif event_type == 'NS':
-                            totals['no_show'] = totals.get('no_show', 0) + 1
-                        elif event_type == 'NR':
-                            # Next Round
-                            totals['next_round'] = totals.get('next_round', 0) + 1
-                        elif event_type == 'PS':
-                            # Profile Submission
-                            totals['profile_submissions'] = totals.get('profile_submissions', 0) + 1
-                        
-                            
-                    except Exception as e:
-                        logger.warning(f"Error processing status history {history.id}: {e}")
-                        continue
-                        
-            except Exception as e:
-                logger.warning(f"Error fetching status history: {e}")
-                # Continue without status history if there's an error
-            
-            # Prepare final result with ATND derived from attend_flag rows per date
-            events_list = []
-            attended_total = 0
-
-            for date, info in sorted(daily_stats.items()):
-                event_counts = info['event_counts'].copy()
-                # ATND is count of status history rows marked attended on this date
-                atnd_for_date = attendance_counts_by_date.get(date, 0)
-                event_counts['ATND'] = atnd_for_date
-                attended_total += atnd_for_date
-
-                events_list.append({
-                    'date': date,
-                    'events': info['events'],
-                    'event_counts': event_counts
-                })
+    #             'year': year_param or 'unknown'
+    #         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-            # Set total attended across month
-            totals['attended'] = attended_total
-
-            result = {
-                'totals': {
-                    'interviews': totals['interviews'],
-                    'followups': totals['followups'],
-                    'joinings': totals['joinings'],
-                    # 'interested': totals.get('interested', 0),
-                    'selected': totals.get('selected', 0),
-                    # 'joined': totals.get('joined', 0),
-                    # 'no_show': totals.get('no_show', 0),
-                    'attended': totals.get('attended', 0),
-                    'in_process': totals.get('in_process', 0),
-                    'next_round': totals.get('next_round', 0),
-                    'profile_submissions': totals.get('profile_submissions', 0),
-                    'total_events': (
-                        totals.get('interviews', 0)
-                        + totals.get('followups', 0)
-                        + totals.get('joinings', 0)
-                        + totals.get('selected', 0)
-                        + totals.get('attended', 0)
-                        + totals.get('in_process', 0)
-                        + totals.get('next_round', 0)
-                        + totals.get('profile_submissions', 0)
-                    )
-                },
-                'events': events_list,
-                'summary': {
-                    'total_candidates': len(candidate_ids),
-                    'total_client_jobs': len(client_jobs)
-                }
-            }
+    @action(detail=False, methods=['get'], url_path='calendar-stats')
+    def calendar_stats(self, request):
+        """
+        Month/year calendar counts read from the calendar_daily_counts rollup.
+        Optional scoping: branch_id, team_id, executive / employee_id (comma separated codes).
+        Defaults to the current month when neither month nor year is given.
+        """
+        from . import calendar_rollup
+        from .models import ClientJob, Candidate, CalendarDailyCount, DerivedTableBuild
 
-            return Response(result)
-        
-        except Exception as e:
-            logger.exception(f"Error in calendar_stats: {e}")
-            return Response(
-                {"error": "Failed to fetch calendar stats", "detail": str(e)}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        try:
+            # ----------------------------
+            # Parse date filters
+            # ----------------------------
+            month_param = request.query_params.get("month")
+            year_param  = request.query_params.get("year")
 
-            for row in hist:
-                ds = str(row["date"])
-                ensure_date(ds)
+            if not month_param and not year_param:
+                month_param = timezone.now().strftime("%Y-%m")
 
-                if row["attend_flag"]:
-                    # All attend_flag=True rows are counted as ATND
-                    daily[ds]["event_counts"]["ATND"] += row["count"]
-                else:
-                    remarks = (row["remarks"] or "").strip().lower()
+            if month_param:
+                year, month = map(int, month_param.split("-"))
+                start_date = datetime(year, month, 1).date()
+                end_date = (
+                    datetime(year, month + 1, 1).date() if month < 12
+                    else datetime(year + 1, 1, 1).date()
+                ) - timedelta(days=1)
+            else:
+                year = int(year_param)
+                start_date = datetime(year, 1, 1).date()
+                end_date   = datetime(year + 1, 1, 1).date() - timedelta(days=1)
 
-                    # For PS, follow the same rule as calendar_details:
-                    # only count when profile_submission is flagged (1).
-                    if remarks == "profile submitted":
-                        if row.get("profile_submission") == 1:
-                            daily[ds]["event_counts"]["PS"] += row["count"]
-                    else:
-                        event_type = map_type.get(remarks, None)
-                        if event_type:
-                            daily[ds]["event_counts"][event_type] += row["count"]
+            # ----------------------------
+            # Optional scope filters
+            # ----------------------------
+            branch_id = request.query_params.get("branch_id")
+            team_id = request.query_params.get("team_id")
+            executive = request.query_params.get("executive") or request.query_params.get("employee_id")
+            branch_id = int(branch_id) if branch_id else None
+            team_id = int(team_id) if team_id else None
+            employee_ids = [code.strip() for code in executive.split(",") if code.strip()] if executive else None
+
+            # ----------------------------
+            #  Daily counts from the rollup (single range scan)
+            # ----------------------------
+            if DerivedTableBuild.is_built(CalendarDailyCount):
+                counts_by_date = calendar_rollup.daily_counts(
+                    start_date, end_date,
+                    branch_id=branch_id, team_id=team_id, employee_ids=employee_ids,
+                )
+            else:
+                # Until a full rebuild_calendar_counts run the rollup only holds rows
+                # signals touched since deploy - aggregate live
+                counts_by_date = {}
+                for key, count in calendar_rollup.aggregate_counts(start_date, end_date).items():
+                    day, event_type, row_branch, row_team, row_employee = key
+                    if branch_id and row_branch != branch_id:
+                        continue
+                    if team_id and row_team != team_id:
+                        continue
+                    if employee_ids and row_employee not in employee_ids:
+                        continue
+                    day_counts = counts_by_date.setdefault(day, {})
+                    day_counts[event_type] = day_counts.get(event_type, 0) + count
+
+            # ----------------------------
+            #  Build event_counts dictionary per date
+            # ----------------------------
+            daily = {}
+            for day, day_counts in counts_by_date.items():
+                event_counts = {event_type: 0 for event_type in calendar_rollup.EVENT_TYPES}
+                event_counts.update(day_counts)
+                daily[str(day)] = {
+                    "event_counts": event_counts,
+                    "events": []  # detailed rows loaded later
+                }
 
             # ----------------------------
             #  Compute Totals
@@ -3875,13 +3391,16 @@ class CandidateViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='clientwise-report')
     def clientwise_report(self, request):
         """
-        Client-wise report using ONLY candidate_clientjob (ClientJob table).
-        Final status per candidate is stored here, so we do NOT use CandidateStatusHistory.
+        Client-wise report from client_job_report_facts (ClientJob counts per day
+        and dimension, see report_facts.py). Final status per candidate is stored
+        on ClientJob, so we do NOT use CandidateStatusHistory.
+        ?export=csv|xlsx returns the rows as a file.
         """
 
-        from django.db.models import Count, Q
-        from .models import ClientJob
+        from django.db.models import Q, Sum
+        from .models import ClientJobReportFact
 
+        export_format = exports.requested_format(request)
         try:
             # Query params
             start_date = request.query_params.get('start_date')
@@ -3897,7 +3416,8 @@ class CandidateViewSet(viewsets.ModelViewSet):
             owner_by_param = (request.query_params.get('owner_by') or 'both').strip().lower()
 
             # Base queryset
-            qs = ClientJob.objects.all()
+            # Rows whose jobs all moved elsewhere stay behind at 0
+            qs = ClientJobReportFact.objects.filter(jobs__gt=0)
             employee_scope_applied = False
             employee_scope_applied = False
 
@@ -3920,142 +3440,28 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 if owner_by_param == 'previous':
                     qs = qs.filter(assigned_from__iexact=ex)
                 elif owner_by_param == 'current':
-                    qs = qs.filter(Q(candidate__executive_name__iexact=ex) | Q(assign_to__iexact=ex))
+                    qs = qs.filter(Q(executive_name__iexact=ex) | Q(owner_code__iexact=ex))
                 else:  # both (default)
                     qs = qs.filter(
-                        Q(candidate__executive_name__iexact=ex) |
-                        Q(assign_to__iexact=ex) |
+                        Q(executive_name__iexact=ex) |
+                        Q(owner_code__iexact=ex) |
                         Q(assigned_from__iexact=ex)
                     )
                 employee_scope_applied = True
 
-            # Optional Branch/Team/Executive code resolution (same as clientwise)
-            try:
-                from empreg.models import Employee as Emp
-                from Masters.models import Team as TeamModel, Branch as BranchModel
-
-                codes_set = None
-
-                if branch_param:
-                    b_name = None
-                    b_code = None
-                    bp = str(branch_param).strip()
-                    if bp.isdigit():
-                        bobj = BranchModel.objects.filter(id=int(bp)).first()
-                        if bobj:
-                            b_name = (getattr(bobj, 'name', None) or '').strip()
-                            b_code = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '')
-                            b_code = (b_code or '').strip()
-                    else:
-                        bobj = BranchModel.objects.filter(name__iexact=bp).first() or BranchModel.objects.filter(code__iexact=bp).first()
-                        if bobj:
-                            b_name = (getattr(bobj, 'name', None) or '').strip()
-                            b_code = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '')
-                            b_code = (b_code or '').strip()
-                        else:
-                            b_name = bp
-
-                    q = None
-                    if b_name:
-                        q = Q(branch__iexact=b_name)
-                    if b_code:
-                        q = (q | Q(branch__iexact=b_code)) if q is not None else Q(branch__iexact=b_code)
-
-                    branch_codes = set()
-                    if q is not None:
-                        branch_codes = set(Emp.objects.filter(del_state=0).filter(q).values_list('employeeCode', flat=True))
-                    if codes_set is None:
-                        codes_set = branch_codes
-                    else:
-                        codes_set = codes_set & branch_codes
-
-                if team_id_param or team_name_param:
-                    team_obj = None
-                    if team_id_param and str(team_id_param).isdigit():
-                        team_obj = TeamModel.objects.filter(id=int(team_id_param)).first()
-                    if not team_obj and team_name_param:
-                        team_obj = TeamModel.objects.filter(name__iexact=str(team_name_param).strip()).first()
-                    team_codes = set()
-                    if team_obj:
-                        team_codes = set(team_obj.employees.filter(del_state=0).values_list('employeeCode', flat=True))
-                    if codes_set is None:
-                        codes_set = team_codes
-                    else:
-                        codes_set = codes_set & team_codes
-
-                if executive and executive.strip().lower() not in ["", "all", "all executives"]:
-                    ex_code = executive.strip()
-                    ex_set = {ex_code}
-                    if codes_set is None:
-                        codes_set = ex_set
-                    else:
-                        codes_set = codes_set & ex_set
-
-                if codes_set is not None:
-                    if codes_set:
-                        qs = qs.filter(Q(candidate__executive_name__in=list(codes_set)) | Q(assign_to__in=list(codes_set)))
-                    else:
-                        qs = qs.none()
-            except Exception:
-                pass
-
             # Apply optional Branch/Team/Executive filters by resolving to employee codes
             try:
-                from empreg.models import Employee as Emp
-                from Masters.models import Team as TeamModel, Branch as BranchModel
-
                 codes_set = None  # None means no restriction yet; sets will be intersected
 
-                # Branch filter -> collect employee codes by employee.branch name/code
+                # Branch filter -> employee codes by employee.branch name/code (organisation hierarchy)
                 if branch_param:
-                    b_name = None
-                    b_code = None
-                    bp = str(branch_param).strip()
-                    if bp.isdigit():
-                        bobj = BranchModel.objects.filter(id=int(bp)).first()
-                        if bobj:
-                            b_name = (getattr(bobj, 'name', None) or '').strip()
-                            b_code = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '')
-                            b_code = (b_code or '').strip()
-                    else:
-                        # Try match by name/code
-                        bobj = BranchModel.objects.filter(name__iexact=bp).first() or BranchModel.objects.filter(code__iexact=bp).first()
-                        if bobj:
-                            b_name = (getattr(bobj, 'name', None) or '').strip()
-                            b_code = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '')
-                            b_code = (b_code or '').strip()
-                        else:
-                            # If branch not found in table, use provided string directly as name hint
-                            b_name = bp
-
-                    q = None
-                    if b_name:
-                        q = Q(branch__iexact=b_name)
-                    if b_code:
-                        q = (q | Q(branch__iexact=b_code)) if q is not None else Q(branch__iexact=b_code)
-
-                    branch_codes = set()
-                    if q is not None:
-                        branch_codes = set(Emp.objects.filter(del_state=0).filter(q).values_list('employeeCode', flat=True))
-                    if codes_set is None:
-                        codes_set = branch_codes
-                    else:
-                        codes_set = codes_set & branch_codes
+                    branch_codes = set(org_hierarchy.branch_employee_codes(branch_param, active_only=False))
+                    codes_set = branch_codes if codes_set is None else codes_set & branch_codes
 
-                # Team filter -> collect employee codes from team M2M
+                # Team filter -> employee codes of the team
                 if team_id_param or team_name_param:
-                    team_obj = None
-                    if team_id_param and str(team_id_param).isdigit():
-                        team_obj = TeamModel.objects.filter(id=int(team_id_param)).first()
-                    if not team_obj and team_name_param:
-                        team_obj = TeamModel.objects.filter(name__iexact=str(team_name_param).strip()).first()
-                    team_codes = set()
-                    if team_obj:
-                        team_codes = set(team_obj.employees.filter(del_state=0).values_list('employeeCode', flat=True))
-                    if codes_set is None:
-                        codes_set = team_codes
-                    else:
-                        codes_set = codes_set & team_codes
+                    team_codes = set(org_hierarchy.team_employee_codes(team_id_param, team_name_param, active_only=False))
+                    codes_set = team_codes if codes_set is None else codes_set & team_codes
 
                 # Executive filter -> restrict to a single employee code
                 if executive_param and executive_param.strip().lower() not in ["", "all", "all executives"]:
@@ -4070,7 +3476,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 # Do not override when executive scope already applied above
                 if codes_set is not None and not employee_scope_applied:
                     if codes_set:
-                        owner_q = Q(candidate__executive_name__in=list(codes_set)) | Q(assign_to__in=list(codes_set))
+                        owner_q = Q(executive_name__in=list(codes_set)) | Q(owner_code__in=list(codes_set))
                         if owner_by_param in ('previous', 'both'):
                             owner_q = owner_q | Q(assigned_from__in=list(codes_set))
                         qs = qs.filter(owner_q)
@@ -4089,20 +3495,20 @@ class CandidateViewSet(viewsets.ModelViewSet):
             if state:
                 state_trimmed = state.strip()
                 if state_trimmed:
-                    qs = qs.filter(Q(candidate__state__icontains=state_trimmed) | Q(candidate__city__icontains=state_trimmed))
+                    qs = qs.filter(Q(state__icontains=state_trimmed) | Q(city__icontains=state_trimmed))
             if city:
                 city_trimmed = city.strip()
                 if city_trimmed:
-                    qs = qs.filter(candidate__city__icontains=city_trimmed)
+                    qs = qs.filter(city__icontains=city_trimmed)
 
             # Date filter is applied on updated_at (final status update time)
             if start_date and end_date:
-                qs = qs.filter(updated_at__date__range=[start_date, end_date])
+                qs = qs.filter(day__range=[start_date, end_date])
 
             # Aggregating counts by client_name and final remarks
             agg = (
                 qs.values("client_name", "remarks")
-                  .annotate(count=Count("candidate_id", distinct=True))
+                  .annotate(count=Sum("jobs"))
             )
 
             # Result dictionary
@@ -4146,41 +3552,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
             client_counts = (
                 qs.values('client_name')
                 .annotate(
-                    profile_submission_count=Count(
-                        'candidate_id',
-                        filter=Q(profile_submission=1),
-                        distinct=True,
-                    ),
-                    profile_submitted_active=Count(
-                        'candidate_id',
-                        filter=Q(profile_submission=1, transfer_status='Active'),
-                        distinct=True,
-                    ),
-                    profile_submitted_inactive=Count(
-                        'candidate_id',
-                        filter=Q(profile_submission=1, transfer_status='Inactive'),
-                        distinct=True,
-                    ),
-                    attended_count=Count(
-                        'candidate_id',
-                        filter=Q(attend=1),
-                        distinct=True,
-                    ),
-                    attended_active=Count(
-                        'candidate_id',
-                        filter=Q(attend=1, transfer_status='Active'),
-                        distinct=True,
-                    ),
-                    attended_inactive=Count(
-                        'candidate_id',
-                        filter=Q(attend=1, transfer_status='Inactive'),
-                        distinct=True,
-                    ),
-                    others=Count(
-                        'candidate_id',
-                        filter=~exclude_known_q,
-                        distinct=True,
-                    )
+                    profile_submission_count=Sum('jobs', filter=Q(profile_submission=1), default=0),
+                    profile_submitted_active=Sum('jobs', filter=Q(profile_submission=1, transfer_status='Active'), default=0),
+                    profile_submitted_inactive=Sum('jobs', filter=Q(profile_submission=1, transfer_status='Inactive'), default=0),
+                    attended_count=Sum('jobs', filter=Q(attend=1), default=0),
+                    attended_active=Sum('jobs', filter=Q(attend=1, transfer_status='Active'), default=0),
+                    attended_inactive=Sum('jobs', filter=Q(attend=1, transfer_status='Inactive'), default=0),
+                    others=Sum('jobs', filter=~exclude_known_q, default=0)
                 )
             )
             
@@ -4255,8 +3633,11 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 result[cname]["profile_submitted_active"] = ps_active_dict.get(cname, 0)
                 result[cname]["profile_submitted_inactive"] = ps_inactive_dict.get(cname, 0)
 
-            # Return as list
-            return Response(list(result.values()), status=200)
+            # Return as list (or as a file with ?export=csv|xlsx)
+            rows = list(result.values())
+            if export_format:
+                return exports.response(export_format, 'clientwise_report', exports.columns_for(rows), [rows])
+            return Response(rows, status=200)
 
         except Exception as e:
             return Response({"error": str(e)}, status=500)
@@ -4264,12 +3645,17 @@ class CandidateViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='employeewise-report')
     def employeewise_report(self, request):
         """
-        Employee-wise report using ONLY candidate_clientjob (ClientJob table).
-        Owner logic: use assign_to (if present and not empty), otherwise Candidate.executive_name.
+        Employee-wise report from client_job_report_facts (ClientJob counts per day
+        and dimension, see report_facts.py).
+        Owner logic: use assign_to (if present and not empty), otherwise Candidate.executive_name
+        (stored as owner_code).
+        ?export=csv|xlsx returns the rows as a file.
         """
 
-        from django.db.models import Count, Q, Case, When, IntegerField, F, Value, CharField
-        from .models import ClientJob
+        from django.db.models import Q, F, Sum
+        from .models import ClientJobReportFact
+
+        export_format = exports.requested_format(request)
         try:
             # Query params
             start_date = request.query_params.get('start_date')
@@ -4284,7 +3670,8 @@ class CandidateViewSet(viewsets.ModelViewSet):
             owner_by_param = (request.query_params.get('owner_by') or 'both').strip().lower()
 
             # Base queryset
-            qs = ClientJob.objects.all()
+            # Rows whose jobs all moved elsewhere stay behind at 0
+            qs = ClientJobReportFact.objects.filter(jobs__gt=0)
 
             # Filters
             if client:
@@ -4292,13 +3679,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
             if state:
                 st = state.strip()
                 if st:
-                    qs = qs.filter(Q(candidate__state__icontains=st) | Q(candidate__city__icontains=st))
+                    qs = qs.filter(Q(state__icontains=st) | Q(city__icontains=st))
             if city:
                 ct = city.strip()
                 if ct:
-                    qs = qs.filter(candidate__city__icontains=ct)
+                    qs = qs.filter(city__icontains=ct)
             if start_date and end_date:
-                qs = qs.filter(updated_at__date__range=[start_date, end_date])
+                qs = qs.filter(day__range=[start_date, end_date])
 
             # Row-level numeric filters for branch/team when no specific executive is provided
             try:
@@ -4316,22 +3703,15 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 if owner_by_param == 'previous':
                     qs = qs.filter(assigned_from__iexact=ex)
                 elif owner_by_param == 'current':
-                    qs = qs.filter(Q(candidate__executive_name__iexact=ex) | Q(assign_to__iexact=ex))
+                    qs = qs.filter(Q(executive_name__iexact=ex) | Q(owner_code__iexact=ex))
                 else:  # both
                     qs = qs.filter(
-                        Q(candidate__executive_name__iexact=ex) |
-                        Q(assign_to__iexact=ex) |
+                        Q(executive_name__iexact=ex) |
+                        Q(owner_code__iexact=ex) |
                         Q(assigned_from__iexact=ex)
                     )
                 employee_scope_applied = True
 
-            # Determine owner code (employee code) per row
-            owner_code = Case(
-                When(Q(assign_to__isnull=False) & ~Q(assign_to=""), then=F('assign_to')),
-                default=F('candidate__executive_name'),
-                output_field=CharField(),
-            )
-
             # Known remarks excluded from Others (new rule - only six)
             known_remarks = [
                 'Selected', 'Rejected', 'Feedback Pending',
@@ -4343,75 +3723,20 @@ class CandidateViewSet(viewsets.ModelViewSet):
 
             # Apply optional Branch/Team/Executive filters by resolving to employee codes (if not already scoped by executive)
             try:
-                from empreg.models import Employee as Emp
-                from Masters.models import Team as TeamModel, Branch as BranchModel
-
                 codes_set = None
 
-                # Branch filter -> collect employee codes
-                #  (a) by employee.branch name/code (Emp table)
-                #  (b) by Team.branch_id membership (Team.employees M2M)
+                # Branch filter -> employee codes (organisation hierarchy)
+                #  (a) by employee.branch name/code
+                #  (b) by Team.branch_id membership (numeric branch ids)
                 if branch_param:
-                    b_name = None
-                    b_code = None
-                    bp = str(branch_param).strip()
-                    if bp.isdigit():
-                        bobj = BranchModel.objects.filter(id=int(bp)).first()
-                        if bobj:
-                            b_name = (getattr(bobj, 'name', None) or '').strip()
-                            b_code = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '')
-                            b_code = (b_code or '').strip()
-                    else:
-                        bobj = BranchModel.objects.filter(name__iexact=bp).first() or BranchModel.objects.filter(code__iexact=bp).first()
-                        if bobj:
-                            b_name = (getattr(bobj, 'name', None) or '').strip()
-                            b_code = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '')
-                            b_code = (b_code or '').strip()
-                        else:
-                            b_name = bp
-
-                    # (a) Emp.branch name/code match
-                    q = None
-                    if b_name:
-                        q = Q(branch__iexact=b_name)
-                    if b_code:
-                        q = (q | Q(branch__iexact=b_code)) if q is not None else Q(branch__iexact=b_code)
-                    branch_codes = set()
-                    if q is not None:
-                        branch_codes = set(Emp.objects.filter(del_state=0).filter(q).values_list('employeeCode', flat=True))
-
-                    # (b) Team.branch_id membership
-                    team_branch_codes = set()
-                    try:
-                        if bp.isdigit():
-                            tqs = TeamModel.objects.filter(branch_id=int(bp))
-                            team_branch_codes = set(
-                                Emp.objects.filter(del_state=0, teams__in=list(tqs)).values_list('employeeCode', flat=True)
-                            )
-                    except Exception:
-                        pass
-
-                    # Union both sources
-                    combined = branch_codes | team_branch_codes
-                    if codes_set is None:
-                        codes_set = combined
-                    else:
-                        codes_set = codes_set & combined
+                    combined = set(org_hierarchy.branch_employee_codes(branch_param, active_only=False,
+                                                                       with_team_branches=True))
+                    codes_set = combined if codes_set is None else codes_set & combined
 
-                # Team filter -> collect employee codes from team M2M
+                # Team filter -> employee codes of the team
                 if team_id_param or team_name_param:
-                    team_obj = None
-                    if team_id_param and str(team_id_param).isdigit():
-                        team_obj = TeamModel.objects.filter(id=int(team_id_param)).first()
-                    if not team_obj and team_name_param:
-                        team_obj = TeamModel.objects.filter(name__iexact=str(team_name_param).strip()).first()
-                    team_codes = set()
-                    if team_obj:
-                        team_codes = set(team_obj.employees.filter(del_state=0).values_list('employeeCode', flat=True))
-                    if codes_set is None:
-                        codes_set = team_codes
-                    else:
-                        codes_set = codes_set & team_codes
+                    team_codes = set(org_hierarchy.team_employee_codes(team_id_param, team_name_param, active_only=False))
+                    codes_set = team_codes if codes_set is None else codes_set & team_codes
 
                 # Executive filter -> restrict to a single employee code (when provided but not already applied above)
                 if executive and executive.strip().lower() not in ["", "all", "all executives"] and not employee_scope_applied:
@@ -4425,7 +3750,7 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 # Apply codes_set against owner fields
                 if codes_set is not None and not employee_scope_applied:
                     if codes_set:
-                        owner_q = Q(candidate__executive_name__in=list(codes_set)) | Q(assign_to__in=list(codes_set))
+                        owner_q = Q(executive_name__in=list(codes_set)) | Q(owner_code__in=list(codes_set))
                         if owner_by_param in ('previous', 'both'):
                             owner_q = owner_q | Q(assigned_from__in=list(codes_set))
                         qs = qs.filter(owner_q)
@@ -4435,13 +3760,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 pass
 
             # Build a base queryset with computed owner (employee_code)
-            qs_with_owner = qs.annotate(employee_code=owner_code)
+            qs_with_owner = qs.annotate(employee_code=F('owner_code'))
 
             # 1) Per-remark aggregation grouped by employee_code
             agg = (
                 qs_with_owner
                 .values('employee_code', 'remarks')
-                .annotate(count=Count('candidate_id', distinct=True))
+                .annotate(count=Sum('jobs'))
             )
 
             # Unique clients per employee_code (current owner)
@@ -4473,13 +3798,13 @@ class CandidateViewSet(viewsets.ModelViewSet):
                 qs_with_owner
                 .values('employee_code')
                 .annotate(
-                    profile_submission_count=Count('candidate_id', filter=Q(profile_submission=1), distinct=True),
-                    profile_submitted_active=Count('candidate_id', filter=Q(profile_submission=1, transfer_status='Active'), distinct=True),
-                    profile_submitted_inactive=Count('candidate_id', filter=Q(profile_submission=1, transfer_status='Inactive'), distinct=True),
-                    attended_count=Count('candidate_id', filter=Q(attend=1), distinct=True),
-                    attended_active=Count('candidate_id', filter=Q(attend=1, transfer_status='Active'), distinct=True),
-                    attended_inactive=Count('candidate_id', filter=Q(attend=1, transfer_status='Inactive'), distinct=True),
-                    others_count=Count('candidate_id', filter=~exclude_known_q, distinct=True),
+                    profile_submission_count=Sum('jobs', filter=Q(profile_submission=1), default=0),
+                    profile_submitted_active=Sum('jobs', filter=Q(profile_submission=1, transfer_status='Active'), default=0),
+                    profile_submitted_inactive=Sum('jobs', filter=Q(profile_submission=1, transfer_status='Inactive'), default=0),
+                    attended_count=Sum('jobs', filter=Q(attend=1), default=0),
+                    attended_active=Sum('jobs', filter=Q(attend=1, transfer_status='Active'), default=0),
+                    attended_inactive=Sum('jobs', filter=Q(attend=1, transfer_status='Inactive'), default=0),
+                    others_count=Sum('jobs', filter=~exclude_known_q, default=0),
                 )
             )
 
@@ -4487,8 +3812,8 @@ class CandidateViewSet(viewsets.ModelViewSet):
             prev_summary = (
                 qs.values('assigned_from')
                 .annotate(
-                    profile_transfer=Count('candidate_id', filter=Q(profile_submission=1, transfer_status='Inactive'), distinct=True),
-                    attended_transfer=Count('candidate_id', filter=Q(attend=1, transfer_status='Inactive'), distinct=True),
+                    profile_transfer=Sum('jobs', filter=Q(profile_submission=1, transfer_status='Inactive'), default=0),
+                    attended_transfer=Sum('jobs', filter=Q(attend=1, transfer_status='Inactive'), default=0),
                 )
             )
             prev_map = { (row.get('assigned_from') or '').strip(): row for row in prev_summary if row.get('assigned_from') }
@@ -4611,25 +3936,9 @@ class CandidateViewSet(viewsets.ModelViewSet):
                     allowed_codes = set()
                     if 'codes_set' in locals() and codes_set is not None:
                         allowed_codes = set(codes_set)
-                    # If codes_set wasn't computed (shouldn't happen with branch/team), fallback to Emp-based branch match
+                    # If codes_set wasn't computed (shouldn't happen with branch/team), fall back to the branch members
                     if not allowed_codes and branch_param:
-                        from empreg.models import Employee as Emp
-                        from Masters.models import Branch as BranchModel
-                        bp = str(branch_param).strip()
-                        q = None
-                        if bp.isdigit():
-                            bobj = BranchModel.objects.filter(id=int(bp)).first()
-                            if bobj:
-                                bname = (getattr(bobj, 'name', None) or '').strip()
-                                bcode = (getattr(bobj, 'code', None) or getattr(bobj, 'branchcode', None) or getattr(bobj, 'branch_code', None) or '').strip()
-                                if bname:
-                                    q = Q(branch__iexact=bname)
-                                if bcode:
-                                    q = (q | Q(branch__iexact=bcode)) if q is not None else Q(branch__iexact=bcode)
-                        else:
-                            q = Q(branch__iexact=bp)
-                        if q is not None:
-                            allowed_codes = set(Emp.objects.filter(del_state=0).filter(q).values_list('employeeCode', flat=True))
+                        allowed_codes = set(org_hierarchy.branch_employee_codes(branch_param, active_only=False))
                     if allowed_codes:
                         result = { code: row for code, row in result.items() if code in allowed_codes }
             except Exception:
@@ -4660,7 +3969,10 @@ class CandidateViewSet(viewsets.ModelViewSet):
             except Exception:
                 pass
 
-            return Response(list(result.values()), status=200)
+            rows = list(result.values())
+            if export_format:
+                return exports.response(export_format, 'employeewise_report', exports.columns_for(rows), [rows])
+            return Response(rows, status=200)
 
         except Exception as e:
             return Response({"error": str(e)}, status=500)
@@ -4678,40 +3990,9 @@ class ClientJobViewSet(viewsets.ModelViewSet):
         
         try:
             if request.user and request.user.is_authenticated:
-                
-                # Method 1: Try to get employee by user relationship
-                try:
-                    employee = Employee.objects.get(user=request.user, del_state=0)
-                    result = f"{employee.firstName}({employee.employeeCode})"
-                    return result
-                except Employee.DoesNotExist:
-                    pass  # Continue to next method
-                
-                # Method 2: Try to find employee by username (might be phone or employeeCode)
-                username = request.user.username
-                
-                # Try by employeeCode first
-                try:
-                    employee = Employee.objects.get(employeeCode=username, del_state=0)
-                    result = f"{employee.firstName}({employee.employeeCode})"
-                    return result
-                except Employee.DoesNotExist:
-                    pass
-                
-                # Try by phone number
-                try:
-                    employee = Employee.objects.get(phone1=username, del_state=0)
-                    result = f"{employee.firstName}({employee.employeeCode})"
-                    return result
-                except Employee.DoesNotExist:
-                    pass
-                
-                try:
-                    employee = Employee.objects.get(phone2=username, del_state=0)
-                    result = f"{employee.firstName}({employee.employeeCode})"
-                    return result
-                except Employee.DoesNotExist:
-                    pass
+                employee = request.employee
+                if employee:
+                    return employee.display_name
                 
                 # Fallback to username if no employee record
                 fallback_name = request.user.username if request.user else "System"
@@ -4742,21 +4023,14 @@ class ClientJobViewSet(viewsets.ModelViewSet):
 
     def get_current_user_employee(self, request):
         """
-        Get the current user's Employee record - OPTIMIZED VERSION
-        Returns Employee object if found, None otherwise
+        Get the current user's employee (request.employee, see empreg/identity.py)
+        Returns the EmployeeIdentity if found, None otherwise
         """
         try:
             if not request.user or not request.user.is_authenticated:
                 return None
             
-            # OPTIMIZED: Single query with Q objects to avoid multiple DB hits
-            return Employee.objects.filter(
-                Q(user=request.user) | 
-                Q(employeeCode=request.user.username) |
-                Q(phone1=request.user.username) | 
-                Q(phone2=request.user.username),
-                del_state=0
-            ).select_related().first()
+            return request.employee or None
             
         except Exception as e:
             print(f"Error getting current user employee: {str(e)}")
@@ -5445,20 +4719,10 @@ class ClientJobViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'], url_path='get-feedback-entries')
     def get_feedback_entries(self, request, pk=None):
-        """Get parsed feedback entries with NFD auto-update"""
+        """Get parsed feedback entries (expired NFDs are marked by the expire_nfds run)"""
         try:
             client_job = self.get_object()
             
-            # Optimized NFD update check with minimal logging
-            nfd_updated = client_job.check_and_update_expired_nfd()
-            if nfd_updated:
-                client_job.refresh_from_db()
-            
-            # Get feedback entries without excessive debugging
-            entries = client_job.get_feedback_entries()
-
-            total_entries = len(entries)
-
             page_param = request.query_params.get('page')
             page_size_param = request.query_params.get('page_size')
 
@@ -5477,12 +4741,12 @@ class ClientJobViewSet(viewsets.ModelViewSet):
                 if page_size < 1:
                     page_size = 1
 
+                # Only the requested page is read (sorted and sliced in the database)
                 start = (page - 1) * page_size
-                end = start + page_size
-                paginated_entries = entries[start:end]
+                paginated_entries, total_entries = client_job.feedback_entries_page(start, start + page_size)
                 total_pages = (total_entries + page_size - 1) // page_size if page_size else 1
             else:
-                paginated_entries = entries
+                paginated_entries, total_entries = client_job.feedback_entries_page()
                 page = 1
                 page_size = total_entries if total_entries > 0 else 1
                 total_pages = 1
@@ -5500,7 +4764,7 @@ class ClientJobViewSet(viewsets.ModelViewSet):
                 "total_pages": total_pages,
                 "has_next": page < total_pages,
                 "has_previous": page > 1,
-                "nfd_updated": nfd_updated
+                "nfd_updated": False  # expiry is applied by the scheduled expire_nfds run
             })
             
         except ClientJob.DoesNotExist:
@@ -5742,10 +5006,12 @@ class ClientJobViewSet(viewsets.ModelViewSet):
                     created_by=''  # as requested
                 )
                 # Immediately set updated_by and updated_at to the assign_by employee
-                ClientJob.objects.filter(pk=duplicate_job.pk).update(
-                    updated_by=assign_by_code,
-                    updated_at=timezone.now()
-                )
+                with report_facts.track_jobs(ClientJob.objects.filter(pk=duplicate_job.pk)):
+                    ClientJob.objects.filter(pk=duplicate_job.pk).update(
+                        updated_by=assign_by_code,
+                        updated_at=timezone.now()
+                    )
+                shared_cache.bump_on_commit('client_job')
                 logger.info(f"Duplicated ClientJob row created with id {duplicate_job.id} for candidate {client_job.candidate.id}")
             except Exception as dup_err:
                 logger.error(f"Error duplicating ClientJob row on assignment: {str(dup_err)}", exc_info=True)
@@ -6080,23 +5346,17 @@ class CandidateRevenueViewSet(viewsets.ModelViewSet):
         if employee_code:
             qs = qs.filter(candidate__executive_name__iexact=employee_code)
 
-        # 4) Client Name - Optimized filtering
+        # 4) Client Name - EXISTS per candidate (no join fan-out, no distinct)
         client = self.request.query_params.get("client")
         if client:
-            # First try exact match (faster, can use index if available)
-            qs = qs.filter(
-                candidate__client_jobs__client_name__iexact=client
-            )
-            
-            # If no results and search term is long enough, fall back to contains
-            if not qs.exists() and len(client) > 3:
-                qs = qs.filter(
-                    candidate__client_jobs__client_name__icontains=client
-                )
-                
-            # Only use distinct() if we had to fall back to contains
-            if 'icontains' in str(qs.query):
-                qs = qs.distinct()
+            exact_jobs = ClientJob.objects.filter(client_name__iexact=client)
+            client_match = Q(Exists(exact_jobs.filter(candidate_id=OuterRef("candidate_id"))))
+            # Long search terms fall back to contains when no client has that exact name
+            if len(client) > 3:
+                client_match |= ~Q(Exists(exact_jobs)) & Q(Exists(ClientJob.objects.filter(
+                    candidate_id=OuterRef("candidate_id"), client_name__icontains=client
+                )))
+            qs = qs.filter(client_match)
 
         # 5) City
         city = self.request.query_params.get("city")
@@ -6108,6 +5368,52 @@ class CandidateRevenueViewSet(viewsets.ModelViewSet):
         # --------------------------
         return qs.order_by("-id")
 
+    # Query params that change the filtered set (cache key for the header summary)
+    SUMMARY_PARAMS = ("from_date", "to_date", "candidate", "branch_name", "employee", "client", "city")
+
+    @staticmethod
+    def latest_client_job(field):
+        """Subquery: `field` of the candidate's latest client job (highest id, as the rows display it)"""
+        return Subquery(
+            ClientJob.objects.filter(candidate_id=OuterRef("candidate_id")).order_by("-id").values(field)[:1]
+        )
+
+    def header_summary(self, queryset):
+        """
+        Row count and header counts for the filtered revenues in one
+        conditional-aggregation query, keyed on each candidate's latest client
+        job status. Cached per filter set until a revenue, client job,
+        candidate or employee write commits.
+        """
+        params = [self.request.query_params.get(name, "") for name in self.SUMMARY_PARAMS]
+        cache_key = shared_cache.make_key(
+            "revenue_summary", ("revenue", "client_job", "candidate", "employee"), *params
+        )
+        summary = shared_cache.get(cache_key)
+        if summary is not None:
+            return summary
+
+        abscond = Q(latest_status__iexact="Abscond")
+        not_abscond = ~abscond
+        joined = Q(latest_status__iexact="Joined")
+        processing = Q(revenue_status__iexact="Processing") | Q(revenue_status__iexact="Process")
+        summary = queryset.order_by().annotate(
+            latest_status=Coalesce(self.latest_client_job("profilestatus"), Value(""))
+        ).aggregate(
+            count=Count("id"),
+            # Abscond profiles are left out of the status counts
+            claimed_count=Count("id", filter=Q(revenue_status__iexact="Claimed") & not_abscond),
+            pending_count=Count("id", filter=Q(revenue_status__iexact="Pending") & not_abscond),
+            processing_count=Count("id", filter=processing & not_abscond),
+            joined_count=Count("id", filter=joined),
+            abscond_count=Count("id", filter=abscond),
+            # Only Joined profiles contribute to the total, as in the frontend header
+            total_revenue=Sum("revenue", filter=joined),
+        )
+        summary["total_revenue"] = summary["total_revenue"] or 0
+        shared_cache.put(cache_key, summary, 300)
+        return summary
+
     def list(self, request, *args, **kwargs):
         """List revenues with aggregated status counts for header summary.
 
@@ -6115,59 +5421,38 @@ class CandidateRevenueViewSet(viewsets.ModelViewSet):
         - claimed_count
         - pending_count
         - processing_count (includes 'Processing' and 'Process')
-        - joined_count (by candidate client_job.profilestatus)
-        - abscond_count (by candidate client_job.profilestatus)
+        - joined_count (by the candidate's latest client_job.profilestatus)
+        - abscond_count (by the candidate's latest client_job.profilestatus)
+        - total_revenue (Joined only)
+
+        Two queries: the header summary (which also supplies the page count)
+        and the page rows, with the latest client job fields annotated.
         """
         queryset = self.filter_queryset(self.get_queryset())
+        summary = self.header_summary(queryset)
+        header = {key: value for key, value in summary.items() if key != "count"}
 
-        # Compute global counts on the fully filtered queryset (before pagination)
-        processing_q = Q(revenue_status__iexact="Processing") | Q(revenue_status__iexact="Process")
-
-        # Exclude Abscond profiles from status counts
-        non_abscond_qs = queryset.exclude(candidate__client_jobs__profilestatus__iexact="Abscond")
-
-        claimed_count = non_abscond_qs.filter(revenue_status__iexact="Claimed").count()
-        pending_count = non_abscond_qs.filter(revenue_status__iexact="Pending").count()
-        processing_count = non_abscond_qs.filter(processing_q).count()
-
-        # Joined / Abscond derived from latest client jobs' profilestatus; we approximate
-        # by filtering on related ClientJob profilestatus. This matches the frontend
-        # semantics closely enough for header summaries.
-        joined_qs = queryset.filter(candidate__client_jobs__profilestatus__iexact="Joined")
-        abscond_qs = queryset.filter(candidate__client_jobs__profilestatus__iexact="Abscond")
-
-        joined_count = joined_qs.count()
-        abscond_count = abscond_qs.count()
-
-        # Total revenue should follow the same business rule as the frontend header:
-        # only Joined profiles contribute to total, Abscond and others are excluded.
-        total_revenue_value = joined_qs.aggregate(total=Sum("revenue"))[["total"] if False else "total"] or 0
-
+        queryset = queryset.annotate(
+            latest_profilestatus=self.latest_client_job("profilestatus"),
+            latest_client_name=self.latest_client_job("client_name"),
+        )
+        # The summary already counted the rows; skip the paginator's COUNT(*)
+        self.paginator.known_count = summary["count"]
         page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             response = self.get_paginated_response(serializer.data)
 
             # Attach aggregated counts to the paginated payload
-            response.data["claimed_count"] = claimed_count
-            response.data["pending_count"] = pending_count
-            response.data["processing_count"] = processing_count
-            response.data["joined_count"] = joined_count
-            response.data["abscond_count"] = abscond_count
-            response.data["total_revenue"] = total_revenue_value
+            response.data.update(header)
             return response
 
         serializer = self.get_serializer(queryset, many=True)
         return Response(
             {
-                "count": queryset.count(),
+                "count": summary["count"],
                 "results": serializer.data,
-                "claimed_count": claimed_count,
-                "pending_count": pending_count,
-                "processing_count": processing_count,
-                "joined_count": joined_count,
-                "abscond_count": abscond_count,
-                "total_revenue": total_revenue_value,
+                **header,
             }
         )
 
@@ -6255,6 +5540,85 @@ class CandidateRevenueFeedbackViewSet(viewsets.ModelViewSet):
 # ------------------------------
 # Resume Parse API View
 # ------------------------------
+class ResumeParseJobView(APIView):
+    """
+    Status / result of a resume parse job.
+    GET /api/parse-resume/<job_id>/
+    """
+
+    def get(self, request, job_id):
+        job = ResumeParseJob.objects.filter(job_id=job_id).first()
+        if job is None:
+            return Response({'error': 'Parse job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.as_status(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """
+    Shared cache hit/miss counters (this process and all processes) and data versions.
+    GET /api/cache-stats/
+    """
+    return Response(shared_cache.stats(), status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def perf_report(request):
+    """
+    Per-endpoint timings, query counts and budget violations from the profiling
+    ring buffer (PERF_PROFILING=1, see backend/perf.py). DELETE clears the buffer.
+    GET /api/_perf/?sort=p95_ms&limit=20&endpoint=candidate-bulk-fetch
+    """
+    if request.method == 'DELETE':
+        perf.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    rows = perf.records()
+    endpoint = request.query_params.get('endpoint')
+    if endpoint:
+        rows = [row for row in rows if row['endpoint'] == endpoint]
+    try:
+        limit = max(0, int(request.query_params.get('limit', 20)))
+        summary = perf.summarize(rows, sort=request.query_params.get('sort', 'p95_ms'), limit=limit)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'enabled': getattr(settings, 'PERF_PROFILING', False),
+        'buffered_requests': len(rows),
+        'buffer_size': perf.buffer_size(),
+        'endpoints': summary,
+    }, status=status.HTTP_200_OK)
+
+
+class ResumeParserHealthView(APIView):
+    """
+    NLP pipeline state and memory of the process serving the request.
+    GET /api/parse-resume/health/            (does not load the model)
+    GET /api/parse-resume/health/?warm=true  (loads it first; admin users only)
+    """
+
+    def _warm(self):
+        return self.request.query_params.get('warm', '').lower() in ('1', 'true', 'yes')
+
+    def get_permissions(self):
+        # Loading costs seconds and hundreds of MB per worker: not for anonymous callers
+        if self._warm():
+            return [IsAuthenticated(), IsAdminUser()]
+        return super().get_permissions()
+
+    def get(self, request):
+        service = resume_nlp.get_service()
+        if self._warm():
+            service.load()
+        return Response({
+            'nlp': service.health(),
+            'parse_backend': resume_jobs.get_backend(),
+            'cache_enabled': resume_cache.enabled(),
+        }, status=status.HTTP_200_OK)
+
+
 class WordToPdfConvertAPIView(APIView):
     """
     API view to convert Word documents to PDF
@@ -6305,37 +5669,42 @@ class WordToPdfConvertAPIView(APIView):
             
             # Create temporary directory for processing
             with tempfile.TemporaryDirectory() as temp_dir:
-                print(f"Created temp directory: {temp_dir}")
-                
-                # Save uploaded Word file temporarily
                 word_filename = word_file.name
-                word_path = os.path.join(temp_dir, word_filename)
-                print(f"Saving file to: {word_path}")
-                
-                with open(word_path, 'wb') as f:
-                    for chunk in word_file.chunks():
-                        f.write(chunk)
-                
-                print(f"File saved successfully, size: {os.path.getsize(word_path)} bytes")
-                
-                # Convert Word to PDF
-                print("Starting PDF conversion...")
-                pdf_path = convert_docx_to_pdf(word_path, temp_dir)
-                print(f"PDF conversion result: {pdf_path}")
+                cache_key = resume_cache.content_hash(word_file) if resume_cache.enabled() else None
+                pdf_path = resume_cache.get_pdf(cache_key)
+                if pdf_path:
+                    print(f"Serving cached PDF conversion: {pdf_path}")
+                else:
+                    print(f"Created temp directory: {temp_dir}")
+                    
+                    # Save uploaded Word file temporarily
+                    word_path = os.path.join(temp_dir, word_filename)
+                    print(f"Saving file to: {word_path}")
+                    
+                    with open(word_path, 'wb') as f:
+                        for chunk in word_file.chunks():
+                            f.write(chunk)
+                    
+                    print(f"File saved successfully, size: {os.path.getsize(word_path)} bytes")
+                    
+                    # Convert Word to PDF
+                    print("Starting PDF conversion...")
+                    pdf_path = resume_cache.put_pdf(cache_key, convert_docx_to_pdf(word_path, temp_dir))
+                    print(f"PDF conversion result: {pdf_path}")
                 
                 if pdf_path and os.path.exists(pdf_path):
-                    print(f"PDF file exists: {pdf_path}, size: {os.path.getsize(pdf_path)} bytes")
-                    
-                    # Read PDF content
-                    with open(pdf_path, 'rb') as pdf_file:
-                        pdf_content = pdf_file.read()
+                    pdf_size = os.path.getsize(pdf_path)
+                    print(f"PDF file exists: {pdf_path}, size: {pdf_size} bytes")
                     
-                    if len(pdf_content) > 0:
-                        print(f"Returning PDF content: {len(pdf_content)} bytes")
-                        response = HttpResponse(
-                            pdf_content,
-                            content_type='application/pdf'
-                        )
+                    if pdf_size > 0:
+                        print(f"Returning PDF content: {pdf_size} bytes")
+                        if pdf_path.startswith(resume_cache.cache_root()):
+                            # Stream from the cache instead of reading the PDF into memory
+                            response = FileResponse(open(pdf_path, 'rb'), content_type='application/pdf')
+                        else:
+                            # Cache off: temp_dir is removed on return, so read it now
+                            with open(pdf_path, 'rb') as pdf_file:
+                                response = HttpResponse(pdf_file.read(), content_type='application/pdf')
                         response['Content-Disposition'] = f'inline; filename="{os.path.splitext(word_filename)[0]}.pdf"'
                         response['Access-Control-Allow-Origin'] = '*'
                         return response
@@ -6421,31 +5790,24 @@ class ResumeParseAPIView(APIView):
             )
         
         resume_file = request.FILES['file']
-        file_to_parse = resume_file
+        created_by = getattr(request.user, 'username', None) or None
+        run_async = str(request.query_params.get('async') or request.data.get('async') or '').lower() in ('1', 'true', 'yes')
         
         try:
-            # Check if it's a Word document that needs conversion
-            word_types = [
-                'application/msword',
-                'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            ]
-            
-            if resume_file.content_type in word_types:
-                # Use alternative parser for Word documents (no PDF conversion needed)
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Save uploaded Word file temporarily
-                    word_filename = resume_file.name
-                    word_path = os.path.join(temp_dir, word_filename)
-                    
-                    with open(word_path, 'wb') as f:
-                        for chunk in resume_file.chunks():
-                            f.write(chunk)
-                    
-                    # Parse the Word document directly
-                    parsed_data = alternative_parse_resume(word_path)
-            else:
-                # Parse the file directly (PDF or other supported formats)
-                parsed_data = parse_resume(resume_file)
+            if run_async:
+                # Return immediately; the client polls GET /api/parse-resume/<job_id>/
+                job = resume_jobs.enqueue_upload(resume_file, created_by=created_by)
+                return Response({
+                    'job_id': str(job.job_id),
+                    'status': job.status,
+                    'status_url': request.build_absolute_uri(f'{job.job_id}/'),
+                    # Set right away when the file was already in the resume cache
+                    'result': job.result if job.status == 'success' else None,
+                }, status=status.HTTP_200_OK if job.is_finished else status.HTTP_202_ACCEPTED)
+
+            # Synchronous parse for the current form autofill: parsed in memory, recorded as a job
+            job = resume_jobs.parse_upload(resume_file, created_by=created_by)
+            parsed_data = job.result if job.status == 'success' else {"success": False, "error": job.error}
             
             if not parsed_data:
                 return Response(
@@ -6970,120 +6332,32 @@ def update_expired_nfd_status(request):
                 'error': f'Failed to test NFD expiry: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    else:  # POST method - Update expired NFDs
+    else:  # POST method - report the scheduled NFD expiry run
+        # Expiry itself runs in `manage.py expire_nfds` / candidate.tasks.expire_nfds;
+        # this endpoint only reads the last run so request handlers never sweep.
         try:
             from django.utils import timezone
-            from django.conf import settings
-            from datetime import datetime
+            from . import nfd_expiry
             
-            # Handle both USE_TZ=True and USE_TZ=False
-            if settings.USE_TZ:
-                current_date = timezone.now().date()
-            else:
-                current_date = datetime.now().date()
-            
-            # Check cache first for performance optimization
-            cache_key = 'nfd_update_last_run'
-            cache_timeout = 30 * 60  # 30 minutes in seconds
-            
-            try:
-                last_run_data = cache.get(cache_key)
-                if last_run_data:
-                    last_run_time = last_run_data.get('timestamp')
-                    if last_run_time:
-                        # Handle both timezone-aware and naive datetimes
-                        current_time = timezone.now() if settings.USE_TZ else datetime.now()
-                        time_since = (current_time - last_run_time).total_seconds()
-                        if time_since < cache_timeout:
-                            # Return cached response immediately
-                            minutes_ago = int(time_since / 60)
-                            print(f" NFD AUTO-UPDATE: Skipping update (last update was {minutes_ago} minutes ago)")
-                            return Response({
-                                'success': True,
-                                'message': f'NFD auto-update skipped (last run {minutes_ago} minutes ago)',
-                                'updated_count': 0,
-                                'cached': True,
-                                'current_date': str(current_date),
-                                'expiry_threshold': str(get_nfd_expiry_threshold())
-                            }, status=status.HTTP_200_OK)
-            except Exception as cache_error:
-                # If cache fails, log but continue with update
-                print(f" Warning: Cache check failed: {str(cache_error)}, continuing with update...")
-            
-            print(f" NFD AUTO-UPDATE - Current date: {current_date}")
-            
-            # Use common NFD expiry threshold
+            current_date = timezone.now().date()
             expiry_threshold = get_nfd_expiry_threshold()
-            
-            # Test with a specific NFD date for debugging
-            test_nfd = current_date - timedelta(days=2)  # 2 days ago
-            
-            print(f"   Current date: {current_date}")
-            print(f"   Expiry threshold: {expiry_threshold}")
-            print(f"   Test NFD: {test_nfd}")
-            print(f"   Is test NFD expired: {test_nfd < expiry_threshold}")
-            
-            test_jobs = ClientJob.objects.filter(next_follow_up_date=test_nfd)
-            print(f" Found {test_jobs.count()} jobs with NFD {test_nfd}")
-            
-            for job in test_jobs[:3]:  # Show first 3 for debugging
-                candidate_name = job.candidate.candidate_name if job.candidate else 'Unknown'
-                print(f"   - Job {job.id}: NFD={job.next_follow_up_date}, Candidate={candidate_name}, Remarks='{job.remarks}'")
-            
-            # Get all expired jobs
-            expired_jobs = ClientJob.objects.filter(
-                next_follow_up_date__lt=expiry_threshold,
-                next_follow_up_date__isnull=False
-            )
-            
-            print(f" Found {expired_jobs.count()} expired jobs to update")
-            
-            # Show some examples
-            for job in expired_jobs[:5]:  # Show first 5 for debugging
-                candidate_name = job.candidate.candidate_name if job.candidate else 'Unknown'
-                
-                print(f"   - Job {job.id}: NFD={job.next_follow_up_date}, Candidate={candidate_name}, Remarks='{job.remarks}'")
-        
-            updated_count = ClientJob.update_all_expired_nfd_jobs()
-            
-            # Cache the update timestamp for 30 minutes
-            try:
-                current_time = timezone.now() if settings.USE_TZ else datetime.now()
-                cache.set(cache_key, {
-                    'timestamp': current_time,
-                    'updated_count': updated_count
-                }, cache_timeout)
-            except Exception as cache_error:
-                # If cache set fails, log but continue
-                print(f" Warning: Failed to cache update result: {str(cache_error)}")
-            
-            print(f" NFD AUTO-UPDATE: Completed - {updated_count} jobs updated, cached for 30 minutes")
+            last_run = nfd_expiry.last_run_metrics()
             
             return Response({
                 'success': True,
-                'message': f'NFD auto-update completed - {updated_count} jobs updated',
-                'updated_count': updated_count,
+                'message': 'NFD expiry runs on schedule; returning last run',
+                'updated_count': last_run['jobs_unassigned'] if last_run else 0,
+                'pending_count': nfd_expiry.expired_jobs(expiry_threshold).count(),
+                'last_run': last_run,
                 'current_date': str(current_date),
                 'expiry_threshold': str(expiry_threshold)
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f" Critical error in update_expired_nfd_status: {str(e)}")
-            import traceback
-            error_traceback = traceback.format_exc()
-            print(error_traceback)
-            
-            # Log detailed error information
-            error_details = {
-                'error_type': type(e).__name__,
-                'error_message': str(e),
-                'traceback': error_traceback
-            }
-            print(f" Error details: {error_details}")
-            
+            print(f" Error in update_expired_nfd_status: {str(e)}")
             return Response({
                 'success': False,
-                'error': f'Failed to update expired NFD status: {str(e)}',
+                'error': f'Failed to read NFD expiry status: {str(e)}',
                 'error_type': type(e).__name__,
                 'updated_count': 0
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -7141,23 +6415,24 @@ def check_expired_nfd_jobs(request):
 @permission_classes([IsAuthenticated])
 def run_expired_job_cleanup(request):
     """
-    Run the automated cleanup for expired NFD jobs.
-    This marks all expired jobs as open profile automatically.
-    Should be called periodically (e.g., daily cron job).
+    Report the automated cleanup for expired NFD jobs.
+    The cleanup itself runs daily after midnight (`manage.py expire_nfds` or the
+    candidate.tasks.expire_nfds celery-beat task); this returns its last run.
     """
     try:
-        # Get current user info
-        current_user_name = get_current_user_name(request.user)
+        from . import nfd_expiry
         
-        # Run the cleanup
-        updated_count = ClientJob.update_all_expired_nfd_jobs()
+        last_run = nfd_expiry.last_run_metrics()
+        updated_count = last_run['jobs_unassigned'] if last_run else 0
         
         return Response({
             'success': True,
-            'message': f'Expired job cleanup completed - {updated_count} jobs marked as open profile',
+            'message': f'Last expired job cleanup marked {updated_count} jobs as open profile',
             'updated_count': updated_count,
-            'run_by': current_user_name,
-            'run_at': timezone.now().isoformat()
+            'pending_count': nfd_expiry.expired_jobs().count(),
+            'last_run': last_run,
+            'run_by': last_run['triggered_by'] if last_run else None,
+            'run_at': last_run['finished_at'] if last_run else None
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
@@ -7175,38 +6450,14 @@ def profile_in_list(request):
     Supports pagination and date filtering.
     """
     try:
-        # Get current user's employee code (optimized query)
-        username = request.user.username
-        
-        # Normalize username to handle different formats
-        # Convert formats like "EMP00040-1", "EMP00040", "Emp00040" to "Emp/00040"
-        normalized_username = username
-        if username and len(username) >= 8:
-            # Remove any suffix like "-1"
-            base_username = username.split('-')[0]
-            # Check if it matches employee code pattern (EMP or Emp followed by digits)
-            if base_username.upper().startswith('EMP') and base_username[3:].isdigit():
-                # Normalize to Emp/XXXXX format
-                normalized_username = f"Emp/{base_username[3:]}"
-                print(f"ProfileIN: Normalized username from '{username}' to '{normalized_username}'")
-        
-        # Try to find employee using multiple lookup methods
-        employee = Employee.objects.filter(
-            Q(user=request.user) |                      # By user object
-            Q(employeeCode=username) |                  # By original username
-            Q(employeeCode=normalized_username) |       # By normalized username
-            Q(phone1=username) |                        # By phone1
-            Q(phone2=username),                         # By phone2
-            del_state=0
-        ).only('employeeCode').first()
-        
+        # Get current user's employee code (request.employee, see empreg/identity.py)
+        employee = request.employee
         if employee:
             emp_code = employee.employeeCode
             print(f"ProfileIN: Found employee code: {emp_code}")
-            print(f"ProfileIN: Employee code type: {type(emp_code)}, repr: {repr(emp_code)}")
         else:
-            # Fallback to normalized username if no employee found
-            emp_code = normalized_username if normalized_username != username else username
+            # Fallback to the username, normalized ("EMP00040-1" -> "Emp/00040")
+            emp_code = employee_identity.fallback_code(request.user.username)
             print(f"ProfileIN: Using fallback emp_code: {emp_code}")
 
         # Base query - profiles assigned TO this user (optimized with only/defer)
@@ -7337,38 +6588,14 @@ def profile_out_list(request):
     Supports pagination and date filtering.
     """
     try:
-        # Get current user's employee code (optimized query)
-        username = request.user.username
-        
-        # Normalize username to handle different formats
-        # Convert formats like "EMP00040-1", "EMP00040", "Emp00040" to "Emp/00040"
-        normalized_username = username
-        if username and len(username) >= 8:
-            # Remove any suffix like "-1"
-            base_username = username.split('-')[0]
-            # Check if it matches employee code pattern (EMP or Emp followed by digits)
-            if base_username.upper().startswith('EMP') and base_username[3:].isdigit():
-                # Normalize to Emp/XXXXX format
-                normalized_username = f"Emp/{base_username[3:]}"
-                print(f"ProfileOUT: Normalized username from '{username}' to '{normalized_username}'")
-        
-        # Try to find employee using multiple lookup methods
-        employee = Employee.objects.filter(
-            Q(user=request.user) |                      # By user object
-            Q(employeeCode=username) |                  # By original username
-            Q(employeeCode=normalized_username) |       # By normalized username
-            Q(phone1=username) |                        # By phone1
-            Q(phone2=username),                         # By phone2
-            del_state=0
-        ).only('employeeCode').first()
-        
+        # Get current user's employee code (request.employee, see empreg/identity.py)
+        employee = request.employee
         if employee:
             emp_code = employee.employeeCode
             print(f"ProfileOUT: Found employee code: {emp_code}")
-            print(f"ProfileOUT: Employee code type: {type(emp_code)}, repr: {repr(emp_code)}")
         else:
-            # Fallback to normalized username if no employee found
-            emp_code = normalized_username if normalized_username != username else username
+            # Fallback to the username, normalized ("EMP00040-1" -> "Emp/00040")
+            emp_code = employee_identity.fallback_code(request.user.username)
             print(f"ProfileOUT: Using fallback emp_code: {emp_code}")
 
         # Base query - profiles assigned FROM this user (optimized with only/defer)
@@ -7646,6 +6873,89 @@ def create_status_history(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+BULK_STATUS_HISTORY_LIMIT = 5000
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create_status_history(request):
+    """
+    Create many status history entries in one request
+
+    Expected payload:
+    {
+        "events": [
+            {"candidate_id": 123, "remarks": "Interested", "change_date": "2025-11-14",
+             "created_by": "EMP001", "client_job_id": 45, "profile_submission": 1, ...},
+            ...
+        ]
+    }
+
+    Same de-dup rules as create_status_history (see
+    CandidateStatusHistory.bulk_create_status_entries), resolved for the whole
+    batch at once. Response lists what was created, which events matched an
+    existing row, which were skipped and which were invalid (by event index).
+    """
+    events = request.data.get('events') if isinstance(request.data, dict) else request.data
+    if not isinstance(events, list) or not events:
+        return Response({'error': 'events must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(events) > BULK_STATUS_HISTORY_LIMIT:
+        return Response({
+            'error': f'At most {BULK_STATUS_HISTORY_LIMIT} events per request'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # Resolve branch/team once per (creator, job) instead of once per event
+        resolved = {}
+        prepared = []
+        for event in events:
+            if not isinstance(event, dict):
+                prepared.append({})
+                continue
+            event = dict(event)
+            if event.get('branch_id') in [None, '', 'null'] or event.get('team_id') in [None, '', 'null']:
+                key = (event.get('created_by'), event.get('client_job_id'))
+                if key not in resolved:
+                    resolved[key] = _resolve_branch_team_by_employee_code(*key)
+                b_id, t_id = resolved[key]
+                if event.get('branch_id') in [None, '', 'null']:
+                    event['branch_id'] = b_id
+                if event.get('team_id') in [None, '', 'null']:
+                    event['team_id'] = t_id
+            prepared.append(event)
+
+        result = CandidateStatusHistory.bulk_create_status_entries(prepared)
+        created = result['created']
+        return Response({
+            'success': True,
+            'created_count': len(created),
+            'existing_count': len(result['existing']),
+            'skipped_count': len(result['skipped']),
+            'error_count': len(result['errors']),
+            'created': [
+                {
+                    # id is None on backends where bulk_create does not return pks (MySQL)
+                    'id': entry.id,
+                    'candidate_id': entry.candidate_id,
+                    'client_job_id': entry.client_job_id,
+                    'remarks': entry.remarks,
+                    'change_date': entry.change_date.strftime('%Y-%m-%d'),
+                    'profile_submission': entry.profile_submission,
+                    'attend_flag': entry.attend_flag,
+                }
+                for entry in created
+            ],
+            'existing': result['existing'],
+            'skipped': result['skipped'],
+            'errors': result['errors'],
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+    except Exception as e:
+        logger.error(f"Error bulk creating status history: {str(e)}")
+        return Response({
+            'error': f'Failed to create status history: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_candidate_timeline(request, candidate_id):
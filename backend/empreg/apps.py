@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class EmpregConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'empreg'
+
+    def ready(self):
+        import empreg.signals
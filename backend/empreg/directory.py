@@ -0,0 +1,209 @@
+"""
+Process-wide employee directory.
+
+Resolves employee codes (and ids) to display/organisation details without a
+query per row. The whole directory is loaded in a few queries into an
+in-process snapshot tagged with a version number; Employee/Team/Branch
+save and delete signals (see empreg/signals.py) bump the version so the
+next lookup reloads. A max age bounds staleness for changes made by other
+worker processes.
+
+Usage:
+    from empreg import directory as employee_directory
+    people = employee_directory.resolve(['EMP/00101', 'EMP/00102'])
+    people['EMP/00101']['fullName']
+"""
+import threading
+import time
+
+# Seconds a snapshot may be served before it is reloaded even without a signal
+MAX_AGE_SECONDS = 300
+
+_lock = threading.Lock()
+_version = 0
+_snapshot = None
+
+
+class _Snapshot:
+    def __init__(self, version, by_code, by_normalized_code, by_id):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.by_code = by_code
+        self.by_normalized_code = by_normalized_code
+        self.by_id = by_id
+
+
+def _code_key(code):
+    return str(code).strip().upper()
+
+
+def _normalized_key(code):
+    return _code_key(code).replace('/', '').replace('_', '').replace(' ', '')
+
+
+def _load(version):
+    from empreg.models import Employee
+    from Masters.models import Team, Branch
+
+    branch_ids = {}
+    for branch_id, name, branchcode in Branch.objects.values_list('id', 'name', 'branchcode'):
+        if name:
+            branch_ids.setdefault(name.strip().upper(), branch_id)
+        if branchcode:
+            branch_ids.setdefault(branchcode.strip().upper(), branch_id)
+
+    # First active team (lowest id) per employee, matching Team...first() lookups
+    teams = {}
+    team_rows = (
+        Team.objects.filter(status='Active', employees__isnull=False)
+        .order_by('id')
+        .values_list('employees__id', 'id', 'name', 'branch_id')
+    )
+    for employee_id, team_id, team_name, team_branch_id in team_rows:
+        teams.setdefault(employee_id, (team_id, team_name, team_branch_id))
+
+    by_code = {}
+    by_normalized_code = {}
+    by_id = {}
+    employees = Employee.objects.values(
+        'id', 'employeeCode', 'firstName', 'lastName', 'branch', 'level',
+        'reportingManager', 'officialEmail', 'phone1', 'status', 'del_state',
+    )
+    for emp in employees:
+        first = emp['firstName'] or ''
+        last = emp['lastName'] or ''
+        team_id, team_name, team_branch_id = teams.get(emp['id'], (None, None, None))
+        branch = emp['branch']
+        info = {
+            'id': emp['id'],
+            'employeeCode': emp['employeeCode'],
+            'firstName': first,
+            'lastName': last,
+            'fullName': f"{first} {last}".strip(),
+            'branch': branch,
+            'branch_id': team_branch_id or branch_ids.get((branch or '').strip().upper()),
+            'level': emp['level'],
+            'team': team_name,
+            'team_id': team_id,
+            'reportingManager': emp['reportingManager'],
+            'officialEmail': emp['officialEmail'],
+            'phone1': emp['phone1'],
+            'status': emp['status'],
+            'del_state': emp['del_state'],
+        }
+        by_id[emp['id']] = info
+        if emp['employeeCode']:
+            # Active rows win over soft-deleted rows sharing a code
+            key = _code_key(emp['employeeCode'])
+            if key not in by_code or by_code[key]['del_state'] != 0:
+                by_code[key] = info
+            by_normalized_code.setdefault(_normalized_key(emp['employeeCode']), info)
+
+    return _Snapshot(version, by_code, by_normalized_code, by_id)
+
+
+def _current():
+    global _snapshot
+    snapshot = _snapshot
+    if (snapshot is not None and snapshot.version == _version
+            and time.monotonic() - snapshot.loaded_at < MAX_AGE_SECONDS):
+        return snapshot
+    with _lock:
+        snapshot = _snapshot
+        if (snapshot is None or snapshot.version != _version
+                or time.monotonic() - snapshot.loaded_at >= MAX_AGE_SECONDS):
+            snapshot = _load(_version)
+            _snapshot = snapshot
+    return snapshot
+
+
+def _visible(info, include_deleted):
+    if info is None:
+        return None
+    if not include_deleted and info['del_state'] != 0:
+        return None
+    return info
+
+
+def invalidate(*args, **kwargs):
+    """Drop the cached snapshot; usable directly as a signal receiver"""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def current_version():
+    return _version
+
+
+def resolve(codes, include_deleted=False):
+    """
+    Bulk lookup of employee codes.
+
+    Returns {code: info} for every code found, keyed by the code exactly as
+    passed in. info has firstName, lastName, fullName, branch, branch_id,
+    level, team, team_id and a few contact fields. Soft-deleted employees are
+    skipped unless include_deleted is True.
+    """
+    snapshot = _current()
+    resolved = {}
+    for code in codes:
+        if not code:
+            continue
+        info = _visible(snapshot.by_code.get(_code_key(code)), include_deleted)
+        if info is not None:
+            resolved[code] = info
+    return resolved
+
+
+def get(code, include_deleted=False):
+    """Single-code form of resolve(); returns info or None"""
+    if not code:
+        return None
+    return _visible(_current().by_code.get(_code_key(code)), include_deleted)
+
+
+def get_by_id(employee_id, include_deleted=False):
+    """Lookup by Employee primary key"""
+    if not employee_id:
+        return None
+    try:
+        employee_id = int(employee_id)
+    except (TypeError, ValueError):
+        return None
+    return _visible(_current().by_id.get(employee_id), include_deleted)
+
+
+def find(identifier, include_deleted=False, partial=False):
+    """
+    Lenient lookup for codes typed in different shapes ("emp/00101",
+    "EMP00101", "EMP_00101"): exact code first, then the code with
+    separators stripped. With partial=True, finally the lowest-id employee
+    whose code contains identifier (the old employeeCode__icontains fallback).
+    """
+    info = get(identifier, include_deleted=include_deleted)
+    if info is None and identifier:
+        snapshot = _current()
+        info = _visible(snapshot.by_normalized_code.get(_normalized_key(identifier)), include_deleted)
+        if info is None and partial:
+            needle = _code_key(identifier)
+            matches = [
+                candidate for candidate in snapshot.by_id.values()
+                if candidate['employeeCode'] and needle in _code_key(candidate['employeeCode'])
+                and _visible(candidate, include_deleted) is not None
+            ]
+            info = min(matches, key=lambda candidate: candidate['id']) if matches else None
+    return info
+
+
+def display_name(code, default=None, include_deleted=False):
+    """
+    "FirstName LastName" for an employee code, falling back to the first
+    name, then to default (the code itself when default is None).
+    """
+    if not code:
+        return None
+    info = get(code, include_deleted=include_deleted)
+    if info is None:
+        return code if default is None else default
+    return info['fullName'] or info['firstName'] or (code if default is None else default)
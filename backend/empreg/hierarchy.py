@@ -0,0 +1,316 @@
+"""
+Precomputed organisation hierarchy for role-scoped queries.
+
+Two tables, rebuilt together from Employee / Team / Branch:
+
+- employee_hierarchy: closure of the reportingManager tree, one row per
+  (ancestor_code, descendant_code, depth). reportingManager holds either the
+  manager's employee code or first name; both are resolved here, once.
+- employee_org_membership: branch (Employee.branch, upper-cased) and team
+  membership per employee.
+
+Who sees whose data (visible_employee_codes):
+
+    ceo / rm / l4 / l5   everyone (None)
+    l3 / bm              active employees of their branch, plus employees with
+                         no branch when the branch is in ORG_UNASSIGNED_BRANCHES
+                         (default COIMBATORE, MADURAI), plus their reporting tree
+    l2 / tl              themselves and their active reporting tree
+    anyone else          themselves
+
+    codes = hierarchy.visible_employee_codes(request.user)
+    if codes is not None:
+        candidates = candidates.filter(executive_name__in=codes)
+
+Endpoints with their own long-standing per-level rules (the events role filter,
+my-candidates-dtr) keep those rules and only take reports from here, e.g.
+subordinate_codes(code, max_depth=1) for a TL's direct reports.
+
+Results are cached in the shared cache under the 'org' namespace. Employee /
+Team / Branch signals rebuild the tables once the write commits and then bump
+'org'; bulk writes call rebuild() themselves (or `manage.py rebuild_org_hierarchy`).
+"""
+import logging
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from backend import shared_cache
+
+logger = logging.getLogger(__name__)
+
+UNRESTRICTED_LEVELS = ('ceo', 'rm', 'l4', 'l5')
+BRANCH_LEVELS = ('l3', 'bm')
+TEAM_LEVELS = ('l2', 'tl')
+DEFAULT_UNASSIGNED_BRANCHES = ('COIMBATORE', 'MADURAI')
+CACHE_TIMEOUT = 300
+
+
+def _key(value):
+    return (value or '').strip().upper()
+
+
+def unassigned_branches():
+    """Branches whose managers also see employees with no branch set"""
+    return {_key(name) for name in getattr(settings, 'ORG_UNASSIGNED_BRANCHES', DEFAULT_UNASSIGNED_BRANCHES)}
+
+
+# -----------------------------
+# Rebuild
+# -----------------------------
+def _closure(children, code):
+    """{descendant: depth} for code's reporting tree (shortest path, cycles ignored)"""
+    depths = {code: 0}
+    queue = deque([code])
+    while queue:
+        parent = queue.popleft()
+        for child in children.get(parent, ()):
+            if child not in depths:
+                depths[child] = depths[parent] + 1
+                queue.append(child)
+    return depths
+
+
+def rebuild():
+    """Recompute both tables from Employee / Team / Branch; returns (hierarchy rows, membership rows)"""
+    from Masters.models import Branch, Team
+    from .models import Employee, EmployeeHierarchy, EmployeeOrgMembership
+
+    employees = list(
+        Employee.objects.filter(del_state=0)
+        .exclude(employeeCode__isnull=True).exclude(employeeCode='')
+        .values('id', 'employeeCode', 'firstName', 'branch', 'level', 'status', 'reportingManager')
+    )
+
+    branch_ids = {}
+    for branch_id, name, branchcode in Branch.objects.values_list('id', 'name', 'branchcode'):
+        for value in (name, branchcode):
+            if value:
+                branch_ids.setdefault(_key(value), branch_id)
+
+    teams = defaultdict(list)
+    memberships = Team.employees.through.objects.order_by('team_id').values_list('employee_id', 'team_id', 'team__branch_id')
+    for employee_id, team_id, team_branch_id in memberships:
+        teams[employee_id].append((team_id, team_branch_id or 0))
+
+    # reportingManager matches the manager's code or first name (as the old per-view queries did)
+    by_code = {_key(emp['employeeCode']): emp['employeeCode'] for emp in employees}
+    by_first_name = defaultdict(set)
+    for emp in employees:
+        if emp['firstName']:
+            by_first_name[emp['firstName'].strip().casefold()].add(emp['employeeCode'])
+    children = defaultdict(set)
+    for emp in employees:
+        manager = (emp['reportingManager'] or '').strip()
+        if not manager:
+            continue
+        parents = set(by_first_name.get(manager.casefold(), ()))
+        if _key(manager) in by_code:
+            parents.add(by_code[_key(manager)])
+        for parent in parents - {emp['employeeCode']}:
+            children[parent].add(emp['employeeCode'])
+
+    active = {emp['employeeCode']: emp['status'] == 'Active' for emp in employees}
+    hierarchy_rows = [
+        EmployeeHierarchy(ancestor_code=emp['employeeCode'], descendant_code=descendant, depth=depth,
+                          descendant_active=active[descendant])
+        for emp in employees
+        for descendant, depth in _closure(children, emp['employeeCode']).items()
+    ]
+    membership_rows = [
+        EmployeeOrgMembership(
+            employee_id=emp['id'], employee_code=emp['employeeCode'], level=emp['level'] or '',
+            branch_key=_key(emp['branch']), branch_id=branch_ids.get(_key(emp['branch']), 0),
+            team_id=team_id, team_branch_id=team_branch_id, active=active[emp['employeeCode']],
+        )
+        for emp in employees
+        for team_id, team_branch_id in (teams.get(emp['id']) or [(0, 0)])
+    ]
+
+    with transaction.atomic():
+        EmployeeHierarchy.objects.all().delete()
+        EmployeeOrgMembership.objects.all().delete()
+        EmployeeHierarchy.objects.bulk_create(hierarchy_rows, batch_size=1000)
+        EmployeeOrgMembership.objects.bulk_create(membership_rows, batch_size=1000)
+        shared_cache.bump_on_commit('org')
+    return len(hierarchy_rows), len(membership_rows)
+
+
+def rebuild_on_commit():
+    """rebuild() once the current transaction commits; saves inside one transaction share a single rebuild"""
+    connection = transaction.get_connection()
+    if connection.in_atomic_block:
+        for entry in connection.run_on_commit:
+            if getattr(entry[1], 'org_hierarchy_rebuild', False):
+                return
+
+    def run():
+        # No longer pending, so later writes schedule their own rebuild
+        run.org_hierarchy_rebuild = False
+        try:
+            rebuild()
+        except Exception as e:
+            # The write itself already committed; `manage.py rebuild_org_hierarchy` recovers
+            logger.error(f"Organisation hierarchy rebuild failed: {e}", exc_info=True)
+
+    run.org_hierarchy_rebuild = True
+    transaction.on_commit(run)
+
+
+_built = False
+
+
+def ensure_built():
+    """Build the tables on first use in this process if they are empty (fresh deploy)"""
+    global _built
+    if _built:
+        return
+    from .models import Employee, EmployeeOrgMembership
+
+    if not EmployeeOrgMembership.objects.exists() and Employee.objects.filter(del_state=0).exists():
+        rebuild()
+    _built = True
+
+
+# -----------------------------
+# Lookups (each one indexed query)
+# -----------------------------
+def _branch_scope(branch, with_unassigned=False, with_team_branches=False):
+    """
+    Q on EmployeeOrgMembership for a branch given as a Branch id, name or
+    branchcode. branch_id was resolved from Employee.branch at rebuild time, so
+    a name only needs a Branch subquery, not a separate lookup.
+    """
+    from Masters.models import Branch
+
+    value = str(branch).strip()
+    if value.isdigit():
+        scope = Q(branch_id=int(value))
+        if with_team_branches:
+            scope |= Q(team_branch_id=int(value))
+        return scope
+    named = Branch.objects.filter(Q(name__iexact=value) | Q(branchcode__iexact=value)).values('id')
+    scope = Q(branch_key=_key(value)) | Q(branch_id__in=named)
+    if with_unassigned and _key(value) in unassigned_branches():
+        scope |= Q(branch_key='')
+    return scope
+
+
+def members(branch=None, team=None, level=None, active_only=True, with_unassigned=False, with_team_branches=False):
+    """
+    EmployeeOrgMembership rows for a branch (id, name or code) and/or team id,
+    usable directly as an IN subquery:
+
+        CallDetails.objects.filter(tb_call_emp_id__in=hierarchy.members(branch='CHENNAI').values('employee_id'))
+
+    with_unassigned adds employees without a branch for ORG_UNASSIGNED_BRANCHES;
+    with_team_branches adds members of teams belonging to a numeric branch id.
+    """
+    from .models import EmployeeOrgMembership
+
+    ensure_built()
+    rows = EmployeeOrgMembership.objects.all()
+    if branch not in (None, ''):
+        rows = rows.filter(_branch_scope(branch, with_unassigned, with_team_branches))
+    if team not in (None, ''):
+        rows = rows.filter(team_id=int(team))
+    if level:
+        rows = rows.filter(level__iexact=level)
+    if active_only:
+        rows = rows.filter(active=True)
+    return rows
+
+
+def _codes(rows, field):
+    return sorted(set(rows.values_list(field, flat=True)))
+
+
+def branch_employee_codes(branch, **options):
+    """Employee codes of a branch; options as for members()"""
+    return _codes(members(branch=branch, **options), 'employee_code')
+
+
+def team_employee_codes(team=None, name=None, **options):
+    """Employee codes of a team id, or of the first team called `name` when the id finds nobody"""
+    from Masters.models import Team
+
+    codes = _codes(members(team=team, **options), 'employee_code') if str(team or '').isdigit() else []
+    if not codes and name:
+        team = Team.objects.filter(name__iexact=str(name).strip()).order_by('id').values_list('id', flat=True).first()
+        if team is not None:
+            codes = _codes(members(team=team, **options), 'employee_code')
+    return codes
+
+
+def subordinate_codes(code, max_depth=None, active_only=True):
+    """Codes reporting to `code`, directly or not (max_depth=1: direct reports only)"""
+    from .models import EmployeeHierarchy
+
+    ensure_built()
+    rows = EmployeeHierarchy.objects.filter(ancestor_code=code, depth__gte=1)
+    if max_depth:
+        rows = rows.filter(depth__lte=max_depth)
+    if active_only:
+        rows = rows.filter(descendant_active=True)
+    return _codes(rows, 'descendant_code')
+
+
+# -----------------------------
+# Visibility
+# -----------------------------
+def _membership(code):
+    from .models import EmployeeOrgMembership
+
+    ensure_built()
+    return EmployeeOrgMembership.objects.filter(employee_code=code).first()
+
+
+def _visible_for(code):
+    from .models import EmployeeHierarchy
+
+    row = _membership(code)
+    if row is None:
+        return [code]
+    level = (row.level or '').strip().lower()
+    if level in UNRESTRICTED_LEVELS:
+        return None
+    if level in BRANCH_LEVELS:
+        # Reporting tree OR branch, one query
+        scope = Q(employee_code__in=EmployeeHierarchy.objects.filter(ancestor_code=code).values('descendant_code'))
+        if row.branch_key:
+            scope |= _branch_scope(row.branch_key, with_unassigned=True)
+        return sorted(set(members().filter(scope).values_list('employee_code', flat=True)) | {code})
+    if level in TEAM_LEVELS:
+        return sorted(set(subordinate_codes(code)) | {code})
+    return [code]
+
+
+def visible_codes_for(code):
+    """visible_employee_codes() for an employee code"""
+    if not code:
+        return []
+    key = shared_cache.make_key('org_visible', ('org',), _key(code))
+    cached = shared_cache.get(key)
+    if cached is not None:
+        return cached['codes']
+    codes = _visible_for(code)
+    shared_cache.put(key, {'codes': codes}, CACHE_TIMEOUT)
+    return codes
+
+
+def employee_code_for_user(user):
+    """Employee code of a logged-in user (see empreg/identity.py)"""
+    from . import identity
+
+    employee = identity.for_user(user)
+    return employee.employeeCode if employee else None
+
+
+def visible_employee_codes(user):
+    """
+    Sorted employee codes whose data `user` may see, or None for unrestricted
+    roles. A user without an employee profile sees nobody's ([]).
+    """
+    return visible_codes_for(employee_code_for_user(user))
@@ -0,0 +1,197 @@
+"""
+The logged-in user's employee, resolved once per request.
+
+Views used to find it with Employee.objects.filter(Q(user=...) | Q(employeeCode=
+username) | Q(phone1=username) | Q(phone2=username)), several times per request,
+with their own fixes for usernames like "EMP00040-1". Now:
+
+- employee_identifier holds every normalised code / phone / email per employee
+  (see normalize()), so the username (and the user's email) is one indexed IN
+  plus the Employee.user link.
+- The result (id, code, level, branch, branch_id, team ids...) is cached per
+  user for EMPLOYEE_IDENTITY_CACHE_SECONDS (default 60) in the shared cache
+  under the 'employee' and 'org' namespaces, and memoised on the user object
+  (per request in practice), so one request never resolves twice.
+- EmployeeIdentityMiddleware attaches it lazily as request.employee (falsy,
+  with every field None, when the user has no employee profile):
+
+    employee = request.employee
+    if employee:
+        queryset = queryset.filter(assign_to=employee.employeeCode)
+
+Employee post_save / post_delete keep the identifier rows in step; bulk writes
+call rebuild() (or `manage.py rebuild_employee_identifiers`).
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.functional import SimpleLazyObject
+
+from backend import shared_cache
+
+DEFAULT_CACHE_SECONDS = 60
+FIELDS = ('id', 'employeeCode', 'firstName', 'lastName', 'officialEmail', 'phone1', 'branch', 'level', 'status')
+
+
+def normalize(value):
+    """
+    Lookup key for a login identifier: case-folded, without '/', '_' or
+    spaces, and without the account suffix of "EMP00040-1" style usernames,
+    so "EMP00040-1", "emp00040" and "Emp/00040" share one key.
+    """
+    value = str(value or '').strip().casefold()
+    base = value.split('-')[0]
+    if base.startswith('emp') and base[3:].isdigit():
+        value = base
+    return value.replace('/', '').replace('_', '').replace(' ', '')
+
+
+def fallback_code(username):
+    """Employee code to assume for a username with no employee profile ("EMP00040-1" -> "Emp/00040")"""
+    base = str(username or '').split('-')[0]
+    if len(str(username or '')) >= 8 and base.upper().startswith('EMP') and base[3:].isdigit():
+        return f"Emp/{base[3:]}"
+    return username
+
+
+# -----------------------------
+# Identifier table
+# -----------------------------
+def _rows_for(employee):
+    from .models import EmployeeIdentifier
+
+    values = [('code', employee['employeeCode']), ('phone', employee['phone1']),
+              ('phone', employee['phone2']), ('email', employee['officialEmail'])]
+    keys = {}
+    for kind, value in values:
+        key = normalize(value)
+        if key:
+            keys.setdefault(key, kind)
+    return [EmployeeIdentifier(identifier=key, employee_id=employee['id'], kind=kind) for key, kind in keys.items()]
+
+
+def sync(employee_id):
+    """Rewrite one employee's identifier rows (none for soft-deleted or missing employees)"""
+    from .models import Employee, EmployeeIdentifier
+
+    employee = (
+        Employee.objects.filter(id=employee_id, del_state=0)
+        .values('id', 'employeeCode', 'phone1', 'phone2', 'officialEmail').first()
+    )
+    with transaction.atomic():
+        EmployeeIdentifier.objects.filter(employee_id=employee_id).delete()
+        if employee:
+            EmployeeIdentifier.objects.bulk_create(_rows_for(employee), ignore_conflicts=True)
+
+
+def rebuild():
+    """Recompute the whole identifier table; returns the number of rows written"""
+    from .models import Employee, EmployeeIdentifier
+
+    rows = []
+    for employee in Employee.objects.filter(del_state=0).values('id', 'employeeCode', 'phone1', 'phone2', 'officialEmail'):
+        rows.extend(_rows_for(employee))
+    with transaction.atomic():
+        EmployeeIdentifier.objects.all().delete()
+        EmployeeIdentifier.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return len(rows)
+
+
+# -----------------------------
+# Resolution
+# -----------------------------
+class EmployeeIdentity:
+    """The resolved employee; attribute names follow the Employee model. Empty (falsy) without data."""
+
+    def __init__(self, data=None):
+        data = data or {}
+        for name in FIELDS:
+            setattr(self, name, data.get(name))
+        self.branch_id = data.get('branch_id')
+        self.team_ids = list(data.get('team_ids') or [])
+
+    @property
+    def fullName(self):
+        if self.firstName and self.lastName:
+            return f"{self.firstName} {self.lastName}"
+        return self.firstName or self.lastName or 'Unknown Employee'
+
+    @property
+    def display_name(self):
+        """"FirstName(EMP/00040)", the form used on feedback entries"""
+        return f"{self.firstName}({self.employeeCode})"
+
+    def as_dict(self):
+        """Employee fields with '' for blanks plus fullName (events' employee-data shape)"""
+        data = {name: getattr(self, name) or '' for name in FIELDS}
+        data['id'] = self.id
+        data['fullName'] = self.fullName
+        return data
+
+    def __bool__(self):
+        return self.id is not None
+
+    def __repr__(self):
+        return f"<EmployeeIdentity {self.employeeCode or 'none'}>"
+
+
+def _pick(rows, user):
+    # The linked user wins, then codes in the canonical "Emp/XXXXX" shape, then the oldest row
+    return min(rows, key=lambda row: (row['user_id'] != user.id, '/' not in (row['employeeCode'] or ''), row['id']))
+
+
+def _lookup(user):
+    from . import hierarchy
+    from .models import Employee, EmployeeIdentifier, EmployeeOrgMembership
+
+    keys = {normalize(user.username), normalize(getattr(user, 'email', ''))} - {''}
+    matched = EmployeeIdentifier.objects.filter(identifier__in=keys).values('employee_id')
+    rows = list(
+        Employee.objects.filter(Q(user_id=user.id) | Q(id__in=matched), del_state=0)
+        .values('user_id', *FIELDS)[:10]
+    )
+    if not rows:
+        return None
+    data = _pick(rows, user)
+    hierarchy.ensure_built()
+    memberships = list(
+        EmployeeOrgMembership.objects.filter(employee_id=data['id'])
+        .order_by('team_id').values_list('branch_id', 'team_id', 'team_branch_id')
+    )
+    data['branch_id'] = next((branch_id for branch_id, _, _ in memberships if branch_id), None)
+    data['team_ids'] = [team_id for _, team_id, _ in memberships if team_id]
+    data.pop('user_id')
+    return data
+
+
+def for_user(user):
+    """EmployeeIdentity of a user, or None (anonymous user or no employee profile)"""
+    if not user or not user.is_authenticated:
+        return None
+    key = shared_cache.make_key('employee_identity', ('employee', 'org'), user.id, user.username)
+    # Memo on the user object, checked against the key: valid until an employee write bumps the version
+    memo = getattr(user, '_employee_identity', None)
+    if memo is not None and memo[0] == key:
+        return memo[1]
+
+    cached = shared_cache.get(key)
+    if cached is None:
+        cached = {'employee': _lookup(user)}
+        shared_cache.put(key, cached, getattr(settings, 'EMPLOYEE_IDENTITY_CACHE_SECONDS', DEFAULT_CACHE_SECONDS))
+    identity = EmployeeIdentity(cached['employee']) if cached['employee'] else None
+    user._employee_identity = (key, identity)
+    return identity
+
+
+class EmployeeIdentityMiddleware:
+    """
+    Sets request.employee, resolved on first use. DRF authenticates inside the
+    view and then sets request.user, so token-authenticated requests resolve too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.employee = SimpleLazyObject(lambda: for_user(getattr(request, 'user', None)) or EmployeeIdentity())
+        return self.get_response(request)
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from empreg import identity
+
+
+class Command(BaseCommand):
+    help = 'Rebuild employee_identifier (login lookups for request.employee) from Employee'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding employee identifiers...')
+        rows = identity.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} employee_identifier rows'))
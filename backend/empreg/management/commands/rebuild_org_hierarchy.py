@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from empreg import hierarchy
+
+
+class Command(BaseCommand):
+    help = 'Rebuild employee_hierarchy / employee_org_membership (role scoping) from Employee and Team'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding organisation hierarchy...')
+        pairs, memberships = hierarchy.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {pairs} employee_hierarchy rows and {memberships} employee_org_membership rows'
+        ))
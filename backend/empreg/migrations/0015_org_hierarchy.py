@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empreg', '0014_remove_employee_payslipfiles_employee_status_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor_code', models.CharField(max_length=50)),
+                ('descendant_code', models.CharField(max_length=50)),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('descendant_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'db_table': 'employee_hierarchy',
+                'indexes': [models.Index(fields=['descendant_code'], name='employee_hier_desc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor_code', 'descendant_code'), name='uniq_employee_hierarchy_pair')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EmployeeOrgMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_id', models.IntegerField()),
+                ('employee_code', models.CharField(max_length=50)),
+                ('level', models.CharField(blank=True, default='', max_length=50)),
+                ('branch_key', models.CharField(blank=True, default='', max_length=100)),
+                ('branch_id', models.IntegerField(default=0)),
+                ('team_id', models.IntegerField(default=0)),
+                ('team_branch_id', models.IntegerField(default=0)),
+                ('active', models.BooleanField(default=True)),
+            ],
+            options={
+                'db_table': 'employee_org_membership',
+                'indexes': [models.Index(fields=['branch_key', 'employee_code'], name='employee_org_branch_key_idx'), models.Index(fields=['branch_id', 'employee_code'], name='employee_org_branch_idx'), models.Index(fields=['team_id', 'employee_code'], name='employee_org_team_idx'), models.Index(fields=['team_branch_id', 'employee_code'], name='employee_org_team_branch_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee_code', 'team_id'), name='uniq_employee_org_membership')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:02
+
+from django.db import migrations, models
+
+
+def normalize(value):
+    # Same rules as empreg.identity.normalize (copied: migrations must not import app code)
+    value = str(value or '').strip().casefold()
+    base = value.split('-')[0]
+    if base.startswith('emp') and base[3:].isdigit():
+        value = base
+    return value.replace('/', '').replace('_', '').replace(' ', '')
+
+
+def fill_identifiers(apps, schema_editor):
+    """employee_identifier rows for every active employee's code, phones and official email"""
+    Employee = apps.get_model('empreg', 'Employee')
+    EmployeeIdentifier = apps.get_model('empreg', 'EmployeeIdentifier')
+
+    rows = []
+    employees = Employee.objects.filter(del_state=0).values('id', 'employeeCode', 'phone1', 'phone2', 'officialEmail')
+    for employee in employees.iterator():
+        keys = {}
+        for kind, field in [('code', 'employeeCode'), ('phone', 'phone1'), ('phone', 'phone2'), ('email', 'officialEmail')]:
+            key = normalize(employee[field])
+            if key:
+                keys.setdefault(key, kind)
+        rows.extend(EmployeeIdentifier(identifier=key, employee_id=employee['id'], kind=kind) for key, kind in keys.items())
+    EmployeeIdentifier.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empreg', '0015_org_hierarchy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeIdentifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.CharField(max_length=254)),
+                ('employee_id', models.IntegerField()),
+                ('kind', models.CharField(choices=[('code', 'Employee code'), ('phone', 'Phone'), ('email', 'Official email')], max_length=10)),
+            ],
+            options={
+                'db_table': 'employee_identifier',
+                'indexes': [models.Index(fields=['employee_id'], name='employee_identifier_emp_idx')],
+                'constraints': [models.UniqueConstraint(fields=('identifier', 'employee_id'), name='uniq_employee_identifier')],
+            },
+        ),
+        migrations.RunPython(fill_identifiers, migrations.RunPython.noop),
+    ]
@@ -85,4 +85,89 @@ class Employee(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class EmployeeHierarchy(models.Model):
+    """
+    Closure table of the reportingManager tree (employee_hierarchy): one row per
+    (ancestor, descendant) pair with the number of reporting levels between
+    them, including each employee's depth-0 row. Rebuilt by empreg/hierarchy.py.
+    """
+    ancestor_code = models.CharField(max_length=50)
+    descendant_code = models.CharField(max_length=50)
+    depth = models.PositiveSmallIntegerField()
+    descendant_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = 'employee_hierarchy'
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor_code', 'descendant_code'], name='uniq_employee_hierarchy_pair'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant_code'], name='employee_hier_desc_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_code} > {self.descendant_code} ({self.depth})"
+
+
+class EmployeeOrgMembership(models.Model):
+    """
+    Branch and team membership per employee (employee_org_membership): one row
+    per (employee, team), or a single row with team_id 0 for employees in no
+    team. Rebuilt with EmployeeHierarchy.
+    """
+    employee_id = models.IntegerField()
+    employee_code = models.CharField(max_length=50)
+    level = models.CharField(max_length=50, blank=True, default='')
+    # Employee.branch upper-cased ('' when unset) and the Branch it names (0 = none)
+    branch_key = models.CharField(max_length=100, blank=True, default='')
+    branch_id = models.IntegerField(default=0)
+    team_id = models.IntegerField(default=0)
+    team_branch_id = models.IntegerField(default=0)
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = 'employee_org_membership'
+        constraints = [
+            models.UniqueConstraint(fields=['employee_code', 'team_id'], name='uniq_employee_org_membership'),
+        ]
+        indexes = [
+            models.Index(fields=['branch_key', 'employee_code'], name='employee_org_branch_key_idx'),
+            models.Index(fields=['branch_id', 'employee_code'], name='employee_org_branch_idx'),
+            models.Index(fields=['team_id', 'employee_code'], name='employee_org_team_idx'),
+            models.Index(fields=['team_branch_id', 'employee_code'], name='employee_org_team_branch_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee_code} - {self.branch_key or 'no branch'} / team {self.team_id}"
+
+
+class EmployeeIdentifier(models.Model):
+    """
+    Normalised login identifiers per employee (employee_identifier): employee
+    code, phone numbers and official email, so a username resolves with one
+    indexed IN instead of an OR across Employee columns. Kept in step by
+    empreg/identity.py.
+    """
+    KIND_CHOICES = [
+        ('code', 'Employee code'),
+        ('phone', 'Phone'),
+        ('email', 'Official email'),
+    ]
+
+    identifier = models.CharField(max_length=254)
+    employee_id = models.IntegerField()
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+
+    class Meta:
+        db_table = 'employee_identifier'
+        constraints = [
+            models.UniqueConstraint(fields=['identifier', 'employee_id'], name='uniq_employee_identifier'),
+        ]
+        indexes = [
+            models.Index(fields=['employee_id'], name='employee_identifier_emp_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.identifier} -> {self.employee_id} ({self.kind})"
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from Masters.models import Team, Branch
+from backend import shared_cache
+
+from . import directory as employee_directory
+from . import hierarchy
+from . import identity
+from .models import Employee
+
+
+@receiver(post_save, sender=Employee, dispatch_uid='employee_directory_employee_saved')
+@receiver(post_delete, sender=Employee, dispatch_uid='employee_directory_employee_deleted')
+@receiver(post_save, sender=Team, dispatch_uid='employee_directory_team_saved')
+@receiver(post_delete, sender=Team, dispatch_uid='employee_directory_team_deleted')
+@receiver(m2m_changed, sender=Team.employees.through, dispatch_uid='employee_directory_team_members_changed')
+@receiver(post_save, sender=Branch, dispatch_uid='employee_directory_branch_saved')
+@receiver(post_delete, sender=Branch, dispatch_uid='employee_directory_branch_deleted')
+def invalidate_employee_directory(sender, **kwargs):
+    """Any change to employees, teams or branches invalidates the directory snapshot and cached employee data"""
+    employee_directory.invalidate()
+    shared_cache.bump_on_commit('employee')
+    # employee_hierarchy / employee_org_membership (bumps 'org' when rebuilt)
+    hierarchy.rebuild_on_commit()
+
+
+@receiver(post_save, sender=Employee, dispatch_uid='employee_identifier_employee_saved')
+@receiver(post_delete, sender=Employee, dispatch_uid='employee_identifier_employee_deleted')
+def sync_employee_identifiers(sender, instance, **kwargs):
+    """Keep employee_identifier (login lookups) in step with the employee's code, phones and email"""
+    identity.sync(instance.id)
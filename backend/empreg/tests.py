@@ -1,3 +1,245 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from Masters.models import Branch, Team
+
+from . import directory, hierarchy, identity
+from .models import Employee, EmployeeHierarchy, EmployeeIdentifier, EmployeeOrgMembership
+
+
+class OrgHierarchyTests(APITestCase):
+    """Role scoping reads employee_hierarchy / employee_org_membership instead of walking reportingManager"""
+
+    def setUp(self):
+        cache.clear()
+        rows = [
+            # code, first name, level, branch, reporting manager, status
+            ('EMP/00001', 'Chief', 'CEO', 'CHENNAI', '', 'Active'),
+            ('EMP/00002', 'Manager', 'L3', 'CHENNAI', 'EMP/00001', 'Active'),
+            ('EMP/00003', 'Lead', 'L2', 'CHN', 'Manager', 'Active'),  # by first name, branch code
+            ('EMP/00004', 'Exec', 'L1', 'CHENNAI', 'EMP/00003', 'Active'),
+            ('EMP/00005', 'Junior', 'L1', 'MADURAI', 'EMP/00004', 'Active'),
+            ('EMP/00006', 'Gone', 'L1', 'CHENNAI', 'EMP/00003', 'Inactive'),
+            ('EMP/00007', 'Floater', 'L1', None, '', 'Active'),
+            ('EMP/00008', 'Madurai', 'L3', 'MADURAI', '', 'Active'),
+        ]
+        # Saves rebuild the hierarchy once the (test) transaction's callbacks run
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chennai = Branch.objects.create(name='CHENNAI', branchcode='CHN')
+            Branch.objects.create(name='MADURAI', branchcode='MDU')
+            self.employees = {
+                code: Employee.objects.create(employeeCode=code, firstName=first, lastName='X',
+                                              phone1=f'90000{code[-5:]}', level=level, branch=branch,
+                                              reportingManager=manager, status=status)
+                for code, first, level, branch, manager, status in rows
+            }
+            self.team = Team.objects.create(name='Hunters', branch=self.chennai)
+            self.team.employees.add(self.employees['EMP/00005'])
+
+    def _login(self, code):
+        user = User.objects.create_user(username=code, password='x')
+        Employee.objects.filter(employeeCode=code).update(user=user)
+        self.client.force_authenticate(user)
+        return user
+
+    def test_closure_depths(self):
+        depths = dict(EmployeeHierarchy.objects.filter(ancestor_code='EMP/00002').values_list('descendant_code', 'depth'))
+        self.assertEqual(depths, {'EMP/00002': 0, 'EMP/00003': 1, 'EMP/00004': 2, 'EMP/00006': 2, 'EMP/00005': 3})
+        self.assertEqual(hierarchy.subordinate_codes('EMP/00003'), ['EMP/00004', 'EMP/00005'])
+        self.assertEqual(hierarchy.subordinate_codes('EMP/00003', active_only=False, max_depth=1),
+                         ['EMP/00004', 'EMP/00006'])
+
+    def test_reporting_cycle_terminates(self):
+        Employee.objects.filter(employeeCode='EMP/00001').update(reportingManager='EMP/00005')
+        hierarchy.rebuild()
+        self.assertEqual(EmployeeHierarchy.objects.filter(ancestor_code='EMP/00004', descendant_code='EMP/00004').count(), 1)
+        self.assertIn('EMP/00002', hierarchy.subordinate_codes('EMP/00004'))
+
+    def test_branch_and_team_members(self):
+        chennai = ['EMP/00001', 'EMP/00002', 'EMP/00003', 'EMP/00004']
+        self.assertEqual(hierarchy.branch_employee_codes('chennai'), chennai)
+        self.assertEqual(hierarchy.branch_employee_codes(self.chennai.id), chennai)
+        self.assertEqual(hierarchy.branch_employee_codes(self.chennai.id, with_team_branches=True), chennai + ['EMP/00005'])
+        self.assertEqual(hierarchy.branch_employee_codes('madurai', with_unassigned=True),
+                         ['EMP/00005', 'EMP/00007', 'EMP/00008'])
+        self.assertEqual(hierarchy.team_employee_codes(self.team.id), ['EMP/00005'])
+        self.assertEqual(hierarchy.team_employee_codes(None, 'hunters'), ['EMP/00005'])
+
+    @override_settings(ORG_UNASSIGNED_BRANCHES=['CHENNAI'])
+    def test_visibility_by_level(self):
+        self.assertIsNone(hierarchy.visible_codes_for('EMP/00001'))
+        # BM: branch (plus unassigned, per setting) and reporting tree across branches
+        self.assertEqual(hierarchy.visible_codes_for('EMP/00002'),
+                         ['EMP/00001', 'EMP/00002', 'EMP/00003', 'EMP/00004', 'EMP/00005', 'EMP/00007'])
+        self.assertEqual(hierarchy.visible_codes_for('EMP/00003'), ['EMP/00003', 'EMP/00004', 'EMP/00005'])
+        self.assertEqual(hierarchy.visible_codes_for('EMP/00004'), ['EMP/00004'])
+        self.assertEqual(hierarchy.visible_codes_for('EMP/99999'), ['EMP/99999'])
+        self.assertEqual(hierarchy.visible_employee_codes(self._login('EMP/00003')), ['EMP/00003', 'EMP/00004', 'EMP/00005'])
+
+    def test_employee_changes_invalidate_cached_scope(self):
+        self.assertEqual(hierarchy.visible_codes_for('EMP/00004'), ['EMP/00004'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Employee.objects.create(employeeCode='EMP/00009', firstName='New', lastName='X', phone1='9000000009',
+                                    level='L1', branch='CHENNAI', reportingManager='EMP/00004', status='Active')
+            Employee.objects.filter(employeeCode='EMP/00004').update(level='L2')
+            self.employees['EMP/00004'].save(update_fields=['firstName'])
+        self.assertEqual(hierarchy.visible_codes_for('EMP/00004'), ['EMP/00004', 'EMP/00005', 'EMP/00009'])
+        self.assertTrue(EmployeeOrgMembership.objects.filter(employee_code='EMP/00009', branch_id=self.chennai.id).exists())
+
+    def test_branch_employees_endpoint(self):
+        self._login('EMP/00002')
+        response = self.client.get('/api/candidates/branch-employees/')
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        self.assertEqual([emp['employeeCode'] for emp in response.data['all_employees']],
+                         ['EMP/00001', 'EMP/00004', 'EMP/00003', 'EMP/00002'])
+        self.assertEqual([tl['employeeCode'] for tl in response.data['team_leaders']], ['EMP/00003'])
+
+    def test_rebuild_command(self):
+        EmployeeHierarchy.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_org_hierarchy', stdout=out)
+        self.assertIn('21 employee_hierarchy rows and 8 employee_org_membership rows', out.getvalue())
+
+
+class EmployeeIdentityTests(APITestCase):
+    """request.employee is resolved once per request from employee_identifier"""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.team = Team.objects.create(name='Closers')
+            self.employee = Employee.objects.create(employeeCode='EMP/00040', firstName='Kavya', lastName='R',
+                                                    phone1='98400 12345', officialEmail='Kavya@Example.com',
+                                                    branch='CHENNAI', level='L2', status='Active')
+            self.team.employees.add(self.employee)
+
+    def _user(self, username, **extra):
+        user = User.objects.create_user(username=username, password='x', **extra)
+        self.client.force_authenticate(user)
+        return user
+
+    def test_normalized_identifiers(self):
+        self.assertEqual(identity.normalize('EMP00040-1'), identity.normalize('Emp/00040'))
+        self.assertEqual(identity.fallback_code('EMP00040-1'), 'Emp/00040')
+        self.assertEqual(identity.fallback_code('9840012345'), '9840012345')
+        self.assertEqual(set(EmployeeIdentifier.objects.filter(employee_id=self.employee.id).values_list('identifier', 'kind')),
+                         {('emp00040', 'code'), ('9840012345', 'phone'), ('kavya@example.com', 'email')})
+
+        for username, extra in [('EMP00040-1', {}), ('9840012345', {}), ('someone', {'email': 'kavya@example.com'})]:
+            employee = identity.for_user(User.objects.create_user(username=username, password='x', **extra))
+            self.assertEqual((employee.employeeCode, employee.team_ids), ('EMP/00040', [self.team.id]))
+        self.assertIsNone(identity.for_user(User.objects.create_user(username='stranger', password='x')))
+
+    def test_linked_user_and_canonical_code_win(self):
+        twin = Employee.objects.create(employeeCode='EMP00040-1', firstName='Twin', lastName='R',
+                                phone1='9840054321', level='L1')
+        user = User.objects.create_user(username='EMP00040-1', password='x')
+        self.assertEqual(identity.for_user(user).employeeCode, 'EMP/00040')
+
+        Employee.objects.filter(id=twin.id).update(user=user)
+        cache.clear()
+        user = User.objects.get(id=user.id)
+        self.assertEqual(identity.for_user(user).employeeCode, 'EMP00040-1')
+
+    def test_resolved_once_and_cached(self):
+        user = self._user('EMP00040-1')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(identity.for_user(user).display_name, 'Kavya(EMP/00040)')
+        self.assertEqual(len(queries), 2)
+        with CaptureQueriesContext(connection) as queries:
+            identity.for_user(user)
+            identity.for_user(User.objects.get(id=user.id))
+        self.assertEqual(len(queries), 1)  # only the User fetch
+
+        response = self.client.get('/api/candidates/profile-in/')
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+
+    def test_employee_changes_refresh_identity(self):
+        user = self._user('9840012345')
+        self.assertEqual(identity.for_user(user).level, 'L2')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.level = 'L3'
+            self.employee.phone1 = '9840099999'
+            self.employee.save()
+        self.assertIsNone(identity.for_user(user))
+        self.assertEqual(identity.for_user(User.objects.create_user(username='9840099999', password='x')).level, 'L3')
+
+    def test_rebuild_command(self):
+        EmployeeIdentifier.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_employee_identifiers', stdout=out)
+        self.assertIn('Wrote 3 employee_identifier rows', out.getvalue())
+
+
+class EmployeeDirectoryTests(APITestCase):
+    """empreg.directory answers code lookups from an in-process snapshot"""
+
+    def setUp(self):
+        self.branch = Branch.objects.create(name='CHENNAI', branchcode='CHN')
+        self.ravi = Employee.objects.create(employeeCode='EMP/00101', firstName='Ravi', lastName='Kumar',
+                                            phone1='9100000101', branch='CHENNAI', level='L1')
+        self.gone = Employee.objects.create(employeeCode='EMP/00102', firstName='Gone', lastName='',
+                                            phone1='9100000102', branch='CHN', level='L1', del_state=1)
+        self.team = Team.objects.create(name='Closers', branch=self.branch)
+        self.team.employees.add(self.ravi)
+        directory.invalidate()
+
+    def test_resolve_and_get(self):
+        people = directory.resolve(['emp/00101', 'EMP/00102', 'EMP/99999', None])
+        self.assertEqual(list(people), ['emp/00101'])  # keyed as passed; soft-deleted and unknown left out
+        self.assertEqual(people['emp/00101']['fullName'], 'Ravi Kumar')
+        self.assertEqual((people['emp/00101']['team_id'], people['emp/00101']['branch_id']), (self.team.id, self.branch.id))
+        self.assertEqual(directory.get('EMP/00102', include_deleted=True)['branch_id'], self.branch.id)
+        self.assertEqual(directory.get_by_id(self.ravi.id)['employeeCode'], 'EMP/00101')
+        self.assertIsNone(directory.get_by_id('x'))
+
+    def test_find_and_display_name(self):
+        for typed in ('EMP00101', 'emp_00101', ' Emp/00101 '):
+            self.assertEqual(directory.find(typed)['id'], self.ravi.id)
+        self.assertIsNone(directory.find('00101'))
+        self.assertEqual(directory.find('00101', partial=True)['id'], self.ravi.id)
+        self.assertIsNone(directory.find('00102', partial=True))  # soft-deleted
+
+        self.assertEqual(directory.display_name('EMP/00101'), 'Ravi Kumar')
+        self.assertEqual(directory.display_name('EMP/99999'), 'EMP/99999')
+        self.assertEqual(directory.display_name('EMP/99999', default='-'), '-')
+        self.assertEqual(directory.display_name('EMP/00102', include_deleted=True), 'Gone')
+        self.assertIsNone(directory.display_name(''))
+
+    def test_signals_invalidate_the_snapshot(self):
+        self.assertEqual(directory.display_name('EMP/00101'), 'Ravi Kumar')
+        self.ravi.lastName = 'K'
+        self.ravi.save()
+        self.assertEqual(directory.display_name('EMP/00101'), 'Ravi K')
+
+        other = Team.objects.create(name='Aces', branch=self.branch)
+        self.team.employees.remove(self.ravi)
+        other.employees.add(self.ravi)
+        self.assertEqual(directory.get('EMP/00101')['team'], 'Aces')
+
+        self.assertEqual(directory.get('EMP/00102', include_deleted=True)['branch_id'], self.branch.id)
+        self.branch.branchcode = 'CH1'
+        self.branch.save()
+        self.assertIsNone(directory.get('EMP/00102', include_deleted=True)['branch_id'])
+
+    def test_lookups_cost_a_fixed_number_of_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            directory.resolve(['EMP/00101'])
+        for number in range(200, 230):
+            Employee.objects.create(employeeCode=f'EMP/00{number}', firstName='Bulk', lastName=str(number),
+                                    phone1=f'91000{number:05d}', branch='CHENNAI', level='L1')
+        with CaptureQueriesContext(connection) as large:
+            people = directory.resolve([f'EMP/00{number}' for number in range(200, 230)])
+        self.assertEqual(len(people), 30)
+        self.assertEqual(len(large), len(small))
+        with CaptureQueriesContext(connection) as warm:
+            directory.resolve(['EMP/00101', 'EMP/00215'])
+            directory.find('00101', partial=True)
+        self.assertEqual(len(warm), 0)
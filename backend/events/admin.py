@@ -10,4 +10,8 @@ class CallDetailsAdmin(admin.ModelAdmin):
     ]
     list_filter = ['tb_call_status', 'tb_call_add_date', 'tb_call_plan_data']
     search_fields = ['tb_call_description', 'tb_call_channel', 'employee_name', 'client_name']
-    readonly_fields = ['tb_call_add_date', 'tb_call_up_date']
+    # tb_calls_* mirror call_detail_candidate (events/candidate_links.py)
+    readonly_fields = [
+        'tb_call_add_date', 'tb_call_up_date',
+        'tb_calls_onplan', 'tb_calls_onothers', 'tb_calls_profiles', 'tb_calls_profilesothers'
+    ]
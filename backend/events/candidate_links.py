@@ -0,0 +1,130 @@
+"""
+Candidates counted against call plans (call_detail_candidate).
+
+CallDetails.tb_calls_onplan / onothers / profiles / profilesothers used to be
+the only record: comma-joined candidate IDs, rewritten with a read-modify-write
+on every ClientJob save, so concurrent saves lost IDs and every count meant
+parsing the string. Each (call_detail, candidate, kind) is now one row with a
+unique constraint:
+
+    candidate_links.add(call_detail_id, candidate_id, 'onplan')     # insert-ignore
+    candidate_links.remove(call_detail_id, candidate_id)
+    candidate_links.totals(CallDetails.objects.filter(tb_call_plan_id=7))   # GROUP BY kind
+
+The tb_calls_* columns stay as a compatibility view for the calendar screens and
+old scripts: after each change they are rewritten from the rows (under a lock on
+the CallDetails row), never edited in place.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+KINDS = ('onplan', 'onothers', 'profiles', 'profilesothers')
+LEGACY_FIELDS = {kind: f'tb_calls_{kind}' for kind in KINDS}
+COUNT_ANNOTATIONS = {kind: f'linked_{kind}_count' for kind in KINDS}
+
+
+def parse_ids(text):
+    """Candidate IDs in a legacy comma-joined value, in order, without '0' placeholders or repeats"""
+    ids = []
+    for part in str(text or '').split(','):
+        part = part.strip()
+        if part.isdigit() and int(part) and int(part) not in ids:
+            ids.append(int(part))
+    return ids
+
+
+def _check_kinds(kinds):
+    unknown = [kind for kind in kinds if kind not in KINDS]
+    if unknown:
+        raise ValueError(f"Unknown call statistic kind(s): {', '.join(unknown)}")
+
+
+# -----------------------------
+# Writes
+# -----------------------------
+def _lock(call_detail_id):
+    """Lock the CallDetails row for the legacy rewrite; False when it does not exist"""
+    from .models import CallDetails
+
+    return bool(list(CallDetails.objects.select_for_update().filter(id=call_detail_id).values_list('id', flat=True)))
+
+
+def refresh_legacy(call_detail_id):
+    """Rewrite the tb_calls_* columns of one CallDetails from its rows"""
+    from .models import CallDetails
+
+    ids = ids_by_kind(call_detail_id)
+    values = {LEGACY_FIELDS[kind]: ','.join(str(candidate_id) for candidate_id in ids[kind]) for kind in KINDS}
+    CallDetails.objects.filter(id=call_detail_id).update(tb_call_up_date=timezone.now(), **values)
+    return values
+
+
+def add(call_detail_id, candidate_id, kind):
+    """Count candidate_id under kind for the call detail (no-op if already counted); False if it does not exist"""
+    from .models import CallDetailCandidate
+
+    _check_kinds([kind])
+    with transaction.atomic():
+        if not _lock(call_detail_id):
+            return False
+        CallDetailCandidate.objects.bulk_create(
+            [CallDetailCandidate(call_detail_id=call_detail_id, candidate_id=int(candidate_id), kind=kind)],
+            ignore_conflicts=True,
+        )
+        refresh_legacy(call_detail_id)
+    return True
+
+
+def remove(call_detail_id, candidate_id, kinds=KINDS):
+    """Stop counting candidate_id under kinds; returns the number of rows removed"""
+    from .models import CallDetailCandidate
+
+    _check_kinds(kinds)
+    with transaction.atomic():
+        if not _lock(call_detail_id):
+            return 0
+        removed, _ = CallDetailCandidate.objects.filter(
+            call_detail_id=call_detail_id, candidate_id=int(candidate_id), kind__in=kinds,
+        ).delete()
+        if removed:
+            refresh_legacy(call_detail_id)
+    return removed
+
+
+# -----------------------------
+# Reads
+# -----------------------------
+def ids_by_kind(call_detail_id):
+    """{kind: [candidate ids]} for one call detail, one query"""
+    from .models import CallDetailCandidate
+
+    ids = {kind: [] for kind in KINDS}
+    rows = CallDetailCandidate.objects.filter(call_detail_id=call_detail_id).order_by('id')
+    for kind, candidate_id in rows.values_list('kind', 'candidate_id'):
+        ids[kind].append(candidate_id)
+    return ids
+
+
+def totals(call_details):
+    """{kind: candidates} over a CallDetails queryset, one GROUP BY kind query"""
+    from .models import CallDetailCandidate
+
+    counts = {kind: 0 for kind in KINDS}
+    rows = (
+        CallDetailCandidate.objects.filter(call_detail__in=call_details.order_by().values('id'))
+        .values('kind')
+        .annotate(candidates=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        counts[row['kind']] = row['candidates']
+    return counts
+
+
+def with_counts(queryset):
+    """Annotate linked_<kind>_count on a CallDetails queryset (one join, grouped per call detail)"""
+    return queryset.annotate(**{
+        COUNT_ANNOTATIONS[kind]: Count('candidate_links', filter=Q(candidate_links__kind=kind))
+        for kind in KINDS
+    })
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+KINDS = ('onplan', 'onothers', 'profiles', 'profilesothers')
+
+
+def parse_ids(text):
+    # Same rules as events.candidate_links.parse_ids (copied: migrations must not import app code)
+    ids = []
+    for part in str(text or '').split(','):
+        part = part.strip()
+        if part.isdigit() and int(part) and int(part) not in ids:
+            ids.append(int(part))
+    return ids
+
+
+def explode_candidate_ids(apps, schema_editor):
+    """One call_detail_candidate row per ID in tb_calls_*; the columns are normalized to match"""
+    CallDetails = apps.get_model('events', 'CallDetails')
+    CallDetailCandidate = apps.get_model('events', 'CallDetailCandidate')
+    fields = [f'tb_calls_{kind}' for kind in KINDS]
+
+    last_id = 0
+    while True:
+        batch = list(CallDetails.objects.filter(id__gt=last_id).order_by('id').values('id', *fields)[:1000])
+        if not batch:
+            break
+        last_id = batch[-1]['id']
+        rows = []
+        for values in batch:
+            normalized = {}
+            for kind, field in zip(KINDS, fields):
+                ids = parse_ids(values[field])
+                rows.extend(CallDetailCandidate(call_detail_id=values['id'], candidate_id=candidate_id, kind=kind)
+                            for candidate_id in ids)
+                joined = ','.join(str(candidate_id) for candidate_id in ids)
+                if (values[field] or '') != joined:
+                    normalized[field] = joined
+            if normalized:
+                # Drop '0' placeholders and repeated IDs so the columns read the same as the rows
+                CallDetails.objects.filter(id=values['id']).update(**normalized)
+        CallDetailCandidate.objects.bulk_create(rows, ignore_conflicts=True, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CallDetailCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('candidate_id', models.IntegerField()),
+                ('kind', models.CharField(choices=[('onplan', 'Calls on plan'), ('onothers', 'Calls on others'), ('profiles', 'Profiles on plan'), ('profilesothers', 'Profiles on others')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('call_detail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidate_links', to='events.calldetails')),
+            ],
+            options={
+                'verbose_name': 'Call Detail Candidate',
+                'verbose_name_plural': 'Call Detail Candidates',
+                'db_table': 'call_detail_candidate',
+                'indexes': [models.Index(fields=['call_detail', 'kind'], name='call_detail_cand_kind_idx'), models.Index(fields=['candidate_id'], name='call_detail_cand_cand_idx')],
+                'constraints': [models.UniqueConstraint(fields=('call_detail', 'candidate_id', 'kind'), name='uniq_call_detail_candidate_kind')],
+            },
+        ),
+        # Reverse keeps the tb_calls_* columns, which still hold every ID
+        migrations.RunPython(explode_candidate_ids, reverse_code=migrations.RunPython.noop),
+    ]
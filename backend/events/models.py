@@ -27,7 +27,8 @@ class CallDetails(models.Model):
     tb_call_startdate = models.DateTimeField()
     tb_call_todate = models.DateTimeField()
     
-    # Call outcome fields - store comma-separated candidate IDs
+    # Call outcome fields - comma-separated candidate IDs, kept as a read-only
+    # mirror of call_detail_candidate (see events/candidate_links.py)
     tb_calls_onplan = models.TextField(null=True, blank=True)
     tb_calls_onothers = models.TextField(null=True, blank=True)
     tb_calls_profiles = models.TextField(null=True, blank=True)
@@ -137,3 +138,38 @@ class CallDetails(models.Model):
         except Exception:
             # Fallback: encode as ASCII, ignoring errors
             return str(text).encode('ascii', errors='ignore').decode('ascii')
+
+
+class CallDetailCandidate(models.Model):
+    """
+    One candidate counted against a call plan, per statistic (call_detail_candidate).
+    Source of truth for the tb_calls_* columns of CallDetails.
+    """
+    KIND_CHOICES = [
+        ('onplan', 'Calls on plan'),
+        ('onothers', 'Calls on others'),
+        ('profiles', 'Profiles on plan'),
+        ('profilesothers', 'Profiles on others'),
+    ]
+
+    call_detail = models.ForeignKey(CallDetails, on_delete=models.CASCADE, related_name='candidate_links')
+    # Candidate reference (no foreign key, like the other tb_call_* ids)
+    candidate_id = models.IntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'call_detail_candidate'
+        verbose_name = 'Call Detail Candidate'
+        verbose_name_plural = 'Call Detail Candidates'
+        constraints = [
+            models.UniqueConstraint(fields=['call_detail', 'candidate_id', 'kind'],
+                                    name='uniq_call_detail_candidate_kind'),
+        ]
+        indexes = [
+            models.Index(fields=['call_detail', 'kind'], name='call_detail_cand_kind_idx'),
+            models.Index(fields=['candidate_id'], name='call_detail_cand_cand_idx'),
+        ]
+
+    def __str__(self):
+        return f"Call Detail {self.call_detail_id} - {self.kind} - Candidate {self.candidate_id}"
@@ -131,25 +131,29 @@ class CallDetailsNameResolutionMixin:
         return self.get_source_name(obj)
     
     # Call statistics count methods
+    def _linked_count(self, obj, kind):
+        """linked_<kind>_count annotation (GROUP BY on call_detail_candidate), else the tb_calls_<kind> view"""
+        from . import candidate_links
+        count = getattr(obj, candidate_links.COUNT_ANNOTATIONS[kind], None)
+        if count is not None:
+            return count
+        return len(candidate_links.parse_ids(getattr(obj, candidate_links.LEGACY_FIELDS[kind])))
+    
     def get_tb_calls_onplan_count(self, obj):
         """Get count of candidates in tb_calls_onplan"""
-        from .views import get_candidate_count
-        return get_candidate_count(obj.tb_calls_onplan)
+        return self._linked_count(obj, 'onplan')
     
     def get_tb_calls_onothers_count(self, obj):
         """Get count of candidates in tb_calls_onothers"""
-        from .views import get_candidate_count
-        return get_candidate_count(obj.tb_calls_onothers)
+        return self._linked_count(obj, 'onothers')
     
     def get_tb_calls_profiles_count(self, obj):
         """Get count of candidates in tb_calls_profiles"""
-        from .views import get_candidate_count
-        return get_candidate_count(obj.tb_calls_profiles)
+        return self._linked_count(obj, 'profiles')
     
     def get_tb_calls_profilesothers_count(self, obj):
         """Get count of candidates in tb_calls_profilesothers"""
-        from .views import get_candidate_count
-        return get_candidate_count(obj.tb_calls_profilesothers)
+        return self._linked_count(obj, 'profilesothers')
 
 
 class CallDetailsSerializer(CallDetailsNameResolutionMixin, serializers.ModelSerializer):
@@ -235,7 +239,9 @@ class CallDetailsSerializer(CallDetailsNameResolutionMixin, serializers.ModelSer
         ]
         read_only_fields = [
             'tb_call_add_date', 'tb_call_up_date', 'is_active', 'call_duration',
-            'status_display', 'call_plan_info'
+            'status_display', 'call_plan_info',
+            # Compatibility view of call_detail_candidate, written by events/candidate_links.py only
+            'tb_calls_onplan', 'tb_calls_onothers', 'tb_calls_profiles', 'tb_calls_profilesothers'
         ]
     
     def validate(self, data):
@@ -1,6 +1,5 @@
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
-from django.utils import timezone
 from .models import CallDetails
 from candidate.models import Candidate, ClientJob
 from .views import update_call_statistics
@@ -120,28 +119,13 @@ def remove_candidate_from_call_details(sender, instance, **kwargs):
             return
         
         # Remove candidate ID from all relevant fields
-        from .views import remove_candidate_from_list
+        from . import candidate_links
         
-        fields_to_check = ['tb_calls_onplan', 'tb_calls_onothers']
-        
-        # Always check onplan and onothers
-        for field in fields_to_check:
-            current_value = getattr(call_detail, field)
-            if current_value and str(instance.candidate.id) in current_value:
-                updated_value = remove_candidate_from_list(current_value, instance.candidate.id)
-                setattr(call_detail, field, updated_value)
-        
-        # Check profiles fields only if profile_submission was 1 (Yes)
+        # Always check onplan and onothers; profiles only if profile_submission was 1 (Yes)
+        kinds = ['onplan', 'onothers']
         if instance.profile_submission == 1:
-            profile_fields = ['tb_calls_profiles', 'tb_calls_profilesothers']
-            for field in profile_fields:
-                current_value = getattr(call_detail, field)
-                if current_value and str(instance.candidate.id) in current_value:
-                    updated_value = remove_candidate_from_list(current_value, instance.candidate.id)
-                    setattr(call_detail, field, updated_value)
-        
-        call_detail.tb_call_up_date = timezone.now()
-        call_detail.save()
+            kinds += ['profiles', 'profilesothers']
+        candidate_links.remove(call_detail.id, instance.candidate.id, kinds)
             
     except Exception as e:
         import traceback
@@ -0,0 +1,137 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from empreg.models import Employee
+
+from . import candidate_links
+from .models import CallDetails, CallDetailCandidate
+from .views import get_call_statistics, get_filtered_employees_by_role, store_candidate_id
+
+
+class CallDetailCandidateTests(APITestCase):
+    """Call statistics live in call_detail_candidate; tb_calls_* is a mirror of it"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='events-admin', password='x')
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        self.plan, self.other = [
+            CallDetails.objects.create(tb_call_plan_id=7, tb_call_emp_id=emp_id, tb_call_startdate=now,
+                                       tb_call_todate=now + timezone.timedelta(hours=1))
+            for emp_id in (11, 12)
+        ]
+
+    def _legacy(self, call_detail):
+        call_detail.refresh_from_db()
+        return [getattr(call_detail, candidate_links.LEGACY_FIELDS[kind]) for kind in candidate_links.KINDS]
+
+    def test_insert_ignore_and_legacy_view(self):
+        for candidate_id, kind in [(5, 'onplan'), (9, 'onplan'), (5, 'onplan'), (5, 'profiles'), (3, 'onothers')]:
+            self.assertTrue(store_candidate_id(self.plan.id, candidate_id, kind))
+        self.assertFalse(store_candidate_id(self.plan.id, 5, 'bogus'))
+        self.assertFalse(store_candidate_id(999999, 5, 'onplan'))
+
+        self.assertEqual(CallDetailCandidate.objects.filter(call_detail=self.plan).count(), 4)
+        self.assertEqual(self._legacy(self.plan), ['5,9', '3', '5', ''])
+
+        self.assertEqual(candidate_links.remove(self.plan.id, 5, ['onplan', 'onothers']), 1)
+        self.assertEqual(self._legacy(self.plan), ['9', '3', '5', ''])
+
+        # The serializer no longer writes the mirror columns
+        response = self.client.patch(f'/api/call-details/{self.plan.id}/', {'tb_calls_onplan': '1,2,3'}, format='json')
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        self.assertEqual((response.data['tb_calls_onplan'], response.data['tb_calls_onplan_count']), ('9', 1))
+        self.assertEqual(self._legacy(self.plan)[0], '9')
+
+    def test_statistics_group_by(self):
+        store_candidate_id(self.plan.id, 5, 'onplan')
+        store_candidate_id(self.plan.id, 6, 'onplan')
+        store_candidate_id(self.plan.id, 6, 'profiles')
+        store_candidate_id(self.other.id, 5, 'onothers')
+
+        stats = get_call_statistics(call_detail_id=self.plan.id)
+        self.assertEqual((stats['tb_calls_onplan_count'], stats['tb_calls_onplan_ids']), (2, [5, 6]))
+        self.assertEqual(stats['tb_calls_profiles_ids'], [6])
+
+        with CaptureQueriesContext(connection) as queries:
+            totals = get_call_statistics(plan_id=7)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(totals, {'total_calls_on_plan': 2, 'total_calls_on_others': 1,
+                                  'total_profiles_on_plan': 1, 'total_profiles_on_others': 0})
+        self.assertEqual(get_call_statistics(candidate_id=12)['total_calls_on_others'], 1)
+
+        response = self.client.get(f'/api/call-details/{self.plan.id}/')
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', None))
+        self.assertEqual((response.data['tb_calls_onplan_count'], response.data['tb_calls_profiles_count']), (2, 1))
+
+    def test_migration_explodes_strings(self):
+        migration = import_module('events.migrations.0002_call_detail_candidate')
+        CallDetails.objects.filter(id=self.plan.id).update(
+            tb_calls_onplan='5, 0,7,5', tb_calls_onothers='0', tb_calls_profiles=None, tb_calls_profilesothers='8',
+        )
+        migration.explode_candidate_ids(apps, None)
+
+        self.assertEqual(candidate_links.ids_by_kind(self.plan.id),
+                         {'onplan': [5, 7], 'onothers': [], 'profiles': [], 'profilesothers': [8]})
+        self.assertEqual(self._legacy(self.plan), ['5,7', '', None, '8'])
+        # Running it again inserts nothing new
+        migration.explode_candidate_ids(apps, None)
+        self.assertEqual(CallDetailCandidate.objects.count(), 3)
+
+
+class RoleFilterTests(APITestCase):
+    """get_filtered_employees_by_role keeps its per-level rules; only direct reports come from the closure table"""
+
+    def setUp(self):
+        rows = [
+            # code, first name, level, branch, reporting manager, status
+            ('EMP/10001', 'Chief', 'CEO', 'CHENNAI', '', 'Active'),
+            ('EMP/10002', 'Boss', 'L3', 'CHENNAI', 'EMP/10001', 'Active'),
+            ('EMP/10003', 'Lead', 'L2', 'CHENNAI', 'Boss', 'Active'),  # by first name
+            ('EMP/10004', 'Exec', 'L1', 'CHENNAI', 'EMP/10003', 'Active'),
+            ('EMP/10005', 'Deep', 'L1', 'PUNE', 'EMP/10004', 'Active'),  # Lead's tree, not a direct report
+            ('EMP/10006', 'Remote', 'L1', 'PUNE', 'Lead', 'Active'),
+            ('EMP/10007', 'Floater', 'L1', None, '', 'Active'),
+            ('EMP/10008', 'Gone', 'L1', 'CHENNAI', 'EMP/10003', 'Inactive'),
+            ('EMP/10009', 'Exec', 'L1', 'PUNE', '', 'Active'),  # shares a first name with EMP/10004
+            ('EMP/10010', 'Branchy', 'bm', 'PUNE', '', 'Active'),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for code, first, level, branch, manager, status in rows:
+                Employee.objects.create(employeeCode=code, firstName=first, lastName='X', phone1=f'91000{code[-5:]}',
+                                        level=level, branch=branch, reportingManager=manager, status=status)
+        self.everyone = [f'EMP/1000{n}' for n in (1, 2, 3, 4, 5, 6, 7, 9)] + ['EMP/10010']
+
+    def _visible(self, code, **overrides):
+        employee = Employee.objects.get(employeeCode=code)
+        data = {'employeeCode': code, 'firstName': employee.firstName, 'branch': employee.branch or '',
+                'level': employee.level or ''}
+        data.update(overrides)
+        return sorted(get_filtered_employees_by_role(data).values_list('employeeCode', flat=True))
+
+    def test_each_level_sees_what_it_did_before(self):
+        chennai_or_unassigned = ['EMP/10001', 'EMP/10002', 'EMP/10003', 'EMP/10004', 'EMP/10007']
+        # L1: themselves and anyone sharing their first name
+        self.assertEqual(self._visible('EMP/10004'), ['EMP/10004', 'EMP/10009'])
+        # L2: themselves plus active direct reports, limited to the branch for the three home branches
+        self.assertEqual(self._visible('EMP/10003'), ['EMP/10003', 'EMP/10004'])
+        self.assertEqual(self._visible('EMP/10003', branch='PUNE'), ['EMP/10003', 'EMP/10004', 'EMP/10006'])
+        # L3: their branch (and employees without one), or just themselves without a branch
+        self.assertEqual(self._visible('EMP/10002'), chennai_or_unassigned)
+        self.assertEqual(self._visible('EMP/10002', branch=''), ['EMP/10002'])
+        # bm and the unrestricted levels: everyone
+        self.assertEqual(self._visible('EMP/10010'), self.everyone)
+        self.assertEqual(self._visible('EMP/10001'), self.everyone)
+        # tl, blank and unknown levels: their branch when set, otherwise everyone
+        self.assertEqual(self._visible('EMP/10003', level='tl', branch='PUNE'),
+                         ['EMP/10005', 'EMP/10006', 'EMP/10007', 'EMP/10009', 'EMP/10010'])
+        self.assertEqual(self._visible('EMP/10003', level='tl', branch=''), self.everyone)
+        self.assertEqual(self._visible('EMP/10003', level=''), chennai_or_unassigned)
+        self.assertEqual(self._visible('EMP/10003', level='intern', branch=''), self.everyone)
+        self.assertEqual(list(get_filtered_employees_by_role(None)), [])
@@ -6,12 +6,16 @@ from django.db.models import Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 import calendar
+from . import candidate_links
 from .models import CallDetails
 from .serializers import (
     CallDetailsSerializer,
     CallDetailsListSerializer
 )
 from empreg.models import Employee
+from empreg import directory as employee_directory
+from empreg import hierarchy as org_hierarchy
+from empreg import identity as employee_identity
 from vendor.models import Vendor
 from Masters.models import Source, Branch
 from locations.models import State, City, Country
@@ -49,24 +53,23 @@ class DatabaseQueryHelper:
             return None
         
         try:
-            employee = Employee.objects.filter(
-                id=emp_id,
-                del_state=0
-            ).first()
+            employee = employee_directory.get_by_id(emp_id)
             
             if employee:
+                first_name = employee['firstName']
+                last_name = employee['lastName']
                 result = {
-                    'id': employee.id,
-                    'firstName': employee.firstName or '',
-                    'lastName': employee.lastName or '',
-                    'officialEmail': employee.officialEmail or '',
-                    'phone1': employee.phone1 or '',
-                    'fullName': f"{employee.firstName} {employee.lastName}" if employee.firstName and employee.lastName else employee.firstName or employee.lastName or 'Unknown Employee'
+                    'id': employee['id'],
+                    'firstName': first_name,
+                    'lastName': last_name,
+                    'officialEmail': employee['officialEmail'] or '',
+                    'phone1': employee['phone1'] or '',
+                    'fullName': f"{first_name} {last_name}" if first_name and last_name else first_name or last_name or 'Unknown Employee'
                 }
                 if include_branch_level:
                     result.update({
-                        'branch': employee.branch or '',
-                        'level': employee.level or ''
+                        'branch': employee['branch'] or '',
+                        'level': employee['level'] or ''
                     })
                 return result
         except Exception as e:
@@ -138,147 +141,49 @@ def get_filtered_employees_by_role(user_employee_data):
     if not user_employee_data:
         return Employee.objects.none()
     
-    user_level = user_employee_data.get('level', '').lower()
+    user_level = (user_employee_data.get('level') or '').lower()
     user_employee_code = user_employee_data.get('employeeCode')
     user_first_name = user_employee_data.get('firstName')
     user_branch = user_employee_data.get('branch')
-    
-    
+
+    employee_objects = Employee.objects.filter(
+        firstName__isnull=False,
+        del_state=0,
+        status='Active'
+    ).exclude(firstName='')
+    in_branch = Q(branch__iexact=user_branch) | Q(branch__isnull=True)
+    self_match = Q(employeeCode=user_employee_code) | Q(firstName=user_first_name)
+
     # Apply role-based filtering logic
     if user_level == 'l1':
-        employee_objects = Employee.objects.filter(
-            Q(employeeCode=user_employee_code) | Q(firstName=user_first_name),
-            firstName__isnull=False,
-            del_state=0,
-            status='Active'
-        ).exclude(firstName='')
-        
+        employee_objects = employee_objects.filter(self_match)
+
     elif user_level == 'l2':
+        # Direct reports (reportingManager = code or first name) come from the closure table
+        direct_reports = org_hierarchy.subordinate_codes(user_employee_code, max_depth=1) if user_employee_code else []
+        employee_objects = employee_objects.filter(self_match | Q(employeeCode__in=direct_reports))
         if user_branch and user_branch.upper() in ['MADURAI', 'COIMBATORE', 'CHENNAI']:
-            employee_objects = Employee.objects.filter(
-                Q(reportingManager=user_employee_code) | 
-                Q(reportingManager=user_first_name) |
-                Q(employeeCode=user_employee_code) |
-                Q(firstName=user_first_name),
-                Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                firstName__isnull=False,
-                del_state=0,
-                status='Active'
-            ).exclude(firstName='')
-        else:
-            employee_objects = Employee.objects.filter(
-                Q(reportingManager=user_employee_code) | 
-                Q(reportingManager=user_first_name) |
-                Q(employeeCode=user_employee_code) |
-                Q(firstName=user_first_name),
-                firstName__isnull=False,
-                del_state=0,
-                status='Active'
-            ).exclude(firstName='')
-            
+            employee_objects = employee_objects.filter(in_branch)
+
     elif user_level == 'l3':
-        if user_branch:
-            employee_objects = Employee.objects.filter(
-                Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                firstName__isnull=False,
-                del_state=0,
-                status='Active'
-            ).exclude(firstName='')
-        else:
-            employee_objects = Employee.objects.filter(
-                Q(employeeCode=user_employee_code) | Q(firstName=user_first_name),
-                firstName__isnull=False,
-                del_state=0,
-                status='Active'
-            ).exclude(firstName='')
-            
+        employee_objects = employee_objects.filter(in_branch if user_branch else self_match)
+
     elif user_level in ['ceo', 'rm', 'l4', 'l5', 'bm']:
-        employee_objects = Employee.objects.filter(
-            firstName__isnull=False,
-            del_state=0,
-            status='Active'
-        ).exclude(firstName='')
-        
-    else:
-        if user_branch:
-            employee_objects = Employee.objects.filter(
-                Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                firstName__isnull=False,
-                del_state=0,
-                status='Active'
-            ).exclude(firstName='')
-        else:
-            employee_objects = Employee.objects.filter(
-                firstName__isnull=False,
-                del_state=0,
-                status='Active'
-            ).exclude(firstName='')
-    
-    employee_count = employee_objects.count()
-    
+        pass  # everyone
+
+    elif user_branch:
+        # Any other level (tl, blank, unknown) is scoped to its branch when it has one
+        employee_objects = employee_objects.filter(in_branch)
+
     return employee_objects.order_by('firstName', 'lastName')
 
 
 def get_user_employee_data(user):
-    """Get employee data for the current logged-in user using Django ORM"""
-    if not user or not user.is_authenticated:
+    """Get employee data for the current logged-in user (resolved once per request, see empreg/identity.py)"""
+    employee = employee_identity.for_user(user)
+    if not employee:
         return None
-    
-    
-    def create_employee_dict(employee):
-        """Helper to create employee dictionary"""
-        return {
-            'id': employee.id,
-            'employeeCode': employee.employeeCode or '',  
-            'firstName': employee.firstName or '',
-            'lastName': employee.lastName or '',
-            'officialEmail': employee.officialEmail or '',
-            'phone1': employee.phone1 or '',
-            'branch': employee.branch or '',
-            'level': employee.level or '',
-            'status': employee.status or '',
-            'fullName': f"{employee.firstName} {employee.lastName}" if employee.firstName and employee.lastName else employee.firstName or employee.lastName or 'Unknown Employee'
-        }
-    
-    try:
-        # Strategy 1: Match by email
-        if user.email:
-            employee = Employee.objects.filter(
-                officialEmail=user.email,
-                del_state=0
-            ).first()
-            if employee:
-                employee_dict = create_employee_dict(employee)
-                return employee_dict
-        
-        # Strategy 2: Match by username (firstName)
-        employee = Employee.objects.filter(
-            Q(firstName=user.username) | Q(firstName__iexact=user.username),
-            del_state=0
-        ).first()
-        if employee:
-            return create_employee_dict(employee)
-        
-        # Strategy 3: Match by employeeCode if username looks like employee code
-        if user.username and (user.username.startswith('CBE') or user.username.startswith('EMP')):
-            employee = Employee.objects.filter(
-                employeeCode=user.username,
-                del_state=0
-            ).first()
-            if employee:
-                return create_employee_dict(employee)
-        
-        # Strategy 4: For testing, return first active employee if no match found
-        employee = Employee.objects.filter(
-            Q(del_state=0) | Q(del_state__isnull=True)
-        ).order_by('id').first()
-        if employee:
-            return create_employee_dict(employee)
-            
-    except Exception as e:
-        print(f"[ERROR] Error fetching employee data for user {user.username}: {str(e)}")
-    
-    return None
+    return employee.as_dict()
 
 
 def get_employee_branch_from_plan(emp_id):
@@ -372,31 +277,7 @@ def increment_calls_on_plan(call_detail_id, candidate_id):
         call_detail_id: ID of the call detail record
         candidate_id: ID of the candidate to add
     """
-    try:
-        
-        
-        call_detail = CallDetails.objects.filter(id=call_detail_id).first()
-        
-        if call_detail:
-            print(f"[DEBUG] Found call_detail. Current tb_calls_onplan: '{call_detail.tb_calls_onplan}'")
-            
-            # Use the helper function to add candidate ID
-            updated_ids = add_candidate_to_list(call_detail.tb_calls_onplan, candidate_id)
-            
-            # Store the updated comma-separated candidate IDs
-            call_detail.tb_calls_onplan = updated_ids
-            call_detail.tb_call_up_date = timezone.now()
-            call_detail.save(update_fields=['tb_calls_onplan', 'tb_call_up_date'])
-            
-            print(f"[DEBUG] [SUCCESS] Successfully updated tb_calls_onplan to: '{call_detail.tb_calls_onplan}'")
-            print(f"[DEBUG] Candidate count: {get_candidate_count(call_detail.tb_calls_onplan)}")
-        else:
-            print(f"[ERROR] Call detail with ID {call_detail_id} not found")
-                
-    except Exception as e:
-        print(f"[ERROR] Error adding candidate to tb_calls_onplan: {str(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+    return store_candidate_id(call_detail_id, candidate_id, 'onplan')
 
 
 def increment_calls_on_others(call_detail_id, candidate_id):
@@ -407,31 +288,7 @@ def increment_calls_on_others(call_detail_id, candidate_id):
         call_detail_id: ID of the call detail record
         candidate_id: ID of the candidate to add
     """
-    try:
-        print(f"[DEBUG] increment_calls_on_others called with call_detail_id={call_detail_id}, candidate_id={candidate_id}")
-        
-        call_detail = CallDetails.objects.filter(id=call_detail_id).first()
-        
-        if call_detail:
-            print(f"[DEBUG] Found call_detail. Current tb_calls_onothers: '{call_detail.tb_calls_onothers}'")
-            
-            # Use the helper function to add candidate ID
-            updated_ids = add_candidate_to_list(call_detail.tb_calls_onothers, candidate_id)
-            
-            # Store the updated comma-separated candidate IDs
-            call_detail.tb_calls_onothers = updated_ids
-            call_detail.tb_call_up_date = timezone.now()
-            call_detail.save(update_fields=['tb_calls_onothers', 'tb_call_up_date'])
-            
-            print(f"[DEBUG] [SUCCESS] Successfully updated tb_calls_onothers to: '{call_detail.tb_calls_onothers}'")
-            print(f"[DEBUG] Candidate count: {get_candidate_count(call_detail.tb_calls_onothers)}")
-        else:
-            print(f"[ERROR] Call detail with ID {call_detail_id} not found")
-                
-    except Exception as e:
-        print(f"[ERROR] Error adding candidate to tb_calls_onothers: {str(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+    return store_candidate_id(call_detail_id, candidate_id, 'onothers')
 
 
 def add_candidate_to_list(existing_string, candidate_id):
@@ -498,6 +355,9 @@ def store_candidate_id(call_detail_id, candidate_id, field_type='onplan'):
     """
     Main function to store candidate ID in the appropriate CallDetails field
     
+    Inserts (call_detail, candidate, field_type) into call_detail_candidate,
+    ignoring duplicates; tb_calls_<field_type> is rewritten from those rows.
+    
     Args:
         call_detail_id: ID of the call detail record
         candidate_id: ID of the candidate to add
@@ -509,46 +369,15 @@ def store_candidate_id(call_detail_id, candidate_id, field_type='onplan'):
     try:
         print(f"[DEBUG] store_candidate_id called with call_detail_id={call_detail_id}, candidate_id={candidate_id}, field_type={field_type}")
         
-        call_detail = CallDetails.objects.filter(id=call_detail_id).first()
-        
-        if not call_detail:
-            print(f"[ERROR] Call detail with ID {call_detail_id} not found")
-            return False
-        
-        # Get the appropriate field based on field_type
-        field_mapping = {
-            'onplan': call_detail.tb_calls_onplan,
-            'onothers': call_detail.tb_calls_onothers,
-            'profiles': call_detail.tb_calls_profiles,
-            'profilesothers': call_detail.tb_calls_profilesothers
-        }
-        
-        if field_type not in field_mapping:
+        if field_type not in candidate_links.KINDS:
             print(f"[ERROR] Invalid field_type: {field_type}")
             return False
         
-        current_value = field_mapping[field_type]
-        print(f"[DEBUG] Current {field_type} value: '{current_value}'")
-        
-        # Use the helper function to add candidate ID
-        updated_ids = add_candidate_to_list(current_value, candidate_id)
-        
-        # Update the appropriate field
-        if field_type == 'onplan':
-            call_detail.tb_calls_onplan = updated_ids
-        elif field_type == 'onothers':
-            call_detail.tb_calls_onothers = updated_ids
-        elif field_type == 'profiles':
-            call_detail.tb_calls_profiles = updated_ids
-        elif field_type == 'profilesothers':
-            call_detail.tb_calls_profilesothers = updated_ids
-        
-        call_detail.tb_call_up_date = timezone.now()
-        call_detail.save(update_fields=[f'tb_calls_{field_type}', 'tb_call_up_date'])
-        
-        print(f"[DEBUG] [SUCCESS] Successfully updated tb_calls_{field_type} to: '{updated_ids}'")
-        print(f"[DEBUG] Candidate count: {get_candidate_count(updated_ids)}")
+        if not candidate_links.add(call_detail_id, candidate_id, field_type):
+            print(f"[ERROR] Call detail with ID {call_detail_id} not found")
+            return False
         
+        print(f"[DEBUG] [SUCCESS] Stored candidate {candidate_id} in tb_calls_{field_type}")
         return True
         
     except Exception as e:
@@ -560,7 +389,7 @@ def store_candidate_id(call_detail_id, candidate_id, field_type='onplan'):
 
 def get_call_statistics(call_detail_id=None, candidate_id=None, plan_id=None):
     """
-    Get call statistics from CallDetails model fields
+    Get call statistics from call_detail_candidate
     
     Args:
         call_detail_id: ID of the call detail record (optional)
@@ -571,10 +400,6 @@ def get_call_statistics(call_detail_id=None, candidate_id=None, plan_id=None):
         dict: Statistics data or None if not found
     """
     try:
-        from django.db.models import Sum, Q
-        from django.db.models.functions import Cast
-        from django.db.models import IntegerField
-        
         if call_detail_id:
             # Get single call detail record using Django ORM
             call_detail = CallDetails.objects.filter(id=call_detail_id).first()
@@ -585,47 +410,19 @@ def get_call_statistics(call_detail_id=None, candidate_id=None, plan_id=None):
                     'tb_call_up_date': call_detail.tb_call_up_date
                 })
                 return stats
-        elif candidate_id:
-            # Aggregate statistics for candidate - now using candidate ID counting
-            call_details = CallDetails.objects.filter(tb_call_emp_id=candidate_id)
-            
-            total_calls_on_plan = 0
-            total_calls_on_others = 0
-            total_profiles_on_plan = 0
-            total_profiles_on_others = 0
-            
-            for call_detail in call_details:
-                total_calls_on_plan += get_candidate_count(call_detail.tb_calls_onplan)
-                total_calls_on_others += get_candidate_count(call_detail.tb_calls_onothers)
-                total_profiles_on_plan += get_candidate_count(call_detail.tb_calls_profiles)
-                total_profiles_on_others += get_candidate_count(call_detail.tb_calls_profilesothers)
-            
-            return {
-                'total_calls_on_plan': total_calls_on_plan,
-                'total_calls_on_others': total_calls_on_others,
-                'total_profiles_on_plan': total_profiles_on_plan,
-                'total_profiles_on_others': total_profiles_on_others
-            }
-        elif plan_id:
-            # Aggregate statistics for plan - now using candidate ID counting
-            call_details = CallDetails.objects.filter(tb_call_plan_id=plan_id)
-            
-            total_calls_on_plan = 0
-            total_calls_on_others = 0
-            total_profiles_on_plan = 0
-            total_profiles_on_others = 0
-            
-            for call_detail in call_details:
-                total_calls_on_plan += get_candidate_count(call_detail.tb_calls_onplan)
-                total_calls_on_others += get_candidate_count(call_detail.tb_calls_onothers)
-                total_profiles_on_plan += get_candidate_count(call_detail.tb_calls_profiles)
-                total_profiles_on_others += get_candidate_count(call_detail.tb_calls_profilesothers)
+        elif candidate_id or plan_id:
+            # Aggregate over the employee's (candidate_id) or the plan's call details, one GROUP BY kind query
+            if candidate_id:
+                call_details = CallDetails.objects.filter(tb_call_emp_id=candidate_id)
+            else:
+                call_details = CallDetails.objects.filter(tb_call_plan_id=plan_id)
+            totals = candidate_links.totals(call_details)
             
             return {
-                'total_calls_on_plan': total_calls_on_plan,
-                'total_calls_on_others': total_calls_on_others,
-                'total_profiles_on_plan': total_profiles_on_plan,
-                'total_profiles_on_others': total_profiles_on_others
+                'total_calls_on_plan': totals['onplan'],
+                'total_calls_on_others': totals['onothers'],
+                'total_profiles_on_plan': totals['profiles'],
+                'total_profiles_on_others': totals['profilesothers']
             }
         else:
             return None
@@ -643,31 +440,7 @@ def increment_profiles_on_plan(call_detail_id, candidate_id):
         call_detail_id: ID of the call detail record
         candidate_id: ID of the candidate to add
     """
-    try:
-        print(f"[DEBUG] increment_profiles_on_plan called with call_detail_id={call_detail_id}, candidate_id={candidate_id}")
-        
-        call_detail = CallDetails.objects.filter(id=call_detail_id).first()
-        
-        if call_detail:
-            print(f"[DEBUG] Found call_detail. Current tb_calls_profiles: '{call_detail.tb_calls_profiles}'")
-            
-            # Use the helper function to add candidate ID
-            updated_ids = add_candidate_to_list(call_detail.tb_calls_profiles, candidate_id)
-            
-            # Store the updated comma-separated candidate IDs
-            call_detail.tb_calls_profiles = updated_ids
-            call_detail.tb_call_up_date = timezone.now()
-            call_detail.save(update_fields=['tb_calls_profiles', 'tb_call_up_date'])
-            
-            print(f"[DEBUG] [SUCCESS] Successfully updated tb_calls_profiles to: '{call_detail.tb_calls_profiles}'")
-            print(f"[DEBUG] Candidate count: {get_candidate_count(call_detail.tb_calls_profiles)}")
-        else:
-            print(f"[ERROR] Call detail with ID {call_detail_id} not found")
-                
-    except Exception as e:
-        print(f"[ERROR] Error adding candidate to tb_calls_profiles: {str(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+    return store_candidate_id(call_detail_id, candidate_id, 'profiles')
 
 
 def increment_profiles_on_others(call_detail_id, candidate_id):
@@ -678,31 +451,7 @@ def increment_profiles_on_others(call_detail_id, candidate_id):
         call_detail_id: ID of the call detail record
         candidate_id: ID of the candidate to add
     """
-    try:
-        print(f"[DEBUG] increment_profiles_on_others called with call_detail_id={call_detail_id}, candidate_id={candidate_id}")
-        
-        call_detail = CallDetails.objects.filter(id=call_detail_id).first()
-        
-        if call_detail:
-            print(f"[DEBUG] Found call_detail. Current tb_calls_profilesothers: '{call_detail.tb_calls_profilesothers}'")
-            
-            # Use the helper function to add candidate ID
-            updated_ids = add_candidate_to_list(call_detail.tb_calls_profilesothers, candidate_id)
-            
-            # Store the updated comma-separated candidate IDs
-            call_detail.tb_calls_profilesothers = updated_ids
-            call_detail.tb_call_up_date = timezone.now()
-            call_detail.save(update_fields=['tb_calls_profilesothers', 'tb_call_up_date'])
-            
-            print(f"[DEBUG] [SUCCESS] Successfully updated tb_calls_profilesothers to: '{call_detail.tb_calls_profilesothers}'")
-            print(f"[DEBUG] Candidate count: {get_candidate_count(call_detail.tb_calls_profilesothers)}")
-        else:
-            print(f"[ERROR] Call detail with ID {call_detail_id} not found")
-                
-    except Exception as e:
-        print(f"[ERROR] Error adding candidate to tb_calls_profilesothers: {str(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+    return store_candidate_id(call_detail_id, candidate_id, 'profilesothers')
 
 
 # Helper functions for converting candidate IDs to counts
@@ -773,19 +522,20 @@ def format_statistics_for_frontend(call_detail):
     Returns:
         dict: Statistics with counts for frontend
     """
+    ids = candidate_links.ids_by_kind(call_detail.id)
     return {
         'id': call_detail.id,
         'plan_data': call_detail.tb_call_plan_data,
-        'tb_calls_onplan_count': get_candidate_count(call_detail.tb_calls_onplan),
-        'tb_calls_onothers_count': get_candidate_count(call_detail.tb_calls_onothers),
-        'tb_calls_profiles_count': get_candidate_count(call_detail.tb_calls_profiles),
-        'tb_calls_profilesothers_count': get_candidate_count(call_detail.tb_calls_profilesothers),
+        'tb_calls_onplan_count': len(ids['onplan']),
+        'tb_calls_onothers_count': len(ids['onothers']),
+        'tb_calls_profiles_count': len(ids['profiles']),
+        'tb_calls_profilesothers_count': len(ids['profilesothers']),
         
         # Optional: Include candidate IDs if needed for detailed analysis
-        'tb_calls_onplan_ids': get_candidate_ids_list(call_detail.tb_calls_onplan),
-        'tb_calls_onothers_ids': get_candidate_ids_list(call_detail.tb_calls_onothers),
-        'tb_calls_profiles_ids': get_candidate_ids_list(call_detail.tb_calls_profiles),
-        'tb_calls_profilesothers_ids': get_candidate_ids_list(call_detail.tb_calls_profilesothers)
+        'tb_calls_onplan_ids': ids['onplan'],
+        'tb_calls_onothers_ids': ids['onothers'],
+        'tb_calls_profiles_ids': ids['profiles'],
+        'tb_calls_profilesothers_ids': ids['profilesothers']
     }
 
 
@@ -964,6 +714,10 @@ class CallDetailsViewSet(viewsets.ModelViewSet):
         
         # Save the updated instance
         instance = serializer.save()
+        
+        # save() wrote the tb_calls_* values read before the update; rewrite them from call_detail_candidate
+        for field, value in candidate_links.refresh_legacy(instance.id).items():
+            setattr(instance, field, value)
         return instance
     
     def get_queryset(self):
@@ -996,10 +750,9 @@ class CallDetailsViewSet(viewsets.ModelViewSet):
                 print(f"[DEBUG] Using explicit branch_id from params: {branch_id_param}")
                 # Filter by employees who belong to this branch using Django ORM
                 # Only include employees from the specific branch (no NULL branches)
-                branch_employee_ids = list(Employee.objects.filter(
-                    branch__iexact=branch_id_param,
-                    del_state=0
-                ).values_list('id', flat=True))
+                branch_employee_ids = list(org_hierarchy.members(
+                    branch=branch_id_param, active_only=False
+                ).values_list('employee_id', flat=True))
                 if branch_employee_ids:
                     queryset = queryset.filter(tb_call_emp_id__in=branch_employee_ids)
                     print(f"[DEBUG] After branch filter (explicit): {queryset.count()}")
@@ -1007,21 +760,11 @@ class CallDetailsViewSet(viewsets.ModelViewSet):
                 # If user is not admin, filter by their branch using Django ORM
                 print(f"[DEBUG] Applying branch filter for non-admin user: {user_branch}")
                 # Only include employees from the specific branch (no NULL branches)
-                branch_employee_ids = list(Employee.objects.filter(
-                    branch__iexact=user_branch,
-                    del_state=0
-                ).values_list('id', flat=True))
-                
-                print(f"[DEBUG] Branch employee IDs for '{user_branch}': {branch_employee_ids}")
-                
-                # Debug: Show employee details for branch filtering
-                branch_employees = Employee.objects.filter(
-                    branch__iexact=user_branch,
-                    del_state=0
-                )[:10]  # Show first 10
-                for emp in branch_employees:
-                    print(f"[DEBUG] Branch Employee: ID={emp.id}, Name={emp.firstName}, Branch={emp.branch}")
-                
+                branch_employee_ids = list(org_hierarchy.members(
+                    branch=user_branch, active_only=False
+                ).values_list('employee_id', flat=True))
+                print(f"[DEBUG] Branch employee IDs for '{user_branch}': {len(branch_employee_ids)}")
+
                 if branch_employee_ids:
                     queryset = queryset.filter(tb_call_emp_id__in=branch_employee_ids)
                     print(f"[DEBUG] After branch filter (user): {queryset.count()}")
@@ -1097,7 +840,8 @@ class CallDetailsViewSet(viewsets.ModelViewSet):
                         pass
             
             print(f"[DEBUG] Final queryset count before ordering: {queryset.count()}")
-            result = queryset.order_by('-tb_call_add_date')
+            # linked_<kind>_count for the serializers' count fields
+            result = candidate_links.with_counts(queryset).order_by('-tb_call_add_date')
             print(f"[DEBUG] Final queryset count after ordering: {result.count()}")
             return result
         except Exception as e:
@@ -3875,10 +3619,9 @@ class CallDetailsViewSet(viewsets.ModelViewSet):
             
             # Apply branch filtering if user is not admin
             if not is_admin and user_branch:
-                branch_employee_ids = list(Employee.objects.filter(
-                    Q(branch__iexact=user_branch) | Q(branch__isnull=True),
-                    del_state=0
-                ).values_list('id', flat=True))
+                branch_employee_ids = list(org_hierarchy.members(
+                    branch=user_branch, active_only=False, with_unassigned=True
+                ).values_list('employee_id', flat=True))
                 if branch_employee_ids:
                     queryset = queryset.filter(tb_call_emp_id__in=branch_employee_ids)
             
@@ -25,6 +25,10 @@ try:
     from django.core.wsgi import get_wsgi_application
     application = get_wsgi_application()
 
+    # Load the resume NLP model up front when RESUME_NLP_PRELOAD is set
+    from candidate import resume_nlp
+    resume_nlp.preload_if_configured()
+
 except Exception as e:
 
     raise